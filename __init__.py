@@ -3,15 +3,21 @@ import logging
 import sys
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP, Platform
+from homeassistant.core import Event, HomeAssistant
 
 from .const import DOMAIN
 from .core.audio_processor import AudioProcessor
 from .core.light_controller import LightController
 from .core.effect_engine import EffectEngine
+from .core.layout import LightLayout
+from .core.render_loop import RenderScheduler
+from .core.show import ShowManager
 from .services import async_register_services
 from .cache import AuroraCache
+from .effect_creator import EffectCreator
+from .optimization import PerformanceOptimizer
+from .websocket import async_register_websocket_commands
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -39,17 +45,83 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         light_controller = LightController(hass)
         effect_engine = EffectEngine(hass)
 
+        # Put light dispatch to sleep whenever the audio goes quiet; it
+        # stays active until the running processor first decides
+        remove_idle_listener = audio_processor.async_add_idle_listener(
+            light_controller.set_idle
+        )
+        await audio_processor.start()
+
+        # Light positions for spatial effects
+        layout = LightLayout(hass)
+        await layout.async_load()
+
+        # Render all active effects from one clock
+        render_scheduler = RenderScheduler(
+            hass,
+            audio_processor.feature_bus,
+            light_controller,
+            layout=layout
+        )
+        effect_engine.attach_scheduler(render_scheduler)
+        await render_scheduler.start()
+        # Effects designed in the creator render like the built-in ones
+        effect_creator = EffectCreator(hass)
+        await effect_creator.async_load()
+        for effect_id, name in effect_creator.get_effects().items():
+            await effect_engine.register_effect(
+                effect_id,
+                {"type": effect_id, "name": name}
+            )
+        # Resume the effects that were running before the restart
+        await effect_engine.async_load_state()
+
+        # Entries are not unloaded on shutdown, so save the effects then
+        async def _async_save_effects(event: Event) -> None:
+            await effect_engine.async_save_state()
+
+        remove_stop_listener = hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_STOP,
+            _async_save_effects
+        )
+        show_manager = ShowManager(hass, render_scheduler)
+        await show_manager.async_load()
+        remove_show_listener = None
+        if audio_processor.media_player:
+            # Shows compiled for a track replace live rendering
+            remove_show_listener = show_manager.follow(
+                audio_processor.media_player
+            )
+
+        # Let the optimizer trade analysis quality for CPU at runtime
+        optimizer = PerformanceOptimizer(hass)
+        optimizer.attach_audio_processor(audio_processor)
+        optimizer_task = hass.async_create_task(
+            optimizer.start_optimization_loop()
+        )
+
         # Store references
         hass.data.setdefault(DOMAIN, {})
         hass.data[DOMAIN][entry.entry_id] = {
             "audio_processor": audio_processor,
+            "feature_bus": audio_processor.feature_bus,
             "light_controller": light_controller,
             "effect_engine": effect_engine,
+            "effect_creator": effect_creator,
+            "render_scheduler": render_scheduler,
+            "show_manager": show_manager,
+            "remove_show_listener": remove_show_listener,
+            "layout": layout,
             "cache": cache,
+            "remove_idle_listener": remove_idle_listener,
+            "remove_stop_listener": remove_stop_listener,
+            "optimizer": optimizer,
+            "optimizer_task": optimizer_task,
         }
 
         # Register services
         await async_register_services(hass)
+        async_register_websocket_commands(hass)
 
         # Forward entry setup to platforms
         await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
@@ -71,9 +143,23 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         if unload_ok:
             if DOMAIN in hass.data and entry.entry_id in hass.data[DOMAIN]:
                 data = hass.data[DOMAIN].pop(entry.entry_id)
+                if "remove_idle_listener" in data:
+                    data["remove_idle_listener"]()
+                if "remove_stop_listener" in data:
+                    data["remove_stop_listener"]()
+                if "optimizer_task" in data:
+                    data["optimizer_task"].cancel()
+                if data.get("remove_show_listener"):
+                    data["remove_show_listener"]()
+                if "show_manager" in data:
+                    await data["show_manager"].async_stop_recording()
+                    await data["show_manager"].async_stop_playback()
+                if "render_scheduler" in data:
+                    await data["render_scheduler"].stop()
                 if "audio_processor" in data:
                     await data["audio_processor"].stop()
                 if "effect_engine" in data:
+                    await data["effect_engine"].async_save_state()
                     await data["effect_engine"].cleanup()
                 if "cache" in data:
                     await data["cache"].async_stop()
@@ -22,6 +22,10 @@ from .const import (
     DEFAULT_LATENCY_THRESHOLD,
     CONF_MEDIA_PLAYER,
     CONF_LIGHTS,
+    CONF_AUDIO_CHANNELS,
+    CONF_PUBLISH_EVENTS,
+    DEFAULT_AUDIO_CHANNELS,
+    DEFAULT_PUBLISH_EVENTS,
     DEFAULT_NAME,
 )
 
@@ -102,6 +106,14 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             step_id="media_player",
             data_schema=vol.Schema({
                 vol.Required(CONF_MEDIA_PLAYER): vol.In(media_players),
+                vol.Optional(
+                    CONF_AUDIO_CHANNELS,
+                    default=DEFAULT_AUDIO_CHANNELS
+                ): vol.In([1, 2, 4, 6]),
+                vol.Optional(
+                    CONF_PUBLISH_EVENTS,
+                    default=DEFAULT_PUBLISH_EVENTS
+                ): bool,
             }),
             errors=errors,
         )
@@ -11,6 +11,9 @@ CONF_LIGHT_GROUPS = "light_groups"
 CONF_EFFECT_TYPE = "effect_type"
 CONF_EFFECT_PARAMS = "effect_params"
 CONF_LIGHTS = "lights"
+CONF_NOISE_FLOOR = "noise_floor"
+CONF_AUDIO_CHANNELS = "audio_channels"
+CONF_PUBLISH_EVENTS = "publish_events"
 
 # Default Values
 DEFAULT_NAME = "Aurora Sound to Light"
@@ -24,6 +27,10 @@ DEFAULT_BUFFER_SIZE = 100
 DEFAULT_LATENCY_THRESHOLD = 50
 DEFAULT_FREQUENCY_BANDS = 32
 DEFAULT_UPDATE_INTERVAL = 0.05  # 50ms
+DEFAULT_NOISE_FLOOR = -60  # dBFS
+DEFAULT_AUDIO_CHANNELS = 1  # mono
+DEFAULT_PUBLISH_EVENTS = False
+DEFAULT_SUMMARY_INTERVAL = 1.0  # seconds between aurora_audio_summary events
 
 # Effect Types
 EFFECT_BASS_PULSE = "bass_pulse"
@@ -77,3 +84,8 @@ METRIC_AUDIO_LATENCY = "audio_latency"
 METRIC_LIGHT_LATENCY = "light_latency"
 METRIC_CPU_USAGE = "cpu_usage"
 METRIC_MEMORY_USAGE = "memory_usage"
+
+# Audio features
+FEATURE_LOUDNESS_MOMENTARY = "loudness_momentary"
+FEATURE_LOUDNESS_SHORT_TERM = "loudness_short_term"
+UNIT_LUFS = "LUFS"
@@ -0,0 +1,111 @@
+"""Analysis profile for Aurora Sound to Light."""
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+# Default analysis resolution
+SAMPLE_RATE = 44100
+CHUNK_SIZE = 2048
+NUM_BANDS = 32
+MIN_FREQ = 20
+MAX_FREQ = 20000
+FRAME_RATE = 30.0
+
+# Limits for profiles chosen at runtime
+MIN_CHUNK_SIZE = 512
+MAX_CHUNK_SIZE = 8192
+MIN_BANDS = 8
+MIN_FRAME_RATE = 5.0
+MAX_FRAME_RATE = 60.0
+
+
+@dataclass(frozen=True)
+class AnalysisProfile:
+    """Resolution and rate of the audio analysis."""
+
+    sample_rate: int = SAMPLE_RATE
+    chunk_size: int = CHUNK_SIZE
+    num_bands: int = NUM_BANDS
+    frame_rate: float = FRAME_RATE
+    min_freq: float = MIN_FREQ
+    max_freq: float = MAX_FREQ
+
+    def __post_init__(self) -> None:
+        """Validate the profile."""
+        if self.chunk_size & (self.chunk_size - 1) or not (
+            MIN_CHUNK_SIZE <= self.chunk_size <= MAX_CHUNK_SIZE
+        ):
+            raise ValueError(
+                f"chunk_size must be a power of two between "
+                f"{MIN_CHUNK_SIZE} and {MAX_CHUNK_SIZE}"
+            )
+        if self.num_bands < MIN_BANDS:
+            raise ValueError(f"num_bands must be at least {MIN_BANDS}")
+        if not MIN_FRAME_RATE <= self.frame_rate <= MAX_FRAME_RATE:
+            raise ValueError(
+                f"frame_rate must be between {MIN_FRAME_RATE} "
+                f"and {MAX_FRAME_RATE}"
+            )
+        if not 0 < self.min_freq < self.max_freq <= self.sample_rate / 2:
+            raise ValueError("Invalid frequency range")
+
+    @property
+    def num_bins(self) -> int:
+        """Return the number of rFFT bins per chunk."""
+        return self.chunk_size // 2 + 1
+
+    def scaled(self, quality: float, chunk_size: int) -> "AnalysisProfile":
+        """Return a profile for a 0..1 quality level and target chunk size.
+
+        Lower quality reduces the band count and the analysis frame rate;
+        the chunk size is snapped to the nearest supported power of two.
+        """
+        quality = min(1.0, max(0.0, quality))
+        chunk = int(2 ** round(np.log2(max(1, chunk_size))))
+        chunk = min(MAX_CHUNK_SIZE, max(MIN_CHUNK_SIZE, chunk))
+        bands = max(MIN_BANDS, int(round(NUM_BANDS * quality / 8)) * 8)
+        rate = max(MIN_FRAME_RATE, round(FRAME_RATE * quality))
+        return replace(
+            self,
+            chunk_size=chunk,
+            num_bands=bands,
+            frame_rate=float(rate),
+        )
+
+
+def build_band_matrix(band_indices: np.ndarray, num_bins: int) -> np.ndarray:
+    """Build a (bands, bins) matrix that averages rFFT bins into bands.
+
+    Bands narrower than one bin fall back to their start bin so the low
+    end of the logarithmic scale never averages an empty slice.
+    """
+    num_bands = len(band_indices) - 1
+    matrix = np.zeros((num_bands, num_bins))
+    for i in range(num_bands):
+        start = min(band_indices[i], num_bins - 1)
+        end = min(max(band_indices[i + 1], start + 1), num_bins)
+        matrix[i, start:end] = 1.0 / (end - start)
+    return matrix
+
+
+class AnalysisTables:
+    """Precomputed lookup tables for one analysis profile."""
+
+    def __init__(self, profile: AnalysisProfile) -> None:
+        """Build the tables for a profile."""
+        self.profile = profile
+        self.window = np.hanning(profile.chunk_size)
+
+        # Frequency bands (logarithmic scale)
+        self.freq_range = np.logspace(
+            np.log10(profile.min_freq),
+            np.log10(profile.max_freq),
+            profile.num_bands + 1
+        )
+        self.band_indices = np.floor(
+            self.freq_range * profile.chunk_size / profile.sample_rate
+        ).astype(int)
+        self.band_matrix = build_band_matrix(
+            self.band_indices,
+            profile.num_bins
+        )
@@ -4,29 +4,49 @@ import logging
 import numpy as np
 import subprocess
 import shutil
-from typing import Dict, Optional
+from typing import Callable, Dict, List, Optional
 
-from homeassistant.core import HomeAssistant
+from homeassistant.const import STATE_PLAYING
+from homeassistant.core import Event, HomeAssistant, callback
 from homeassistant.components.ffmpeg import FFmpegManager
 from homeassistant.components.media_player import MediaType
 from homeassistant.components.media_player.const import (
     ATTR_MEDIA_CONTENT_ID,
     ATTR_MEDIA_CONTENT_TYPE,
 )
+from homeassistant.helpers.event import async_track_state_change_event
+
+from ..const import (
+    CONF_AUDIO_CHANNELS,
+    CONF_NOISE_FLOOR,
+    CONF_PUBLISH_EVENTS,
+    DEFAULT_AUDIO_CHANNELS,
+    DEFAULT_NOISE_FLOOR,
+    DEFAULT_PUBLISH_EVENTS,
+    DEFAULT_SUMMARY_INTERVAL,
+)
+from .analysis_profile import (
+    AnalysisProfile,
+    AnalysisTables,
+    CHUNK_SIZE,
+    MAX_FREQ,
+    MIN_FREQ,
+    NUM_BANDS,
+    SAMPLE_RATE,
+)
+from .feature_bus import AudioFeatures, FeatureBus, StructureEvent
+from .loudness import LoudnessMeter
+from .structure import StructureAnalyzer
 
 _LOGGER = logging.getLogger(__name__)
 
 # Audio processing constants
-SAMPLE_RATE = 44100
-CHUNK_SIZE = 2048
-NUM_BANDS = 32
-MIN_FREQ = 20
-MAX_FREQ = 20000
 BEAT_MIN_FREQ = 20
 BEAT_MAX_FREQ = 200
 BEAT_THRESHOLD = 0.15
 ENERGY_SMOOTH = 0.2
 TEMPO_SMOOTH = 0.2
+SILENCE_HOLD_TIME = 2.0  # seconds below the noise floor before going idle
 
 
 class AudioProcessor:
@@ -37,6 +57,12 @@ class AudioProcessor:
         self.hass = hass
         self.config = config
         self.media_player: Optional[str] = config.get("media_player")
+        self._noise_floor = 10 ** (
+            config.get(CONF_NOISE_FLOOR, DEFAULT_NOISE_FLOOR) / 20
+        )
+        self._channels = max(
+            1, int(config.get(CONF_AUDIO_CHANNELS, DEFAULT_AUDIO_CHANNELS))
+        )
 
         # Initialize FFmpeg
         ffmpeg_bin = shutil.which("ffmpeg")
@@ -44,13 +70,29 @@ class AudioProcessor:
             raise RuntimeError("FFmpeg not found")
         self.ffmpeg = FFmpegManager(self.hass, ffmpeg_bin)
 
+        # Internal consumers read features from here instead of hass.bus
+        self.feature_bus = FeatureBus(hass)
+        if config.get(CONF_PUBLISH_EVENTS, DEFAULT_PUBLISH_EVENTS):
+            self.feature_bus.subscribe(
+                AudioFeatures,
+                self._fire_summary,
+                max_rate=1 / DEFAULT_SUMMARY_INTERVAL
+            )
+
+        # Analysis profile and its precomputed tables
+        self._profile = AnalysisProfile()
+        self._tables = AnalysisTables(self._profile)
+
         # Audio processing state
         self._running = False
         self._task: Optional[asyncio.Task] = None
         self._process: Optional[subprocess.Popen] = None
-        self._last_chunk = np.zeros(CHUNK_SIZE)
-        self._freq_bands = np.zeros(NUM_BANDS)
-        self._waveform = np.zeros(NUM_BANDS)
+        self._freq_bands = np.zeros(self._profile.num_bands)
+        self._waveform = np.zeros(self._profile.num_bands)
+        self._channel_bands = np.zeros(
+            (self._channels, self._profile.num_bands)
+        )
+        self._balance = 0.0
         self._energy_history = np.zeros(8)
         self._beat_history = np.zeros(8)
         self._tempo_history = np.zeros(4)
@@ -60,16 +102,67 @@ class AudioProcessor:
         self._is_beat = False
         self._tempo = 0.0
         self._last_beat_time = 0.0
+        self._loudness = LoudnessMeter(
+            self._profile.sample_rate,
+            self._profile.chunk_size
+        )
+        self._structure = StructureAnalyzer(
+            self._profile.sample_rate,
+            self._profile.chunk_size,
+            self._profile.num_bands
+        )
+        self._structure_events: List[str] = []
+
+        # Idle detection state
+        self._idle = True
+        self._idle_decided = False  # listeners hear the first decision
+        self._silent_since: Optional[float] = None
+        self._idle_listeners: List[Callable[[bool], None]] = []
+
+    @property
+    def channels(self) -> int:
+        """Return the number of analyzed audio channels."""
+        return self._channels
+
+    @property
+    def profile(self) -> AnalysisProfile:
+        """Return the active analysis profile."""
+        return self._profile
+
+    def set_profile(self, profile: AnalysisProfile) -> None:
+        """Hot-swap the analysis profile.
+
+        Every table and analyzer for the new profile is built before
+        anything is replaced, so the processing loop sees either the old
+        or the new profile and never a mix. The decoder keeps running
+        unless the sample rate changes.
+        """
+        if profile == self._profile:
+            return
 
-        # Set up frequency bands (logarithmic scale)
-        self._freq_range = np.logspace(
-            np.log10(MIN_FREQ),
-            np.log10(MAX_FREQ),
-            NUM_BANDS + 1
+        tables = AnalysisTables(profile)
+        loudness = LoudnessMeter(profile.sample_rate, profile.chunk_size)
+        structure = StructureAnalyzer(
+            profile.sample_rate,
+            profile.chunk_size,
+            profile.num_bands
         )
-        self._band_indices = np.floor(
-            self._freq_range * CHUNK_SIZE / SAMPLE_RATE
-        ).astype(int)
+        restart = profile.sample_rate != self._profile.sample_rate
+
+        self._profile = profile
+        self._tables = tables
+        self._loudness = loudness
+        self._structure = structure
+        self._structure_events = []
+        if len(self._freq_bands) != profile.num_bands:
+            self._freq_bands = np.zeros(profile.num_bands)
+            self._waveform = np.zeros(profile.num_bands)
+            self._channel_bands = np.zeros((self._channels, profile.num_bands))
+
+        if restart:
+            self._close_stream()
+
+        _LOGGER.debug("Applied analysis profile: %s", profile)
 
     async def start(self):
         """Start audio processing."""
@@ -91,12 +184,125 @@ class AudioProcessor:
                 pass
             self._task = None
 
+        self._close_stream()
+        self._set_idle(True)
+
+        _LOGGER.info("Stopped audio processor")
+
+    @property
+    def is_idle(self) -> bool:
+        """Return True while there is no audible signal to analyse."""
+        return self._idle
+
+    @property
+    def loudness_momentary(self) -> float:
+        """Return the K-weighted momentary loudness (400 ms) in LUFS."""
+        return self._loudness.momentary
+
+    @property
+    def loudness_short_term(self) -> float:
+        """Return the K-weighted short-term loudness (3 s) in LUFS."""
+        return self._loudness.short_term
+
+    @callback
+    def async_add_idle_listener(
+        self,
+        listener: Callable[[bool], None]
+    ) -> Callable[[], None]:
+        """Register a callback for idle/active transitions.
+
+        Returns a function that removes the listener again.
+        """
+        self._idle_listeners.append(listener)
+
+        @callback
+        def remove_listener() -> None:
+            if listener in self._idle_listeners:
+                self._idle_listeners.remove(listener)
+
+        return remove_listener
+
+    def _set_idle(self, idle: bool) -> None:
+        """Switch between the idle and active state."""
+        if idle == self._idle and self._idle_decided:
+            return
+
+        self._idle = idle
+        self._idle_decided = True
+        self._silent_since = None
+        if idle:
+            # Leave consumers with a silent frame rather than the last loud one
+            num_bands = self._profile.num_bands
+            self._freq_bands = np.zeros(num_bands)
+            self._waveform = np.zeros(num_bands)
+            self._channel_bands = np.zeros((self._channels, num_bands))
+            self._balance = 0.0
+            self._loudness.reset()
+            self._structure.reset()
+            self._structure_events = []
+            self._energy = 0.0
+            self._is_beat = False
+
+        _LOGGER.debug("Audio processor is now %s", "idle" if idle else "active")
+        for listener in list(self._idle_listeners):
+            try:
+                listener(idle)
+            except Exception as err:
+                _LOGGER.error("Error in idle listener: %s", err)
+
+    def _update_idle_state(self, audio_data: np.ndarray) -> bool:
+        """Update the idle state from the raw PCM and return it.
+
+        Only the RMS of the chunk is computed here so silence costs a dot
+        product instead of a full analysis pass.
+        """
+        samples = audio_data.ravel()
+        rms = float(np.sqrt(np.dot(samples, samples) / len(samples)))
+        if rms >= self._noise_floor:
+            self._set_idle(False)
+            self._silent_since = None
+            return False
+
+        now = asyncio.get_event_loop().time()
+        if self._silent_since is None:
+            self._silent_since = now
+        elif now - self._silent_since >= SILENCE_HOLD_TIME:
+            self._set_idle(True)
+
+        return self._idle
+
+    def _is_playing(self) -> bool:
+        """Return True if the media player is currently playing."""
+        state = self.hass.states.get(self.media_player)
+        return state is not None and state.state == STATE_PLAYING
+
+    async def _wait_for_playback(self) -> None:
+        """Sleep until the media player starts playing again."""
+        playing = asyncio.Event()
+
+        @callback
+        def _state_changed(event: Event) -> None:
+            new_state = event.data.get("new_state")
+            if new_state is not None and new_state.state == STATE_PLAYING:
+                playing.set()
+
+        remove_listener = async_track_state_change_event(
+            self.hass,
+            [self.media_player],
+            _state_changed
+        )
+        try:
+            if not self._is_playing():
+                await playing.wait()
+        finally:
+            remove_listener()
+
+    def _close_stream(self) -> None:
+        """Terminate the FFmpeg decoder if it is running."""
         if self._process:
             self._process.terminate()
             self._process = None
 
-        _LOGGER.info("Stopped audio processor")
-
     async def _process_loop(self):
         """Main audio processing loop."""
         try:
@@ -105,12 +311,25 @@ class AudioProcessor:
                     await asyncio.sleep(1)
                     continue
 
+                # Paused or stopped: drop the decoder and sleep until the
+                # player changes state instead of polling
+                if not self._is_playing():
+                    self._set_idle(True)
+                    self._close_stream()
+                    await self._wait_for_playback()
+                    continue
+
                 # Get audio data from media player
                 audio_data = await self._get_audio_data()
                 if audio_data is None:
                     await asyncio.sleep(0.1)
                     continue
 
+                # Below the noise floor: skip analysis and notifications
+                if self._update_idle_state(audio_data):
+                    await asyncio.sleep(1 / self._profile.frame_rate)
+                    continue
+
                 # Process audio
                 self._process_audio(audio_data)
 
@@ -118,7 +337,7 @@ class AudioProcessor:
                 await self._notify_update()
 
                 # Control processing rate
-                await asyncio.sleep(1 / 30)  # 30 fps target
+                await asyncio.sleep(1 / self._profile.frame_rate)
 
         except asyncio.CancelledError:
             _LOGGER.debug("Audio processing loop cancelled")
@@ -193,6 +412,8 @@ class AudioProcessor:
             if not stream_url:
                 return None
 
+            chunk_size = self._profile.chunk_size
+
             # Initialize FFmpeg process if needed
             if not self._process:
                 command = [
@@ -200,8 +421,8 @@ class AudioProcessor:
                     "-i", stream_url,
                     "-f", "f32le",  # 32-bit float PCM
                     "-acodec", "pcm_f32le",
-                    "-ac", "1",  # mono
-                    "-ar", str(SAMPLE_RATE),
+                    "-ac", str(self._channels),
+                    "-ar", str(self._profile.sample_rate),
                     "-"  # output to pipe
                 ]
 
@@ -209,11 +430,14 @@ class AudioProcessor:
                     command,
                     stdout=subprocess.PIPE,
                     stderr=subprocess.PIPE,
-                    bufsize=CHUNK_SIZE * 4  # 4 bytes per float
+                    # 4 bytes per float
+                    bufsize=chunk_size * self._channels * 4
                 )
 
             # Read audio chunk
-            raw_data = self._process.stdout.read(CHUNK_SIZE * 4)
+            raw_data = self._process.stdout.read(
+                chunk_size * self._channels * 4
+            )
             if not raw_data:
                 self._process = None
                 return None
@@ -222,36 +446,53 @@ class AudioProcessor:
             audio_data = np.frombuffer(raw_data, dtype=np.float32)
 
             # Handle potential size mismatch
-            if len(audio_data) < CHUNK_SIZE:
+            num_samples = chunk_size * self._channels
+            if len(audio_data) < num_samples:
                 audio_data = np.pad(
                     audio_data,
-                    (0, CHUNK_SIZE - len(audio_data))
+                    (0, num_samples - len(audio_data))
                 )
-            elif len(audio_data) > CHUNK_SIZE:
-                audio_data = audio_data[:CHUNK_SIZE]
+            elif len(audio_data) > num_samples:
+                audio_data = audio_data[:num_samples]
+
+            if self._channels > 1:
+                # De-interleave into one row per channel
+                audio_data = audio_data.reshape(chunk_size, self._channels).T
 
             return audio_data
 
         except Exception as err:
             _LOGGER.error("Error getting audio data: %s", err)
-            if self._process:
-                self._process.terminate()
-                self._process = None
+            self._close_stream()
             return None
 
-    def _process_audio(self, audio_data: np.ndarray):
-        """Process audio data to extract features."""
+    def _process_audio(
+        self,
+        audio_data: np.ndarray,
+        now: Optional[float] = None
+    ):
+        """Process audio data to extract features.
+
+        ``audio_data`` is either a mono chunk or a (channels, samples)
+        array; all channels are transformed in one batched FFT. ``now``
+        is the time of the chunk for tempo tracking, the loop time if
+        omitted; offline analysis passes the position in the track.
+        """
+        tables = self._tables
+        frames = np.atleast_2d(audio_data)
+        num_samples = frames.shape[-1]
+
         # Apply window function
-        windowed = audio_data * np.hanning(len(audio_data))
+        windowed = frames * tables.window
 
-        # Compute FFT
-        fft = np.abs(np.fft.rfft(windowed))
-        fft = fft / len(fft)
+        # Compute FFT (one row per channel)
+        spectrum = np.abs(np.fft.rfft(windowed, axis=-1))
+        self._loudness.process(spectrum)
+        fft = spectrum / spectrum.shape[-1]
 
-        # Calculate frequency bands
-        for i in range(NUM_BANDS):
-            start, end = self._band_indices[i], self._band_indices[i + 1]
-            self._freq_bands[i] = np.mean(fft[start:end])
+        # Calculate frequency bands for every channel at once
+        channel_bands = fft @ tables.band_matrix.T
+        self._freq_bands = channel_bands.mean(axis=0)
 
         # Normalize frequency bands
         max_freq = np.max(self._freq_bands)
@@ -260,18 +501,48 @@ class AudioProcessor:
         else:
             self._freq_bands = np.zeros_like(self._freq_bands)
 
-        # Calculate waveform
+        # Per-channel bands share one scale so their levels stay comparable
+        max_channel = np.max(channel_bands)
+        if max_channel > 0:
+            self._channel_bands = channel_bands / max_channel
+        else:
+            self._channel_bands = np.zeros_like(channel_bands)
+        self._update_balance(channel_bands)
+
+        # Track song structure on the downmixed spectrum
+        self._structure_events = self._structure.process(
+            channel_bands.mean(axis=0),
+            spectrum.mean(axis=0),
+            self._loudness.momentary
+        )
+
+        # Calculate waveform from the downmix
+        mono = frames.mean(axis=0)
         self._waveform = np.interp(
-            np.linspace(0, len(audio_data), NUM_BANDS),
-            np.arange(len(audio_data)),
-            audio_data
+            np.linspace(0, num_samples, tables.profile.num_bands),
+            np.arange(num_samples),
+            mono
         )
 
         # Update energy and beat detection
         self._update_energy()
-        self._detect_beat()
+        self._detect_beat(now)
         self._update_tempo()
 
+    def _update_balance(self, channel_bands: np.ndarray):
+        """Update the left/right balance from the first two channels.
+
+        The result ranges from -1.0 (hard left) to 1.0 (hard right).
+        """
+        if len(channel_bands) < 2:
+            self._balance = 0.0
+            return
+
+        left = float(np.sum(channel_bands[0]))
+        right = float(np.sum(channel_bands[1]))
+        total = left + right
+        self._balance = (right - left) / total if total > 0 else 0.0
+
     def _update_energy(self):
         """Update energy levels."""
         # Calculate current energy (focus on bass frequencies)
@@ -289,7 +560,7 @@ class AudioProcessor:
         self._energy_history = np.roll(self._energy_history, 1)
         self._energy_history[0] = current_energy
 
-    def _detect_beat(self):
+    def _detect_beat(self, now: Optional[float] = None):
         """Detect beats in the audio."""
         # Calculate local energy average
         local_average = float(np.mean(self._energy_history))
@@ -302,7 +573,9 @@ class AudioProcessor:
         self._is_beat = bool(beat_energy > threshold)
 
         if self._is_beat:
-            current_time = asyncio.get_event_loop().time()
+            current_time = (
+                now if now is not None else asyncio.get_event_loop().time()
+            )
             if self._last_beat_time > 0:
                 beat_time = current_time - self._last_beat_time
                 if 0.2 < beat_time < 2.0:  # 30-300 BPM range
@@ -321,23 +594,56 @@ class AudioProcessor:
             # Use median for stability
             self._tempo = float(np.median(self._tempo_history))
 
+    def analyze(
+        self,
+        audio_data: np.ndarray,
+        timestamp: float
+    ) -> AudioFeatures:
+        """Analyze one chunk at a given time, outside the live loop."""
+        self._process_audio(audio_data, timestamp)
+        return self.features(timestamp)
+
+    def features(self, timestamp: float) -> AudioFeatures:
+        """Return the results of the last processed chunk."""
+        return AudioFeatures(
+            frequencies=self._freq_bands,
+            waveform=self._waveform,
+            energy=float(self._energy),
+            beat=bool(self._is_beat),
+            tempo=float(self._tempo),
+            loudness_momentary=float(self._loudness.momentary),
+            loudness_short_term=float(self._loudness.short_term),
+            novelty=float(self._structure.novelty),
+            timestamp=timestamp,
+            channels=self._channel_bands if self._channels > 1 else None,
+            balance=float(self._balance),
+        )
+
     async def _notify_update(self):
-        """Notify visualization of new audio data."""
+        """Publish the latest analysis results on the feature bus."""
         try:
-            # Create update event
-            event_data = {
-                "frequencies": self._freq_bands.tolist(),
-                "waveform": self._waveform.tolist(),
-                "energy": float(self._energy),
-                "beat": bool(self._is_beat),
-                "tempo": float(self._tempo)
-            }
-
-            # Fire event
-            self.hass.bus.async_fire(
-                "aurora_audio_update",
-                event_data
-            )
+            now = self.hass.loop.time()
+            self.feature_bus.publish(self.features(now))
+
+            for structure_event in self._structure_events:
+                event = StructureEvent(
+                    event_type=structure_event,
+                    novelty=float(self._structure.novelty),
+                    loudness=float(self._loudness.short_term),
+                    timestamp=now,
+                )
+                self.feature_bus.publish(event)
+
+                # Structure events are rare and useful to automations
+                self.hass.bus.async_fire(
+                    f"aurora_{structure_event}",
+                    {"novelty": event.novelty, "loudness": event.loudness}
+                )
 
         except Exception as err:
             _LOGGER.error("Error notifying update: %s", err)
+
+    @callback
+    def _fire_summary(self, features: AudioFeatures) -> None:
+        """Fire the opt-in, rate-limited summary event on the HA bus."""
+        self.hass.bus.async_fire("aurora_audio_summary", features.summary())
@@ -0,0 +1,64 @@
+"""Beat phase tracking for Aurora Sound to Light."""
+import logging
+from typing import Any, Dict, Optional
+
+from .feature_bus import AudioFeatures
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_TEMPO = 120.0  # BPM assumed until a tempo is detected
+
+
+class BeatClock:
+    """Running beat position, locked to detected beats.
+
+    Between beats the phase advances at the detected tempo, so effects
+    keep time through frames without a beat; a detected beat snaps the
+    phase back to zero. ``position`` counts beats since start, so
+    effects can time bars or subdivisions with plain arithmetic.
+    """
+
+    def __init__(self, default_tempo: float = DEFAULT_TEMPO) -> None:
+        """Initialize the clock."""
+        self.tempo = default_tempo
+        self.phase = 0.0
+        self.beats = 0
+        self._last_update: Optional[float] = None
+
+    @property
+    def position(self) -> float:
+        """Return the beat position, whole beats plus the phase."""
+        return self.beats + self.phase
+
+    def snapshot_state(self) -> Dict[str, Any]:
+        """Return the tempo and beat position."""
+        return {"tempo": self.tempo, "phase": self.phase, "beats": self.beats}
+
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        """Continue from a saved tempo and beat position."""
+        self.tempo = float(state.get("tempo", self.tempo))
+        self.phase = float(state.get("phase", 0.0))
+        self.beats = int(state.get("beats", 0))
+        self._last_update = None
+
+    def update(self, features: AudioFeatures, t: float) -> float:
+        """Advance the clock to time t and return the beat phase (0-1)."""
+        if t == self._last_update:
+            return self.phase
+        elapsed = 0.0 if self._last_update is None else t - self._last_update
+        self._last_update = t
+        if features.tempo > 0:
+            self.tempo = features.tempo
+
+        self.phase += elapsed * self.tempo / 60
+        if self.phase >= 1.0:
+            self.beats += int(self.phase)
+            self.phase %= 1.0
+
+        if features.beat:
+            # A beat late in the phase starts the next beat early; one
+            # just after the wrap was already counted
+            if self.phase >= 0.5:
+                self.beats += 1
+            self.phase = 0.0
+        return self.phase
@@ -0,0 +1,205 @@
+"""Color lookup tables for Aurora Sound to Light."""
+import logging
+from functools import lru_cache
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+_LOGGER = logging.getLogger(__name__)
+
+# Table sizes; smaller tables trade color resolution for memory
+DEFAULT_HUE_TABLE_SIZE = 1024
+DEFAULT_CURVE_TABLE_SIZE = 1024
+DEFAULT_PALETTE_SIZE = 256
+MIN_TABLE_SIZE = 16
+
+DEFAULT_GAMMA = 2.2
+
+# Brightness curves
+CURVE_LINEAR = "linear"
+CURVE_GAMMA = "gamma"
+CURVE_CIE = "cie"  # CIE 1976 lightness, perceptually even steps
+BRIGHTNESS_CURVES = [CURVE_LINEAR, CURVE_GAMMA, CURVE_CIE]
+
+# Built-in gradient palettes
+PALETTES: Dict[str, List[List[int]]] = {
+    "rainbow": [
+        [255, 0, 0], [255, 255, 0], [0, 255, 0],
+        [0, 255, 255], [0, 0, 255], [255, 0, 255],
+    ],
+    "fire": [[0, 0, 0], [255, 0, 0], [255, 128, 0], [255, 255, 128]],
+    "ocean": [[0, 0, 64], [0, 64, 255], [0, 255, 255], [255, 255, 255]],
+    "forest": [[0, 64, 0], [32, 160, 32], [160, 255, 64]],
+    "party": [[255, 0, 128], [128, 0, 255], [0, 128, 255], [255, 128, 0]],
+}
+
+
+def _check_size(size: int) -> int:
+    """Validate a table size."""
+    if size < MIN_TABLE_SIZE:
+        raise ValueError(f"Table size must be at least {MIN_TABLE_SIZE}")
+    return int(size)
+
+
+def hsv_to_rgb(
+    h: np.ndarray,
+    s: np.ndarray,
+    v: np.ndarray
+) -> np.ndarray:
+    """Convert HSV arrays in 0-1 to an (n, 3) RGB array in 0-255."""
+    h, s, v = np.broadcast_arrays(
+        np.asarray(h, dtype=np.float32) % 1.0,
+        np.asarray(s, dtype=np.float32),
+        np.asarray(v, dtype=np.float32),
+    )
+    # Distance of each channel's hue sector from the current hue
+    k = (np.array([5.0, 3.0, 1.0], dtype=np.float32) + h[..., None] * 6) % 6
+    weight = np.clip(np.minimum(k, 4 - k), 0.0, 1.0)
+    rgb = v[..., None] * (1 - s[..., None] * weight)
+    return rgb * 255
+
+
+def _table_index(values: np.ndarray, size: int, wrap: bool) -> np.ndarray:
+    """Map 0-1 positions to table indices."""
+    scaled = np.asarray(values, dtype=np.float32) * size
+    if wrap:
+        return scaled.astype(np.intp) % size
+    return np.clip(scaled, 0, size - 1).astype(np.intp)
+
+
+class Palette:
+    """Gradient palette sampled into a fixed (size, 3) float32 table."""
+
+    def __init__(
+        self,
+        colors: Sequence[Sequence[float]],
+        size: int = DEFAULT_PALETTE_SIZE,
+        cyclic: bool = True
+    ) -> None:
+        """Sample a gradient through the given RGB colors.
+
+        Args:
+            colors: RGB stops in 0-255, evenly spaced
+            size: Number of table entries
+            cyclic: Blend the last color back into the first
+        """
+        stops = np.asarray(colors, dtype=np.float32).reshape(-1, 3)
+        if not len(stops):
+            raise ValueError("A palette needs at least one color")
+        size = _check_size(size)
+        self.cyclic = cyclic
+
+        if cyclic:
+            stops = np.vstack([stops, stops[:1]])
+            positions = np.arange(size, dtype=np.float32) / size
+        else:
+            positions = np.linspace(0, 1, size, dtype=np.float32)
+        anchors = np.linspace(0, 1, len(stops), dtype=np.float32)
+        self.table = np.stack([
+            np.interp(positions, anchors, stops[:, channel])
+            for channel in range(3)
+        ], axis=1).astype(np.float32)
+
+    def __len__(self) -> int:
+        """Return the number of table entries."""
+        return len(self.table)
+
+    def sample(self, positions: np.ndarray) -> np.ndarray:
+        """Return the (n, 3) colors at 0-1 positions along the gradient."""
+        index = _table_index(positions, len(self.table), self.cyclic)
+        return np.take(self.table, index, axis=0)
+
+
+class ColorLUT:
+    """Precomputed hue, gamma and brightness tables.
+
+    Effects color a whole frame with one ``np.take`` per table instead of
+    evaluating color math per light.
+    """
+
+    def __init__(
+        self,
+        hue_size: int = DEFAULT_HUE_TABLE_SIZE,
+        curve_size: int = DEFAULT_CURVE_TABLE_SIZE,
+        gamma: float = DEFAULT_GAMMA
+    ) -> None:
+        """Build the tables."""
+        hue_size = _check_size(hue_size)
+        curve_size = _check_size(curve_size)
+        if gamma <= 0:
+            raise ValueError("Gamma must be positive")
+        self.gamma = gamma
+
+        hues = np.arange(hue_size, dtype=np.float32) / hue_size
+        self.hue_table = hsv_to_rgb(hues, 1.0, 1.0).astype(np.float32)
+
+        levels = np.linspace(0, 1, curve_size, dtype=np.float32)
+        self.gamma_table = (255 * levels ** gamma).astype(np.float32)
+        lightness = 100 * levels
+        cie = np.where(
+            lightness > 8,
+            ((lightness + 16) / 116) ** 3,
+            lightness / 903.3
+        )
+        self.curve_tables: Dict[str, np.ndarray] = {
+            CURVE_LINEAR: (255 * levels).astype(np.float32),
+            CURVE_GAMMA: self.gamma_table,
+            CURVE_CIE: (255 * cie).astype(np.float32),
+        }
+
+    @property
+    def nbytes(self) -> int:
+        """Return the memory used by the tables."""
+        return self.hue_table.nbytes + sum(
+            table.nbytes for table in self.curve_tables.values()
+        )
+
+    def hue(self, hues: np.ndarray) -> np.ndarray:
+        """Return fully saturated (n, 3) RGB colors for 0-1 hues."""
+        index = _table_index(hues, len(self.hue_table), wrap=True)
+        return np.take(self.hue_table, index, axis=0)
+
+    def apply_gamma(self, values: np.ndarray) -> np.ndarray:
+        """Gamma-correct 0-255 values."""
+        return self._apply_curve(self.gamma_table, values / 255)
+
+    def brightness(
+        self,
+        levels: np.ndarray,
+        curve: str = CURVE_CIE
+    ) -> np.ndarray:
+        """Map 0-1 levels to 0-255 brightness along a curve."""
+        if curve not in self.curve_tables:
+            raise ValueError(f"Unknown brightness curve: {curve}")
+        return self._apply_curve(self.curve_tables[curve], levels)
+
+    @staticmethod
+    def _apply_curve(table: np.ndarray, levels: np.ndarray) -> np.ndarray:
+        """Look up 0-1 levels in a curve table."""
+        index = np.clip(
+            np.rint(np.asarray(levels, dtype=np.float32) * (len(table) - 1)),
+            0,
+            len(table) - 1
+        ).astype(np.intp)
+        return np.take(table, index)
+
+
+@lru_cache(maxsize=8)
+def get_color_lut(
+    hue_size: int = DEFAULT_HUE_TABLE_SIZE,
+    curve_size: int = DEFAULT_CURVE_TABLE_SIZE,
+    gamma: float = DEFAULT_GAMMA
+) -> ColorLUT:
+    """Return a shared lookup table set for the given sizes."""
+    return ColorLUT(hue_size, curve_size, gamma)
+
+
+@lru_cache(maxsize=32)
+def get_palette(
+    name: str,
+    size: int = DEFAULT_PALETTE_SIZE
+) -> Palette:
+    """Return a shared built-in palette."""
+    if name not in PALETTES:
+        raise ValueError(f"Unknown palette: {name}")
+    return Palette(PALETTES[name], size)
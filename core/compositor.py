@@ -0,0 +1,147 @@
+"""Layer compositor for Aurora Sound to Light."""
+import logging
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from .frame_output import FRAME_CHANNELS
+
+_LOGGER = logging.getLogger(__name__)
+
+# Blend modes
+BLEND_OVER = "over"
+BLEND_ADD = "add"
+BLEND_MULTIPLY = "multiply"
+BLEND_SCREEN = "screen"
+BLEND_MAX = "max"
+BLEND_MODES = [BLEND_OVER, BLEND_ADD, BLEND_MULTIPLY, BLEND_SCREEN, BLEND_MAX]
+
+FULL_SCALE = np.float32(255.0)
+
+
+@dataclass
+class Layer:
+    """One effect frame to composite.
+
+    ``frame`` is a float32 (n_lights, 4) frame in the compositor's light
+    space and ``mask`` an optional float32 weight per light (0-1), e.g.
+    the lights of a group. The effective weight of the layer on a light
+    is ``opacity * mask``.
+    """
+
+    frame: np.ndarray
+    mode: str = BLEND_OVER
+    opacity: float = 1.0
+    mask: Optional[np.ndarray] = None
+
+    def __post_init__(self) -> None:
+        """Validate the blend mode."""
+        if self.mode not in BLEND_MODES:
+            raise ValueError(f"Unknown blend mode: {self.mode}")
+
+    def weights(self, num_lights: int) -> np.ndarray:
+        """Return the (n_lights, 1) blend weight of the layer."""
+        if self.mask is None:
+            weights = np.full(num_lights, self.opacity, dtype=np.float32)
+        else:
+            weights = np.asarray(self.mask, dtype=np.float32) * self.opacity
+        return weights[:, None]
+
+
+class Compositor:
+    """Blend stacked effect frames into one frame.
+
+    Over, add, multiply and screen are all affine in the destination
+    (``dst * a + b`` per element), so a run of such layers collapses into
+    one product and one weighted sum over the stacked (layers, lights, 4)
+    arrays regardless of the number of layers. Runs of max layers reduce
+    with a single ``np.max``. Values are clipped to 0-255 once at the end.
+    """
+
+    def __init__(self, num_lights: int) -> None:
+        """Initialize the compositor for a number of lights."""
+        self.num_lights = num_lights
+
+    def _coefficients(self, layer: Layer) -> np.ndarray:
+        """Return the stacked (a, b) coefficients of an affine layer."""
+        src = np.asarray(layer.frame, dtype=np.float32)
+        weight = layer.weights(self.num_lights)
+        coefficients = np.empty(
+            (2, self.num_lights, FRAME_CHANNELS),
+            dtype=np.float32
+        )
+        if layer.mode == BLEND_OVER:
+            coefficients[0] = 1 - weight
+            coefficients[1] = weight * src
+        elif layer.mode == BLEND_ADD:
+            coefficients[0] = 1
+            coefficients[1] = weight * src
+        elif layer.mode == BLEND_MULTIPLY:
+            coefficients[0] = 1 - weight + weight * src / FULL_SCALE
+            coefficients[1] = 0
+        else:  # screen
+            coefficients[0] = 1 - weight * src / FULL_SCALE
+            coefficients[1] = weight * src
+        return coefficients
+
+    def _apply_affine(
+        self,
+        result: np.ndarray,
+        layers: List[Layer]
+    ) -> np.ndarray:
+        """Apply a run of affine layers in one vectorized step."""
+        stacked = np.stack([self._coefficients(layer) for layer in layers])
+        scale, offset = stacked[:, 0], stacked[:, 1]
+
+        # Each layer's offset is scaled by every layer above it
+        above = np.ones_like(scale)
+        above[:-1] = np.cumprod(scale[:0:-1], axis=0)[::-1]
+        return result * np.prod(scale, axis=0) + np.sum(offset * above, axis=0)
+
+    def _apply_max(
+        self,
+        result: np.ndarray,
+        layers: List[Layer]
+    ) -> np.ndarray:
+        """Apply a run of max layers in one vectorized step."""
+        stacked = np.stack([
+            layer.weights(self.num_lights) *
+            np.asarray(layer.frame, dtype=np.float32)
+            for layer in layers
+        ])
+        return np.maximum(result, np.max(stacked, axis=0))
+
+    def composite(
+        self,
+        layers: Sequence[Layer],
+        base: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Blend layers bottom to top onto a base frame (all off by default)."""
+        shape = (self.num_lights, FRAME_CHANNELS)
+        if base is None:
+            result = np.zeros(shape, dtype=np.float32)
+        else:
+            result = np.array(base, dtype=np.float32)
+
+        run: List[Layer] = []
+        for layer in layers:
+            if np.shape(layer.frame) != shape:
+                raise ValueError(
+                    f"Expected layer of shape {shape}, "
+                    f"got {np.shape(layer.frame)}"
+                )
+            if run and (run[-1].mode == BLEND_MAX) != (layer.mode == BLEND_MAX):
+                result = self._apply_run(result, run)
+                run = []
+            run.append(layer)
+        if run:
+            result = self._apply_run(result, run)
+
+        return np.clip(result, 0, FULL_SCALE)
+
+    def _apply_run(self, result: np.ndarray, run: List[Layer]) -> np.ndarray:
+        """Apply a run of layers that share a reduction."""
+        if run[0].mode == BLEND_MAX:
+            return self._apply_max(result, run)
+        return self._apply_affine(result, run)
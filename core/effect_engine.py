@@ -1,11 +1,23 @@
 """Effect Engine for Aurora Sound to Light."""
 import logging
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import storage
+from homeassistant.util import slugify
+
+from ..const import DOMAIN
+from .compositor import BLEND_OVER
+from .render_loop import RenderScheduler
+from .sandbox import SandboxedEffect, check_effect_code
+from .snapshot import SNAPSHOT_VERSION
 
 _LOGGER = logging.getLogger(__name__)
 
+STORAGE_KEY = f"{DOMAIN}.effect_state"
+STORAGE_VERSION = 1
+SAVE_DELAY = 10  # seconds changes are collected before a snapshot is saved
+
 class EffectEngine:
     """Manages light effects for Aurora Sound to Light."""
 
@@ -14,17 +26,83 @@ class EffectEngine:
         self.hass = hass
         self._effects: Dict[str, dict] = {}
         self._active_effects: Dict[str, dict] = {}
+        self._instances: Dict[str, Any] = {}
+        self._scheduler: Optional[RenderScheduler] = None
+        self._store = storage.Store(
+            hass,
+            STORAGE_VERSION,
+            STORAGE_KEY,
+            private=True,
+            atomic_writes=True
+        )
+
+    def attach_scheduler(self, scheduler: RenderScheduler) -> None:
+        """Render started effects with the given scheduler from now on."""
+        self._scheduler = scheduler
+
+    async def _create_instance(
+        self,
+        effect_id: str,
+        effect_config: dict,
+        target_lights: List[str]
+    ) -> Optional[Any]:
+        """Create a renderable effect instance for a configuration."""
+        from ..effects import get_effect_engine
+
+        if "code" in effect_config:
+            return SandboxedEffect(
+                self.hass,
+                target_lights,
+                effect_config.get("params", {}),
+                code=effect_config["code"],
+            )
+
+        registry = await get_effect_engine(self.hass)
+        effect_type = effect_config.get("type", effect_id)
+        if effect_type not in registry.get_available_effects():
+            _LOGGER.debug("No renderer for effect type %s", effect_type)
+            return None
+
+        return await registry.create_effect(
+            effect_type,
+            target_lights,
+            effect_config.get("params", {})
+        )
 
     async def register_effect(self, effect_id: str, effect_config: dict) -> bool:
         """Register a new effect."""
         try:
             self._effects[effect_id] = effect_config
+            self._schedule_save()
             _LOGGER.debug("Registered effect: %s", effect_id)
             return True
         except Exception as err:
             _LOGGER.error("Failed to register effect %s: %s", effect_id, err)
             return False
 
+    async def create_effect(
+        self,
+        name: str,
+        code: str,
+        parameters: Optional[Dict[str, Any]] = None,
+        description: Optional[str] = None
+    ) -> str:
+        """Register a custom effect whose code runs in a worker process.
+
+        Returns the effect id. Raises ValueError if the code does not
+        parse or lacks a render function.
+        """
+        check_effect_code(code)
+        effect_id = slugify(name)
+        await self.register_effect(effect_id, {
+            "type": "custom",
+            "name": name,
+            "code": code,
+            "params": dict(parameters or {}),
+            "description": description,
+        })
+        return effect_id
+
     async def start_effect(self, effect_id: str, target_lights: List[str]) -> bool:
         """Start an effect on specified lights."""
         try:
@@ -32,18 +110,90 @@ class EffectEngine:
                 _LOGGER.error("Effect %s not found", effect_id)
                 return False
 
+            # Starting again replaces the running instance; stop it so
+            # its timers and workers do not outlive it
+            if effect_id in self._instances:
+                await self._async_stop(effect_id)
+
             effect_config = self._effects[effect_id].copy()
             effect_config["target_lights"] = target_lights
             self._active_effects[effect_id] = effect_config
+
+            if self._scheduler is not None:
+                instance = await self._create_instance(
+                    effect_id,
+                    effect_config,
+                    target_lights
+                )
+                if instance is not None:
+                    await instance.start()
+                    self._instances[effect_id] = instance
+                    self._scheduler.add_effect(
+                        effect_id,
+                        instance,
+                        blend=effect_config.get("blend", BLEND_OVER),
+                        opacity=effect_config.get("opacity", 1.0),
+                        group=effect_config.get("group"),
+                    )
+            self._schedule_save()
             _LOGGER.debug("Started effect %s on lights %s", effect_id, target_lights)
             return True
         except Exception as err:
             _LOGGER.error("Failed to start effect %s: %s", effect_id, err)
             return False
 
+    async def async_populate(
+        self,
+        scheduler: RenderScheduler,
+        budget: Optional[float] = None
+    ) -> int:
+        """Add fresh instances of the active effects to another scheduler.
+
+        Used to render the current lineup offline. Custom code effects
+        run in worker processes and self-timed effects switch lights on
+        their own clock, so neither is included. Returns the number of
+        effects added.
+        """
+        added = 0
+        for effect_id, effect_config in self._active_effects.items():
+            if "code" in effect_config:
+                _LOGGER.debug("Not rendering custom effect %s", effect_id)
+                continue
+            instance = await self._create_instance(
+                effect_id,
+                effect_config,
+                effect_config.get("target_lights", [])
+            )
+            if instance is None or getattr(instance, "SELF_TIMED", False):
+                continue
+            await instance.start()
+            scheduler.add_effect(
+                effect_id,
+                instance,
+                budget=budget,
+                blend=effect_config.get("blend", BLEND_OVER),
+                opacity=effect_config.get("opacity", 1.0),
+                group=effect_config.get("group"),
+            )
+            added += 1
+        return added
+
     async def stop_effect(self, effect_id: str) -> bool:
         """Stop a running effect."""
+        stopped = await self._async_stop(effect_id)
+        if stopped:
+            self._schedule_save()
+        return stopped
+
+    async def _async_stop(self, effect_id: str) -> bool:
+        """Stop a running effect without saving the change."""
         try:
+            instance = self._instances.pop(effect_id, None)
+            if instance is not None:
+                if self._scheduler is not None:
+                    self._scheduler.remove_effect(effect_id)
+                await instance.stop()
+
             if effect_id in self._active_effects:
                 del self._active_effects[effect_id]
                 _LOGGER.debug("Stopped effect: %s", effect_id)
@@ -53,11 +203,118 @@ class EffectEngine:
             _LOGGER.error("Failed to stop effect %s: %s", effect_id, err)
             return False
 
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the registered and active effects with their state.
+
+        Active effects are saved with their light assignment, layer and
+        parameters as configured, plus the runtime state of the running
+        instance, so a restore continues where the show left off.
+        """
+        active = {}
+        for effect_id, effect_config in self._active_effects.items():
+            instance = self._instances.get(effect_id)
+            state = None
+            if instance is not None and hasattr(instance, "snapshot_state"):
+                try:
+                    state = instance.snapshot_state()
+                except Exception as err:
+                    _LOGGER.error(
+                        "Failed to snapshot effect %s: %s",
+                        effect_id,
+                        err
+                    )
+            active[effect_id] = {
+                "target_lights": list(
+                    effect_config.get("target_lights", [])
+                ),
+                "state": state,
+            }
+        return {
+            "version": SNAPSHOT_VERSION,
+            "effects": {
+                effect_id: dict(effect_config)
+                for effect_id, effect_config in self._effects.items()
+            },
+            "active": active,
+        }
+
+    async def async_restore(self, snapshot: Dict[str, Any]) -> int:
+        """Restore effects from a snapshot and resume the active ones.
+
+        Configurations are taken over as saved, without validating or
+        compiling them again. Raises ValueError for a malformed snapshot.
+        Returns the number of effects resumed.
+        """
+        if (
+            not isinstance(snapshot, dict) or
+            snapshot.get("version") != SNAPSHOT_VERSION or
+            not isinstance(snapshot.get("effects"), dict) or
+            not isinstance(snapshot.get("active"), dict)
+        ):
+            raise ValueError("Invalid effect snapshot")
+
+        self._effects.update({
+            effect_id: dict(effect_config)
+            for effect_id, effect_config in snapshot["effects"].items()
+        })
+        resumed = 0
+        for effect_id, active in snapshot["active"].items():
+            if effect_id not in self._effects:
+                continue
+            if not await self.start_effect(
+                effect_id,
+                active.get("target_lights", [])
+            ):
+                continue
+            resumed += 1
+            instance = self._instances.get(effect_id)
+            state = active.get("state")
+            if instance is not None and state:
+                try:
+                    instance.restore_state(state)
+                except Exception as err:
+                    _LOGGER.error(
+                        "Failed to restore state of effect %s: %s",
+                        effect_id,
+                        err
+                    )
+        return resumed
+
+    def _schedule_save(self) -> None:
+        """Save a snapshot once changes have settled.
+
+        The snapshot is taken when it is written, and a pending write is
+        flushed when Home Assistant stops, so restarts resume the
+        effects even though entries are not unloaded on shutdown.
+        """
+        try:
+            self._store.async_delay_save(self.snapshot, SAVE_DELAY)
+        except Exception as err:
+            _LOGGER.error("Failed to schedule effect state save: %s", err)
+
+    async def async_save_state(self) -> None:
+        """Save a snapshot of the effects."""
+        try:
+            await self._store.async_save(self.snapshot())
+        except Exception as err:
+            _LOGGER.error("Failed to save effect state: %s", err)
+
+    async def async_load_state(self) -> None:
+        """Restore the effects saved by the last ``async_save_state()``."""
+        try:
+            data = await self._store.async_load()
+            if data:
+                resumed = await self.async_restore(data)
+                _LOGGER.debug("Resumed %d effects", resumed)
+        except Exception as err:
+            _LOGGER.error("Failed to load effect state: %s", err)
+
     async def cleanup(self) -> None:
         """Clean up all active effects."""
         try:
+            # Stopping for unload must not overwrite the saved snapshot
             for effect_id in list(self._active_effects.keys()):
-                await self.stop_effect(effect_id)
+                await self._async_stop(effect_id)
             self._effects.clear()
             _LOGGER.debug("Cleaned up all effects")
         except Exception as err:
@@ -72,23 +329,93 @@ class EffectEngine:
         return self._effects.copy()
 
     async def update_effect(self, effect_id: str, effect_config: dict) -> bool:
-        """Update an existing effect configuration."""
+        """Update an existing effect configuration.
+
+        Parameter and layer changes are applied to a running effect in
+        place, keeping its phase and other state; only a change of type
+        or of custom effect code restarts it.
+        """
         try:
             if effect_id not in self._effects:
                 _LOGGER.error("Effect %s not found for update", effect_id)
                 return False
 
+            if "code" in effect_config:
+                check_effect_code(effect_config["code"])
+
+            instance = self._instances.get(effect_id)
+            current_type = self._effects[effect_id].get("type")
+            type_changed = effect_config.get("type", current_type) != current_type
+            # The worker runs the code it was spawned with
+            code_changed = (
+                "code" in effect_config and
+                effect_config["code"] != self._effects[effect_id].get("code")
+            )
+            restart = effect_id in self._active_effects and (
+                instance is None or type_changed or code_changed
+            )
+
+            # Validate once, before anything changes
+            params = None
+            if instance is not None and "params" in effect_config:
+                params = instance.validate_params({
+                    **instance.params,
+                    **effect_config["params"],
+                })
+
+            # Parameter updates are partial; store the complete set
+            if "params" in effect_config:
+                effect_config = {
+                    **effect_config,
+                    "params": params if params is not None else {
+                        **self._effects[effect_id].get("params", {}),
+                        **effect_config["params"],
+                    },
+                }
+
             self._effects[effect_id].update(effect_config)
-            
+
             # If the effect is active, update the active configuration
             if effect_id in self._active_effects:
                 active_config = self._active_effects[effect_id]
                 target_lights = active_config.get("target_lights", [])
-                await self.stop_effect(effect_id)
-                await self.start_effect(effect_id, target_lights)
-            
+                if restart:
+                    await self.stop_effect(effect_id)
+                    await self.start_effect(effect_id, target_lights)
+                else:
+                    active_config.update(effect_config)
+                    self._apply_live_update(
+                        effect_id,
+                        instance,
+                        effect_config,
+                        params
+                    )
+
+            self._schedule_save()
             _LOGGER.debug("Updated effect: %s", effect_id)
             return True
         except Exception as err:
             _LOGGER.error("Failed to update effect %s: %s", effect_id, err)
-            return False 
\ No newline at end of file
+            return False
+
+    def _apply_live_update(
+        self,
+        effect_id: str,
+        instance: Any,
+        effect_config: dict,
+        params: Optional[Dict[str, Any]]
+    ) -> None:
+        """Hand validated changes to a running effect between frames."""
+        if self._scheduler is None:
+            if params is not None:
+                instance.apply_params(params)
+            return
+
+        if params is not None:
+            self._scheduler.update_params(effect_id, params)
+        self._scheduler.update_layer(
+            effect_id,
+            blend=effect_config.get("blend"),
+            opacity=effect_config.get("opacity"),
+            group=effect_config.get("group"),
+        )
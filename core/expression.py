@@ -0,0 +1,430 @@
+"""Vectorized expression graphs for declarative effects."""
+import ast
+import json
+import logging
+import math
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Mapping
+
+import numpy as np
+
+from .color_lut import hsv_to_rgb
+from .frame_output import new_frame
+
+_LOGGER = logging.getLogger(__name__)
+
+MAX_EXPRESSION_LENGTH = 1000
+MAX_EXPRESSION_DEPTH = 32
+
+# A compiled node maps the variables of a frame to a scalar or (n,) array
+Node = Callable[[Mapping[str, Any]], Any]
+
+CONSTANTS: Dict[str, float] = {
+    "pi": math.pi,
+    "tau": 2 * math.pi,
+}
+
+
+def _fract(x: Any) -> Any:
+    """Return the fractional part of x."""
+    return x - np.floor(x)
+
+
+def _mix(a: Any, b: Any, x: Any) -> Any:
+    """Blend linearly from a to b as x goes from 0 to 1."""
+    return a + (b - a) * x
+
+
+def _step(edge: Any, x: Any) -> Any:
+    """Return 1 where x >= edge, else 0."""
+    return np.where(x >= edge, 1.0, 0.0)
+
+
+def _smoothstep(edge0: Any, edge1: Any, x: Any) -> Any:
+    """Smooth Hermite interpolation between two edges."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        y = np.clip((x - edge0) / (edge1 - edge0), 0.0, 1.0)
+    return y * y * (3 - 2 * y)
+
+
+def _triangle(x: Any) -> Any:
+    """Triangle wave with period 1 in 0-1."""
+    return 1 - np.abs(2 * _fract(x) - 1)
+
+
+# Whitelisted functions and their number of arguments
+FUNCTIONS: Dict[str, Any] = {
+    "sin": (np.sin, 1),
+    "cos": (np.cos, 1),
+    "tan": (np.tan, 1),
+    "abs": (np.abs, 1),
+    "sqrt": (np.sqrt, 1),
+    "exp": (np.exp, 1),
+    "log": (np.log, 1),
+    "floor": (np.floor, 1),
+    "ceil": (np.ceil, 1),
+    "fract": (_fract, 1),
+    "triangle": (_triangle, 1),
+    "min": (np.minimum, 2),
+    "max": (np.maximum, 2),
+    "pow": (np.power, 2),
+    "step": (_step, 2),
+    "clip": (np.clip, 3),
+    "mix": (_mix, 3),
+    "smoothstep": (_smoothstep, 3),
+}
+
+_BINARY_OPERATORS = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+    ast.Div: np.true_divide,
+    ast.FloorDiv: np.floor_divide,
+    ast.Mod: np.mod,
+    ast.Pow: np.power,
+}
+
+_UNARY_OPERATORS = {
+    ast.USub: np.negative,
+    ast.UAdd: np.positive,
+    ast.Not: lambda x: np.where(x, 0.0, 1.0),
+}
+
+_COMPARE_OPERATORS = {
+    ast.Lt: np.less,
+    ast.LtE: np.less_equal,
+    ast.Gt: np.greater,
+    ast.GtE: np.greater_equal,
+    ast.Eq: np.equal,
+    ast.NotEq: np.not_equal,
+}
+
+
+class Expression:
+    """A compiled arithmetic expression over per-frame variables.
+
+    The source is parsed once into a tree of numpy closures. Only numbers,
+    the given variable names, whitelisted functions and arithmetic,
+    comparison and conditional operators are accepted, so evaluating an
+    expression cannot run arbitrary code. Subtrees that do not depend on
+    any variable are folded into constants at compile time. Variables may
+    be scalars or per-light arrays; evaluation broadcasts across lights.
+    """
+
+    def __init__(self, source: str, names: Iterable[str]) -> None:
+        """Compile an expression.
+
+        Args:
+            source: Expression text, e.g. ``"fract(t * speed + position)"``
+            names: Variable names the expression may reference
+
+        Raises ValueError if the expression is invalid.
+        """
+        if not isinstance(source, (str, int, float)):
+            raise ValueError(f"Invalid expression: {source!r}")
+        source = str(source)
+        if len(source) > MAX_EXPRESSION_LENGTH:
+            raise ValueError("Expression is too long")
+        try:
+            tree = ast.parse(source.strip(), mode="eval")
+        except SyntaxError as err:
+            raise ValueError(
+                f"Invalid expression '{source}': {err.msg}"
+            ) from err
+
+        self.source = source
+        self._names: FrozenSet[str] = frozenset(names)
+        self.variables: set = set()
+        self._node: Node = self._compile(tree.body, 0)[0]
+
+    def __call__(self, variables: Mapping[str, Any]) -> Any:
+        """Evaluate the expression."""
+        return self._node(variables)
+
+    def _compile(self, node: ast.AST, depth: int) -> Any:
+        """Compile an AST node to (closure, is_constant)."""
+        if depth > MAX_EXPRESSION_DEPTH:
+            raise ValueError(f"Expression is nested too deeply: {self.source}")
+        depth += 1
+
+        if isinstance(node, ast.Constant):
+            if isinstance(node.value, bool) or not isinstance(
+                node.value, (int, float)
+            ):
+                raise ValueError(f"Unsupported constant: {node.value!r}")
+            return self._constant(float(node.value))
+
+        if isinstance(node, ast.Name):
+            if node.id in CONSTANTS:
+                return self._constant(CONSTANTS[node.id])
+            if node.id not in self._names:
+                raise ValueError(f"Unknown name '{node.id}' in {self.source}")
+            name = node.id
+            self.variables.add(name)
+            return (lambda env: env[name]), False
+
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+            return self._apply(
+                _BINARY_OPERATORS[type(node.op)],
+                [node.left, node.right],
+                depth
+            )
+
+        if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPERATORS:
+            return self._apply(
+                _UNARY_OPERATORS[type(node.op)],
+                [node.operand],
+                depth
+            )
+
+        if isinstance(node, ast.Compare) and len(node.ops) == 1:
+            operator = _COMPARE_OPERATORS.get(type(node.ops[0]))
+            if operator is not None:
+                return self._apply(
+                    lambda a, b: np.where(operator(a, b), 1.0, 0.0),
+                    [node.left, node.comparators[0]],
+                    depth
+                )
+
+        if isinstance(node, ast.BoolOp):
+            reduce = (
+                np.logical_and if isinstance(node.op, ast.And)
+                else np.logical_or
+            )
+
+            def bool_op(*values: Any) -> Any:
+                result = values[0]
+                for value in values[1:]:
+                    result = reduce(result, value)
+                return np.where(result, 1.0, 0.0)
+
+            return self._apply(bool_op, node.values, depth)
+
+        if isinstance(node, ast.IfExp):
+            return self._apply(
+                lambda test, body, orelse: np.where(test, body, orelse),
+                [node.test, node.body, node.orelse],
+                depth
+            )
+
+        if (
+            isinstance(node, ast.Call) and
+            isinstance(node.func, ast.Name) and
+            not node.keywords
+        ):
+            if node.func.id not in FUNCTIONS:
+                raise ValueError(
+                    f"Unknown function '{node.func.id}' in {self.source}"
+                )
+            function, arity = FUNCTIONS[node.func.id]
+            if len(node.args) != arity:
+                raise ValueError(
+                    f"{node.func.id}() takes {arity} argument(s), "
+                    f"got {len(node.args)}"
+                )
+            return self._apply(function, node.args, depth)
+
+        raise ValueError(
+            f"Unsupported syntax '{type(node).__name__}' in {self.source}"
+        )
+
+    @staticmethod
+    def _constant(value: Any) -> Any:
+        """Return a node yielding a constant."""
+        return (lambda env: value), True
+
+    def _apply(
+        self,
+        function: Callable[..., Any],
+        args: Iterable[ast.AST],
+        depth: int
+    ) -> Any:
+        """Compile a function applied to compiled arguments."""
+        compiled = [self._compile(arg, depth) for arg in args]
+        nodes = [node for node, _ in compiled]
+        if all(constant for _, constant in compiled):
+            with np.errstate(all="ignore"):
+                return self._constant(function(*(node({}) for node in nodes)))
+
+        if len(nodes) == 1:
+            only = nodes[0]
+            return (lambda env: function(only(env))), False
+        if len(nodes) == 2:
+            left, right = nodes
+            return (lambda env: function(left(env), right(env))), False
+        return (lambda env: function(*(node(env) for node in nodes))), False
+
+
+# Variables every effect expression may use
+FEATURE_VARIABLES = [
+    "t",  # seconds
+    "position",  # 0-1 across the lights
+    "index",  # light index
+    "count",  # number of lights
+    "bass",  # 0-1 levels of the low, middle and high thirds of the bands
+    "mid",
+    "high",
+    "energy",
+    "beat",  # 1 on a beat frame, else 0
+    "tempo",  # BPM
+    "novelty",
+    "loudness",  # momentary loudness in LUFS
+]
+
+# Outputs of an effect program, all in 0-1
+HSV_OUTPUTS = ["hue", "saturation", "value"]
+RGB_OUTPUTS = ["red", "green", "blue"]
+OUTPUT_BRIGHTNESS = "brightness"
+OUTPUT_DEFAULTS: Dict[str, str] = {
+    "hue": "0",
+    "saturation": "1",
+    "value": "1",
+    "red": "0",
+    "green": "0",
+    "blue": "0",
+    OUTPUT_BRIGHTNESS: "1",
+}
+
+PROGRAM_CACHE_SIZE = 64
+
+
+def feature_variables(features: Any, t: float) -> Dict[str, Any]:
+    """Return the scalar expression variables of one frame of features."""
+    bands = np.asarray(features.frequencies, dtype=np.float32)
+    levels = [
+        float(np.mean(part)) if len(part) else 0.0
+        for part in np.array_split(bands, 3)
+    ]
+    return {
+        "t": t,
+        "bass": levels[0],
+        "mid": levels[1],
+        "high": levels[2],
+        "energy": float(features.energy),
+        "beat": 1.0 if features.beat else 0.0,
+        "tempo": float(features.tempo),
+        "novelty": float(features.novelty),
+        "loudness": float(features.loudness_momentary),
+    }
+
+
+class EffectProgram:
+    """Expression graph mapping audio features and parameters to a frame.
+
+    ``expressions`` maps outputs to expression text: either ``hue``,
+    ``saturation`` and ``value`` or ``red``, ``green`` and ``blue``, plus
+    ``brightness``, all in 0-1. Missing outputs use defaults. Each output
+    is evaluated once per frame across all lights.
+    """
+
+    def __init__(
+        self,
+        expressions: Mapping[str, Any],
+        parameters: Iterable[str] = ()
+    ) -> None:
+        """Compile the expressions of an effect.
+
+        Args:
+            expressions: Output name to expression text
+            parameters: Names of the effect's parameters
+
+        Raises ValueError if an output or expression is invalid.
+        """
+        unknown = set(expressions) - set(OUTPUT_DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown effect outputs: {sorted(unknown)}")
+        self.rgb = any(output in expressions for output in RGB_OUTPUTS)
+        if self.rgb and any(output in expressions for output in HSV_OUTPUTS):
+            raise ValueError(
+                "Use either hue/saturation/value or red/green/blue"
+            )
+
+        names = set(FEATURE_VARIABLES) | set(parameters)
+        color_outputs = RGB_OUTPUTS if self.rgb else HSV_OUTPUTS
+        self.outputs: Dict[str, Expression] = {
+            output: Expression(
+                expressions.get(output, OUTPUT_DEFAULTS[output]),
+                names
+            )
+            for output in color_outputs + [OUTPUT_BRIGHTNESS]
+        }
+        self.variables = set().union(
+            *(expression.variables for expression in self.outputs.values())
+        )
+        self._positions: Dict[int, Dict[str, np.ndarray]] = {}
+
+    def _light_variables(self, count: int) -> Dict[str, Any]:
+        """Return the per-light variables for a number of lights."""
+        if count not in self._positions:
+            index = np.arange(count, dtype=np.float32)
+            self._positions[count] = {
+                "index": index,
+                "position": index / count if count else index,
+                "count": float(count),
+            }
+        return self._positions[count]
+
+    def evaluate(
+        self,
+        variables: Mapping[str, Any],
+        count: int
+    ) -> np.ndarray:
+        """Render a float32 (count, 4) frame from the given variables."""
+        frame = new_frame(count)
+        if not count:
+            return frame
+        env = {**variables, **self._light_variables(count)}
+
+        with np.errstate(all="ignore"):
+            values = [
+                np.nan_to_num(
+                    np.broadcast_to(
+                        np.asarray(expression(env), dtype=np.float32),
+                        (count,)
+                    ),
+                    nan=0.0, posinf=1.0, neginf=0.0
+                )
+                for expression in self.outputs.values()
+            ]
+
+        if self.rgb:
+            frame[:, :3] = np.stack(values[:3], axis=1) * 255
+        else:
+            frame[:, :3] = hsv_to_rgb(
+                values[0],
+                np.clip(values[1], 0.0, 1.0),
+                np.clip(values[2], 0.0, 1.0)
+            )
+        frame[:, 3] = values[3] * 255
+        return np.clip(frame, 0, 255, out=frame)
+
+
+def config_key(
+    expressions: Mapping[str, Any],
+    parameters: Iterable[str] = ()
+) -> str:
+    """Return the canonical cache key of an effect's expressions."""
+    return json.dumps(
+        {"expressions": dict(expressions), "parameters": sorted(parameters)},
+        sort_keys=True,
+        default=str
+    )
+
+
+@lru_cache(maxsize=PROGRAM_CACHE_SIZE)
+def _compile_key(key: str) -> EffectProgram:
+    """Compile the program for a canonical key."""
+    config = json.loads(key)
+    return EffectProgram(config["expressions"], config["parameters"])
+
+
+def compile_program(
+    expressions: Mapping[str, Any],
+    parameters: Iterable[str] = ()
+) -> EffectProgram:
+    """Return the compiled program of an effect.
+
+    Programs are cached by their canonical config, so effects that are
+    reloaded or share expressions are only compiled once.
+    """
+    return _compile_key(config_key(expressions, parameters))
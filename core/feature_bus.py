@@ -0,0 +1,208 @@
+"""In-process audio feature bus for Aurora Sound to Light."""
+import logging
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    List,
+    Optional,
+    Sequence,
+    Type,
+    TypeVar,
+)
+
+import numpy as np
+
+from homeassistant.core import HomeAssistant, callback
+
+from .loudness import LOUDNESS_FLOOR
+
+_LOGGER = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class AudioFeatures:
+    """One frame of audio analysis results."""
+
+    frequencies: np.ndarray
+    waveform: np.ndarray
+    energy: float
+    beat: bool
+    tempo: float
+    loudness_momentary: float
+    loudness_short_term: float
+    novelty: float
+    timestamp: float
+    channels: Optional[np.ndarray] = None
+    balance: float = 0.0
+
+    @classmethod
+    def from_levels(
+        cls,
+        levels: Optional[Sequence[float]] = None,
+        beat: bool = False,
+        tempo: float = 0.0,
+        timestamp: float = 0.0,
+    ) -> "AudioFeatures":
+        """Build features from bare band levels, as passed to update()."""
+        frequencies = np.asarray(
+            levels if levels is not None else (),
+            dtype=float
+        )
+        energy = float(np.mean(frequencies)) if len(frequencies) else 0.0
+        return cls(
+            frequencies=frequencies,
+            waveform=np.zeros(0, dtype=np.float32),
+            energy=energy,
+            beat=beat,
+            tempo=float(tempo),
+            loudness_momentary=LOUDNESS_FLOOR,
+            loudness_short_term=LOUDNESS_FLOOR,
+            novelty=0.0,
+            timestamp=timestamp,
+        )
+
+    def summary(self) -> Dict[str, Any]:
+        """Return the scalar features as a JSON-friendly dict."""
+        return {
+            "energy": float(self.energy),
+            "beat": bool(self.beat),
+            "tempo": float(self.tempo),
+            "loudness_momentary": float(self.loudness_momentary),
+            "loudness_short_term": float(self.loudness_short_term),
+            "novelty": float(self.novelty),
+            "balance": float(self.balance),
+        }
+
+
+@dataclass(frozen=True)
+class StructureEvent:
+    """A section change, build-up or drop detected in the music."""
+
+    event_type: str
+    novelty: float
+    loudness: float
+    timestamp: float
+
+
+class _Subscription(Generic[T]):
+    """A rate-limited subscriber with latest-value semantics."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        listener: Callable[[T], None],
+        max_rate: Optional[float],
+    ) -> None:
+        """Initialize the subscription."""
+        self._hass = hass
+        self._listener = listener
+        self._interval = 1.0 / max_rate if max_rate else 0.0
+        self._last_delivery = float("-inf")
+        self._pending: Optional[T] = None
+        self._timer: Optional[Any] = None
+
+    @callback
+    def offer(self, value: T) -> None:
+        """Deliver a value now or keep it as the latest pending one."""
+        if self._timer is not None:
+            self._pending = value
+            return
+
+        now = self._hass.loop.time()
+        due = self._last_delivery + self._interval
+        if now >= due:
+            self._deliver(value, now)
+            return
+
+        # Too early: hold on to the newest value until the slot opens
+        self._pending = value
+        self._timer = self._hass.loop.call_at(due, self._flush)
+
+    @callback
+    def _flush(self) -> None:
+        """Deliver the value held back by the rate limit."""
+        self._timer = None
+        value, self._pending = self._pending, None
+        if value is not None:
+            self._deliver(value, self._hass.loop.time())
+
+    def _deliver(self, value: T, now: float) -> None:
+        """Invoke the listener."""
+        self._last_delivery = now
+        try:
+            self._listener(value)
+        except Exception as err:
+            _LOGGER.error("Error in feature subscriber: %s", err)
+
+    @callback
+    def cancel(self) -> None:
+        """Drop any pending delivery."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._pending = None
+
+
+class FeatureBus:
+    """Typed publish/subscribe channel for audio features.
+
+    Subscribers register for a feature type (e.g. ``AudioFeatures``) with
+    an optional maximum delivery rate. Faster publishers never queue up
+    work: a subscriber only ever receives the newest value once its rate
+    limit allows it. Listeners run in the event loop and must not block.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the feature bus."""
+        self.hass = hass
+        self._latest: Dict[type, Any] = {}
+        self._subscriptions: Dict[type, List[_Subscription]] = {}
+
+    @callback
+    def publish(self, value: Any) -> None:
+        """Publish a value to all subscribers of its type."""
+        kind = type(value)
+        self._latest[kind] = value
+        for subscription in list(self._subscriptions.get(kind, ())):
+            subscription.offer(value)
+
+    def latest(self, kind: Type[T]) -> Optional[T]:
+        """Return the most recently published value of a type."""
+        return self._latest.get(kind)
+
+    @callback
+    def subscribe(
+        self,
+        kind: Type[T],
+        listener: Callable[[T], None],
+        max_rate: Optional[float] = None,
+    ) -> Callable[[], None]:
+        """Subscribe to a feature type.
+
+        Args:
+            kind: Feature type to receive
+            listener: Callback invoked with each delivered value
+            max_rate: Maximum deliveries per second, unlimited if None
+
+        Returns a function that cancels the subscription.
+        """
+        subscription = _Subscription(self.hass, listener, max_rate)
+        self._subscriptions.setdefault(kind, []).append(subscription)
+
+        @callback
+        def unsubscribe() -> None:
+            subscription.cancel()
+            subscriptions = self._subscriptions.get(kind, [])
+            if subscription in subscriptions:
+                subscriptions.remove(subscription)
+
+        return unsubscribe
+
+    def subscriber_count(self, kind: type) -> int:
+        """Return the number of subscribers for a feature type."""
+        return len(self._subscriptions.get(kind, ()))
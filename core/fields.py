@@ -0,0 +1,78 @@
+"""Spatial fields sampled at light positions for Aurora Sound to Light."""
+import math
+from typing import Sequence
+
+import numpy as np
+
+
+def _unit(vector: Sequence[float]) -> np.ndarray:
+    """Return a normalized 3-D vector."""
+    values = np.zeros(3, dtype=np.float32)
+    given = np.asarray(vector, dtype=np.float32).reshape(-1)[:3]
+    values[:len(given)] = given
+    norm = np.linalg.norm(values)
+    if norm == 0:
+        raise ValueError("Direction must not be zero")
+    return values / norm
+
+
+def project(positions: np.ndarray, direction: Sequence[float]) -> np.ndarray:
+    """Return the distance of each position along a direction."""
+    return positions @ _unit(direction)
+
+
+def distance(positions: np.ndarray, center: Sequence[float]) -> np.ndarray:
+    """Return the distance of each position from a point."""
+    origin = np.zeros(3, dtype=np.float32)
+    given = np.asarray(center, dtype=np.float32).reshape(-1)[:3]
+    origin[:len(given)] = given
+    return np.linalg.norm(positions - origin, axis=1)
+
+
+def wave(
+    positions: np.ndarray,
+    direction: Sequence[float],
+    wavelength: float,
+    phase: float
+) -> np.ndarray:
+    """Return a plane wave in 0-1 travelling along a direction."""
+    offset = project(positions, direction) / wavelength - phase
+    return 0.5 + 0.5 * np.cos(2 * math.pi * offset)
+
+
+def rings(
+    positions: np.ndarray,
+    center: Sequence[float],
+    radii: np.ndarray,
+    width: float
+) -> np.ndarray:
+    """Return the brightest of several expanding rings in 0-1.
+
+    ``radii`` holds the current radius of every ring; each light takes
+    the Gaussian falloff of the ring closest to it.
+    """
+    radii = np.asarray(radii, dtype=np.float32)
+    if not len(radii):
+        return np.zeros(len(positions), dtype=np.float32)
+    gap = distance(positions, center)[None, :] - radii[:, None]
+    return np.max(np.exp(-0.5 * (gap / width) ** 2), axis=0)
+
+
+def sweep(
+    positions: np.ndarray,
+    center: Sequence[float],
+    angle: float,
+    width: float
+) -> np.ndarray:
+    """Return a beam in 0-1 pointing at an angle (radians) in the x-y plane.
+
+    Brightness falls off linearly to zero at ``width`` radians from the
+    beam.
+    """
+    given = np.asarray(center, dtype=np.float32).reshape(-1)
+    light_angles = np.arctan2(
+        positions[:, 1] - given[1],
+        positions[:, 0] - given[0]
+    )
+    gap = np.abs((light_angles - angle + math.pi) % (2 * math.pi) - math.pi)
+    return np.clip(1 - gap / width, 0.0, 1.0)
@@ -0,0 +1,217 @@
+"""Frame output stage for Aurora Sound to Light."""
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from homeassistant.components.light import (
+    ATTR_BRIGHTNESS,
+    ATTR_RGB_COLOR,
+    ATTR_TRANSITION,
+)
+from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+# Frame layout: one row per light, channels in Home Assistant units (0-255)
+FRAME_CHANNELS = 4
+CHANNEL_RED = 0
+CHANNEL_GREEN = 1
+CHANNEL_BLUE = 2
+CHANNEL_BRIGHTNESS = 3
+
+# Frame diffing
+METRIC_LAB = "lab"  # CIE76 delta E, ~2.3 is a just noticeable difference
+METRIC_RGB = "rgb"  # "redmean" weighted RGB distance, 0-765
+DIFF_METRICS = [METRIC_LAB, METRIC_RGB]
+DEFAULT_DEADBAND = 2.0  # delta E
+
+# sRGB (D65) to CIE XYZ, rows scaled by the reference white
+_RGB_TO_XYZ = (
+    np.array([
+        [0.4124, 0.3576, 0.1805],
+        [0.2126, 0.7152, 0.0722],
+        [0.0193, 0.1192, 0.9505],
+    ]) / np.array([[0.95047], [1.0], [1.08883]])
+).astype(np.float32)
+
+
+def new_frame(num_lights: int) -> np.ndarray:
+    """Return an all-off frame for the given number of lights."""
+    return np.zeros((num_lights, FRAME_CHANNELS), dtype=np.float32)
+
+
+def displayed_rgb(values: np.ndarray) -> np.ndarray:
+    """Return the emitted RGB (0-1) of frame values, scaled by brightness."""
+    values = np.asarray(values, dtype=np.float32)
+    return (
+        values[:, :CHANNEL_BRIGHTNESS] *
+        values[:, CHANNEL_BRIGHTNESS:] / (255.0 * 255.0)
+    )
+
+
+def rgb_to_lab(rgb: np.ndarray) -> np.ndarray:
+    """Convert an (n, 3) sRGB array in 0-1 to CIELAB."""
+    linear = np.where(
+        rgb <= 0.04045,
+        rgb / 12.92,
+        ((rgb + 0.055) / 1.055) ** 2.4
+    )
+    xyz = linear @ _RGB_TO_XYZ.T
+    f = np.where(
+        xyz > (6 / 29) ** 3,
+        np.cbrt(xyz),
+        xyz / (3 * (6 / 29) ** 2) + 4 / 29
+    )
+    return np.stack([
+        116 * f[:, 1] - 16,
+        500 * (f[:, 0] - f[:, 1]),
+        200 * (f[:, 1] - f[:, 2]),
+    ], axis=1)
+
+
+def color_distance(
+    old: np.ndarray,
+    new: np.ndarray,
+    metric: str = METRIC_LAB
+) -> np.ndarray:
+    """Return the perceptual distance per light between two frames."""
+    old_rgb = displayed_rgb(old)
+    new_rgb = displayed_rgb(new)
+    if metric == METRIC_LAB:
+        delta = rgb_to_lab(new_rgb) - rgb_to_lab(old_rgb)
+        return np.linalg.norm(delta, axis=1)
+
+    delta = (new_rgb - old_rgb) * 255
+    red_mean = (new_rgb[:, 0] + old_rgb[:, 0]) * 127.5
+    weights = np.stack([
+        2 + red_mean / 256,
+        np.full_like(red_mean, 4.0),
+        2 + (255 - red_mean) / 256,
+    ], axis=1)
+    return np.sqrt(np.sum(weights * delta ** 2, axis=1))
+
+
+class FrameOutput:
+    """Turn rendered frames into light service calls.
+
+    A frame is a float32 array of shape (n_lights, 4) holding red, green,
+    blue and brightness in 0-255. Lights that end up with the same color
+    and brightness share a single service call, so a uniform frame costs
+    one call regardless of the number of lights.
+
+    With a deadband the stage remembers what each light was last sent
+    and only commands lights whose displayed color moved further than
+    the deadband (or that switched on or off) since then.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        lights: Sequence[str],
+        transition: Optional[float] = None,
+        deadband: Optional[float] = None,
+        metric: str = METRIC_LAB,
+    ) -> None:
+        """Initialize the output stage.
+
+        Args:
+            hass: Home Assistant instance
+            lights: Light entity IDs, one per frame row
+            transition: Optional transition time for turn_on calls
+            deadband: Minimum perceptual change that is re-sent, or None
+                to send every light on every frame
+            metric: Distance used for the deadband, "lab" or "rgb"
+        """
+        if metric not in DIFF_METRICS:
+            raise ValueError(f"Unknown color metric: {metric}")
+        self.hass = hass
+        self.lights = list(lights)
+        self.transition = transition
+        self.deadband = deadband
+        self.metric = metric
+        self._entity_ids = np.array(self.lights, dtype=object)
+        self._last_sent: Optional[np.ndarray] = None
+
+    def reset(self) -> None:
+        """Forget what was sent so the next frame updates every light."""
+        self._last_sent = None
+
+    def _changed(self, values: np.ndarray) -> np.ndarray:
+        """Return a mask of lights that need a command, and remember them."""
+        if self.deadband is None or self._last_sent is None:
+            self._last_sent = values.copy()
+            return np.ones(len(values), dtype=bool)
+
+        last = self._last_sent
+        switched = (
+            (values[:, CHANNEL_BRIGHTNESS] == 0) !=
+            (last[:, CHANNEL_BRIGHTNESS] == 0)
+        )
+        changed = switched | (
+            color_distance(last, values, self.metric) > self.deadband
+        )
+        last[changed] = values[changed]
+        return changed
+
+    def quantize(self, frame: np.ndarray) -> np.ndarray:
+        """Convert a float frame to integer light values."""
+        frame = np.asarray(frame, dtype=np.float32)
+        if frame.shape != (len(self.lights), FRAME_CHANNELS):
+            raise ValueError(
+                f"Expected frame of shape ({len(self.lights)}, "
+                f"{FRAME_CHANNELS}), got {frame.shape}"
+            )
+        return np.clip(frame, 0, 255).astype(np.int32)
+
+    def commands(self, frame: np.ndarray) -> List[Tuple[str, Dict[str, Any]]]:
+        """Return the (service, data) pairs that display a frame.
+
+        With a deadband, lights are considered sent once their commands
+        are returned.
+        """
+        if not self.lights:
+            return []
+
+        values = self.quantize(frame)
+        # Lights that are off only differ by brightness
+        values[values[:, CHANNEL_BRIGHTNESS] == 0, :CHANNEL_BRIGHTNESS] = 0
+
+        changed = self._changed(values)
+        if not changed.any():
+            return []
+        values = values[changed]
+        changed_ids = self._entity_ids[changed]
+        unique, inverse = np.unique(values, axis=0, return_inverse=True)
+
+        commands = []
+        for index, (red, green, blue, brightness) in enumerate(unique):
+            entity_ids = changed_ids[inverse.reshape(-1) == index]
+            data: Dict[str, Any] = {
+                "entity_id": (
+                    entity_ids[0] if len(entity_ids) == 1
+                    else entity_ids.tolist()
+                ),
+            }
+            if brightness == 0:
+                commands.append(("turn_off", data))
+                continue
+
+            data[ATTR_BRIGHTNESS] = int(brightness)
+            data[ATTR_RGB_COLOR] = [int(red), int(green), int(blue)]
+            if self.transition is not None:
+                data[ATTR_TRANSITION] = self.transition
+            commands.append(("turn_on", data))
+        return commands
+
+    async def async_send(self, frame: np.ndarray) -> None:
+        """Display a frame on the lights."""
+        for service, data in self.commands(frame):
+            try:
+                await self.hass.services.async_call("light", service, data)
+            except Exception as err:
+                _LOGGER.error(
+                    "Failed to update lights %s: %s",
+                    data["entity_id"],
+                    err
+                )
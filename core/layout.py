@@ -0,0 +1,184 @@
+"""Spatial light layout for Aurora Sound to Light."""
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import storage
+
+from ..const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_KEY = f"{DOMAIN}.layout"
+STORAGE_VERSION = 1
+
+DIMENSIONS = 3  # 2-D positions are stored with z = 0
+
+
+def linear_positions(count: int) -> np.ndarray:
+    """Return lights spread along the x axis in 0-1, in list order."""
+    positions = np.zeros((count, DIMENSIONS), dtype=np.float32)
+    if count:
+        positions[:, 0] = np.arange(count, dtype=np.float32) / count
+    return positions
+
+
+def _as_position(position: Sequence[float]) -> np.ndarray:
+    """Validate a 2-D or 3-D position."""
+    values = np.asarray(position, dtype=np.float32).reshape(-1)
+    if len(values) not in (2, 3) or not np.all(np.isfinite(values)):
+        raise ValueError(f"Invalid position: {position}")
+    return np.pad(values, (0, DIMENSIONS - len(values)))
+
+
+class LightLayout:
+    """Registry of light and group positions in room coordinates.
+
+    Positions are kept in one contiguous float32 (n, 3) array. Lookups
+    for a list of lights are gathered once and cached until the layout
+    changes, so effects can sample fields at all light positions in a
+    single vectorized pass. Lights without a position fall back to their
+    place along the x axis, matching the old index-based effects.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the layout."""
+        self.hass = hass
+        self._store = storage.Store(
+            hass,
+            STORAGE_VERSION,
+            STORAGE_KEY,
+            private=True,
+            atomic_writes=True
+        )
+        self._index: Dict[str, int] = {}
+        self._positions = np.zeros((0, DIMENSIONS), dtype=np.float32)
+        self._groups: Dict[str, List[str]] = {}
+        self._group_positions: Dict[str, np.ndarray] = {}
+        self._cache: Dict[Tuple[str, ...], np.ndarray] = {}
+        self.version = 0
+
+    @property
+    def lights(self) -> List[str]:
+        """Return the lights with a position."""
+        return list(self._index)
+
+    def _changed(self) -> None:
+        """Invalidate cached lookups."""
+        self._cache.clear()
+        self.version += 1
+
+    def set_positions(self, positions: Dict[str, Sequence[float]]) -> None:
+        """Set the positions of lights, keeping the others."""
+        values = {light: _as_position(pos) for light, pos in positions.items()}
+        new = [light for light in values if light not in self._index]
+        if new:
+            for light in new:
+                self._index[light] = len(self._index)
+            self._positions = np.ascontiguousarray(np.vstack([
+                self._positions,
+                np.zeros((len(new), DIMENSIONS), dtype=np.float32),
+            ]))
+        for light, value in values.items():
+            self._positions[self._index[light]] = value
+        self._changed()
+
+    def remove_light(self, light: str) -> None:
+        """Forget the position of a light."""
+        if light not in self._index:
+            return
+        keep = [name for name in self._index if name != light]
+        self._positions = np.ascontiguousarray(
+            self._positions[[self._index[name] for name in keep]]
+        )
+        self._index = {name: index for index, name in enumerate(keep)}
+        self._changed()
+
+    def set_group(
+        self,
+        name: str,
+        lights: Sequence[str],
+        position: Optional[Sequence[float]] = None
+    ) -> None:
+        """Define a group, optionally with its own position.
+
+        Without a position the group sits at the centroid of its lights.
+        """
+        self._groups[name] = list(lights)
+        if position is None:
+            self._group_positions.pop(name, None)
+        else:
+            self._group_positions[name] = _as_position(position)
+        self._changed()
+
+    def positions(self, lights: Sequence[str]) -> np.ndarray:
+        """Return the read-only float32 (n, 3) positions of lights."""
+        key = tuple(lights)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        positions = linear_positions(len(key))
+        known = np.array([light in self._index for light in key], dtype=bool)
+        if known.any():
+            rows = [self._index[light] for light in key if light in self._index]
+            positions[known] = self._positions[rows]
+        positions.setflags(write=False)
+        self._cache[key] = positions
+        return positions
+
+    def group_position(self, name: str) -> np.ndarray:
+        """Return the position of a group."""
+        if name in self._group_positions:
+            return self._group_positions[name]
+        if name not in self._groups:
+            raise KeyError(f"Unknown group: {name}")
+        lights = self._groups[name]
+        if not lights:
+            return np.zeros(DIMENSIONS, dtype=np.float32)
+        return self.positions(lights).mean(axis=0)
+
+    def bounds(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the minimum and maximum corner of all positions."""
+        if not len(self._positions):
+            return (
+                np.zeros(DIMENSIONS, dtype=np.float32),
+                np.ones(DIMENSIONS, dtype=np.float32),
+            )
+        return self._positions.min(axis=0), self._positions.max(axis=0)
+
+    async def async_load(self) -> None:
+        """Load the saved layout."""
+        try:
+            data = await self._store.async_load()
+            if data:
+                self.set_positions(data.get("lights", {}))
+                for name, group in data.get("groups", {}).items():
+                    self.set_group(
+                        name,
+                        group.get("lights", []),
+                        group.get("position")
+                    )
+        except Exception as err:
+            _LOGGER.error("Failed to load light layout: %s", err)
+
+    async def async_save(self) -> None:
+        """Save the layout."""
+        await self._store.async_save({
+            "lights": {
+                light: self._positions[index].tolist()
+                for light, index in self._index.items()
+            },
+            "groups": {
+                name: {
+                    "lights": lights,
+                    "position": (
+                        self._group_positions[name].tolist()
+                        if name in self._group_positions else None
+                    ),
+                }
+                for name, lights in self._groups.items()
+            },
+        })
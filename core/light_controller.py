@@ -1,5 +1,6 @@
 """Light controller for Aurora Sound to Light."""
 from typing import Any, Dict, List, Optional, Tuple
+import asyncio
 import logging
 
 from homeassistant.components.light import (
@@ -23,6 +24,8 @@ class LightController:
         self._lights: Dict[str, Dict[str, Any]] = {}  # Store light states
         self._effect_engine: Optional[EffectEngine] = None
         self._current_effect = None
+        self._active = asyncio.Event()
+        self._active.set()
 
     def get_lights(self) -> List[str]:
         """Get list of available lights."""
@@ -108,6 +111,22 @@ class LightController:
             except Exception as err:
                 _LOGGER.error("Failed to stop effect: %s", err)
 
+    @property
+    def is_idle(self) -> bool:
+        """Return True while light dispatch is suspended."""
+        return not self._active.is_set()
+
+    def set_idle(self, idle: bool) -> None:
+        """Suspend or resume the effect dispatch path."""
+        if idle:
+            self._active.clear()
+        else:
+            self._active.set()
+
+    async def async_wait_active(self) -> None:
+        """Block until light dispatch is resumed."""
+        await self._active.wait()
+
     async def get_light_state(self, light_id: str) -> Optional[Dict[str, Any]]:
         """Get the current state of a light."""
         return self._lights.get(light_id) 
\ No newline at end of file
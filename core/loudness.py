@@ -0,0 +1,144 @@
+"""Perceptual loudness metering for Aurora Sound to Light."""
+import logging
+
+import numpy as np
+
+_LOGGER = logging.getLogger(__name__)
+
+# ITU-R BS.1770 measurement windows
+MOMENTARY_WINDOW = 0.4  # seconds
+SHORT_TERM_WINDOW = 3.0  # seconds
+LOUDNESS_FLOOR = -70.0  # LUFS, absolute gate
+
+# K-weighting filter stages (high shelf + RLB high pass), specified as
+# analogue prototypes so they can be evaluated at any sample rate
+SHELF_GAIN = 3.99984385397  # dB
+SHELF_Q = 0.7071752369554193
+SHELF_FREQ = 1681.974450955533  # Hz
+HIGHPASS_Q = 0.5003270373253953
+HIGHPASS_FREQ = 38.13547087613982  # Hz
+
+
+def _biquad_power(
+    b: np.ndarray,
+    a: np.ndarray,
+    omega: np.ndarray
+) -> np.ndarray:
+    """Evaluate |H(e^jw)|^2 of a biquad at the given angular frequencies."""
+    z = np.exp(-1j * omega)
+    numerator = b[0] + b[1] * z + b[2] * z ** 2
+    denominator = a[0] + a[1] * z + a[2] * z ** 2
+    return np.abs(numerator / denominator) ** 2
+
+
+def k_weighting(freqs: np.ndarray, sample_rate: int) -> np.ndarray:
+    """Return the K-weighting power response at the given frequencies."""
+    omega = 2 * np.pi * np.asarray(freqs, dtype=np.float64) / sample_rate
+
+    # Stage 1: high shelf modelling the acoustic effect of the head
+    amp = 10 ** (SHELF_GAIN / 40)
+    w0 = 2 * np.pi * SHELF_FREQ / sample_rate
+    alpha = np.sin(w0) / (2 * SHELF_Q)
+    cos_w0 = np.cos(w0)
+    root = 2 * np.sqrt(amp) * alpha
+    shelf_b = np.array([
+        amp * ((amp + 1) + (amp - 1) * cos_w0 + root),
+        -2 * amp * ((amp - 1) + (amp + 1) * cos_w0),
+        amp * ((amp + 1) + (amp - 1) * cos_w0 - root),
+    ])
+    shelf_a = np.array([
+        (amp + 1) - (amp - 1) * cos_w0 + root,
+        2 * ((amp - 1) - (amp + 1) * cos_w0),
+        (amp + 1) - (amp - 1) * cos_w0 - root,
+    ])
+
+    # Stage 2: revised low-frequency B-curve high pass
+    w0 = 2 * np.pi * HIGHPASS_FREQ / sample_rate
+    alpha = np.sin(w0) / (2 * HIGHPASS_Q)
+    cos_w0 = np.cos(w0)
+    highpass_b = np.array([(1 + cos_w0) / 2, -(1 + cos_w0), (1 + cos_w0) / 2])
+    highpass_a = np.array([1 + alpha, -2 * cos_w0, 1 - alpha])
+
+    return (
+        _biquad_power(shelf_b, shelf_a, omega) *
+        _biquad_power(highpass_b, highpass_a, omega)
+    )
+
+
+class LoudnessMeter:
+    """K-weighted momentary and short-term loudness meter.
+
+    Loudness is computed in the frequency domain: a precomputed weighting
+    vector folds the K-weighting response, Parseval scaling and window
+    energy correction into a single dot product with the rFFT power
+    spectrum. Per-frame mean squares are kept in ring buffers covering
+    the momentary and short-term windows.
+    """
+
+    def __init__(self, sample_rate: int, chunk_size: int) -> None:
+        """Initialize the meter for a given analysis resolution."""
+        self.sample_rate = sample_rate
+        self.chunk_size = chunk_size
+
+        window = np.hanning(chunk_size)
+        freqs = np.fft.rfftfreq(chunk_size, 1 / sample_rate)
+
+        # One-sided spectrum: every bin except DC and Nyquist appears twice
+        scale = np.full(len(freqs), 2.0)
+        scale[0] = 1.0
+        if chunk_size % 2 == 0:
+            scale[-1] = 1.0
+        self._weights = (
+            k_weighting(freqs, sample_rate) * scale /
+            (chunk_size * np.sum(window ** 2))
+        )
+
+        # Consecutive chunks are contiguous, so one frame spans one chunk
+        frame_rate = sample_rate / chunk_size
+        self._momentary = np.zeros(
+            max(1, int(round(MOMENTARY_WINDOW * frame_rate)))
+        )
+        self._short_term = np.zeros(
+            max(1, int(round(SHORT_TERM_WINDOW * frame_rate)))
+        )
+        self._frames = 0
+
+        self.momentary = LOUDNESS_FLOOR
+        self.short_term = LOUDNESS_FLOOR
+
+    @property
+    def num_bins(self) -> int:
+        """Return the number of rFFT bins the meter expects."""
+        return len(self._weights)
+
+    def reset(self) -> None:
+        """Clear the measurement history."""
+        self._momentary.fill(0.0)
+        self._short_term.fill(0.0)
+        self._frames = 0
+        self.momentary = LOUDNESS_FLOOR
+        self.short_term = LOUDNESS_FLOOR
+
+    def process(self, spectrum: np.ndarray) -> None:
+        """Add one frame of rFFT magnitudes, shaped (bins,) or (channels, bins).
+
+        Channels are summed with unit weight as for the front channels in
+        BS.1770.
+        """
+        power = np.square(np.atleast_2d(spectrum)) @ self._weights
+        mean_square = float(np.sum(power))
+
+        self._momentary[self._frames % len(self._momentary)] = mean_square
+        self._short_term[self._frames % len(self._short_term)] = mean_square
+        self._frames += 1
+
+        self.momentary = self._to_lufs(self._momentary)
+        self.short_term = self._to_lufs(self._short_term)
+
+    def _to_lufs(self, buffer: np.ndarray) -> float:
+        """Convert a ring buffer of mean squares to LUFS."""
+        filled = min(self._frames, len(buffer))
+        mean_square = float(np.mean(buffer[:filled])) if filled else 0.0
+        if mean_square <= 0:
+            return LOUDNESS_FLOOR
+        return max(LOUDNESS_FLOOR, -0.691 + 10 * np.log10(mean_square))
@@ -0,0 +1,242 @@
+"""Array-backed particle system for Aurora Sound to Light."""
+import logging
+from typing import Optional, Sequence, Union
+
+import numpy as np
+
+from .frame_output import CHANNEL_BRIGHTNESS
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_CAPACITY = 4096
+DENSE_SPLAT_LIMIT = 1 << 18  # particle-target pairs splatted without a grid
+
+# Neighbor cells searched around each particle's grid cell
+_NEIGHBORS = np.array(
+    [(x, y, z) for x in (-1, 0, 1) for y in (-1, 0, 1) for z in (-1, 0, 1)],
+    dtype=np.int64
+)
+
+ArrayLike = Union[Sequence[float], np.ndarray]
+
+
+class ParticleSystem:
+    """Particles stored as a struct of arrays.
+
+    Position, velocity, color, remaining and total lifetime live in
+    preallocated float32 arrays; the first ``count`` rows are alive.
+    Spawning writes a block of rows at once and culling compacts the
+    survivors with one boolean index, so the cost per frame depends on
+    the number of array operations, not the number of particles.
+    """
+
+    def __init__(
+        self,
+        capacity: int = DEFAULT_CAPACITY,
+        drag: float = 0.0,
+        gravity: Optional[ArrayLike] = None
+    ) -> None:
+        """Allocate the particle arrays.
+
+        Args:
+            capacity: Maximum number of live particles
+            drag: Fraction of velocity lost per second
+            gravity: Constant acceleration applied to every particle
+        """
+        self.capacity = capacity
+        self.drag = drag
+        self.gravity = np.zeros(3, dtype=np.float32)
+        if gravity is not None:
+            self.gravity[:len(gravity)] = gravity
+        self.position = np.zeros((capacity, 3), dtype=np.float32)
+        self.velocity = np.zeros((capacity, 3), dtype=np.float32)
+        self.color = np.zeros((capacity, 3), dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.float32)
+        self.lifetime = np.ones(capacity, dtype=np.float32)
+        self.count = 0
+
+    def __len__(self) -> int:
+        """Return the number of live particles."""
+        return self.count
+
+    def clear(self) -> None:
+        """Remove all particles."""
+        self.count = 0
+
+    def spawn(
+        self,
+        position: ArrayLike,
+        velocity: ArrayLike,
+        color: ArrayLike,
+        lifetime: ArrayLike
+    ) -> int:
+        """Add a block of particles.
+
+        Arguments broadcast to (k, 3) for vectors and (k,) for lifetimes;
+        the block size k is taken from the largest argument. Particles
+        beyond the capacity are dropped. Returns the number spawned.
+        """
+        lifetime = np.asarray(lifetime, dtype=np.float32)
+        total = max(
+            np.atleast_2d(position).shape[0],
+            np.atleast_2d(velocity).shape[0],
+            np.atleast_2d(color).shape[0],
+            lifetime.size,
+        )
+        rows = min(total, self.capacity - self.count)
+        if rows <= 0:
+            return 0
+
+        block = slice(self.count, self.count + rows)
+        for array, values in (
+            (self.position, position),
+            (self.velocity, velocity),
+            (self.color, color),
+        ):
+            array[block] = np.broadcast_to(values, (total, 3))[:rows]
+        self.lifetime[block] = np.broadcast_to(
+            np.maximum(lifetime, 1e-3), (total,)
+        )[:rows]
+        self.life[block] = self.lifetime[block]
+        self.count += rows
+        return rows
+
+    def step(self, elapsed: float) -> None:
+        """Move all particles and cull the expired ones."""
+        if not self.count or elapsed <= 0:
+            return
+        live = slice(0, self.count)
+        velocity = self.velocity[live]
+        if self.gravity.any():
+            velocity += self.gravity * elapsed
+        if self.drag:
+            velocity *= max(0.0, 1.0 - self.drag * elapsed)
+        self.position[live] += velocity * elapsed
+        self.life[live] -= elapsed
+
+        alive = self.life[live] > 0
+        survivors = int(np.count_nonzero(alive))
+        if survivors == self.count:
+            return
+        for array in (
+            self.position, self.velocity, self.color,
+            self.life, self.lifetime,
+        ):
+            array[:survivors] = array[live][alive]
+        self.count = survivors
+
+    def intensity(self) -> np.ndarray:
+        """Return the remaining life of each live particle in 0-1."""
+        live = slice(0, self.count)
+        return self.life[live] / self.lifetime[live]
+
+    def rasterize(
+        self,
+        targets: np.ndarray,
+        radius: float,
+        frame: np.ndarray
+    ) -> None:
+        """Splat the particles onto target positions.
+
+        Every particle adds its color, faded by its remaining life and
+        linearly by distance out to ``radius``, to the targets near it.
+        The summed light is written to the float32 (m, 4) frame as a
+        color at full scale with the brightest channel as brightness.
+        """
+        light = np.zeros((len(targets), 3), dtype=np.float32)
+        if self.count and len(targets):
+            if self.count * len(targets) <= DENSE_SPLAT_LIMIT:
+                self._splat_dense(targets, radius, light)
+            else:
+                self._splat_grid(targets, radius, light)
+
+        peak = light.max(axis=1)
+        lit = peak > 0
+        frame[:, :CHANNEL_BRIGHTNESS] = 0
+        frame[lit, :CHANNEL_BRIGHTNESS] = (
+            light[lit] * (255 / peak[lit, None])
+        )
+        frame[:, CHANNEL_BRIGHTNESS] = np.minimum(peak, 255)
+
+    def _splat_dense(
+        self,
+        targets: np.ndarray,
+        radius: float,
+        light: np.ndarray
+    ) -> None:
+        """Splat using the full target-particle distance matrix.
+
+        Squared distances are expanded as |t|^2 + |p|^2 - 2 t.p so the
+        bulk of the work is one matrix product, and the falloff is
+        applied in place.
+        """
+        live = slice(0, self.count)
+        particles = self.position[live]
+        weights = (targets * np.float32(-2)) @ particles.T
+        weights += np.einsum("ij,ij->i", targets, targets)[:, None]
+        weights += np.einsum("ij,ij->i", particles, particles)[None, :]
+        np.maximum(weights, 0, out=weights)
+        np.sqrt(weights, out=weights)
+        weights *= np.float32(-1 / radius)
+        weights += 1
+        np.maximum(weights, 0, out=weights)
+        light += weights @ (self.color[live] * self.intensity()[:, None])
+
+    def _splat_grid(
+        self,
+        targets: np.ndarray,
+        radius: float,
+        light: np.ndarray
+    ) -> None:
+        """Splat using a uniform grid of cells one radius wide.
+
+        Targets are sorted by cell; each particle only visits the
+        targets in its own and the 26 neighboring cells.
+        """
+        target_cells = np.floor(targets / radius).astype(np.int64)
+        low = target_cells.min(axis=0) - 1
+        shape = target_cells.max(axis=0) - low + 2
+
+        def keys(cells: np.ndarray) -> np.ndarray:
+            cells = cells - low
+            inside = np.all((cells >= 0) & (cells < shape), axis=1)
+            packed = (cells[:, 0] * shape[1] + cells[:, 1]) * shape[2]
+            return np.where(inside, packed + cells[:, 2], -1)
+
+        target_keys = keys(target_cells)
+        order = np.argsort(target_keys, kind="stable")
+        sorted_keys = target_keys[order]
+
+        live = slice(0, self.count)
+        particles = self.position[live]
+        emitted = self.color[live] * self.intensity()[:, None]
+        particle_cells = np.floor(particles / radius).astype(np.int64)
+        index = np.arange(self.count)
+
+        for neighbor in _NEIGHBORS:
+            cell_keys = keys(particle_cells + neighbor)
+            start = np.searchsorted(sorted_keys, cell_keys, "left")
+            counts = np.searchsorted(sorted_keys, cell_keys, "right") - start
+            counts[cell_keys < 0] = 0
+            total = int(counts.sum())
+            if not total:
+                continue
+
+            # Expand to one row per (particle, target) pair
+            particle = np.repeat(index, counts)
+            first = np.repeat(np.cumsum(counts) - counts, counts)
+            target = order[
+                np.arange(total) - first + np.repeat(start, counts)
+            ]
+            offsets = particles[particle] - targets[target]
+            weights = np.clip(
+                1 - np.sqrt(np.einsum("ij,ij->i", offsets, offsets)) / radius,
+                0.0,
+                1.0
+            )
+            for channel in range(3):
+                light[:, channel] += np.bincount(
+                    target,
+                    weights * emitted[particle, channel],
+                    minlength=len(targets)
+                )
@@ -0,0 +1,227 @@
+"""Addressable pixel strips for Aurora Sound to Light."""
+import asyncio
+import logging
+import socket
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from homeassistant.core import HomeAssistant
+
+from .frame_output import CHANNEL_BRIGHTNESS, FRAME_CHANNELS
+
+_LOGGER = logging.getLogger(__name__)
+
+# WLED realtime UDP protocol
+WLED_UDP_PORT = 21324
+PROTOCOL_DNRGB = 4  # RGB with a 16-bit start index
+DNRGB_MAX_PIXELS = 489  # pixels per packet
+DEFAULT_REALTIME_TIMEOUT = 2  # seconds WLED stays in realtime mode
+KEEPALIVE_INTERVAL = 1.0  # resend unchanged strips before WLED times out
+
+
+@dataclass(frozen=True)
+class PixelStrip:
+    """An addressable LED strip driven over UDP.
+
+    ``start`` and ``end`` place the first and last pixel in the room;
+    the pixels in between are spaced evenly.
+    """
+
+    name: str
+    host: str
+    count: int
+    port: int = WLED_UDP_PORT
+    start: Optional[Sequence[float]] = None
+    end: Optional[Sequence[float]] = None
+
+    def __post_init__(self) -> None:
+        """Validate the strip."""
+        if not 0 < self.count <= 0xFFFF:
+            raise ValueError(f"Invalid pixel count for {self.name}")
+
+
+def _point(
+    value: Optional[Sequence[float]],
+    default: Sequence[float]
+) -> np.ndarray:
+    """Return a 2-D or 3-D point as a 3-D float32 vector."""
+    point = np.zeros(3, dtype=np.float32)
+    given = np.asarray(value if value is not None else default, np.float32)
+    point[:len(given)] = given
+    return point
+
+
+class PixelBuffer:
+    """Pixels of all strips in one contiguous uint8 (total, 3) array.
+
+    Each strip is a slice of the array, so effects render every pixel in
+    one vectorized pass and outputs send each strip straight from its
+    view without copying.
+    """
+
+    def __init__(self, strips: Sequence[PixelStrip]) -> None:
+        """Allocate the buffer for the given strips."""
+        self.strips = list(strips)
+        names = [strip.name for strip in self.strips]
+        if len(set(names)) != len(names):
+            raise ValueError("Strip names must be unique")
+
+        self.slices: Dict[str, slice] = {}
+        offset = 0
+        for strip in self.strips:
+            self.slices[strip.name] = slice(offset, offset + strip.count)
+            offset += strip.count
+        self.data = np.zeros((offset, 3), dtype=np.uint8)
+        self.positions = self._positions()
+
+    def __len__(self) -> int:
+        """Return the total number of pixels."""
+        return len(self.data)
+
+    def _positions(self) -> np.ndarray:
+        """Return the float32 (total, 3) room positions of the pixels."""
+        positions = np.zeros((len(self.data), 3), dtype=np.float32)
+        for row, strip in enumerate(self.strips):
+            start = _point(strip.start, (0.0, row, 0.0))
+            end = _point(strip.end, (1.0, row, 0.0))
+            steps = np.linspace(0, 1, strip.count, dtype=np.float32)
+            positions[self.slices[strip.name]] = (
+                start + steps[:, None] * (end - start)
+            )
+        positions.setflags(write=False)
+        return positions
+
+    def segment(self, name: str) -> np.ndarray:
+        """Return the writable pixel view of one strip."""
+        return self.data[self.slices[name]]
+
+    def load_frame(self, frame: np.ndarray) -> None:
+        """Fill the buffer from a float32 (total, 4) frame.
+
+        The brightness channel scales the colors, as lights would.
+        """
+        if np.shape(frame) != (len(self.data), FRAME_CHANNELS):
+            raise ValueError(
+                f"Expected frame of shape ({len(self.data)}, "
+                f"{FRAME_CHANNELS}), got {np.shape(frame)}"
+            )
+        scaled = (
+            frame[:, :CHANNEL_BRIGHTNESS] *
+            (frame[:, CHANNEL_BRIGHTNESS:] / 255.0)
+        )
+        np.clip(scaled, 0, 255, out=scaled)
+        self.data[:] = scaled
+
+
+def encode_dnrgb(
+    pixels: np.ndarray,
+    timeout: int = DEFAULT_REALTIME_TIMEOUT
+) -> List[bytes]:
+    """Encode uint8 (n, 3) pixels as WLED DNRGB packets."""
+    payload = np.ascontiguousarray(pixels, dtype=np.uint8).reshape(-1)
+    packets = []
+    for start in range(0, len(pixels), DNRGB_MAX_PIXELS):
+        header = bytes([
+            PROTOCOL_DNRGB,
+            timeout,
+            start >> 8,
+            start & 0xFF,
+        ])
+        chunk = payload[start * 3:(start + DNRGB_MAX_PIXELS) * 3]
+        packets.append(header + chunk.tobytes())
+    return packets
+
+
+class PixelOutput:
+    """Send pixel buffers to WLED strips over UDP.
+
+    Strips that did not change since the last send are skipped, except
+    for a periodic keepalive that holds WLED in realtime mode.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        buffer: PixelBuffer,
+        timeout: int = DEFAULT_REALTIME_TIMEOUT,
+    ) -> None:
+        """Initialize the output."""
+        self.hass = hass
+        self.buffer = buffer
+        self.timeout = timeout
+        self._transport: Optional[asyncio.DatagramTransport] = None
+        self._addresses: Dict[str, Tuple[str, int]] = {}
+        self._last_sent: Dict[str, np.ndarray] = {}
+        self._last_time: Dict[str, float] = {}
+        self.packets_sent = 0
+
+    async def async_start(self) -> None:
+        """Resolve the strips' hosts and open the UDP socket.
+
+        Hosts are resolved once here; sending to a hostname would look
+        it up again, blocking, for every packet.
+        """
+        for strip in self.buffer.strips:
+            if strip.name in self._addresses:
+                continue
+            try:
+                infos = await self.hass.loop.getaddrinfo(
+                    strip.host,
+                    strip.port,
+                    family=socket.AF_INET,
+                    type=socket.SOCK_DGRAM
+                )
+            except OSError as err:
+                _LOGGER.error(
+                    "Failed to resolve %s for strip %s: %s",
+                    strip.host,
+                    strip.name,
+                    err
+                )
+                continue
+            self._addresses[strip.name] = infos[0][4]
+        if self._transport is None:
+            self._transport, _ = await self.hass.loop.create_datagram_endpoint(
+                asyncio.DatagramProtocol,
+                family=socket.AF_INET
+            )
+
+    def close(self) -> None:
+        """Close the UDP socket."""
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+
+    def send(self) -> None:
+        """Send every strip that changed or is due for a keepalive."""
+        if self._transport is None:
+            return
+        now = time.monotonic()
+        for strip in self.buffer.strips:
+            address = self._addresses.get(strip.name)
+            if address is None:
+                continue
+            pixels = self.buffer.segment(strip.name)
+            last = self._last_sent.get(strip.name)
+            if (
+                last is not None and
+                now - self._last_time[strip.name] < KEEPALIVE_INTERVAL and
+                np.array_equal(last, pixels)
+            ):
+                continue
+            try:
+                for packet in encode_dnrgb(pixels, self.timeout):
+                    self._transport.sendto(packet, address)
+                    self.packets_sent += 1
+            except OSError as err:
+                _LOGGER.error(
+                    "Failed to send pixels to %s: %s",
+                    strip.name,
+                    err
+                )
+                continue
+            self._last_sent[strip.name] = pixels.copy()
+            self._last_time[strip.name] = now
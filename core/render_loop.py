@@ -0,0 +1,490 @@
+"""Central render loop for Aurora Sound to Light."""
+import asyncio
+import dataclasses
+import logging
+import math
+import time
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from homeassistant.core import HomeAssistant
+
+from .compositor import BLEND_MODES, BLEND_OVER, Compositor, Layer
+from .feature_bus import AudioFeatures, FeatureBus
+from .frame_output import DEFAULT_DEADBAND, FrameOutput, new_frame
+from .layout import LightLayout
+from .pixels import PixelBuffer, PixelOutput, PixelStrip
+from .show import ShowRecorder
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_RENDER_RATE = 30.0  # frames per second
+DEFAULT_EFFECT_BUDGET = 0.25  # share of the frame interval per effect
+MAX_SKIPPED_FRAMES = 10  # frames an effect may be skipped after an overrun
+
+
+def _self_timed(effect: Any) -> bool:
+    """Return whether an effect switches its lights on its own clock."""
+    return getattr(effect, "SELF_TIMED", False)
+
+
+class _ScheduledEffect:
+    """Scheduling state of one effect in the render loop."""
+
+    def __init__(
+        self,
+        effect: Any,
+        budget: float,
+        blend: str,
+        opacity: float,
+        group: Optional[str],
+    ) -> None:
+        """Initialize the scheduling state."""
+        self.effect = effect
+        self.budget = budget
+        self.blend = blend
+        self.opacity = opacity
+        self.group = group
+        self.indices = np.zeros(0, dtype=np.intp)
+        self.mask = np.zeros(0, dtype=np.float32)
+        self.frame: Optional[np.ndarray] = None
+        self.pending_params: Optional[Dict[str, Any]] = None
+        self.skip = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.render_time = 0.0
+
+
+class RenderScheduler:
+    """Drive all active effects from one clock.
+
+    Every tick the scheduler takes the latest audio features from the
+    feature bus, renders each running effect with the real elapsed time,
+    composites the frames as layers (in the order the effects were
+    added) into one frame covering all target lights and hands it to the
+    output stage. An effect whose render exceeds its time budget has its
+    next frames skipped, reusing its last frame, so a slow effect cannot
+    stall the others. The loop sleeps while light dispatch is idle.
+
+    With pixel strips configured, effects that implement
+    ``render_pixels()`` are also sampled at every pixel position and
+    composited into one pixel frame, which is sent to the strips as
+    whole buffers.
+
+    Effects with ``SELF_TIMED`` set switch their lights on their own
+    clock: they are left out of the combined frame and only handed the
+    latest features through ``sync()`` every tick.
+
+    While a ``recorder`` is set, every combined frame is also recorded
+    as a show.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        feature_bus: FeatureBus,
+        light_controller: Optional[Any] = None,
+        frame_rate: float = DEFAULT_RENDER_RATE,
+        deadband: Optional[float] = DEFAULT_DEADBAND,
+        layout: Optional[LightLayout] = None,
+    ) -> None:
+        """Initialize the render scheduler.
+
+        Args:
+            hass: Home Assistant instance
+            feature_bus: Source of the latest audio features
+            light_controller: Optional controller whose idle state pauses
+                the loop
+            frame_rate: Target frames per second
+            deadband: Perceptual change below which lights are not
+                re-commanded, None to send every light on every frame
+            layout: Light positions handed to effects without their own
+        """
+        self.hass = hass
+        self._feature_bus = feature_bus
+        self._light_controller = light_controller
+        self.frame_rate = frame_rate
+        self.deadband = deadband
+        self.layout = layout
+        self._effects: Dict[str, _ScheduledEffect] = {}
+        self._groups: Dict[str, Dict[str, float]] = {}
+        self._lights: List[str] = []
+        self._output = FrameOutput(hass, [])
+        self._compositor = Compositor(0)
+        self._pixels: Optional[PixelBuffer] = None
+        self._pixel_output: Optional[PixelOutput] = None
+        self._pixel_compositor = Compositor(0)
+        self._task: Optional[asyncio.Task] = None
+        self._published: Optional[AudioFeatures] = None
+        self._published_at = 0.0
+        self.recorder: Optional[ShowRecorder] = None
+        self.frames_rendered = 0
+        self.frames_dropped = 0
+
+    @property
+    def frame_interval(self) -> float:
+        """Return the target time between frames in seconds."""
+        return 1.0 / self.frame_rate
+
+    @property
+    def lights(self) -> List[str]:
+        """Return the lights covered by the combined frame."""
+        return list(self._lights)
+
+    def set_group(
+        self,
+        name: str,
+        lights: Union[Sequence[str], Dict[str, float]]
+    ) -> None:
+        """Define a light group usable as a layer mask.
+
+        Args:
+            name: Group name
+            lights: Light entity IDs, or a mapping of light to weight (0-1)
+        """
+        if not isinstance(lights, dict):
+            lights = {light: 1.0 for light in lights}
+        self._groups[name] = dict(lights)
+        self._update_layout()
+
+    async def async_set_strips(self, strips: Sequence[PixelStrip]) -> None:
+        """Replace the pixel strips driven by the loop."""
+        if self._pixel_output is not None:
+            self._pixel_output.close()
+        self._pixels = None
+        self._pixel_output = None
+        if not strips:
+            return
+
+        buffer = PixelBuffer(strips)
+        output = PixelOutput(self.hass, buffer)
+        await output.async_start()
+        self._pixel_compositor = Compositor(len(buffer))
+        self._pixels = buffer
+        self._pixel_output = output
+
+    @property
+    def pixels(self) -> Optional[PixelBuffer]:
+        """Return the pixel buffer of the configured strips."""
+        return self._pixels
+
+    def add_effect(
+        self,
+        effect_id: str,
+        effect: Any,
+        budget: Optional[float] = None,
+        blend: str = BLEND_OVER,
+        opacity: float = 1.0,
+        group: Optional[str] = None,
+    ) -> None:
+        """Schedule an effect as the top layer, replacing one with the same id.
+
+        Args:
+            effect_id: Identifier of the effect
+            effect: Effect instance implementing render()
+            budget: Render time budget in seconds, defaults to a share
+                of the frame interval
+            blend: Blend mode of the effect's layer
+            opacity: Opacity of the effect's layer (0-1)
+            group: Optional light group restricting the layer
+        """
+        if blend not in BLEND_MODES:
+            raise ValueError(f"Unknown blend mode: {blend}")
+        if budget is None:
+            budget = DEFAULT_EFFECT_BUDGET * self.frame_interval
+        if self.layout is not None and getattr(effect, "layout", None) is None:
+            effect.layout = self.layout
+        self._effects.pop(effect_id, None)
+        self._effects[effect_id] = _ScheduledEffect(
+            effect, budget, blend, opacity, group
+        )
+        self._update_layout()
+
+    def update_params(self, effect_id: str, params: Dict[str, Any]) -> bool:
+        """Queue validated parameters for an effect's next frame.
+
+        Parameters are applied atomically between ticks; when several
+        updates arrive within one frame only the newest is applied.
+        Returns False if the effect is not scheduled.
+        """
+        scheduled = self._effects.get(effect_id)
+        if scheduled is None:
+            return False
+        scheduled.pending_params = params
+        return True
+
+    def update_layer(
+        self,
+        effect_id: str,
+        blend: Optional[str] = None,
+        opacity: Optional[float] = None,
+        group: Optional[str] = None,
+    ) -> bool:
+        """Change how an effect's layer is blended without restarting it.
+
+        Returns False if the effect is not scheduled.
+        """
+        scheduled = self._effects.get(effect_id)
+        if scheduled is None:
+            return False
+        if blend is not None:
+            if blend not in BLEND_MODES:
+                raise ValueError(f"Unknown blend mode: {blend}")
+            scheduled.blend = blend
+        if opacity is not None:
+            scheduled.opacity = opacity
+        if group is not None and group != scheduled.group:
+            scheduled.group = group
+            self._update_layout()
+        return True
+
+    def remove_effect(self, effect_id: str) -> None:
+        """Stop scheduling an effect."""
+        if self._effects.pop(effect_id, None) is not None:
+            self._update_layout()
+
+    def _update_layout(self) -> None:
+        """Map every effect's lights into the combined frame."""
+        lights: Dict[str, int] = {}
+        for scheduled in self._effects.values():
+            if _self_timed(scheduled.effect):
+                scheduled.indices = np.zeros(0, dtype=np.intp)
+                continue
+            for light in scheduled.effect.lights:
+                lights.setdefault(light, len(lights))
+            scheduled.indices = np.array(
+                [lights[light] for light in scheduled.effect.lights],
+                dtype=np.intp
+            )
+        self._lights = list(lights)
+        self._output = FrameOutput(
+            self.hass,
+            self._lights,
+            deadband=self.deadband
+        )
+        self._compositor = Compositor(len(self._lights))
+
+        # Layer masks: the effect's own lights, weighted by its group
+        for scheduled in self._effects.values():
+            mask = np.zeros(len(self._lights), dtype=np.float32)
+            mask[scheduled.indices] = 1.0
+            if scheduled.group is not None:
+                weights = self._groups.get(scheduled.group, {})
+                mask *= np.array(
+                    [weights.get(light, 0.0) for light in self._lights],
+                    dtype=np.float32
+                )
+            scheduled.mask = mask
+
+    def _render_effect(
+        self,
+        effect_id: str,
+        scheduled: _ScheduledEffect,
+        features: AudioFeatures,
+        t: float
+    ) -> Optional[np.ndarray]:
+        """Render one effect within its budget, or reuse its last frame."""
+        if scheduled.pending_params is not None:
+            params, scheduled.pending_params = scheduled.pending_params, None
+            try:
+                scheduled.effect.apply_params(params)
+            except Exception as err:
+                _LOGGER.error(
+                    "Failed to apply parameters to effect %s: %s",
+                    effect_id,
+                    err
+                )
+            # Render the new parameters right away
+            scheduled.skip = 0
+
+        if scheduled.skip > 0:
+            scheduled.skip -= 1
+            scheduled.skipped += 1
+            return scheduled.frame
+
+        start = time.perf_counter()
+        try:
+            frame = scheduled.effect.render(features, t)
+        except Exception as err:
+            _LOGGER.error("Error rendering effect %s: %s", effect_id, err)
+            return scheduled.frame
+        elapsed = time.perf_counter() - start
+        scheduled.render_time = elapsed
+
+        if elapsed > scheduled.budget:
+            scheduled.overruns += 1
+            scheduled.skip = min(
+                MAX_SKIPPED_FRAMES,
+                math.ceil(elapsed / scheduled.budget) - 1
+            )
+            _LOGGER.debug(
+                "Effect %s took %.1f ms (budget %.1f ms), skipping %d frames",
+                effect_id,
+                elapsed * 1000,
+                scheduled.budget * 1000,
+                scheduled.skip
+            )
+
+        if np.shape(frame) != (len(scheduled.indices), 4):
+            _LOGGER.error(
+                "Effect %s rendered a frame of shape %s",
+                effect_id,
+                np.shape(frame)
+            )
+            return scheduled.frame
+
+        scheduled.frame = frame
+        return frame
+
+    def _features(self, t: float) -> AudioFeatures:
+        """Return the latest audio features for the frame at time t.
+
+        Frames are rendered more often than audio is analyzed, so the
+        same features are seen by several frames. A beat is only passed
+        on with the first frame after it was published; later frames
+        would otherwise retrigger it.
+        """
+        features = self._feature_bus.latest(AudioFeatures)
+        if features is None:
+            return AudioFeatures.from_levels(timestamp=t)
+        if features is not self._published:
+            self._published = features
+            self._published_at = t
+        elif features.beat and t != self._published_at:
+            return dataclasses.replace(features, beat=False)
+        return features
+
+    def render(self, t: float) -> np.ndarray:
+        """Render the combined frame of all running effects at time t."""
+        features = self._features(t)
+
+        layers = []
+        for effect_id, scheduled in list(self._effects.items()):
+            if not scheduled.effect.is_running:
+                continue
+            if _self_timed(scheduled.effect):
+                try:
+                    scheduled.effect.sync(features, t)
+                except Exception as err:
+                    _LOGGER.error("Error syncing effect %s: %s", effect_id, err)
+                continue
+            frame = self._render_effect(effect_id, scheduled, features, t)
+            if frame is None:
+                continue
+            layer_frame = new_frame(len(self._lights))
+            layer_frame[scheduled.indices] = frame
+            layers.append(Layer(
+                layer_frame,
+                scheduled.blend,
+                scheduled.opacity,
+                scheduled.mask
+            ))
+        self.frames_rendered += 1
+        return self._compositor.composite(layers)
+
+    def render_pixels(self, t: float) -> Optional[np.ndarray]:
+        """Render the pixel strips at time t into the pixel buffer.
+
+        Returns the uint8 (total, 3) pixels, or None without strips.
+        """
+        if self._pixels is None:
+            return None
+        features = self._features(t)
+        positions = self._pixels.positions
+
+        layers = []
+        for effect_id, scheduled in list(self._effects.items()):
+            effect = scheduled.effect
+            if not effect.is_running:
+                continue
+            try:
+                frame = effect.render_pixels(features, t, positions)
+            except Exception as err:
+                _LOGGER.error(
+                    "Error rendering pixels of effect %s: %s",
+                    effect_id,
+                    err
+                )
+                continue
+            if frame is not None:
+                layers.append(Layer(frame, scheduled.blend, scheduled.opacity))
+
+        self._pixels.load_frame(self._pixel_compositor.composite(layers))
+        return self._pixels.data
+
+    async def start(self) -> None:
+        """Start the render loop."""
+        if self._pixel_output is not None:
+            await self._pixel_output.async_start()
+        if self._task is None or self._task.done():
+            self._task = self.hass.async_create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the render loop."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self._pixel_output is not None:
+            self._pixel_output.close()
+
+    async def _run(self) -> None:
+        """Render frames on a fixed clock until cancelled."""
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while True:
+            if (
+                self._light_controller is not None and
+                self._light_controller.is_idle
+            ):
+                await self._light_controller.async_wait_active()
+                # Lights may have been changed while we were idle
+                self._output.reset()
+                next_tick = loop.time()
+
+            if self._effects:
+                now = loop.time()
+                try:
+                    frame = self.render(now)
+                    await self._output.async_send(frame)
+                    if self.recorder is not None:
+                        self.recorder.record(now, frame, self._lights)
+                    if self._pixel_output is not None:
+                        self.render_pixels(now)
+                        self._pixel_output.send()
+                except Exception as err:
+                    _LOGGER.error("Error in render loop: %s", err)
+
+            # Keep the clock on the grid; drop ticks we are too late for
+            next_tick += self.frame_interval
+            now = loop.time()
+            if now > next_tick:
+                missed = int((now - next_tick) / self.frame_interval) + 1
+                self.frames_dropped += missed
+                next_tick += missed * self.frame_interval
+            await asyncio.sleep(next_tick - now)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return render loop statistics."""
+        effects = {}
+        for effect_id, scheduled in self._effects.items():
+            effects[effect_id] = {
+                "render_time": scheduled.render_time,
+                "budget": scheduled.budget,
+                "overruns": scheduled.overruns,
+                "skipped": scheduled.skipped,
+            }
+            if _self_timed(scheduled.effect):
+                effects[effect_id]["timing"] = (
+                    scheduled.effect.timer.get_stats()
+                )
+        return {
+            "frames_rendered": self.frames_rendered,
+            "frames_dropped": self.frames_dropped,
+            "effects": effects,
+        }
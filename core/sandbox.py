@@ -0,0 +1,363 @@
+"""Out-of-process execution of user effect code for Aurora Sound to Light."""
+import ast
+import builtins
+import logging
+import math
+import multiprocessing
+import os
+import time
+import types
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from homeassistant.core import HomeAssistant
+
+from ..effects.base_effect import BaseEffect
+from .expression import feature_variables
+from .feature_bus import AudioFeatures
+from .frame_output import FRAME_CHANNELS
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_SANDBOX_BUDGET = 0.05  # seconds a worker may take per frame
+MAX_CONSECUTIVE_OVERRUNS = 3  # late frames in a row before a restart
+MAX_RESTARTS = 3  # restarts before the effect is disabled
+STARTUP_TIMEOUT = 15.0  # seconds for a worker to compile the code
+WORKER_NICENESS = 10
+
+RENDER_FUNCTION = "render"
+
+# Builtins available to user code
+SAFE_BUILTINS = {
+    name: getattr(builtins, name)
+    for name in [
+        "abs", "all", "any", "bool", "dict", "enumerate", "float", "int",
+        "len", "list", "max", "min", "pow", "range", "reversed", "round",
+        "sorted", "sum", "tuple", "zip", "ValueError", "ZeroDivisionError",
+    ]
+}
+
+# NumPy functions and constants available to user code as ``np``; file
+# I/O and the numpy submodules are left out
+NUMPY_NAMES = [
+    "abs", "arange", "arccos", "arcsin", "arctan", "arctan2", "argmax",
+    "argmin", "argsort", "array", "asarray", "ceil", "clip", "concatenate",
+    "cos", "cosh", "cumsum", "deg2rad", "diff", "dot", "e", "exp", "float32",
+    "float64", "floor", "fmod", "full", "full_like", "hypot", "int32",
+    "int64", "interp", "isfinite", "linspace", "log", "log10", "log2",
+    "max", "maximum", "mean", "min", "minimum", "mod", "ones", "ones_like",
+    "outer", "pi", "power", "rad2deg", "repeat", "roll", "round", "sign",
+    "sin", "sinh", "sqrt", "stack", "std", "sum", "tan", "tanh", "tile",
+    "where", "zeros", "zeros_like",
+]
+NUMPY_RANDOM_NAMES = ["normal", "randint", "random", "uniform"]
+
+# Attributes of arrays and other objects that write files, expose memory
+# or lead to the interpreter's internals
+FORBIDDEN_ATTRIBUTES = frozenset({"ctypes", "dump", "dumps", "mro", "tofile"})
+FORBIDDEN_PREFIXES = ("_", "ag_", "co_", "cr_", "f_", "gi_", "tb_")
+
+
+def _numpy_facade() -> types.SimpleNamespace:
+    """Return the whitelisted part of NumPy passed to user code as ``np``."""
+    facade = types.SimpleNamespace(
+        **{name: getattr(np, name) for name in NUMPY_NAMES}
+    )
+    facade.random = types.SimpleNamespace(
+        **{name: getattr(np.random, name) for name in NUMPY_RANDOM_NAMES}
+    )
+    return facade
+
+
+def check_effect_code(code: str) -> None:
+    """Check that user code may be handed to a worker.
+
+    The code must parse and define a render function. Dunder names and
+    private or introspection attributes are rejected, since they lead
+    from any object to modules such as ``os``. Raises ValueError
+    otherwise. The code is not executed.
+
+    This is a best-effort restriction: the worker process isolates
+    faults and stalls, not hostile code, so only administrators may
+    create effects.
+    """
+    try:
+        tree = ast.parse(code, "<effect>")
+    except SyntaxError as err:
+        raise ValueError(f"Invalid effect code: {err}") from err
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and node.id.startswith("__"):
+            raise ValueError(f"Effect code may not use {node.id}")
+        if isinstance(node, ast.Attribute) and (
+            node.attr.startswith(FORBIDDEN_PREFIXES) or
+            node.attr in FORBIDDEN_ATTRIBUTES
+        ):
+            raise ValueError(f"Effect code may not use .{node.attr}")
+    if not any(
+        isinstance(node, ast.FunctionDef) and node.name == RENDER_FUNCTION
+        for node in tree.body
+    ):
+        raise ValueError(
+            f"Effect code must define {RENDER_FUNCTION}(features, t, "
+            "params, frame)"
+        )
+
+
+def _worker_main(
+    code: str,
+    shm_name: str,
+    num_lights: int,
+    conn: Any
+) -> None:
+    """Run user effect code in a worker process.
+
+    Each request carries the frame's features, time and parameters; the
+    worker renders into the shared frame buffer and replies with the
+    request's sequence number.
+    """
+    try:
+        os.nice(WORKER_NICENESS)
+    except (AttributeError, OSError):
+        pass
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    frame = np.ndarray(
+        (num_lights, FRAME_CHANNELS),
+        dtype=np.float32,
+        buffer=shm.buf
+    )
+    try:
+        namespace: Dict[str, Any] = {
+            "__builtins__": SAFE_BUILTINS,
+            "np": _numpy_facade(),
+            "math": math,
+        }
+        exec(compile(code, "<effect>", "exec"), namespace)
+        render = namespace[RENDER_FUNCTION]
+        conn.send(("ready", None))
+
+        while True:
+            request = conn.recv()
+            if request is None:
+                break
+            sequence, t, features, params = request
+            frame[:] = 0
+            result = render(features, t, params, frame)
+            if result is not None:
+                frame[:] = result
+            conn.send(("frame", sequence))
+    except (EOFError, KeyboardInterrupt):
+        pass
+    except BaseException as err:  # user code may raise anything
+        try:
+            conn.send(("error", f"{type(err).__name__}: {err}"))
+        except (OSError, ValueError):
+            pass
+    finally:
+        del frame
+        shm.close()
+
+
+class _Worker:
+    """A running worker process and its channels."""
+
+    def __init__(self, code: str, num_lights: int) -> None:
+        """Start a worker process for the given code."""
+        size = max(num_lights, 1) * FRAME_CHANNELS * 4
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        self.frame = np.ndarray(
+            (num_lights, FRAME_CHANNELS),
+            dtype=np.float32,
+            buffer=self.shm.buf
+        )
+        context = multiprocessing.get_context("spawn")
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(code, self.shm.name, num_lights, child_conn),
+            name="aurora_effect_worker",
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.started = time.monotonic()
+        self.ready = False
+        self.sequence = 0
+        self.pending: Optional[int] = None
+        self.sent_at = 0.0
+
+    def close(self) -> None:
+        """Kill the process and release its resources."""
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(0.1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(1.0)
+        self.conn.close()
+        del self.frame
+        self.shm.close()
+        self.shm.unlink()
+
+
+class SandboxedEffect(BaseEffect):
+    """Effect running user code in a separate worker process.
+
+    The code defines ``render(features, t, params, frame)``, filling the
+    float32 (n_lights, 4) ``frame`` in place or returning a new one;
+    ``features`` is a dict of scalar features plus the band levels as
+    ``frequencies``. Only a subset of ``np``, ``math`` and a few
+    builtins are available, see ``check_effect_code()``.
+
+    ``render()`` never waits for the worker: it collects the frame
+    requested on an earlier tick (if ready) and sends the next request,
+    so frames arrive one tick late and a busy worker keeps showing its
+    last frame. A worker that stays over its budget for several frames,
+    raises or dies is killed and restarted off the event loop; after
+    repeated restarts the effect is disabled.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        lights: List[str],
+        params: Optional[Dict[str, Any]] = None,
+        code: str = "",
+        budget: float = DEFAULT_SANDBOX_BUDGET,
+        max_overruns: int = MAX_CONSECUTIVE_OVERRUNS,
+        max_restarts: int = MAX_RESTARTS,
+    ) -> None:
+        """Initialize the effect.
+
+        Args:
+            hass: Home Assistant instance
+            lights: List of light entity IDs
+            params: Optional parameters passed to the code
+            code: User effect code
+            budget: Seconds the worker may take per frame
+            max_overruns: Late frames in a row before a restart
+            max_restarts: Restarts before the effect is disabled
+        """
+        check_effect_code(code)
+        super().__init__(hass, lights, params)
+        self.code = code
+        self.budget = budget
+        self.max_overruns = max_overruns
+        self.max_restarts = max_restarts
+        self.restarts = 0
+        self.overruns = 0
+        self.disabled = False
+        self._consecutive_overruns = 0
+        self._worker: Optional[_Worker] = None
+        self._frame = self.new_frame()
+
+    def _spawn(self) -> None:
+        """Start a worker; runs in the executor."""
+        worker = _Worker(self.code, len(self.lights))
+        if not self.is_running or self.disabled:
+            worker.close()
+            return
+        self._worker = worker
+
+    def _replace(self, worker: Optional[_Worker], respawn: bool) -> None:
+        """Close a worker and maybe start another; runs in the executor."""
+        if worker is not None:
+            worker.close()
+        if respawn:
+            self._spawn()
+
+    async def start(self) -> None:
+        """Start the effect and its worker."""
+        await super().start()
+        self.disabled = False
+        self.restarts = 0
+        if self._worker is None:
+            await self.hass.async_add_executor_job(self._spawn)
+
+    async def stop(self) -> None:
+        """Stop the effect and its worker."""
+        await super().stop()
+        worker, self._worker = self._worker, None
+        if worker is not None:
+            await self.hass.async_add_executor_job(
+                self._replace, worker, False
+            )
+
+    def _fail(self, reason: str) -> None:
+        """Restart the worker, or disable the effect after many restarts."""
+        worker, self._worker = self._worker, None
+        self._consecutive_overruns = 0
+        if self.restarts >= self.max_restarts:
+            self.disabled = True
+            _LOGGER.error(
+                "Disabling custom effect after %d restarts: %s",
+                self.restarts,
+                reason
+            )
+        else:
+            self.restarts += 1
+            _LOGGER.warning("Restarting custom effect: %s", reason)
+        self.hass.async_add_executor_job(
+            self._replace, worker, not self.disabled
+        )
+
+    def _receive(self, worker: _Worker) -> bool:
+        """Handle the worker's replies; returns False if it failed."""
+        while worker.conn.poll():
+            kind, value = worker.conn.recv()
+            if kind == "ready":
+                worker.ready = True
+            elif kind == "frame" and value == worker.pending:
+                self._frame = np.array(worker.frame)
+                worker.pending = None
+                self._consecutive_overruns = 0
+            elif kind == "error":
+                self._fail(value)
+                return False
+        return True
+
+    def render(self, features: AudioFeatures, t: float) -> np.ndarray:
+        """Collect the worker's latest frame and request the next one."""
+        worker = self._worker
+        if worker is None or self.disabled:
+            return self._frame
+
+        now = time.monotonic()
+        try:
+            if not self._receive(worker):
+                return self._frame
+        except (EOFError, OSError):
+            self._fail("worker exited")
+            return self._frame
+
+        if not worker.ready:
+            if now - worker.started > STARTUP_TIMEOUT:
+                self._fail("worker did not start")
+            return self._frame
+
+        if worker.pending is not None:
+            if now - worker.sent_at > self.budget:
+                self.overruns += 1
+                self._consecutive_overruns += 1
+                if self._consecutive_overruns >= self.max_overruns:
+                    self._fail(
+                        f"over its {self.budget * 1000:.0f} ms budget for "
+                        f"{self._consecutive_overruns} frames"
+                    )
+            return self._frame
+
+        variables = feature_variables(features, t)
+        variables["frequencies"] = np.asarray(features.frequencies)
+        worker.sequence += 1
+        try:
+            worker.conn.send((worker.sequence, t, variables, self.params))
+        except (OSError, ValueError):
+            self._fail("worker exited")
+            return self._frame
+        worker.pending = worker.sequence
+        worker.sent_at = now
+        return self._frame
@@ -0,0 +1,619 @@
+"""Show recording and replay for Aurora Sound to Light."""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import struct
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set
+
+import numpy as np
+
+from homeassistant.components.media_player import (
+    ATTR_MEDIA_POSITION,
+    ATTR_MEDIA_POSITION_UPDATED_AT,
+)
+from homeassistant.const import STATE_PAUSED, STATE_PLAYING
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.util import dt as dt_util
+
+from .frame_output import (
+    DEFAULT_DEADBAND,
+    FRAME_CHANNELS,
+    FrameOutput,
+    new_frame,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+SHOW_MAGIC = b"AURSHOW"
+SHOW_VERSION = 1
+SHOW_EXTENSION = ".show"
+SHOWS_DIRECTORY = "aurora_shows"  # below the Home Assistant config dir
+KEYFRAME_INTERVAL = 5.0  # seconds of show time between full frames
+DEFAULT_SHOW_RATE = 30.0  # frames per second
+COMPILED_PREFIX = "track_"  # names of shows compiled for a track
+
+RECORD_DELTA = 0
+RECORD_KEY = 1
+
+# File header: magic, version, length of the JSON metadata that follows
+_HEADER = struct.Struct("<7sBI")
+# Record header: time in ms, record kind, number of light entries
+_RECORD = struct.Struct("<IBH")
+# Light entry: index into the show's lights and its quantized values
+_ENTRY = np.dtype([("index", "<u2"), ("value", "u1", (FRAME_CHANNELS,))])
+
+PositionSource = Callable[[], Optional[float]]
+
+
+def compiled_show_name(content_id: str) -> str:
+    """Return the name under which a track's compiled show is kept."""
+    digest = hashlib.sha1(content_id.encode()).hexdigest()[:16]
+    return f"{COMPILED_PREFIX}{digest}"
+
+
+def media_position(hass: HomeAssistant, entity_id: str) -> Optional[float]:
+    """Return the live track position of a media player in seconds.
+
+    Returns None unless the player is playing or paused.
+    """
+    state = hass.states.get(entity_id)
+    if state is None or state.state not in (STATE_PLAYING, STATE_PAUSED):
+        return None
+    position = state.attributes.get(ATTR_MEDIA_POSITION)
+    if position is None:
+        return None
+    updated = state.attributes.get(ATTR_MEDIA_POSITION_UPDATED_AT)
+    if state.state == STATE_PLAYING and updated is not None:
+        position += (dt_util.utcnow() - updated).total_seconds()
+    return float(position)
+
+
+class Show:
+    """A recorded stream of light frames.
+
+    The stream is a sequence of records, each holding the lights that
+    changed since the previous record, with a full keyframe every
+    ``KEYFRAME_INTERVAL`` seconds so playback can seek. Records are
+    indexed once on load; the light values stay in the packed buffer
+    and are read with zero-copy views during playback.
+    """
+
+    def __init__(
+        self,
+        lights: Sequence[str],
+        body: bytes,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Index the records of a show body."""
+        self.lights = list(lights)
+        self.metadata = dict(metadata or {})
+        self.body = body
+
+        times: List[int] = []
+        kinds: List[int] = []
+        offsets: List[int] = []
+        counts: List[int] = []
+        offset = 0
+        while offset < len(body):
+            time_ms, kind, count = _RECORD.unpack_from(body, offset)
+            offset += _RECORD.size
+            times.append(time_ms)
+            kinds.append(kind)
+            offsets.append(offset)
+            counts.append(count)
+            offset += count * _ENTRY.itemsize
+        if offset != len(body):
+            raise ValueError("Truncated show data")
+
+        self.times = np.array(times, dtype=np.float64) / 1000
+        self.offsets = np.array(offsets, dtype=np.intp)
+        self.counts = np.array(counts, dtype=np.intp)
+        self.keyframes = np.flatnonzero(np.array(kinds) == RECORD_KEY)
+
+    def __len__(self) -> int:
+        """Return the number of records."""
+        return len(self.times)
+
+    @property
+    def start(self) -> float:
+        """Return the show time of the first record."""
+        return float(self.times[0]) if len(self.times) else 0.0
+
+    @property
+    def duration(self) -> float:
+        """Return the show time of the last record."""
+        return float(self.times[-1]) if len(self.times) else 0.0
+
+    def entries(self, record: int) -> np.ndarray:
+        """Return the light entries of a record as a read-only view."""
+        return np.frombuffer(
+            self.body,
+            _ENTRY,
+            self.counts[record],
+            self.offsets[record]
+        )
+
+    def to_bytes(self) -> bytes:
+        """Serialize the show."""
+        metadata = json.dumps(
+            {**self.metadata, "lights": self.lights}
+        ).encode()
+        return (
+            _HEADER.pack(SHOW_MAGIC, SHOW_VERSION, len(metadata)) +
+            metadata +
+            zlib.compress(self.body)
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Show":
+        """Deserialize a show."""
+        magic, version, length = _HEADER.unpack_from(data)
+        if magic != SHOW_MAGIC:
+            raise ValueError("Not a show file")
+        if version != SHOW_VERSION:
+            raise ValueError(f"Unsupported show version: {version}")
+        start = _HEADER.size
+        metadata = json.loads(data[start:start + length])
+        lights = metadata.pop("lights")
+        return cls(
+            lights,
+            zlib.decompress(data[start + length:]),
+            metadata
+        )
+
+    def save(self, path: str) -> None:
+        """Write the show to a file, replacing it atomically."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as file:
+            file.write(self.to_bytes())
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "Show":
+        """Read a show from a file."""
+        with open(path, "rb") as file:
+            return cls.from_bytes(file.read())
+
+
+class ShowRecorder:
+    """Record rendered frames as a delta-compressed show.
+
+    Frames are timed by a position source, normally the track position
+    of the media player, so the show replays in sync with the track.
+    Without one, show time starts at zero with the recording. Frames
+    that do not move forward in show time (paused or rewound tracks)
+    are dropped.
+    """
+
+    def __init__(
+        self,
+        position: Optional[PositionSource] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Initialize the recorder."""
+        self._position = position
+        self.metadata = dict(metadata or {})
+        self._index: Dict[str, int] = {}
+        self._frame = np.zeros((0, FRAME_CHANNELS), dtype=np.uint8)
+        self._body = bytearray()
+        self._start: Optional[float] = None
+        self._last_time = -1
+        self._last_key: Optional[int] = None
+        self.frames = 0
+
+    @property
+    def lights(self) -> List[str]:
+        """Return the lights seen so far, in show order."""
+        return list(self._index)
+
+    def _show_time(self, now: float) -> Optional[float]:
+        """Return the show time of a frame rendered at loop time now."""
+        if self._position is not None:
+            return self._position()
+        if self._start is None:
+            self._start = now
+        return now - self._start
+
+    def record(
+        self,
+        now: float,
+        frame: np.ndarray,
+        lights: Sequence[str]
+    ) -> None:
+        """Add a frame covering the given lights."""
+        show_time = self._show_time(now)
+        if show_time is None:
+            return
+        time_ms = int(round(show_time * 1000))
+        if time_ms <= self._last_time:
+            return
+
+        new = [light for light in lights if light not in self._index]
+        if new:
+            for light in new:
+                self._index[light] = len(self._index)
+            self._frame = np.vstack([
+                self._frame,
+                np.zeros((len(new), FRAME_CHANNELS), dtype=np.uint8),
+            ])
+        rows = np.array([self._index[light] for light in lights], np.intp)
+        values = np.clip(frame, 0, 255).astype(np.uint8)
+
+        key = (
+            self._last_key is None or
+            time_ms - self._last_key >= KEYFRAME_INTERVAL * 1000
+        )
+        if key:
+            self._frame[rows] = values
+            changed = np.arange(len(self._frame))
+            self._last_key = time_ms
+        else:
+            moved = np.any(self._frame[rows] != values, axis=1)
+            changed = rows[moved]
+            self._frame[changed] = values[moved]
+
+        entries = np.empty(len(changed), dtype=_ENTRY)
+        entries["index"] = changed
+        entries["value"] = self._frame[changed]
+        self._body += _RECORD.pack(
+            time_ms,
+            RECORD_KEY if key else RECORD_DELTA,
+            len(changed)
+        )
+        self._body += entries.tobytes()
+        self._last_time = time_ms
+        self.frames += 1
+
+    def to_show(self) -> Show:
+        """Return the recording as a show."""
+        return Show(self.lights, bytes(self._body), self.metadata)
+
+
+class ShowCursor:
+    """Current frame of a show during playback.
+
+    Moving forward applies only the records in between; seeking back or
+    far ahead restarts from the nearest keyframe.
+    """
+
+    def __init__(self, show: Show) -> None:
+        """Initialize the cursor before the first record."""
+        self.show = show
+        self.frame = np.zeros(
+            (len(show.lights), FRAME_CHANNELS),
+            dtype=np.uint8
+        )
+        self.record = -1
+
+    def seek(self, position: float) -> np.ndarray:
+        """Return the uint8 frame showing at a show position."""
+        show = self.show
+        target = int(np.searchsorted(show.times, position, "right")) - 1
+        if target < 0:
+            self.frame[:] = 0
+            self.record = -1
+            return self.frame
+
+        keys = show.keyframes
+        key_index = int(np.searchsorted(keys, target, "right")) - 1
+        key = int(keys[key_index]) if key_index >= 0 else 0
+        if self.record > target or self.record < key:
+            self.frame[:] = 0
+            self.record = key - 1
+
+        for record in range(self.record + 1, target + 1):
+            entries = show.entries(record)
+            self.frame[entries["index"]] = entries["value"]
+        self.record = target
+        return self.frame
+
+
+class ShowPlayer:
+    """Replay a show on the lights, in sync with a position source.
+
+    Playback only reads the stored frames and dispatches them, so no
+    audio analysis or effect runs while a show plays.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        show: Show,
+        position: Optional[PositionSource] = None,
+        deadband: Optional[float] = DEFAULT_DEADBAND,
+    ) -> None:
+        """Initialize the player.
+
+        Args:
+            hass: Home Assistant instance
+            show: Show to replay
+            position: Source of the show position in seconds, None while
+                paused; defaults to time since playback started
+            deadband: Perceptual change below which lights are not
+                re-commanded
+        """
+        self.hass = hass
+        self.show = show
+        self.frame_rate = float(
+            show.metadata.get("frame_rate", DEFAULT_SHOW_RATE)
+        )
+        self._position = position
+        self._cursor = ShowCursor(show)
+        self._output = FrameOutput(hass, show.lights, deadband=deadband)
+        self._frame = new_frame(len(show.lights))
+        self._task: Optional[asyncio.Task] = None
+        self._started: Optional[float] = None
+
+    @property
+    def is_playing(self) -> bool:
+        """Return whether the show is playing."""
+        return self._task is not None and not self._task.done()
+
+    def position(self) -> Optional[float]:
+        """Return the current show position."""
+        if self._position is not None:
+            return self._position()
+        return self.hass.loop.time() - self._started + self.show.start
+
+    def frame_at(self, position: float) -> np.ndarray:
+        """Return the float frame showing at a show position."""
+        self._frame[:] = self._cursor.seek(position)
+        return self._frame
+
+    async def start(self) -> None:
+        """Start playback."""
+        if not self.is_playing:
+            self._started = self.hass.loop.time()
+            self._output.reset()
+            self._task = self.hass.async_create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop playback."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        """Dispatch the show's frames until cancelled."""
+        loop = self.hass.loop
+        interval = 1.0 / self.frame_rate
+        next_tick = loop.time()
+        while True:
+            try:
+                position = self.position()
+                if position is not None:
+                    await self._output.async_send(self.frame_at(position))
+            except Exception as err:
+                _LOGGER.error("Error playing show: %s", err)
+
+            next_tick += interval
+            now = loop.time()
+            if now > next_tick:
+                next_tick = now
+            await asyncio.sleep(next_tick - now)
+
+
+class ShowManager:
+    """Record the render scheduler's output and replay saved shows.
+
+    Shows are saved as files in the ``SHOWS_DIRECTORY`` folder of the
+    Home Assistant configuration. While a show plays, the render
+    scheduler is stopped so the lights only follow the show.
+
+    Shows compiled ahead of time for a track are named after the track's
+    content ID; a followed media player plays them automatically
+    whenever that track is on.
+    """
+
+    def __init__(self, hass: HomeAssistant, scheduler: Any) -> None:
+        """Initialize the show manager."""
+        self.hass = hass
+        self.scheduler = scheduler
+        self.directory = hass.config.path(SHOWS_DIRECTORY)
+        self._recording: Optional[str] = None
+        self._compiled: Set[str] = set()
+        self.player: Optional[ShowPlayer] = None
+        self.playing: Optional[str] = None
+        # Serializes starting and stopping the player
+        self._playback_lock = asyncio.Lock()
+
+    def _list_compiled(self) -> Set[str]:
+        """Return the names of the compiled shows on disk."""
+        if not os.path.isdir(self.directory):
+            return set()
+        return {
+            name[:-len(SHOW_EXTENSION)]
+            for name in os.listdir(self.directory)
+            if name.startswith(COMPILED_PREFIX) and
+            name.endswith(SHOW_EXTENSION)
+        }
+
+    async def async_load(self) -> None:
+        """Find the shows compiled earlier."""
+        try:
+            self._compiled = await self.hass.async_add_executor_job(
+                self._list_compiled
+            )
+        except OSError as err:
+            _LOGGER.error("Failed to list compiled shows: %s", err)
+
+    def path(self, name: str) -> str:
+        """Return the file path of a show."""
+        if not name or os.path.basename(name) != name or name[0] == ".":
+            raise ValueError(f"Invalid show name: {name}")
+        return os.path.join(self.directory, f"{name}{SHOW_EXTENSION}")
+
+    def _position_source(
+        self,
+        media_player: Optional[str]
+    ) -> Optional[PositionSource]:
+        """Return the track position source of a media player."""
+        if media_player is None:
+            return None
+        return lambda: media_position(self.hass, media_player)
+
+    def start_recording(
+        self,
+        name: str,
+        media_player: Optional[str] = None
+    ) -> None:
+        """Start recording the rendered frames as a named show."""
+        self.path(name)
+        metadata: Dict[str, Any] = {"frame_rate": self.scheduler.frame_rate}
+        if media_player is not None:
+            state = self.hass.states.get(media_player)
+            if state is not None:
+                metadata["media_title"] = state.attributes.get("media_title")
+                metadata["media_content_id"] = state.attributes.get(
+                    "media_content_id"
+                )
+        self.scheduler.recorder = ShowRecorder(
+            self._position_source(media_player),
+            metadata
+        )
+        self._recording = name
+
+    async def async_stop_recording(self) -> Optional[str]:
+        """Stop recording and save the show, returning its path."""
+        recorder = self.scheduler.recorder
+        self.scheduler.recorder = None
+        name, self._recording = self._recording, None
+        if recorder is None or name is None:
+            return None
+        path = self.path(name)
+        await self.hass.async_add_executor_job(
+            recorder.to_show().save,
+            path
+        )
+        _LOGGER.info(
+            "Saved show %s with %d frames",
+            name,
+            recorder.frames
+        )
+        return path
+
+    async def async_play(
+        self,
+        name: str,
+        media_player: Optional[str] = None
+    ) -> None:
+        """Replay a saved show, in sync with a media player if given."""
+        # Claim the show before awaiting anything; a later play or stop
+        # request supersedes this one
+        self.playing = name
+        async with self._playback_lock:
+            if self.playing != name:
+                return
+            try:
+                show = await self.hass.async_add_executor_job(
+                    Show.load,
+                    self.path(name)
+                )
+            except Exception:
+                if self.playing == name:
+                    self.playing = None
+                raise
+            if self.playing != name:
+                return
+            await self._async_stop_player()
+            await self.scheduler.stop()
+            self.player = ShowPlayer(
+                self.hass,
+                show,
+                self._position_source(media_player)
+            )
+            await self.player.start()
+
+    async def async_stop_playback(self) -> None:
+        """Stop the playing show and resume the render scheduler."""
+        self.playing = None
+        async with self._playback_lock:
+            await self._async_stop_player()
+
+    async def _async_stop_player(self) -> None:
+        """Stop the player, if any, and resume the render scheduler."""
+        if self.player is None:
+            return
+        await self.player.stop()
+        self.player = None
+        await self.scheduler.start()
+
+    async def async_compile(
+        self,
+        effect_engine: Any,
+        config: Dict[str, Any],
+        content_id: str,
+        url: Optional[str] = None,
+    ) -> Optional[str]:
+        """Compile the current effects for a track and save the show.
+
+        Returns the show name, or None if compiling failed.
+        """
+        # The compiler imports this module
+        from .show_compiler import async_compile_track
+
+        name = compiled_show_name(content_id)
+        try:
+            show = await async_compile_track(
+                self.hass,
+                effect_engine,
+                self.scheduler,
+                config,
+                url or content_id,
+                {"media_content_id": content_id},
+            )
+            await self.hass.async_add_executor_job(show.save, self.path(name))
+        except Exception as err:
+            _LOGGER.error("Failed to compile show for %s: %s", content_id, err)
+            return None
+        self._compiled.add(name)
+        _LOGGER.info("Compiled show for %s", content_id)
+        return name
+
+    @callback
+    def follow(self, media_player: str) -> Callable[[], None]:
+        """Play compiled shows whenever their track plays on a player.
+
+        Returns a function that stops following the player.
+        """
+        @callback
+        def _state_changed(event: Event) -> None:
+            new_state = event.data.get("new_state")
+            name = None
+            if new_state is not None and new_state.state in (
+                STATE_PLAYING,
+                STATE_PAUSED,
+            ):
+                content_id = new_state.attributes.get("media_content_id")
+                if content_id:
+                    name = compiled_show_name(content_id)
+
+            # Claim the change now so a burst of state events only
+            # starts or stops the show once
+            if name in self._compiled:
+                if name != self.playing:
+                    self.playing = name
+                    self.hass.async_create_task(
+                        self.async_play(name, media_player)
+                    )
+            elif self.playing is not None and self.playing.startswith(
+                COMPILED_PREFIX
+            ):
+                self.playing = None
+                self.hass.async_create_task(self.async_stop_playback())
+
+        return async_track_state_change_event(
+            self.hass,
+            [media_player],
+            _state_changed
+        )
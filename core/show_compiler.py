@@ -0,0 +1,176 @@
+"""Offline show compilation for Aurora Sound to Light."""
+import dataclasses
+import logging
+import math
+import subprocess
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+import numpy as np
+
+from homeassistant.core import HomeAssistant
+
+from ..const import CONF_PUBLISH_EVENTS
+from .audio_processor import AudioProcessor
+from .feature_bus import FeatureBus
+from .render_loop import RenderScheduler
+from .show import Show, ShowRecorder
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ShowCompiler:
+    """Render the complete light show of a track ahead of time.
+
+    The track is decoded as fast as FFmpeg can deliver it and analyzed
+    chunk by chunk with the live analysis code. Each chunk's features
+    are placed at the chunk's own position in the track, so the lights
+    land exactly on the music instead of trailing it by the live
+    pipeline's latency. The effects are rendered on their usual frame
+    clock into a show, with no time budget, since nothing waits for the
+    frames.
+    """
+
+    def __init__(
+        self,
+        processor: AudioProcessor,
+        scheduler: RenderScheduler,
+        feature_bus: FeatureBus,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Initialize the compiler.
+
+        Args:
+            processor: Audio processor with fresh analysis state
+            scheduler: Scheduler with the effects to render
+            feature_bus: Feature bus the scheduler reads from
+            metadata: Metadata stored with the show
+        """
+        self.processor = processor
+        self.scheduler = scheduler
+        self.feature_bus = feature_bus
+        self.metadata = {
+            **(metadata or {}),
+            "frame_rate": scheduler.frame_rate,
+        }
+
+    def decode(self, url: str) -> Iterator[np.ndarray]:
+        """Yield the PCM chunks of a track in analysis order.
+
+        Raises ValueError once the chunks are exhausted if FFmpeg failed
+        or delivered no audio, so a broken or cut-off decode is never
+        mistaken for a complete track.
+        """
+        profile = self.processor.profile
+        channels = self.processor.channels
+        chunk_samples = profile.chunk_size * channels
+        process = subprocess.Popen(
+            [
+                "ffmpeg",
+                "-i", url,
+                "-f", "f32le",
+                "-acodec", "pcm_f32le",
+                "-ac", str(channels),
+                "-ar", str(profile.sample_rate),
+                "-",
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        chunks = 0
+        try:
+            while True:
+                raw = process.stdout.read(chunk_samples * 4)
+                if not raw:
+                    break
+                chunks += 1
+                chunk = np.frombuffer(raw, dtype=np.float32)
+                if len(chunk) < chunk_samples:
+                    chunk = np.pad(chunk, (0, chunk_samples - len(chunk)))
+                if channels > 1:
+                    chunk = chunk.reshape(profile.chunk_size, channels).T
+                yield chunk
+
+            returncode = process.wait()
+            if returncode:
+                raise ValueError(
+                    f"FFmpeg failed to decode {url} (exit code {returncode})"
+                )
+            if not chunks:
+                raise ValueError(f"No audio decoded from {url}")
+        finally:
+            process.kill()
+            process.wait()
+
+    def compile(self, chunks: Iterable[np.ndarray]) -> Show:
+        """Analyze the chunks of a track and render its show."""
+        profile = self.processor.profile
+        hop = profile.chunk_size / profile.sample_rate
+        interval = 1.0 / self.scheduler.frame_rate
+        recorder = ShowRecorder(metadata=self.metadata)
+
+        frame_number = 0
+        beat_pending = False
+        for index, chunk in enumerate(chunks):
+            start = index * hop
+            features = self.processor.analyze(chunk, start)
+            beat_pending = beat_pending or features.beat
+
+            # Render every frame that falls within this chunk; a beat is
+            # shown once, on the first frame after it
+            while frame_number * interval < start + hop:
+                t = frame_number * interval
+                self.feature_bus.publish(dataclasses.replace(
+                    features,
+                    beat=beat_pending,
+                    timestamp=t
+                ))
+                beat_pending = False
+                frame = self.scheduler.render(t)
+                recorder.record(t, frame, self.scheduler.lights)
+                frame_number += 1
+
+        if not frame_number:
+            raise ValueError("No audio to compile")
+        _LOGGER.debug(
+            "Compiled show of %.1f s with %d frames",
+            frame_number * interval,
+            recorder.frames
+        )
+        return recorder.to_show()
+
+    def compile_url(self, url: str) -> Show:
+        """Decode, analyze and render a track."""
+        return self.compile(self.decode(url))
+
+
+async def async_compile_track(
+    hass: HomeAssistant,
+    effect_engine: Any,
+    live_scheduler: RenderScheduler,
+    config: Dict[str, Any],
+    url: str,
+    metadata: Optional[Dict[str, Any]] = None,
+) -> Show:
+    """Render the current effect lineup for a track in an executor.
+
+    Args:
+        hass: Home Assistant instance
+        effect_engine: Engine whose active effects are rendered
+        live_scheduler: Live scheduler supplying frame rate and layout
+        config: Audio configuration of the integration entry
+        url: Location of the track's audio
+        metadata: Metadata stored with the show
+    """
+    processor = AudioProcessor(hass, {**config, CONF_PUBLISH_EVENTS: False})
+    feature_bus = FeatureBus(hass)
+    scheduler = RenderScheduler(
+        hass,
+        feature_bus,
+        frame_rate=live_scheduler.frame_rate,
+        deadband=None,
+        layout=live_scheduler.layout,
+    )
+    if not await effect_engine.async_populate(scheduler, budget=math.inf):
+        raise ValueError("No active effects to compile")
+    compiler = ShowCompiler(processor, scheduler, feature_bus, metadata)
+    return await hass.async_add_executor_job(compiler.compile_url, url)
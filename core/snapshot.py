@@ -0,0 +1,49 @@
+"""Effect state snapshots for Aurora Sound to Light."""
+import base64
+from typing import Any
+
+import numpy as np
+
+SNAPSHOT_VERSION = 1
+
+_ARRAY_KEY = "__array__"
+
+
+def encode_value(value: Any) -> Any:
+    """Convert effect state to JSON-compatible data.
+
+    Arrays are stored as base64 of their raw bytes with dtype and shape,
+    which is far smaller than lists of numbers and restores bit-exact.
+    Objects with ``snapshot_state()`` are stored as their snapshot.
+    """
+    if isinstance(value, np.ndarray):
+        array = np.ascontiguousarray(value)
+        return {
+            _ARRAY_KEY: array.dtype.str,
+            "shape": list(array.shape),
+            "data": base64.b64encode(array.tobytes()).decode("ascii"),
+        }
+    if isinstance(value, np.generic):
+        return value.item()
+    if hasattr(value, "snapshot_state"):
+        return value.snapshot_state()
+    if isinstance(value, dict):
+        return {str(key): encode_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [encode_value(item) for item in value]
+    return value
+
+
+def decode_value(value: Any) -> Any:
+    """Convert data written by ``encode_value()`` back to effect state."""
+    if isinstance(value, dict):
+        if _ARRAY_KEY in value:
+            data = base64.b64decode(value["data"])
+            return np.frombuffer(
+                data,
+                dtype=np.dtype(value[_ARRAY_KEY])
+            ).reshape(value["shape"]).copy()
+        return {key: decode_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [decode_value(item) for item in value]
+    return value
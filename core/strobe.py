@@ -0,0 +1,162 @@
+"""Precisely timed strobe for Aurora Sound to Light."""
+import asyncio
+import logging
+import math
+from collections import deque
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from homeassistant.core import HomeAssistant
+
+from .frame_output import FrameOutput, new_frame
+
+_LOGGER = logging.getLogger(__name__)
+
+JITTER_WINDOW = 256  # edges kept for the timing statistics
+MAX_LEAD = 0.02  # seconds a wakeup may be moved ahead of its deadline
+LEAD_GAIN = 0.2  # share of each edge's error folded into the lead
+MIN_PERIOD = 0.02  # shortest strobe period in seconds
+
+
+class StrobeTimer:
+    """Switch a group of lights on and off at absolute deadlines.
+
+    Flash edges sit on a grid anchored at an absolute monotonic time:
+    the n-th flash turns on at ``anchor + n * period`` and off a duty
+    cycle later, so waiting and dispatch delays never accumulate into
+    drift. Detected beats move the anchor, after which flashes follow
+    the predicted beat times.
+
+    Each edge is one service call for the whole group, so all lights
+    switch together. The timer measures how late every edge was
+    dispatched and wakes up that much earlier next time, within
+    ``MAX_LEAD``.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        lights: Sequence[str],
+        color: Sequence[int] = (255, 255, 255),
+        brightness: int = 255,
+        frequency: float = 2.0,
+        duty_cycle: float = 0.5,
+    ) -> None:
+        """Initialize the timer.
+
+        Args:
+            hass: Home Assistant instance
+            lights: Light entity IDs switched together
+            color: RGB color of the flashes
+            brightness: Brightness of the flashes (0-255)
+            frequency: Flashes per second until beats are synced
+            duty_cycle: Share of the period the lights are on (0-1)
+        """
+        self.hass = hass
+        self.lights = list(lights)
+        self._output = FrameOutput(hass, self.lights, transition=0)
+        self._on_frame = new_frame(len(self.lights))
+        self._off_frame = new_frame(len(self.lights))
+        self.set_flash(color, brightness)
+        self.period = 1.0 / frequency
+        self.duty_cycle = duty_cycle
+        self.anchor: Optional[float] = None
+        self.lead = 0.0
+        self._last_on: Optional[float] = None
+        self._errors: deque = deque(maxlen=JITTER_WINDOW)
+        self._dispatch: deque = deque(maxlen=JITTER_WINDOW)
+        self._task: Optional[asyncio.Task] = None
+        self.edges = 0
+
+    @property
+    def is_running(self) -> bool:
+        """Return whether the timer is switching the lights."""
+        return self._task is not None and not self._task.done()
+
+    def set_flash(self, color: Sequence[int], brightness: int) -> None:
+        """Set the color and brightness of the flashes."""
+        self._on_frame[:, :3] = color
+        self._on_frame[:, 3] = brightness
+
+    def set_rate(self, frequency: float, duty_cycle: float) -> None:
+        """Flash at a fixed frequency, keeping the current grid anchor."""
+        self.period = max(MIN_PERIOD, 1.0 / frequency)
+        self.duty_cycle = duty_cycle
+
+    def sync_beat(self, beat_time: float, tempo: float) -> None:
+        """Anchor the flashes on a detected beat at the given tempo."""
+        if tempo > 0:
+            self.period = max(MIN_PERIOD, 60.0 / tempo)
+        self.anchor = beat_time
+
+    def next_on(self, now: float) -> float:
+        """Return the deadline of the next flash after ``now``."""
+        if self.anchor is None:
+            self.anchor = now
+        # Never flash twice within half a period, e.g. after a re-anchor
+        earliest = now
+        if self._last_on is not None:
+            earliest = max(earliest, self._last_on + self.period / 2)
+        cycles = math.ceil((earliest - self.anchor) / self.period)
+        return self.anchor + cycles * self.period
+
+    async def start(self) -> None:
+        """Start switching the lights."""
+        if not self.is_running:
+            self._task = self.hass.async_create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop switching and leave the lights off."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self._output.async_send(self._off_frame)
+
+    async def _run(self) -> None:
+        """Flash on every deadline until cancelled."""
+        loop = self.hass.loop
+        while True:
+            on_time = self.next_on(loop.time())
+            await self._switch(self._on_frame, on_time)
+            self._last_on = on_time
+            await self._switch(
+                self._off_frame,
+                on_time + self.duty_cycle * self.period
+            )
+
+    async def _switch(self, frame: np.ndarray, deadline: float) -> None:
+        """Send a frame to the group at an absolute deadline."""
+        loop = self.hass.loop
+        delay = deadline - self.lead - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        sent = loop.time()
+        await self._output.async_send(frame)
+        self._dispatch.append(loop.time() - sent)
+
+        # Positive errors are late edges; steer the lead towards zero error
+        error = sent - deadline
+        self._errors.append(error)
+        self.lead = min(MAX_LEAD, max(0.0, self.lead + LEAD_GAIN * error))
+        self.edges += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return edge timing statistics in seconds."""
+        if not self._errors:
+            return {"edges": self.edges, "lead": self.lead}
+        errors = np.array(self._errors)
+        return {
+            "edges": self.edges,
+            "lead": self.lead,
+            "mean_error": float(errors.mean()),
+            "max_error": float(np.abs(errors).max()),
+            "jitter": float(errors.std()),
+            "dispatch_time": float(np.mean(self._dispatch)),
+        }
@@ -0,0 +1,213 @@
+"""Musical structure analysis for Aurora Sound to Light."""
+import logging
+from typing import List
+
+import numpy as np
+
+_LOGGER = logging.getLogger(__name__)
+
+# Structure events
+EVENT_SECTION_CHANGE = "section_change"
+EVENT_BUILD_UP = "build_up"
+EVENT_DROP = "drop"
+
+# Analysis constants
+DOWNSAMPLE = 5  # analysis frames per history step (~0.23 s at 44.1 kHz/2048)
+HISTORY_LENGTH = 128  # history steps kept (~30 s)
+NOVELTY_KERNEL = 16  # checkerboard kernel size in steps, must be even
+NOVELTY_THRESHOLD = 1.5  # standard deviations above the mean novelty
+MIN_NOVELTY = 0.02  # absolute novelty floor for a section change
+SECTION_REFRACTORY = 16  # minimum steps between section changes
+POOLED_BANDS = 8
+CHROMA_MIN_FREQ = 55.0  # Hz
+CHROMA_MAX_FREQ = 5000.0  # Hz
+BUILD_WINDOW = 24  # steps used for the build-up trend
+BUILD_SLOPE = 0.4  # LU per second of sustained loudness rise
+BUILD_TIMEOUT = 64  # steps a build-up waits for its drop
+DROP_BASS_RATIO = 1.5  # bass share increase that marks a drop
+
+
+class StructureAnalyzer:
+    """Detect section changes, build-ups and drops.
+
+    Every ``DOWNSAMPLE`` analysis frames a compact feature vector (pooled
+    log band energies plus a chroma profile) is written into a circular
+    float32 history matrix. A Foote checkerboard kernel applied to the
+    self-similarity matrix of the most recent steps yields a novelty
+    curve whose adaptive-threshold peaks mark section changes. Loudness
+    and bass-share trends over the same history detect build-ups and the
+    drops that resolve them.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        chunk_size: int,
+        num_bands: int,
+    ) -> None:
+        """Initialize the analyzer for a given analysis resolution."""
+        self.step_duration = DOWNSAMPLE * chunk_size / sample_rate
+
+        # Chroma folding matrix over the rFFT bins
+        freqs = np.fft.rfftfreq(chunk_size, 1 / sample_rate)
+        valid = (freqs >= CHROMA_MIN_FREQ) & (freqs <= CHROMA_MAX_FREQ)
+        pitch_class = np.zeros(len(freqs), dtype=int)
+        pitch_class[valid] = np.round(
+            12 * np.log2(freqs[valid] / 440.0) + 69
+        ).astype(int) % 12
+        self._chroma_matrix = np.zeros((12, len(freqs)), dtype=np.float32)
+        self._chroma_matrix[pitch_class[valid], np.flatnonzero(valid)] = 1.0
+
+        # Band pooling: average groups of adjacent bands
+        self._pool_edges = np.linspace(
+            0, num_bands, POOLED_BANDS + 1
+        ).astype(int)[:-1]
+        self._pool_sizes = np.diff(
+            np.append(self._pool_edges, num_bands)
+        ).astype(np.float32)
+
+        # Gaussian-tapered checkerboard kernel
+        half = NOVELTY_KERNEL // 2
+        sign = np.concatenate([-np.ones(half), np.ones(half)])
+        offsets = np.arange(NOVELTY_KERNEL) - (NOVELTY_KERNEL - 1) / 2
+        taper = np.exp(-0.5 * (offsets / (0.5 * half)) ** 2)
+        kernel = np.outer(sign, sign) * np.outer(taper, taper)
+        self._kernel = (kernel / np.sum(np.abs(kernel))).astype(np.float32)
+
+        # Least squares slope weights for the build-up trend (per second)
+        x = np.arange(BUILD_WINDOW) * self.step_duration
+        x -= x.mean()
+        self._slope_weights = (x / np.dot(x, x)).astype(np.float32)
+
+        dim = POOLED_BANDS + 12
+        self._history = np.zeros((HISTORY_LENGTH, dim), dtype=np.float32)
+        self._loudness = np.zeros(HISTORY_LENGTH, dtype=np.float32)
+        self._bass = np.zeros(HISTORY_LENGTH, dtype=np.float32)
+        self._novelty = np.zeros(HISTORY_LENGTH, dtype=np.float32)
+        self._accum = np.zeros(dim, dtype=np.float32)
+        self._accum_loudness = 0.0
+        self._accum_bass = 0.0
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the feature history."""
+        self._history.fill(0.0)
+        self._loudness.fill(0.0)
+        self._bass.fill(0.0)
+        self._novelty.fill(0.0)
+        self._accum.fill(0.0)
+        self._accum_loudness = 0.0
+        self._accum_bass = 0.0
+        self._frames = 0
+        self._steps = 0
+        self._last_section = -SECTION_REFRACTORY
+        self._build_started = -1
+        self.novelty = 0.0
+
+    def _recent(self, buffer: np.ndarray, count: int) -> np.ndarray:
+        """Return the last ``count`` steps of a circular buffer in order."""
+        index = (self._steps - count + np.arange(count)) % HISTORY_LENGTH
+        return buffer[index]
+
+    def process(
+        self,
+        bands: np.ndarray,
+        spectrum: np.ndarray,
+        loudness: float,
+    ) -> List[str]:
+        """Add one analysis frame and return the structure events it raised.
+
+        Args:
+            bands: Un-normalized frequency band magnitudes
+            spectrum: Mono rFFT magnitude spectrum
+            loudness: Momentary loudness in LUFS
+        """
+        pooled = np.add.reduceat(bands, self._pool_edges) / self._pool_sizes
+        peak = float(np.max(pooled))
+        if peak > 0:
+            pooled = pooled / peak
+        chroma = self._chroma_matrix @ np.square(spectrum)
+        chroma_sum = float(np.sum(chroma))
+        if chroma_sum > 0:
+            chroma = chroma / chroma_sum
+
+        self._accum[:POOLED_BANDS] += np.log1p(10 * pooled)
+        self._accum[POOLED_BANDS:] += chroma
+        self._accum_loudness += loudness
+        total = float(np.sum(bands))
+        self._accum_bass += float(np.sum(bands[:4])) / total if total > 0 else 0.0
+        self._frames += 1
+
+        if self._frames < DOWNSAMPLE:
+            return []
+
+        slot = self._steps % HISTORY_LENGTH
+        self._history[slot] = self._accum / DOWNSAMPLE
+        self._loudness[slot] = self._accum_loudness / DOWNSAMPLE
+        self._bass[slot] = self._accum_bass / DOWNSAMPLE
+        self._accum.fill(0.0)
+        self._accum_loudness = 0.0
+        self._accum_bass = 0.0
+        self._frames = 0
+        self._steps += 1
+
+        return self._analyze()
+
+    def _analyze(self) -> List[str]:
+        """Run the structure detectors on the latest history step."""
+        events: List[str] = []
+        if self._steps < NOVELTY_KERNEL:
+            return events
+
+        # Novelty from the self-similarity of the most recent steps
+        window = self._recent(self._history, NOVELTY_KERNEL)
+        norms = np.linalg.norm(window, axis=1, keepdims=True)
+        window = window / np.maximum(norms, 1e-9)
+        similarity = window @ window.T
+        self.novelty = float(np.sum(self._kernel * similarity))
+        self._novelty[(self._steps - 1) % HISTORY_LENGTH] = self.novelty
+
+        # Section change at adaptive-threshold novelty peaks
+        filled = min(self._steps - NOVELTY_KERNEL + 1, HISTORY_LENGTH)
+        recent = self._recent(self._novelty, filled)
+        if len(recent) >= 3:
+            previous = recent[-2]
+            threshold = max(
+                MIN_NOVELTY,
+                float(np.mean(recent) + NOVELTY_THRESHOLD * np.std(recent))
+            )
+            if (
+                previous > threshold and
+                previous >= recent[-3] and
+                previous > recent[-1] and
+                self._steps - self._last_section >= SECTION_REFRACTORY
+            ):
+                self._last_section = self._steps
+                events.append(EVENT_SECTION_CHANGE)
+
+        if self._steps < BUILD_WINDOW:
+            return events
+
+        # Build-up: sustained loudness rise while the bass share falls
+        loudness = self._recent(self._loudness, BUILD_WINDOW)
+        bass = self._recent(self._bass, BUILD_WINDOW)
+        loudness_slope = float(np.dot(self._slope_weights, loudness))
+        bass_slope = float(np.dot(self._slope_weights, bass))
+
+        if self._build_started >= 0:
+            if self._steps - self._build_started > BUILD_TIMEOUT:
+                self._build_started = -1
+            else:
+                # Drop: bass returns with full loudness after a build-up
+                baseline = float(np.mean(bass[-8:-1]))
+                if (
+                    bass[-1] > baseline * DROP_BASS_RATIO and
+                    loudness[-1] >= float(np.max(loudness)) - 1.0
+                ):
+                    self._build_started = -1
+                    events.append(EVENT_DROP)
+        elif loudness_slope > BUILD_SLOPE and bass_slope <= 0:
+            self._build_started = self._steps
+            events.append(EVENT_BUILD_UP)
+
+        return events
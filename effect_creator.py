@@ -2,6 +2,8 @@
 from typing import Any, Dict, List, Optional
 import logging
 import colorsys
+import numpy as np
+import voluptuous as vol
 from homeassistant.core import HomeAssistant
 from homeassistant.util import slugify
 from homeassistant.helpers import storage
@@ -17,7 +19,15 @@ from .const import (
     DEFAULT_BRIGHTNESS,
     DEFAULT_TRANSITION_TIME,
 )
+from .core.expression import (
+    EffectProgram,
+    compile_program,
+    feature_variables,
+)
+from .core.feature_bus import AudioFeatures
 from .effects.base_effect import BaseEffect
+from .effects.registry import EFFECT_MANIFEST, get_registry
+from .effects_impl import RGB_COLOR
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -54,6 +64,111 @@ PARAM_TYPES = {
 }
 
 
+COLOR_CHANNELS = ["red", "green", "blue"]
+
+
+def parameter_names(parameters: Dict[str, Dict[str, Any]]) -> List[str]:
+    """Return the expression variables defined by effect parameters.
+
+    Numbers, booleans (0 or 1) and selects (index of the option) define
+    one variable each; colors define ``<name>_red``, ``<name>_green`` and
+    ``<name>_blue`` in 0-1.
+    """
+    names = []
+    for name, config in parameters.items():
+        if config.get("type") == "color":
+            names.extend(f"{name}_{channel}" for channel in COLOR_CHANNELS)
+        else:
+            names.append(name)
+    return names
+
+
+def parameter_schema(parameters: Dict[str, Dict[str, Any]]) -> vol.Schema:
+    """Return the schema validating values of effect parameters."""
+    validators = {
+        "number": lambda config: vol.All(
+            vol.Coerce(float),
+            vol.Range(min=config.get("min"), max=config.get("max"))
+        ),
+        "color": lambda config: RGB_COLOR,
+        "boolean": lambda config: vol.Boolean(),
+        "select": lambda config: vol.In(config.get("options", [])),
+    }
+    return vol.Schema({
+        vol.Optional(name): validators[config["type"]](config)
+        for name, config in parameters.items()
+        if config.get("type") in validators
+    }, extra=vol.ALLOW_EXTRA)
+
+
+def _matches_type(value: Any, value_type: Any) -> bool:
+    """Return whether a value matches a ``PARAM_TYPES`` field type.
+
+    ``[type]`` is a list of that type and a tuple of types a sequence
+    with one item per type; floats also accept integers.
+    """
+    if isinstance(value_type, list):
+        return isinstance(value, list) and all(
+            _matches_type(item, value_type[0]) for item in value
+        )
+    if isinstance(value_type, tuple):
+        return (
+            isinstance(value, (list, tuple)) and
+            len(value) == len(value_type) and
+            all(map(_matches_type, value, value_type))
+        )
+    if value_type is float:
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    return isinstance(value, value_type)
+
+
+class DeclarativeEffect(BaseEffect):
+    """Effect rendered by a compiled expression program.
+
+    Subclasses created by ``EffectCreator`` set ``program`` and
+    ``parameters``; the program evaluates every output once per frame
+    across all lights.
+    """
+
+    program: EffectProgram
+    parameters: Dict[str, Dict[str, Any]] = {}
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        lights: List[str],
+        params: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Initialize the effect."""
+        super().__init__(hass, lights, params)
+        self._load_params()
+
+    def _load_params(self) -> None:
+        """Turn the parameter values into expression variables."""
+        variables: Dict[str, float] = {}
+        for name, config in self.parameters.items():
+            value = self.params.get(name, config.get("default"))
+            param_type = config.get("type")
+            if param_type == "color":
+                channels = list(value or (0, 0, 0))
+                for channel, level in zip(COLOR_CHANNELS, channels):
+                    variables[f"{name}_{channel}"] = float(level) / 255
+            elif param_type == "select":
+                options = config.get("options", [])
+                variables[name] = float(
+                    options.index(value) if value in options else 0
+                )
+            else:
+                variables[name] = float(value or 0)
+        self._variables = variables
+
+    def render(self, features: AudioFeatures, t: float) -> np.ndarray:
+        """Evaluate the program for all lights."""
+        variables = feature_variables(features, t)
+        variables.update(self._variables)
+        return self.program.evaluate(variables, len(self.lights))
+
+
 class EffectCreator:
     """Create and manage custom effects."""
 
@@ -70,12 +185,18 @@ class EffectCreator:
         self._effects: Dict[str, BaseEffect] = {}
 
     async def async_load(self) -> None:
-        """Load saved effects."""
+        """Load saved effects and register them with the effect engines."""
         try:
             data = await self._store.async_load()
             if data:
                 for effect_data in data.get("effects", []):
                     effect_id = slugify(effect_data["name"])
+                    if effect_id in EFFECT_MANIFEST:
+                        _LOGGER.warning(
+                            "Custom effect %s shadows a built-in effect",
+                            effect_data["name"]
+                        )
+                        continue
                     self._effects[effect_id] = self._create_effect(
                         effect_data["name"],
                         effect_data["config"]
@@ -83,6 +204,17 @@ class EffectCreator:
         except Exception as err:
             _LOGGER.error("Failed to load effects: %s", err)
 
+        registry = get_registry()
+        for effect_id, effect in self._effects.items():
+            registry[effect_id] = type(effect)
+
+    def get_effects(self) -> Dict[str, str]:
+        """Return the names of the loaded effects by effect id."""
+        return {
+            effect_id: effect.name
+            for effect_id, effect in self._effects.items()
+        }
+
     async def async_save(self) -> None:
         """Save effects to storage."""
         data = {
@@ -128,11 +260,13 @@ class EffectCreator:
         """Validate parameter configuration."""
         schema = PARAM_TYPES[param_type]
         for key, value_type in schema.items():
+            if key == "type":  # the type itself was checked by the caller
+                continue
             if key not in config:
                 if key == "unit":  # unit is optional
                     continue
                 raise ValueError(f"Missing required field '{key}'")
-            if not isinstance(config[key], value_type):
+            if not _matches_type(config[key], value_type):
                 raise ValueError(
                     f"Invalid type for '{key}', expected {value_type}"
                 )
@@ -142,15 +276,26 @@ class EffectCreator:
         effect_name: str,
         effect_config: Dict[str, Any]
     ) -> type:
-        """Create a new effect class from configuration."""
+        """Create a new effect class from configuration.
+
+        The config's ``expressions`` are compiled once into a program
+        shared by all instances.
+        """
         try:
+            parameters = effect_config.get("parameters", {})
+            program = compile_program(
+                effect_config.get("expressions", {}),
+                parameter_names(parameters)
+            )
             effect_class = type(
                 effect_name,
-                (BaseEffect,),
+                (DeclarativeEffect,),
                 {
                     "name": effect_name,
                     "config": effect_config,
-                    "async_update": self._create_update_method(effect_config),
+                    "parameters": parameters,
+                    "program": program,
+                    "PARAMS_SCHEMA": parameter_schema(parameters),
                 }
             )
             return effect_class
@@ -158,12 +303,3 @@ class EffectCreator:
         except Exception as err:
             _LOGGER.error("Failed to create effect class: %s", err)
             raise
-
-    def _create_update_method(
-        self,
-        config: Dict[str, Any]
-    ) -> Any:
-        """Create the update method for the effect."""
-        def update_method(self, audio_data, beat_detected, bpm):
-            pass
-        return update_method
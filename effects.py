@@ -1,5 +1,5 @@
 """Effect engine and base classes for Aurora Sound to Light."""
-from typing import List, Optional, Dict, Type
+from typing import List, MutableMapping, Optional, Type
 from homeassistant.core import HomeAssistant
 
 class BaseEffect:
@@ -41,14 +41,13 @@ class EffectEngine:
     def __init__(self, hass: HomeAssistant) -> None:
         """Initialize the effect engine."""
         self.hass = hass
-        self._effects: Dict[str, Type[BaseEffect]] = {}
+        self._effects: MutableMapping[str, Type[BaseEffect]] = {}
         self._register_builtin_effects()
 
     def _register_builtin_effects(self) -> None:
-        """Register built-in effects."""
-        from .effects_impl import BassPulseEffect, ColorWaveEffect
-        self._effects["bass_pulse"] = BassPulseEffect
-        self._effects["color_wave"] = ColorWaveEffect
+        """Use the shared registry; effects are imported when first created."""
+        from .effects.registry import get_registry
+        self._effects = get_registry()
 
     def get_available_effects(self) -> List[str]:
         """Get list of available effects."""
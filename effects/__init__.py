@@ -1,11 +1,12 @@
 """Effects package for Aurora Sound to Light."""
+import importlib
 import logging
-from typing import Dict, Type
+from typing import Any
+
 from homeassistant.core import HomeAssistant
 
 from .base_effect import BaseEffect
-from .bass_pulse import BassPulseEffect
-from .color_wave import ColorWaveEffect
+from .registry import get_registry
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -13,8 +14,38 @@ __all__ = [
     "BaseEffect",
     "BassPulseEffect",
     "ColorWaveEffect",
+    "CometsEffect",
+    "FieldWaveEffect",
+    "FrequencySweepEffect",
+    "RadialPulseEffect",
+    "RainbowFlowEffect",
+    "SparksEffect",
+    "StrobeSyncEffect",
+    "SweepEffect",
 ]
 
+# Effect classes are exported lazily so importing the package stays cheap
+_LAZY_EXPORTS = {
+    "BassPulseEffect": ".bass_pulse",
+    "ColorWaveEffect": ".color_wave",
+    "CometsEffect": ".particle_effects",
+    "FieldWaveEffect": ".field_effects",
+    "FrequencySweepEffect": ".frequency_sweep",
+    "RadialPulseEffect": ".field_effects",
+    "RainbowFlowEffect": ".rainbow_flow",
+    "SparksEffect": ".particle_effects",
+    "StrobeSyncEffect": ".strobe_sync",
+    "SweepEffect": ".field_effects",
+}
+
+
+def __getattr__(name: str) -> Any:
+    """Import effect classes on first access."""
+    if name not in _LAZY_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(_LAZY_EXPORTS[name], __name__)
+    return getattr(module, name)
+
 
 class EffectEngine:
     """Engine for managing and running effects."""
@@ -22,10 +53,7 @@ class EffectEngine:
     def __init__(self, hass: HomeAssistant) -> None:
         """Initialize the effect engine."""
         self.hass = hass
-        self._effects: Dict[str, Type[BaseEffect]] = {
-            "bass_pulse": BassPulseEffect,
-            "color_wave": ColorWaveEffect,
-        }
+        self._effects = get_registry()
 
     async def create_effect(
         self,
@@ -37,7 +65,7 @@ class EffectEngine:
         if effect_name not in self._effects:
             raise ValueError(f"Unknown effect: {effect_name}")
 
-        effect_class = self._effects[effect_name]
+        effect_class = await self._effects.async_get(self.hass, effect_name)
         return effect_class(self.hass, lights, params or {})
 
     def get_available_effects(self) -> list[str]:
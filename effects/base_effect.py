@@ -1,14 +1,42 @@
 """Base effect class for Aurora Sound to Light."""
 import logging
-from typing import Any, Dict, List, Optional
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import voluptuous as vol
 
 from homeassistant.core import HomeAssistant
 
+from ..core.feature_bus import AudioFeatures
+from ..core.frame_output import FrameOutput, new_frame
+from ..core.layout import LightLayout, linear_positions
+from ..core.snapshot import decode_value, encode_value
+
 _LOGGER = logging.getLogger(__name__)
 
 
 class BaseEffect:
-    """Base class for light effects."""
+    """Base class for light effects.
+
+    Effects implement ``render(features, t)``, returning a float32 frame
+    of shape (n_lights, 4) with red, green, blue and brightness in 0-255
+    for all lights at once. Displaying the frame is left to a separate
+    output stage. Legacy effects may override ``update()`` instead.
+
+    Parameters are validated against ``PARAMS_SCHEMA`` and read into
+    attributes by ``_load_params()``, which ``apply_params()`` calls again
+    for live updates; state such as phases is left untouched.
+
+    ``positions`` gives the (n_lights, 3) coordinates of the lights from
+    the attached layout, or their place along the x axis without one.
+
+    Runtime state worth keeping across restarts, such as phases, is
+    named in ``STATE_ATTRIBUTES`` and saved by ``snapshot_state()``.
+    """
+
+    PARAMS_SCHEMA: Optional[vol.Schema] = None
+    STATE_ATTRIBUTES: Tuple[str, ...] = ()
 
     def __init__(
         self,
@@ -17,7 +45,7 @@ class BaseEffect:
         params: Optional[Dict[str, Any]] = None
     ) -> None:
         """Initialize the effect.
-        
+
         Args:
             hass: Home Assistant instance
             lights: List of light entity IDs
@@ -27,6 +55,50 @@ class BaseEffect:
         self.lights = lights
         self.params = params or {}
         self._running = False
+        self._output: Optional[FrameOutput] = None
+        self.layout: Optional[LightLayout] = None
+
+    def _load_params(self) -> None:
+        """Read the current parameters into attributes."""
+
+    def validate_params(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate parameters, raising ValueError if they are invalid."""
+        if self.PARAMS_SCHEMA is None:
+            return dict(params)
+        try:
+            return self.PARAMS_SCHEMA(dict(params))
+        except vol.Invalid as err:
+            raise ValueError(f"Invalid effect parameters: {err}") from err
+
+    def apply_params(self, params: Dict[str, Any]) -> None:
+        """Replace the parameters of a running effect, keeping its state.
+
+        The parameters must already be validated.
+        """
+        self.params = params
+        self._load_params()
+
+    def snapshot_state(self) -> Dict[str, Any]:
+        """Return the runtime state as JSON-compatible data."""
+        return {
+            name: encode_value(getattr(self, name))
+            for name in self.STATE_ATTRIBUTES
+        }
+
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        """Restore runtime state saved by ``snapshot_state()``.
+
+        Unknown entries are ignored, so snapshots survive effects gaining
+        or dropping state.
+        """
+        for name in self.STATE_ATTRIBUTES:
+            if name not in state:
+                continue
+            current = getattr(self, name, None)
+            if hasattr(current, "restore_state"):
+                current.restore_state(state[name])
+            else:
+                setattr(self, name, decode_value(state[name]))
 
     async def start(self) -> None:
         """Start the effect."""
@@ -36,6 +108,55 @@ class BaseEffect:
         """Stop the effect."""
         self._running = False
 
+    def render(self, features: AudioFeatures, t: float) -> np.ndarray:
+        """Render one frame for all lights.
+
+        Args:
+            features: Audio features of the current analysis frame
+            t: Monotonic time of the frame in seconds
+
+        Returns a float32 array of shape (n_lights, 4).
+        """
+        raise NotImplementedError(
+            "Effect classes must implement render or update method"
+        )
+
+    @property
+    def positions(self) -> np.ndarray:
+        """Return the float32 (n_lights, 3) positions of the lights."""
+        if self.layout is None:
+            return linear_positions(len(self.lights))
+        return self.layout.positions(self.lights)
+
+    def render_pixels(
+        self,
+        features: AudioFeatures,
+        t: float,
+        positions: np.ndarray
+    ) -> Optional[np.ndarray]:
+        """Render addressable pixels at the given positions.
+
+        Args:
+            features: Audio features of the current analysis frame
+            t: Monotonic time of the frame in seconds
+            positions: Float32 (n_pixels, 3) room positions
+
+        Returns a float32 (n_pixels, 4) frame, or None for effects that
+        only drive whole lights.
+        """
+        return None
+
+    def new_frame(self) -> np.ndarray:
+        """Return an all-off frame sized for this effect's lights."""
+        return new_frame(len(self.lights))
+
+    @property
+    def output(self) -> FrameOutput:
+        """Return the output stage used by update()."""
+        if self._output is None or self._output.lights != self.lights:
+            self._output = FrameOutput(self.hass, self.lights)
+        return self._output
+
     async def update(
         self,
         audio_data: Optional[List[float]] = None,
@@ -43,15 +164,23 @@ class BaseEffect:
         bpm: int = 0
     ) -> None:
         """Update the effect with new audio data.
-        
+
+        Renders a frame from the given audio data and displays it.
+
         Args:
             audio_data: FFT data from audio processing
             beat_detected: Whether a beat was detected
             bpm: Current beats per minute
         """
-        raise NotImplementedError(
-            "Effect classes must implement update method"
-        )
+        if type(self).render is BaseEffect.render:
+            raise NotImplementedError(
+                "Effect classes must implement render or update method"
+            )
+        if not self.is_running:
+            return
+
+        features = AudioFeatures.from_levels(audio_data, beat_detected, bpm)
+        await self.output.async_send(self.render(features, time.monotonic()))
 
     @property
     def is_running(self) -> bool:
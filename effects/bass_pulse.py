@@ -1,14 +1,16 @@
 """Bass pulse effect for Aurora Sound to Light."""
 from typing import Any, Dict, List, Optional
 
+import numpy as np
+
 from homeassistant.core import HomeAssistant
-from homeassistant.components.light import (
-    ATTR_BRIGHTNESS,
-    ATTR_RGB_COLOR,
-)
 
 from .base_effect import BaseEffect
 from ..const import DEFAULT_BRIGHTNESS
+from ..core.feature_bus import AudioFeatures
+
+BASS_BANDS = 4
+MIN_BRIGHTNESS = 10
 
 
 class BassPulseEffect(BaseEffect):
@@ -23,35 +25,14 @@ class BassPulseEffect(BaseEffect):
         """Initialize the bass pulse effect."""
         super().__init__(hass, lights, params)
         self._brightness = DEFAULT_BRIGHTNESS
-        self._color = (255, 0, 0)  # Default to red
+        self._color = np.array([255, 0, 0], dtype=np.float32)  # Red
 
-    async def update(
-        self,
-        audio_data: Optional[List[float]] = None,
-        beat_detected: bool = False,
-        bpm: int = 0
-    ) -> None:
-        """Update the effect with new audio data."""
-        if not self.is_running or not audio_data:
-            return
-
-        # Get the bass frequencies (first few bins of FFT data)
-        bass_energy = sum(audio_data[:4]) / len(audio_data[:4])
-        
-        # Scale the brightness based on bass energy
-        brightness = int(bass_energy * 255)
-        # Clamp between 10 and 255
-        brightness = max(10, min(255, brightness))
-
-        # Update each light
-        for light in self.lights:
-            await self.hass.services.async_call(
-                "light",
-                "turn_on",
-                {
-                    "entity_id": light,
-                    ATTR_BRIGHTNESS: brightness,
-                    ATTR_RGB_COLOR: self._color,
-                },
-                blocking=True,
-            )
+    def render(self, features: AudioFeatures, t: float) -> np.ndarray:
+        """Scale the brightness of all lights with the bass energy."""
+        frame = self.new_frame()
+        bass = features.frequencies[:BASS_BANDS]
+        bass_energy = float(np.mean(bass)) if len(bass) else 0.0
+
+        frame[:, :3] = self._color
+        frame[:, 3] = np.clip(bass_energy * 255, MIN_BRIGHTNESS, 255)
+        return frame
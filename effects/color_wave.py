@@ -1,19 +1,36 @@
 """Color wave effect for Aurora Sound to Light."""
 import math
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import voluptuous as vol
 
 from homeassistant.core import HomeAssistant
-from homeassistant.components.light import (
-    ATTR_BRIGHTNESS,
-    ATTR_RGB_COLOR,
-)
 
 from .base_effect import BaseEffect
+from ..core.color_lut import (
+    DEFAULT_HUE_TABLE_SIZE,
+    MIN_TABLE_SIZE,
+    get_color_lut,
+)
+from ..core.feature_bus import AudioFeatures
+
+DEFAULT_SPEED = 1.0  # Radians per second
 
 
 class ColorWaveEffect(BaseEffect):
     """Effect that creates a wave of colors across lights."""
 
+    PARAMS_SCHEMA = vol.Schema({
+        vol.Optional("speed"): vol.Coerce(float),
+        vol.Optional("lut_size"): vol.All(
+            vol.Coerce(int),
+            vol.Range(min=MIN_TABLE_SIZE)
+        ),
+    }, extra=vol.ALLOW_EXTRA)
+
+    STATE_ATTRIBUTES = ("_phase",)
+
     def __init__(
         self,
         hass: HomeAssistant,
@@ -23,73 +40,30 @@ class ColorWaveEffect(BaseEffect):
         """Initialize the color wave effect."""
         super().__init__(hass, lights, params)
         self._phase = 0.0
-        self._speed = 0.1  # Radians per update
         self._brightness = 255
+        self._last_render: Optional[float] = None
+        self._load_params()
 
-    async def update(
-        self,
-        audio_data: Optional[List[float]] = None,
-        beat_detected: bool = False,
-        bpm: int = 0
-    ) -> None:
-        """Update the effect with new audio data."""
-        if not self.is_running:
-            return
-
-        # Update phase
-        self._phase += self._speed
-        if self._phase >= 2 * math.pi:
-            self._phase -= 2 * math.pi
-
-        # Calculate colors for each light
-        for i, light in enumerate(self.lights):
-            # Calculate color based on position and phase
-            phase_offset = (i / len(self.lights)) * 2 * math.pi
-            hue = (self._phase + phase_offset) % (2 * math.pi)
-
-            # Convert HSV to RGB
-            rgb = self._hsv_to_rgb(hue / (2 * math.pi), 1.0, 1.0)
-
-            # Update light
-            await self.hass.services.async_call(
-                "light",
-                "turn_on",
-                {
-                    "entity_id": light,
-                    ATTR_BRIGHTNESS: self._brightness,
-                    ATTR_RGB_COLOR: rgb,
-                },
-                blocking=True,
-            )
-
-    def _hsv_to_rgb(
-        self,
-        h: float,
-        s: float,
-        v: float
-    ) -> Tuple[int, int, int]:
-        """Convert HSV color values to RGB."""
-        if s == 0.0:
-            return (int(v * 255),) * 3
+    def _load_params(self) -> None:
+        """Read the current parameters into attributes."""
+        self._speed = self.params.get("speed", DEFAULT_SPEED)
+        self._lut = get_color_lut(
+            self.params.get("lut_size", DEFAULT_HUE_TABLE_SIZE)
+        )
 
-        i = int(h * 6.0)
-        f = (h * 6.0) - i
-        p = v * (1.0 - s)
-        q = v * (1.0 - s * f)
-        t = v * (1.0 - s * (1.0 - f))
-        i = i % 6
+    def render(self, features: AudioFeatures, t: float) -> np.ndarray:
+        """Spread the color wheel across the lights and rotate it."""
+        if self._last_render is not None:
+            self._phase += self._speed * (t - self._last_render)
+            self._phase %= 2 * math.pi
+        self._last_render = t
 
-        if i == 0:
-            rgb = (v, t, p)
-        elif i == 1:
-            rgb = (q, v, p)
-        elif i == 2:
-            rgb = (p, v, t)
-        elif i == 3:
-            rgb = (p, q, v)
-        elif i == 4:
-            rgb = (t, p, v)
-        else:
-            rgb = (v, p, q)
+        frame = self.new_frame()
+        if not len(frame):
+            return frame
 
-        return tuple(int(x * 255) for x in rgb)
+        offsets = self.positions[:, 0]
+        hue = self._phase / (2 * math.pi) + offsets
+        frame[:, :3] = self._lut.hue(hue)
+        frame[:, 3] = self._brightness
+        return frame
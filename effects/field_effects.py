@@ -0,0 +1,206 @@
+"""Spatial field effects for Aurora Sound to Light."""
+import math
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant
+
+from .base_effect import BaseEffect
+from ..core import fields
+from ..core.color_lut import PALETTES, get_palette
+from ..core.feature_bus import AudioFeatures
+from ..core.frame_output import new_frame
+
+POSITION = vol.All(
+    list,
+    vol.Length(min=2, max=3),
+    [vol.Coerce(float)]
+)
+POSITIVE = vol.All(vol.Coerce(float), vol.Range(min=0, min_included=False))
+COLOR = vol.All(
+    vol.ExactSequence([vol.Coerce(int)] * 3),
+    [vol.Range(min=0, max=255)]
+)
+
+MAX_RINGS = 8
+
+
+class FieldEffect(BaseEffect):
+    """Base for effects defined as a field over room positions.
+
+    Subclasses advance their state once per frame in ``_advance()`` and
+    color any set of positions in ``_shade()``, so the same field drives
+    both whole lights and pixel strips.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        lights: List[str],
+        params: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Initialize the field effect."""
+        super().__init__(hass, lights, params)
+        self._last_render: Optional[float] = None
+        self._load_params()
+
+    def _advance(self, features: AudioFeatures, elapsed: float) -> None:
+        """Advance the field by the elapsed time."""
+
+    def _shade(self, positions: np.ndarray, frame: np.ndarray) -> None:
+        """Color the frame rows at the given positions."""
+        raise NotImplementedError
+
+    def _step(self, features: AudioFeatures, t: float) -> None:
+        """Advance to time t, once per frame."""
+        if t == self._last_render:
+            return
+        elapsed = 0.0 if self._last_render is None else t - self._last_render
+        self._last_render = t
+        self._advance(features, elapsed)
+
+    def render(self, features: AudioFeatures, t: float) -> np.ndarray:
+        """Sample the field at the light positions."""
+        self._step(features, t)
+        frame = self.new_frame()
+        self._shade(self.positions, frame)
+        return frame
+
+    def render_pixels(
+        self,
+        features: AudioFeatures,
+        t: float,
+        positions: np.ndarray
+    ) -> Optional[np.ndarray]:
+        """Sample the field at pixel positions."""
+        self._step(features, t)
+        frame = new_frame(len(positions))
+        self._shade(positions, frame)
+        return frame
+
+
+class FieldWaveEffect(FieldEffect):
+    """Palette wave travelling through the room along a direction."""
+
+    PARAMS_SCHEMA = vol.Schema({
+        vol.Optional("direction"): POSITION,
+        vol.Optional("wavelength"): POSITIVE,
+        vol.Optional("speed"): vol.Coerce(float),
+        vol.Optional("palette"): vol.In(list(PALETTES)),
+    }, extra=vol.ALLOW_EXTRA)
+
+    STATE_ATTRIBUTES = ("_phase",)
+
+    _phase = 0.0
+
+    def _load_params(self) -> None:
+        """Read the current parameters into attributes."""
+        self._direction = self.params.get("direction", [1.0, 0.0, 0.0])
+        self._wavelength = self.params.get("wavelength", 1.0)
+        self._speed = self.params.get("speed", 0.5)  # waves per second
+        self._palette = get_palette(self.params.get("palette", "rainbow"))
+
+    def _advance(self, features: AudioFeatures, elapsed: float) -> None:
+        """Move the wave along its direction."""
+        self._phase = (self._phase + self._speed * elapsed) % 1.0
+
+    def _shade(self, positions: np.ndarray, frame: np.ndarray) -> None:
+        """Color every position by its distance along the wave."""
+        offset = fields.project(positions, self._direction)
+        frame[:, :3] = self._palette.sample(
+            offset / self._wavelength - self._phase
+        )
+        frame[:, 3] = 255
+
+
+class RadialPulseEffect(FieldEffect):
+    """Rings expanding from a point in the room on every beat."""
+
+    PARAMS_SCHEMA = vol.Schema({
+        vol.Optional("center"): POSITION,
+        vol.Optional("speed"): POSITIVE,
+        vol.Optional("width"): POSITIVE,
+        vol.Optional("reach"): POSITIVE,
+        vol.Optional("color"): COLOR,
+    }, extra=vol.ALLOW_EXTRA)
+
+    STATE_ATTRIBUTES = ("_ages",)
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        lights: List[str],
+        params: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Initialize the radial pulse effect."""
+        self._ages = np.zeros(0, dtype=np.float32)
+        super().__init__(hass, lights, params)
+
+    def _load_params(self) -> None:
+        """Read the current parameters into attributes."""
+        self._center = self.params.get("center", [0.5, 0.5, 0.0])
+        self._speed = self.params.get("speed", 1.0)  # units per second
+        self._width = self.params.get("width", 0.15)
+        self._reach = self.params.get("reach", 10.0)  # units
+        self._color = self.params.get("color", [255, 255, 255])
+
+    def _advance(self, features: AudioFeatures, elapsed: float) -> None:
+        """Grow the rings, drop those out of reach and add one per beat."""
+        ages = self._ages + elapsed
+        ages = ages[ages * self._speed < self._reach + 3 * self._width]
+        if features.beat:
+            ages = np.append(ages, np.float32(0.0))[-MAX_RINGS:]
+        self._ages = ages
+
+    def _shade(self, positions: np.ndarray, frame: np.ndarray) -> None:
+        """Light every position by its distance to the nearest ring."""
+        frame[:, :3] = self._color
+        frame[:, 3] = 255 * fields.rings(
+            positions, self._center, self._ages * self._speed, self._width
+        )
+
+
+class SweepEffect(FieldEffect):
+    """Beam rotating around a point in the room, like a lighthouse."""
+
+    PARAMS_SCHEMA = vol.Schema({
+        vol.Optional("center"): POSITION,
+        vol.Optional("speed"): vol.Coerce(float),
+        vol.Optional("width"): vol.All(
+            vol.Coerce(float),
+            vol.Range(min=1, max=360)
+        ),
+        vol.Optional("color"): COLOR,
+        vol.Optional("beat_sync"): bool,
+    }, extra=vol.ALLOW_EXTRA)
+
+    STATE_ATTRIBUTES = ("_angle",)
+
+    _angle = 0.0
+
+    def _load_params(self) -> None:
+        """Read the current parameters into attributes."""
+        self._center = self.params.get("center", [0.5, 0.5, 0.0])
+        self._speed = self.params.get("speed", 0.5)  # turns per second
+        self._width = math.radians(self.params.get("width", 45.0))
+        self._color = self.params.get("color", [255, 255, 255])
+        self._beat_sync = self.params.get("beat_sync", False)
+
+    def _advance(self, features: AudioFeatures, elapsed: float) -> None:
+        """Turn the beam."""
+        speed = self._speed
+        if self._beat_sync and features.tempo > 0:
+            # One turn per bar of four beats
+            speed = features.tempo / 60 / 4
+        self._angle = (self._angle + 2 * math.pi * speed * elapsed) % (
+            2 * math.pi
+        )
+
+    def _shade(self, positions: np.ndarray, frame: np.ndarray) -> None:
+        """Light every position by its angle to the beam."""
+        frame[:, :3] = self._color
+        frame[:, 3] = 255 * fields.sweep(
+            positions, self._center, self._angle, self._width
+        )
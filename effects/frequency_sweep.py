@@ -0,0 +1,94 @@
+"""Frequency sweep effect for Aurora Sound to Light."""
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant
+
+from .base_effect import BaseEffect
+from ..core.beat_clock import BeatClock
+from ..core.color_lut import PALETTES, get_palette
+from ..core.feature_bus import AudioFeatures
+
+
+class FrequencySweepEffect(BaseEffect):
+    """Spread the spectrum across the lights, with a sweep every bar.
+
+    Each light shows the level of the frequency band at its place along
+    the lights, colored from low to high frequencies. A highlight
+    crosses the lights once every ``beats_per_sweep`` beats, locked to
+    the beat phase.
+    """
+
+    PARAMS_SCHEMA = vol.Schema({
+        vol.Optional("palette"): vol.In(list(PALETTES)),
+        vol.Optional("beats_per_sweep"): vol.All(
+            vol.Coerce(int),
+            vol.Range(min=1)
+        ),
+        vol.Optional("sweep_width"): vol.All(
+            vol.Coerce(float),
+            vol.Range(min=0, max=1, min_included=False)
+        ),
+        vol.Optional("min_brightness"): vol.All(
+            vol.Coerce(float),
+            vol.Range(min=0, max=1)
+        ),
+    }, extra=vol.ALLOW_EXTRA)
+
+    STATE_ATTRIBUTES = ("_clock",)
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        lights: List[str],
+        params: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Initialize the frequency sweep effect."""
+        super().__init__(hass, lights, params)
+        self._clock = BeatClock()
+        self._load_params()
+
+    def _load_params(self) -> None:
+        """Read the current parameters into attributes."""
+        self._palette = get_palette(self.params.get("palette", "rainbow"))
+        self._beats_per_sweep = self.params.get("beats_per_sweep", 4)
+        self._sweep_width = self.params.get("sweep_width", 0.25)
+        self._min_brightness = self.params.get("min_brightness", 0.1)
+
+    def render(self, features: AudioFeatures, t: float) -> np.ndarray:
+        """Show each light's band level and the current sweep."""
+        self._clock.update(features, t)
+        frame = self.new_frame()
+        if not len(frame):
+            return frame
+
+        # Place of each light from the first (0) to the last (1)
+        spread = self.positions[:, 0] - self.positions[:, 0].min()
+        spread /= max(float(spread.max()), 1e-6)
+        bands = np.asarray(features.frequencies, dtype=np.float32)
+        if len(bands):
+            levels = np.interp(
+                spread * (len(bands) - 1),
+                np.arange(len(bands)),
+                bands
+            )
+        else:
+            levels = np.zeros(len(frame), dtype=np.float32)
+
+        # The sweep wraps around, so the lights sit evenly on a ring
+        ring = spread * ((len(frame) - 1) / len(frame))
+        sweep = (self._clock.position / self._beats_per_sweep) % 1.0
+        gap = np.abs(ring - sweep)
+        gap = np.minimum(gap, 1 - gap)
+        highlight = np.clip(1 - gap / self._sweep_width, 0.0, 1.0)
+
+        frame[:, :3] = self._palette.sample(spread * 0.8)
+        frame[:, 3] = 255 * np.clip(
+            self._min_brightness + (1 - self._min_brightness) *
+            np.maximum(levels, highlight),
+            0.0,
+            1.0
+        )
+        return frame
@@ -0,0 +1,150 @@
+"""Particle effects for Aurora Sound to Light."""
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant
+
+from .field_effects import COLOR, POSITION, POSITIVE, FieldEffect
+from ..core.expression import feature_variables
+from ..core.feature_bus import AudioFeatures
+from ..core.particles import ParticleSystem
+
+SNARE_THRESHOLD = 0.15  # rise of the high band level that counts as a hit
+
+
+class ParticleEffect(FieldEffect):
+    """Base for effects that emit particles and splat them onto lights."""
+
+    PARAMS_SCHEMA = vol.Schema({
+        vol.Optional("origin"): POSITION,
+        vol.Optional("radius"): POSITIVE,
+        vol.Optional("lifetime"): POSITIVE,
+        vol.Optional("count"): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Optional("color"): COLOR,
+    }, extra=vol.ALLOW_EXTRA)
+
+    DEFAULT_COLOR = [255, 255, 255]
+    DEFAULT_COUNT = 32
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        lights: List[str],
+        params: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Initialize the particle effect."""
+        self.particles = ParticleSystem(drag=1.5)
+        self._rng = np.random.default_rng()
+        super().__init__(hass, lights, params)
+
+    def _load_params(self) -> None:
+        """Read the current parameters into attributes."""
+        origin = np.zeros(3, dtype=np.float32)
+        given = self.params.get("origin", [0.5, 0.5])
+        origin[:len(given)] = given
+        self._origin = origin
+        self._radius = self.params.get("radius", 0.3)
+        self._lifetime = self.params.get("lifetime", 1.0)
+        self._count = self.params.get("count", self.DEFAULT_COUNT)
+        self._color = np.asarray(
+            self.params.get("color", self.DEFAULT_COLOR),
+            dtype=np.float32
+        )
+
+    def _shade(self, positions: np.ndarray, frame: np.ndarray) -> None:
+        """Splat the live particles at the given positions."""
+        self.particles.rasterize(positions, self._radius, frame)
+
+
+class SparksEffect(ParticleEffect):
+    """Burst of sparks flying out from a point on every kick."""
+
+    DEFAULT_COLOR = [255, 140, 20]
+
+    def _advance(self, features: AudioFeatures, elapsed: float) -> None:
+        """Move the sparks and emit a burst on a beat."""
+        self.particles.step(elapsed)
+        if not features.beat:
+            return
+        # Louder kicks throw more and faster sparks
+        bass = feature_variables(features, 0.0)["bass"]
+        count = max(1, int(self._count * (0.5 + bass)))
+        directions = self._rng.normal(size=(count, 3)).astype(np.float32)
+        directions /= np.linalg.norm(directions, axis=1, keepdims=True)
+        speeds = self._rng.uniform(0.5, 1.5, size=(count, 1)) * (1 + bass)
+        self.particles.spawn(
+            self._origin,
+            directions * speeds,
+            self._color,
+            self._rng.uniform(0.5, 1.0, size=count) * self._lifetime
+        )
+
+
+class CometsEffect(ParticleEffect):
+    """Comets crossing the room on every snare, leaving fading tails."""
+
+    PARAMS_SCHEMA = ParticleEffect.PARAMS_SCHEMA.extend({
+        vol.Optional("direction"): POSITION,
+        vol.Optional("speed"): POSITIVE,
+    })
+
+    DEFAULT_COLOR = [120, 180, 255]
+    DEFAULT_COUNT = 1
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        lights: List[str],
+        params: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Initialize the comets effect."""
+        self.heads = ParticleSystem(capacity=64)
+        self._last_high = 0.0
+        super().__init__(hass, lights, params)
+
+    def _load_params(self) -> None:
+        """Read the current parameters into attributes."""
+        super()._load_params()
+        direction = np.zeros(3, dtype=np.float32)
+        given = self.params.get("direction", [1.0, 0.0])
+        direction[:len(given)] = given
+        norm = np.linalg.norm(direction)
+        self._direction = direction / norm if norm else direction
+        self._speed = self.params.get("speed", 2.0)
+        self._radius = self.params.get("radius", 0.2)
+
+    def _advance(self, features: AudioFeatures, elapsed: float) -> None:
+        """Move the comets, drop their tails and launch one per snare."""
+        self.heads.step(elapsed)
+        self.particles.step(elapsed)
+
+        high = feature_variables(features, 0.0)["high"]
+        if high - self._last_high > SNARE_THRESHOLD:
+            # Start behind the origin so the comet crosses it
+            count = self._count
+            start = self._origin - self._direction * self._speed * 0.5
+            jitter = self._rng.normal(scale=0.1, size=(count, 3))
+            jitter[:, 2] = 0
+            self.heads.spawn(
+                start + jitter,
+                self._direction * self._speed,
+                self._color,
+                np.full(count, 2 * self._lifetime)
+            )
+        self._last_high = high
+
+        # Every head drops a short-lived tail particle where it is
+        heads = slice(0, len(self.heads))
+        if len(self.heads):
+            self.particles.spawn(
+                self.heads.position[heads],
+                0.0,
+                self.heads.color[heads],
+                np.full(len(self.heads), 0.3 * self._lifetime)
+            )
+
+    def _shade(self, positions: np.ndarray, frame: np.ndarray) -> None:
+        """Splat the tails, which include a particle at every head."""
+        self.particles.rasterize(positions, self._radius, frame)
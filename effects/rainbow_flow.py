@@ -0,0 +1,68 @@
+"""Rainbow flow effect for Aurora Sound to Light."""
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant
+
+from .base_effect import BaseEffect
+from ..core.beat_clock import BeatClock
+from ..core.color_lut import get_color_lut
+from ..core.feature_bus import AudioFeatures
+
+
+class RainbowFlowEffect(BaseEffect):
+    """Rainbow flowing across the lights in time with the music.
+
+    The hues shift by a fixed amount per beat, following the beat phase,
+    so the flow speeds up and slows down with the tempo. Brightness
+    follows the overall energy.
+    """
+
+    PARAMS_SCHEMA = vol.Schema({
+        vol.Optional("spread"): vol.Coerce(float),
+        vol.Optional("shift_per_beat"): vol.Coerce(float),
+        vol.Optional("min_brightness"): vol.All(
+            vol.Coerce(float),
+            vol.Range(min=0, max=1)
+        ),
+    }, extra=vol.ALLOW_EXTRA)
+
+    STATE_ATTRIBUTES = ("_clock",)
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        lights: List[str],
+        params: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Initialize the rainbow flow effect."""
+        super().__init__(hass, lights, params)
+        self._clock = BeatClock()
+        self._lut = get_color_lut()
+        self._load_params()
+
+    def _load_params(self) -> None:
+        """Read the current parameters into attributes."""
+        self._spread = self.params.get("spread", 1.0)  # rainbows across
+        self._shift_per_beat = self.params.get("shift_per_beat", 0.125)
+        self._min_brightness = self.params.get("min_brightness", 0.3)
+
+    def render(self, features: AudioFeatures, t: float) -> np.ndarray:
+        """Color the lights along a shifting rainbow."""
+        self._clock.update(features, t)
+        frame = self.new_frame()
+        if not len(frame):
+            return frame
+
+        hue = (
+            self.positions[:, 0] * self._spread +
+            self._clock.position * self._shift_per_beat
+        )
+        frame[:, :3] = self._lut.hue(hue)
+        frame[:, 3] = 255 * (
+            self._min_brightness +
+            (1 - self._min_brightness) * min(1.0, float(features.energy))
+        )
+        return frame
@@ -0,0 +1,164 @@
+"""Lazily loaded effect registry for Aurora Sound to Light."""
+import functools
+import importlib
+import logging
+from importlib.metadata import EntryPoint, entry_points
+from typing import Dict, Iterator, MutableMapping, Optional, Type, Union
+
+from homeassistant.core import HomeAssistant
+
+from .base_effect import BaseEffect
+from ..const import (
+    EFFECT_BASS_PULSE,
+    EFFECT_COLOR_WAVE,
+    EFFECT_FREQUENCY_SWEEP,
+    EFFECT_RAINBOW_FLOW,
+    EFFECT_STROBE_SYNC,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Entry point group through which other packages provide effects
+ENTRY_POINT_GROUP = "aurora_sound_to_light.effects"
+
+# Built-in effects as "module:class", modules relative to the integration
+EFFECT_MANIFEST: Dict[str, str] = {
+    EFFECT_BASS_PULSE: ".effects.bass_pulse:BassPulseEffect",
+    EFFECT_COLOR_WAVE: ".effects.color_wave:ColorWaveEffect",
+    EFFECT_FREQUENCY_SWEEP: ".effects.frequency_sweep:FrequencySweepEffect",
+    EFFECT_STROBE_SYNC: ".effects.strobe_sync:StrobeSyncEffect",
+    EFFECT_RAINBOW_FLOW: ".effects.rainbow_flow:RainbowFlowEffect",
+    "strobe": ".effects_impl:StrobeEffect",
+    "precise_strobe": ".effects_impl:PreciseStrobeEffect",
+    "multi_color": ".effects_impl:MultiColorEffect",
+    "field_wave": ".effects.field_effects:FieldWaveEffect",
+    "radial_pulse": ".effects.field_effects:RadialPulseEffect",
+    "sweep": ".effects.field_effects:SweepEffect",
+    "sparks": ".effects.particle_effects:SparksEffect",
+    "comets": ".effects.particle_effects:CometsEffect",
+}
+
+_INTEGRATION_PACKAGE = __name__.rsplit(".", 2)[0]
+
+EffectTarget = Union[str, EntryPoint, Type[BaseEffect]]
+
+
+@functools.lru_cache(maxsize=None)
+def discover_entry_points() -> Dict[str, EntryPoint]:
+    """Return the effects installed packages provide, scanned once."""
+    try:
+        return {
+            entry_point.name: entry_point
+            for entry_point in entry_points(group=ENTRY_POINT_GROUP)
+        }
+    except Exception as err:
+        _LOGGER.error("Failed to discover effect entry points: %s", err)
+        return {}
+
+
+def load_target(target: EffectTarget) -> Type[BaseEffect]:
+    """Import and return the effect class a target refers to."""
+    if isinstance(target, type):
+        effect_class = target
+    elif isinstance(target, EntryPoint):
+        effect_class = target.load()
+    else:
+        module_name, _, attribute = target.partition(":")
+        module = importlib.import_module(module_name, _INTEGRATION_PACKAGE)
+        effect_class = getattr(module, attribute)
+
+    if not (
+        isinstance(effect_class, type) and issubclass(effect_class, BaseEffect)
+    ):
+        raise TypeError(f"{target} is not an effect class")
+    return effect_class
+
+
+class EffectRegistry(MutableMapping[str, Type[BaseEffect]]):
+    """Map effect types to effect classes, importing each on first use.
+
+    Types are known from the manifest and from entry points in the
+    ``aurora_sound_to_light.effects`` group without importing anything;
+    an effect's module is imported when its class is first looked up,
+    i.e. when the effect is first created. Built-in effects take
+    precedence over entry points of the same name. Classes or
+    "module:class" targets can be registered like dictionary items.
+    """
+
+    def __init__(
+        self,
+        manifest: Optional[Dict[str, EffectTarget]] = None,
+        discover: bool = True
+    ) -> None:
+        """Initialize the registry.
+
+        Args:
+            manifest: Effect targets by type, the built-ins by default
+            discover: Whether to add effects from installed entry points
+        """
+        self._targets: Dict[str, EffectTarget] = dict(
+            EFFECT_MANIFEST if manifest is None else manifest
+        )
+        if discover:
+            for name, entry_point in discover_entry_points().items():
+                self._targets.setdefault(name, entry_point)
+        self._classes: Dict[str, Type[BaseEffect]] = {}
+
+    def __getitem__(self, name: str) -> Type[BaseEffect]:
+        """Return an effect class, importing its module if needed."""
+        if name not in self._classes:
+            target = self._targets[name]
+            try:
+                self._classes[name] = load_target(target)
+            except Exception as err:
+                _LOGGER.error("Failed to load effect %s: %s", name, err)
+                raise
+            _LOGGER.debug("Loaded effect %s", name)
+        return self._classes[name]
+
+    def __setitem__(self, name: str, target: EffectTarget) -> None:
+        """Register an effect class or a "module:class" target."""
+        self._targets[name] = target
+        self._classes.pop(name, None)
+
+    def __delitem__(self, name: str) -> None:
+        """Unregister an effect."""
+        del self._targets[name]
+        self._classes.pop(name, None)
+
+    def __contains__(self, name: object) -> bool:
+        """Return whether an effect type is known, without loading it."""
+        return name in self._targets
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the effect types."""
+        return iter(self._targets)
+
+    def __len__(self) -> int:
+        """Return the number of effect types."""
+        return len(self._targets)
+
+    def is_loaded(self, name: str) -> bool:
+        """Return whether an effect's class has been imported."""
+        return name in self._classes or isinstance(self._targets.get(name), type)
+
+    async def async_get(
+        self,
+        hass: HomeAssistant,
+        name: str
+    ) -> Type[BaseEffect]:
+        """Return an effect class, importing its module in the executor."""
+        if not self.is_loaded(name):
+            await hass.async_add_executor_job(self.__getitem__, name)
+        return self[name]
+
+
+_REGISTRY: Optional[EffectRegistry] = None
+
+
+def get_registry() -> EffectRegistry:
+    """Return the registry shared by all effect engines."""
+    global _REGISTRY
+    if _REGISTRY is None:
+        _REGISTRY = EffectRegistry()
+    return _REGISTRY
@@ -0,0 +1,82 @@
+"""Beat-synchronized strobe effect for Aurora Sound to Light."""
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant
+
+from .base_effect import BaseEffect
+from ..core.beat_clock import BeatClock
+from ..core.feature_bus import AudioFeatures
+
+PATTERN_ALL = "all"
+PATTERN_ALTERNATE = "alternate"
+PATTERN_CHASE = "chase"
+
+
+class StrobeSyncEffect(BaseEffect):
+    """Strobe flashing on beats or beat subdivisions.
+
+    Flashes start on the beat grid kept by a beat clock, so they stay in
+    time between detected beats, and fade out over the duty cycle. The
+    pattern picks which lights flash on each subdivision.
+    """
+
+    PARAMS_SCHEMA = vol.Schema({
+        vol.Optional("color"): vol.All(
+            vol.ExactSequence([vol.Coerce(int)] * 3),
+            [vol.Range(min=0, max=255)]
+        ),
+        vol.Optional("subdivision"): vol.In([1, 2, 4]),
+        vol.Optional("duty_cycle"): vol.All(
+            vol.Coerce(float),
+            vol.Range(min=0, max=1, min_included=False)
+        ),
+        vol.Optional("pattern"): vol.In(
+            [PATTERN_ALL, PATTERN_ALTERNATE, PATTERN_CHASE]
+        ),
+    }, extra=vol.ALLOW_EXTRA)
+
+    STATE_ATTRIBUTES = ("_clock",)
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        lights: List[str],
+        params: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Initialize the strobe sync effect."""
+        super().__init__(hass, lights, params)
+        self._clock = BeatClock()
+        self._load_params()
+
+    def _load_params(self) -> None:
+        """Read the current parameters into attributes."""
+        self._color = self.params.get("color", [255, 255, 255])
+        self._subdivision = self.params.get("subdivision", 1)
+        self._duty_cycle = self.params.get("duty_cycle", 0.3)
+        self._pattern = self.params.get("pattern", PATTERN_ALL)
+
+    def render(self, features: AudioFeatures, t: float) -> np.ndarray:
+        """Flash the lights of the current subdivision."""
+        self._clock.update(features, t)
+        frame = self.new_frame()
+        if not len(frame):
+            return frame
+
+        ticks = self._clock.position * self._subdivision
+        step = int(ticks)
+        level = max(0.0, 1.0 - (ticks - step) / self._duty_cycle)
+
+        index = np.arange(len(frame))
+        if self._pattern == PATTERN_ALTERNATE:
+            active = (index % 2) == (step % 2)
+        elif self._pattern == PATTERN_CHASE:
+            active = index == (step % len(frame))
+        else:
+            active = np.ones(len(frame), dtype=bool)
+
+        frame[:, :3] = self._color
+        frame[:, 3] = np.where(active, 255 * level, 0)
+        return frame
@@ -1,15 +1,80 @@
 """Implementation of Aurora Sound to Light effects."""
-from typing import List, Optional
+import random
+import time
+from typing import Any, Dict, List, Optional
 import numpy as np
+import voluptuous as vol
 from homeassistant.core import HomeAssistant
-from homeassistant.components.light import ATTR_BRIGHTNESS, ATTR_RGB_COLOR
 
+from .core.color_lut import DEFAULT_PALETTE_SIZE, MIN_TABLE_SIZE, Palette
+from .core.feature_bus import AudioFeatures
+from .core.frame_output import DEFAULT_DEADBAND, FrameOutput
+from .core.strobe import StrobeTimer
 from .effects import BaseEffect
 
+# Parameter validators shared by the effects below
+RGB_COLOR = vol.All(
+    vol.ExactSequence([vol.Coerce(int)] * 3),
+    [vol.Range(min=0, max=255)]
+)
+COLOR_LIST = vol.All([RGB_COLOR], vol.Length(min=1))
+BRIGHTNESS = vol.All(vol.Coerce(int), vol.Range(min=0, max=255))
+TRANSITION = vol.All(vol.Coerce(float), vol.Range(min=0))
 
-class BassPulseEffect(BaseEffect):
+
+class FrameEffect(BaseEffect):
+    """Base for effects that render frames and display them on update()."""
+
+    _transition_time: Optional[float] = None
+    _deadband: Optional[float] = None
+
+    @property
+    def output(self) -> FrameOutput:
+        """Return the output stage used by update()."""
+        if self._output is None or self._output.lights != self.lights:
+            self._output = FrameOutput(
+                self.hass,
+                self.lights,
+                self._transition_time,
+                self._deadband
+            )
+        return self._output
+
+    def apply_params(self, params: Dict[str, Any]) -> None:
+        """Replace the parameters of a running effect, keeping its state."""
+        super().apply_params(params)
+        if self._output is not None:
+            self._output.transition = self._transition_time
+
+    async def update(
+        self,
+        audio_data: Optional[List[float]] = None,
+        beat_detected: bool = False,
+        bpm: int = 0
+    ) -> None:
+        """Render a frame from the audio data and send it to the lights."""
+        if not self.is_running:
+            return
+
+        features = AudioFeatures.from_levels(audio_data, beat_detected, bpm)
+        frame = self.render(features, time.monotonic())
+        for service, data in self.output.commands(frame):
+            await self.hass.services.call("light", service, data)
+
+
+class BassPulseEffect(FrameEffect):
     """Effect that pulses lights based on bass frequencies."""
 
+    PARAMS_SCHEMA = vol.Schema({
+        vol.Optional("min_brightness"): BRIGHTNESS,
+        vol.Optional("max_brightness"): BRIGHTNESS,
+        vol.Optional("color"): RGB_COLOR,
+        vol.Optional("sensitivity"): vol.All(
+            vol.Coerce(float),
+            vol.Range(min=0)
+        ),
+    }, extra=vol.ALLOW_EXTRA)
+
     def __init__(
         self,
         hass: HomeAssistant,
@@ -18,6 +83,10 @@ class BassPulseEffect(BaseEffect):
     ) -> None:
         """Initialize bass pulse effect."""
         super().__init__(hass, lights, params)
+        self._load_params()
+
+    def _load_params(self) -> None:
+        """Read the current parameters into attributes."""
         self._min_brightness = self.params.get("min_brightness", 50)
         self._max_brightness = self.params.get("max_brightness", 255)
         self._color = self.params.get("color", [255, 0, 0])
@@ -30,33 +99,42 @@ class BassPulseEffect(BaseEffect):
         bpm: int = 0
     ) -> None:
         """Update effect based on audio data."""
-        if not self.is_running or not audio_data:
+        if audio_data is None or not len(audio_data):
             return
+        await super().update(audio_data, beat_detected, bpm)
 
+    def render(self, features: AudioFeatures, t: float) -> np.ndarray:
+        """Scale the brightness of all lights with the bass energy."""
         # Calculate bass energy (first few frequency bins)
-        bass_energy = np.mean(audio_data[:10]) if audio_data else 0
-        brightness = int(
+        bass = features.frequencies[:10]
+        bass_energy = float(np.mean(bass)) if len(bass) else 0.0
+
+        frame = self.new_frame()
+        frame[:, :3] = self._color
+        frame[:, 3] = (
             self._min_brightness +
             (self._max_brightness - self._min_brightness) *
             min(1.0, bass_energy * self._sensitivity)
         )
+        return frame
 
-        # Update each light
-        for light in self.lights:
-            await self.hass.services.call(
-                "light",
-                "turn_on",
-                {
-                    "entity_id": light,
-                    ATTR_BRIGHTNESS: brightness,
-                    ATTR_RGB_COLOR: self._color
-                }
-            )
 
-
-class ColorWaveEffect(BaseEffect):
+class ColorWaveEffect(FrameEffect):
     """Effect that creates a wave of colors across lights."""
 
+    PARAMS_SCHEMA = vol.Schema({
+        vol.Optional("colors"): COLOR_LIST,
+        vol.Optional("speed"): vol.Coerce(float),
+        vol.Optional("transition_time"): TRANSITION,
+        vol.Optional("beat_sync"): bool,
+        vol.Optional("palette_size"): vol.All(
+            vol.Coerce(int),
+            vol.Range(min=MIN_TABLE_SIZE)
+        ),
+    }, extra=vol.ALLOW_EXTRA)
+
+    STATE_ATTRIBUTES = ("_phase",)
+
     def __init__(
         self,
         hass: HomeAssistant,
@@ -65,6 +143,12 @@ class ColorWaveEffect(BaseEffect):
     ) -> None:
         """Initialize color wave effect."""
         super().__init__(hass, lights, params)
+        self._phase = 0.0
+        self._last_render: Optional[float] = None
+        self._load_params()
+
+    def _load_params(self) -> None:
+        """Read the current parameters into attributes."""
         self._colors = self.params.get("colors", [
             [255, 0, 0],
             [0, 255, 0],
@@ -72,53 +156,51 @@ class ColorWaveEffect(BaseEffect):
         ])
         self._speed = self.params.get("speed", 1.0)
         self._transition_time = self.params.get("transition_time", 1.0)
-        self._phase = 0.0
+        self._palette = Palette(
+            self._colors,
+            self.params.get("palette_size", DEFAULT_PALETTE_SIZE)
+        )
         self._beat_sync = self.params.get("beat_sync", False)
 
-    async def update(
-        self,
-        audio_data: Optional[List[float]] = None,
-        beat_detected: bool = False,
-        bpm: int = 0
-    ) -> None:
-        """Update effect based on audio data and beats."""
-        if not self.is_running:
-            return
-
-        # Update phase
-        if self._beat_sync and beat_detected:
+    def render(self, features: AudioFeatures, t: float) -> np.ndarray:
+        """Interpolate the color list across the lights."""
+        # Advance one color per second at speed 1.0, or a full color per beat
+        elapsed = 0.0 if self._last_render is None else t - self._last_render
+        self._last_render = t
+        if self._beat_sync and features.beat:
             self._phase += 1.0
         else:
-            self._phase += 0.1 * self._speed
-
-        # Calculate color for each light
-        for i, light in enumerate(self.lights):
-            phase = (self._phase + i / len(self.lights)) % len(self._colors)
-            color_idx = int(phase)
-            next_idx = (color_idx + 1) % len(self._colors)
-            fraction = phase - color_idx
-
-            # Interpolate between colors
-            color = [
-                int(self._colors[color_idx][j] * (1 - fraction) +
-                    self._colors[next_idx][j] * fraction)
-                for j in range(3)
-            ]
-
-            await self.hass.services.call(
-                "light",
-                "turn_on",
-                {
-                    "entity_id": light,
-                    ATTR_RGB_COLOR: color,
-                    "transition": self._transition_time
-                }
-            ) 
-
-
-class StrobeEffect(BaseEffect):
+            self._phase += elapsed * self._speed
+
+        frame = self.new_frame()
+        if not len(frame):
+            return frame
+
+        # One palette position per color, blending into the next
+        offsets = self.positions[:, 0]
+        positions = (self._phase + offsets) / len(self._colors)
+        frame[:, :3] = self._palette.sample(positions)
+        frame[:, 3] = 255
+        return frame
+
+
+class StrobeEffect(FrameEffect):
     """Effect that creates a strobe light effect, optionally synchronized with beats."""
 
+    PARAMS_SCHEMA = vol.Schema({
+        vol.Optional("color"): RGB_COLOR,
+        vol.Optional("frequency"): vol.All(
+            vol.Coerce(float),
+            vol.Range(min=0, min_included=False)
+        ),
+        vol.Optional("duty_cycle"): vol.All(
+            vol.Coerce(float),
+            vol.Range(min=0, max=1)
+        ),
+        vol.Optional("beat_sync"): bool,
+        vol.Optional("brightness"): BRIGHTNESS,
+    }, extra=vol.ALLOW_EXTRA)
+
     def __init__(
         self,
         hass: HomeAssistant,
@@ -127,13 +209,82 @@ class StrobeEffect(BaseEffect):
     ) -> None:
         """Initialize strobe effect."""
         super().__init__(hass, lights, params)
+        self._state = False
+        self._load_params()
+
+    def _load_params(self) -> None:
+        """Read the current parameters into attributes."""
         self._color = self.params.get("color", [255, 255, 255])
         self._frequency = self.params.get("frequency", 2.0)  # Hz
         self._duty_cycle = self.params.get("duty_cycle", 0.5)  # 0.0 to 1.0
         self._beat_sync = self.params.get("beat_sync", False)
         self._brightness = self.params.get("brightness", 255)
-        self._state = False
-        self._counter = 0.0
+
+    def render(self, features: AudioFeatures, t: float) -> np.ndarray:
+        """Switch all lights on or off based on timing or beats."""
+        # Update state based on beat sync or frequency
+        if self._beat_sync:
+            self._state = features.beat
+        else:
+            period = 1.0 / self._frequency
+            self._state = (t % period) < (period * self._duty_cycle)
+
+        frame = self.new_frame()
+        if self._state:
+            frame[:, :3] = self._color
+            frame[:, 3] = self._brightness
+        return frame
+
+
+class PreciseStrobeEffect(StrobeEffect):
+    """Strobe whose flash edges are timed independently of the render clock.
+
+    The lights are handed to a ``StrobeTimer``, which switches them all in
+    one call per edge at absolute monotonic deadlines. The render
+    scheduler only feeds the effect audio features through ``sync()``;
+    with ``beat_sync`` detected beats re-anchor the flashes, which then
+    land on the predicted beat times.
+    """
+
+    # Lights are driven by the timer, not the combined frame
+    SELF_TIMED = True
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        lights: List[str],
+        params: Optional[dict] = None
+    ) -> None:
+        """Initialize precise strobe effect."""
+        self.timer = StrobeTimer(hass, lights)
+        self._last_beat: Optional[float] = None
+        super().__init__(hass, lights, params)
+
+    def _load_params(self) -> None:
+        """Read the current parameters into attributes and the timer."""
+        super()._load_params()
+        self.timer.set_flash(self._color, self._brightness)
+        self.timer.set_rate(self._frequency, self._duty_cycle)
+
+    def sync(self, features: AudioFeatures, t: float) -> None:
+        """Re-anchor the flashes on a newly detected beat."""
+        if (
+            self._beat_sync and
+            features.beat and
+            features.timestamp != self._last_beat
+        ):
+            self._last_beat = features.timestamp
+            self.timer.sync_beat(features.timestamp, features.tempo)
+
+    async def start(self) -> None:
+        """Start the effect and its timer."""
+        await super().start()
+        await self.timer.start()
+
+    async def stop(self) -> None:
+        """Stop the timer, leaving the lights off."""
+        await self.timer.stop()
+        await super().stop()
 
     async def update(
         self,
@@ -141,46 +292,35 @@ class StrobeEffect(BaseEffect):
         beat_detected: bool = False,
         bpm: int = 0
     ) -> None:
-        """Update effect based on timing or beats."""
-        if not self.is_running:
-            return
+        """Feed the audio data to the timer."""
+        if self.is_running:
+            self.sync(
+                AudioFeatures.from_levels(
+                    audio_data,
+                    beat_detected,
+                    bpm,
+                    timestamp=self.hass.loop.time()
+                ),
+                time.monotonic()
+            )
 
-        # Update state based on beat sync or frequency
-        if self._beat_sync:
-            if beat_detected:
-                self._state = True
-            else:
-                self._state = False
-        else:
-            self._counter += 0.1  # Assuming 100ms update interval
-            period = 1.0 / self._frequency
-            self._state = (self._counter % period) < (period * self._duty_cycle)
-
-        # Update lights
-        for light in self.lights:
-            if self._state:
-                await self.hass.services.call(
-                    "light",
-                    "turn_on",
-                    {
-                        "entity_id": light,
-                        ATTR_BRIGHTNESS: self._brightness,
-                        ATTR_RGB_COLOR: self._color
-                    }
-                )
-            else:
-                await self.hass.services.call(
-                    "light",
-                    "turn_off",
-                    {
-                        "entity_id": light
-                    }
-                )
-
-
-class MultiColorEffect(BaseEffect):
+
+class MultiColorEffect(FrameEffect):
     """Effect that assigns different colors to multiple lights with various patterns."""
 
+    # Colors only change on beats; don't re-send unchanged lights
+    _deadband = DEFAULT_DEADBAND
+
+    PARAMS_SCHEMA = vol.Schema({
+        vol.Optional("colors"): COLOR_LIST,
+        vol.Optional("pattern"): vol.In(["alternate", "random", "sequence"]),
+        vol.Optional("transition_time"): TRANSITION,
+        vol.Optional("change_on_beat"): bool,
+        vol.Optional("brightness"): BRIGHTNESS,
+    }, extra=vol.ALLOW_EXTRA)
+
+    STATE_ATTRIBUTES = ("_current_colors",)
+
     def __init__(
         self,
         hass: HomeAssistant,
@@ -189,6 +329,11 @@ class MultiColorEffect(BaseEffect):
     ) -> None:
         """Initialize multi color effect."""
         super().__init__(hass, lights, params)
+        self._current_colors = {}
+        self._load_params()
+
+    def _load_params(self) -> None:
+        """Read the current parameters into attributes."""
         self._colors = self.params.get("colors", [
             [255, 0, 0],
             [0, 255, 0],
@@ -201,16 +346,22 @@ class MultiColorEffect(BaseEffect):
         self._transition_time = self.params.get("transition_time", 1.0)
         self._change_on_beat = self.params.get("change_on_beat", False)
         self._brightness = self.params.get("brightness", 255)
-        self._current_colors = {}
         self._initialize_colors()
 
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        """Restore the saved colors of lights still driven by the effect."""
+        colors = state.get("_current_colors", {})
+        self._current_colors.update({
+            light: color for light, color in colors.items()
+            if light in self._current_colors
+        })
+
     def _initialize_colors(self) -> None:
         """Initialize colors for each light based on the selected pattern."""
         if self._pattern == "alternate":
             for i, light in enumerate(self.lights):
                 self._current_colors[light] = self._colors[i % len(self._colors)]
         elif self._pattern == "random":
-            import random
             for light in self.lights:
                 self._current_colors[light] = random.choice(self._colors)
         else:  # sequence
@@ -219,30 +370,15 @@ class MultiColorEffect(BaseEffect):
                 self._current_colors[light] = self._colors[color_idx]
                 color_idx = (color_idx + 1) % len(self._colors)
 
-    async def update(
-        self,
-        audio_data: Optional[List[float]] = None,
-        beat_detected: bool = False,
-        bpm: int = 0
-    ) -> None:
-        """Update effect based on pattern and beats."""
-        if not self.is_running:
-            return
-
+    def render(self, features: AudioFeatures, t: float) -> np.ndarray:
+        """Show each light's assigned color."""
         # Change colors if beat detected and change_on_beat is enabled
-        if self._change_on_beat and beat_detected:
+        if self._change_on_beat and features.beat:
             self._initialize_colors()
 
-        # Update each light with its color
-        for light in self.lights:
-            await self.hass.services.call(
-                "light",
-                "turn_on",
-                {
-                    "entity_id": light,
-                    ATTR_BRIGHTNESS: self._brightness,
-                    ATTR_RGB_COLOR: self._current_colors[light],
-                    "transition": self._transition_time
-                }
-            )
+        frame = self.new_frame()
+        if len(frame):
+            frame[:, :3] = [self._current_colors[light] for light in self.lights]
+            frame[:, 3] = self._brightness
+        return frame
 
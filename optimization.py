@@ -9,6 +9,8 @@ from enum import Enum
 
 from homeassistant.core import HomeAssistant
 
+from .core.analysis_profile import AnalysisProfile
+
 _LOGGER = logging.getLogger(__name__)
 
 class PerformanceMode(Enum):
@@ -50,6 +52,25 @@ class PerformanceOptimizer:
         self._last_throttle_time = 0
         self._effect_quality_level = 1.0
         self._processing_quality_level = 1.0
+        self._audio_processor = None
+
+    def attach_audio_processor(self, audio_processor) -> None:
+        """Apply audio optimizations to the given processor from now on."""
+        self._audio_processor = audio_processor
+        # Start from the processor's resolution rather than the default
+        self._audio_buffer_size = audio_processor.profile.chunk_size
+
+    def get_analysis_profile(
+        self,
+        base: AnalysisProfile,
+        processing_quality: Optional[float] = None
+    ) -> AnalysisProfile:
+        """Derive an analysis profile from the current optimization state."""
+        if processing_quality is None:
+            processing_quality = self._processing_quality_level * (
+                self._current_performance_level / 100.0
+            )
+        return base.scaled(processing_quality, self._audio_buffer_size)
 
     async def optimize_audio_processing(self, current_latency: float) -> Dict[str, int]:
         """Optimize audio processing parameters based on system performance."""
@@ -73,12 +94,31 @@ class PerformanceOptimizer:
         # Apply quality adjustments based on performance level
         processing_quality = self._processing_quality_level * (self._current_performance_level / 100.0)
 
+        self._apply_analysis_profile(processing_quality)
+
         return {
             "buffer_size": self._audio_buffer_size,
             "target_latency": self._target_latency,
             "processing_quality": processing_quality
         }
 
+    def _apply_analysis_profile(
+        self,
+        processing_quality: Optional[float] = None
+    ) -> None:
+        """Trade analysis resolution and rate for CPU on the live processor."""
+        if self._audio_processor is None:
+            return
+        try:
+            self._audio_processor.set_profile(
+                self.get_analysis_profile(
+                    self._audio_processor.profile,
+                    processing_quality
+                )
+            )
+        except ValueError as err:
+            _LOGGER.warning("Could not apply analysis profile: %s", err)
+
     async def optimize_light_control(
         self, 
         light_count: int,
@@ -241,6 +281,9 @@ class PerformanceOptimizer:
                     )
                     await self.optimize_memory_usage()
 
+                # Follow the performance level both down and back up
+                self._apply_analysis_profile()
+
             except Exception as err:
                 _LOGGER.error("Error in optimization loop: %s", err)
 
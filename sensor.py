@@ -9,7 +9,7 @@ from homeassistant.components.sensor import (
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import PERCENTAGE, UnitOfTime
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import (
@@ -17,10 +17,16 @@ from .const import (
     METRIC_AUDIO_LATENCY,
     METRIC_LIGHT_LATENCY,
     METRIC_CPU_USAGE,
+    FEATURE_LOUDNESS_MOMENTARY,
+    FEATURE_LOUDNESS_SHORT_TERM,
+    UNIT_LUFS,
 )
+from .core.feature_bus import AudioFeatures
 
 _LOGGER = logging.getLogger(__name__)
 
+SENSOR_UPDATE_RATE = 1.0  # state writes per second
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -58,6 +64,22 @@ async def async_setup_entry(
             METRIC_CPU_USAGE,
             PERCENTAGE,
         ),
+        AuroraLoudnessSensor(
+            hass,
+            audio_processor,
+            "loudness_momentary",
+            "Momentary Loudness",
+            FEATURE_LOUDNESS_MOMENTARY,
+            UNIT_LUFS,
+        ),
+        AuroraLoudnessSensor(
+            hass,
+            audio_processor,
+            "loudness_short_term",
+            "Short-term Loudness",
+            FEATURE_LOUDNESS_SHORT_TERM,
+            UNIT_LUFS,
+        ),
     ]
 
     async_add_entities(entities)
@@ -123,3 +145,51 @@ class AuroraCPUSensor(SensorEntity):
         """Update the sensor."""
         if hasattr(self._processor, "get_metric"):
             self._attr_native_value = await self._processor.get_metric(self._metric)
+
+
+class AuroraLoudnessSensor(SensorEntity):
+    """Sensor for K-weighted loudness measured by the audio processor."""
+
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_suggested_display_precision = 1
+    _attr_icon = "mdi:volume-high"
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        processor: Any,
+        unique_id: str,
+        name: str,
+        feature: str,
+        unit: str,
+    ) -> None:
+        """Initialize the sensor."""
+        self.hass = hass
+        self._processor = processor
+        self._attr_unique_id = f"{DOMAIN}_{unique_id}"
+        self._attr_name = name
+        self._feature = feature
+        self._attr_native_unit_of_measurement = unit
+        self._attr_native_value = None
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to loudness updates from the feature bus."""
+        feature_bus = getattr(self._processor, "feature_bus", None)
+        if feature_bus is not None:
+            self.async_on_remove(
+                feature_bus.subscribe(
+                    AudioFeatures,
+                    self._handle_features,
+                    max_rate=SENSOR_UPDATE_RATE,
+                )
+            )
+
+    @callback
+    def _handle_features(self, features: AudioFeatures) -> None:
+        """Update the state from the latest audio features."""
+        value = round(float(getattr(features, self._feature)), 1)
+        if value != self._attr_native_value:
+            self._attr_native_value = value
+            self.async_write_ha_state()
@@ -6,11 +6,14 @@ import voluptuous as vol
 from homeassistant.core import HomeAssistant, ServiceCall, callback
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.service import async_register_admin_service
 
 from .const import DOMAIN
 from .core.effect_engine import EffectEngine
 from .core.light_controller import LightController
 from .core.audio_processor import AudioProcessor
+from .core.pixels import WLED_UDP_PORT, PixelStrip
+from .core.show import ShowManager
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -22,12 +25,55 @@ EFFECT_PARAMETER_SCHEMA = vol.Schema({
     vol.Optional("description"): cv.string,
 })
 
+UPDATE_EFFECT_SCHEMA = vol.Schema({
+    vol.Required("effect_id"): cv.string,
+}, extra=vol.ALLOW_EXTRA)
+
 LIGHT_GROUP_SCHEMA = vol.Schema({
     vol.Required("id"): cv.string,
     vol.Required("name"): cv.string,
     vol.Required("lights"): [cv.string],
 })
 
+POSITION_SCHEMA = vol.All(
+    [vol.Coerce(float)],
+    vol.Length(min=2, max=3)
+)
+
+LIGHT_LAYOUT_SCHEMA = vol.Schema({
+    vol.Optional("lights", default={}): {cv.entity_id: POSITION_SCHEMA},
+    vol.Optional("groups", default=[]): [vol.Schema({
+        vol.Required("id"): cv.string,
+        vol.Required("lights"): [cv.entity_id],
+        vol.Optional("position"): POSITION_SCHEMA,
+    })],
+})
+
+PIXEL_STRIPS_SCHEMA = vol.Schema({
+    vol.Required("strips"): [vol.Schema({
+        vol.Required("name"): cv.string,
+        vol.Required("host"): cv.string,
+        vol.Required("count"): vol.All(
+            vol.Coerce(int),
+            vol.Range(min=1, max=0xFFFF)
+        ),
+        vol.Optional("port", default=WLED_UDP_PORT): cv.port,
+        vol.Optional("start"): POSITION_SCHEMA,
+        vol.Optional("end"): POSITION_SCHEMA,
+    })],
+})
+
+SHOW_SCHEMA = vol.Schema({
+    vol.Required("name"): cv.string,
+    vol.Optional("media_player"): cv.entity_id,
+})
+
+COMPILE_SHOW_SCHEMA = vol.Schema({
+    vol.Required("media_player"): cv.entity_id,
+    vol.Optional("url"): cv.string,
+})
+
+
 async def async_register_services(hass: HomeAssistant) -> None:
     """Register services for Aurora Sound to Light."""
     
@@ -136,13 +182,173 @@ async def async_register_services(hass: HomeAssistant) -> None:
             _LOGGER.error("Failed to update groups: %s", err)
             raise HomeAssistantError(f"Failed to update groups: {err}") from err
 
+    async def set_light_layout(call: ServiceCall) -> None:
+        """Handle set_light_layout service call."""
+        data = hass.data.get(DOMAIN, {})
+        layout = next(
+            (entry["layout"] for entry in data.values() if "layout" in entry),
+            None
+        )
+        if layout is None:
+            raise HomeAssistantError("Integration not initialized")
+
+        try:
+            layout_data = LIGHT_LAYOUT_SCHEMA(dict(call.data))
+            layout.set_positions(layout_data["lights"])
+            for group in layout_data["groups"]:
+                layout.set_group(
+                    group["id"],
+                    group["lights"],
+                    group.get("position")
+                )
+            await layout.async_save()
+            _LOGGER.info("Updated light layout")
+        except Exception as err:
+            _LOGGER.error("Failed to update light layout: %s", err)
+            raise HomeAssistantError(
+                f"Failed to update light layout: {err}"
+            ) from err
+
+    async def set_pixel_strips(call: ServiceCall) -> None:
+        """Handle set_pixel_strips service call."""
+        data = hass.data.get(DOMAIN, {})
+        scheduler = next(
+            (
+                entry["render_scheduler"] for entry in data.values()
+                if "render_scheduler" in entry
+            ),
+            None
+        )
+        if scheduler is None:
+            raise HomeAssistantError("Integration not initialized")
+
+        try:
+            strips = [
+                PixelStrip(
+                    name=strip["name"],
+                    host=strip["host"],
+                    count=strip["count"],
+                    port=strip["port"],
+                    start=strip.get("start"),
+                    end=strip.get("end"),
+                )
+                for strip in PIXEL_STRIPS_SCHEMA(dict(call.data))["strips"]
+            ]
+            await scheduler.async_set_strips(strips)
+            _LOGGER.info("Configured %d pixel strips", len(strips))
+        except Exception as err:
+            _LOGGER.error("Failed to configure pixel strips: %s", err)
+            raise HomeAssistantError(
+                f"Failed to configure pixel strips: {err}"
+            ) from err
+
+    def get_show_manager() -> ShowManager:
+        """Get the show manager of the first entry."""
+        data = hass.data.get(DOMAIN, {})
+        manager = next(
+            (
+                entry["show_manager"] for entry in data.values()
+                if "show_manager" in entry
+            ),
+            None
+        )
+        if manager is None:
+            raise HomeAssistantError("Integration not initialized")
+        return manager
+
+    # Show Recording Services
+    async def start_show_recording(call: ServiceCall) -> None:
+        """Handle start_show_recording service call."""
+        manager = get_show_manager()
+        try:
+            show = SHOW_SCHEMA(dict(call.data))
+            manager.start_recording(show["name"], show.get("media_player"))
+            _LOGGER.info("Recording show %s", show["name"])
+        except Exception as err:
+            _LOGGER.error("Failed to start show recording: %s", err)
+            raise HomeAssistantError(
+                f"Failed to start show recording: {err}"
+            ) from err
+
+    async def stop_show_recording(call: ServiceCall) -> None:
+        """Handle stop_show_recording service call."""
+        manager = get_show_manager()
+        try:
+            await manager.async_stop_recording()
+        except Exception as err:
+            _LOGGER.error("Failed to save show: %s", err)
+            raise HomeAssistantError(f"Failed to save show: {err}") from err
+
+    async def play_show(call: ServiceCall) -> None:
+        """Handle play_show service call."""
+        manager = get_show_manager()
+        try:
+            show = SHOW_SCHEMA(dict(call.data))
+            await manager.async_play(show["name"], show.get("media_player"))
+            _LOGGER.info("Playing show %s", show["name"])
+        except Exception as err:
+            _LOGGER.error("Failed to play show: %s", err)
+            raise HomeAssistantError(f"Failed to play show: {err}") from err
+
+    async def compile_show(call: ServiceCall) -> None:
+        """Handle compile_show service call."""
+        manager = get_show_manager()
+        effect_engine, _, audio_processor = get_components()
+        try:
+            request = COMPILE_SHOW_SCHEMA(dict(call.data))
+        except vol.Invalid as err:
+            raise HomeAssistantError(f"Invalid show request: {err}") from err
+
+        state = hass.states.get(request["media_player"])
+        content_id = (
+            state.attributes.get("media_content_id") if state else None
+        )
+        if not content_id:
+            raise HomeAssistantError(
+                f"No track playing on {request['media_player']}"
+            )
+
+        # Rendering a whole track takes a while; run it in the background
+        hass.async_create_task(manager.async_compile(
+            effect_engine,
+            audio_processor.config,
+            content_id,
+            request.get("url")
+        ))
+        _LOGGER.info("Compiling show for %s", content_id)
+
+    async def stop_show(call: ServiceCall) -> None:
+        """Handle stop_show service call."""
+        manager = get_show_manager()
+        try:
+            await manager.async_stop_playback()
+        except Exception as err:
+            _LOGGER.error("Failed to stop show: %s", err)
+            raise HomeAssistantError(f"Failed to stop show: {err}") from err
+
     # Register all services
-    hass.services.async_register(DOMAIN, "create_effect", create_effect)
-    hass.services.async_register(DOMAIN, "update_effect", update_effect)
+    # Effects may carry code, which only administrators may provide
+    async_register_admin_service(
+        hass, DOMAIN, "create_effect", create_effect, EFFECT_PARAMETER_SCHEMA
+    )
+    async_register_admin_service(
+        hass, DOMAIN, "update_effect", update_effect, UPDATE_EFFECT_SCHEMA
+    )
     hass.services.async_register(DOMAIN, "delete_effect", delete_effect)
     hass.services.async_register(DOMAIN, "list_effects", list_effects)
     hass.services.async_register(DOMAIN, "set_effect", set_effect)
     hass.services.async_register(DOMAIN, "set_media_player", set_media_player)
     hass.services.async_register(DOMAIN, "update_groups", update_groups)
+    hass.services.async_register(DOMAIN, "set_light_layout", set_light_layout)
+    hass.services.async_register(DOMAIN, "set_pixel_strips", set_pixel_strips)
+    hass.services.async_register(
+        DOMAIN, "start_show_recording", start_show_recording
+    )
+    hass.services.async_register(
+        DOMAIN, "stop_show_recording", stop_show_recording
+    )
+    hass.services.async_register(DOMAIN, "play_show", play_show)
+    hass.services.async_register(DOMAIN, "stop_show", stop_show)
+    hass.services.async_register(DOMAIN, "compile_show", compile_show)
 
     _LOGGER.info("Registered Aurora Sound to Light services") 
\ No newline at end of file
@@ -0,0 +1,143 @@
+"""Tests for runtime analysis profiles."""
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.aurora_sound_to_light.core.analysis_profile import (
+    AnalysisProfile,
+    AnalysisTables,
+    MIN_BANDS,
+)
+from custom_components.aurora_sound_to_light.core.audio_processor import (
+    AudioProcessor,
+)
+from custom_components.aurora_sound_to_light.optimization import (
+    PerformanceOptimizer,
+)
+
+
+@pytest.fixture
+def audio_processor():
+    """Audio processor with FFmpeg patched out."""
+    with patch(
+        "custom_components.aurora_sound_to_light.core.audio_processor.shutil.which",
+        return_value="/usr/bin/ffmpeg",
+    ), patch(
+        "custom_components.aurora_sound_to_light.core.audio_processor.FFmpegManager"
+    ):
+        return AudioProcessor(
+            MagicMock(spec=HomeAssistant),
+            {"media_player": "media_player.test"},
+        )
+
+
+class TestAnalysisProfile:
+    """Test cases for AnalysisProfile."""
+
+    def test_validation(self):
+        """Test invalid profiles are rejected."""
+        with pytest.raises(ValueError):
+            AnalysisProfile(chunk_size=1000)
+        with pytest.raises(ValueError):
+            AnalysisProfile(num_bands=2)
+        with pytest.raises(ValueError):
+            AnalysisProfile(frame_rate=500)
+
+    def test_scaled(self):
+        """Test quality scaling reduces bands and rate."""
+        profile = AnalysisProfile().scaled(0.5, 1200)
+        assert profile.chunk_size == 1024
+        assert profile.num_bands == 16
+        assert profile.frame_rate == 15.0
+
+        profile = AnalysisProfile().scaled(0.0, 100000)
+        assert profile.num_bands == MIN_BANDS
+        assert profile.chunk_size == 8192
+
+    def test_tables(self):
+        """Test tables match the profile resolution."""
+        profile = AnalysisProfile(chunk_size=1024, num_bands=16)
+        tables = AnalysisTables(profile)
+        assert tables.window.shape == (1024,)
+        assert tables.band_matrix.shape == (16, profile.num_bins)
+        assert np.allclose(tables.band_matrix.sum(axis=1), 1.0)
+
+
+@pytest.mark.asyncio
+class TestProfileHotSwap:
+    """Test cases for swapping profiles on a running processor."""
+
+    async def test_set_profile(self, audio_processor):
+        """Test a new profile rebuilds every table."""
+        process = MagicMock()
+        audio_processor._process = process
+        profile = AnalysisProfile(chunk_size=1024, num_bands=16, frame_rate=15)
+
+        audio_processor.set_profile(profile)
+
+        assert audio_processor.profile is profile
+        assert audio_processor._tables.profile is profile
+        assert audio_processor._loudness.num_bins == profile.num_bins
+        assert audio_processor._freq_bands.shape == (16,)
+        # Same sample rate: the decoder keeps running
+        assert audio_processor._process is process
+
+        audio_processor._process_audio(np.random.rand(1024))
+        assert audio_processor._freq_bands.shape == (16,)
+        assert audio_processor._waveform.shape == (16,)
+
+    async def test_sample_rate_restarts_decoder(self, audio_processor):
+        """Test only a sample rate change restarts FFmpeg."""
+        process = MagicMock()
+        audio_processor._process = process
+        audio_processor.set_profile(AnalysisProfile(sample_rate=48000))
+        process.terminate.assert_called_once()
+        assert audio_processor._process is None
+
+    async def test_optimizer_applies_profile(self, audio_processor):
+        """Test the optimizer pushes its buffer size to the processor."""
+        optimizer = PerformanceOptimizer(MagicMock())
+        optimizer.attach_audio_processor(audio_processor)
+
+        with patch("psutil.cpu_percent", return_value=50.0):
+            result = await optimizer.optimize_audio_processing(100.0)
+
+        assert audio_processor.profile.chunk_size == result["buffer_size"]
+
+    async def test_optimizer_keeps_chunk_size(self, audio_processor):
+        """Test attaching the optimizer does not shrink the chunk size."""
+        optimizer = PerformanceOptimizer(MagicMock())
+        optimizer.attach_audio_processor(audio_processor)
+
+        with patch("psutil.cpu_percent", return_value=50.0):
+            await optimizer.optimize_audio_processing(optimizer._target_latency)
+
+        assert audio_processor.profile.chunk_size == 2048
+
+    async def test_optimizer_restores_quality(self, audio_processor):
+        """Test analysis quality comes back once the CPU load drops."""
+        optimizer = PerformanceOptimizer(MagicMock())
+        optimizer.attach_audio_processor(audio_processor)
+        optimizer._current_performance_level = 50.0
+        optimizer._adjust_quality_levels()
+        with patch("psutil.cpu_percent", return_value=90.0):
+            await optimizer.optimize_audio_processing(optimizer._target_latency)
+        assert audio_processor.profile.num_bands < 32
+
+        optimizer._current_performance_level = 100.0
+        optimizer._adjust_quality_levels()
+        with patch("psutil.cpu_percent", return_value=10.0), patch(
+            "psutil.virtual_memory"
+        ) as memory, patch(
+            "asyncio.sleep", side_effect=asyncio.CancelledError
+        ):
+            memory.return_value.percent = 10.0
+            with pytest.raises(asyncio.CancelledError):
+                await optimizer.start_optimization_loop()
+
+        assert audio_processor.profile.num_bands == 32
+        assert audio_processor.profile.frame_rate == 30.0
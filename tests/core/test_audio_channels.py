@@ -0,0 +1,73 @@
+"""Tests for multichannel analysis in the audio processor."""
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.aurora_sound_to_light.core.audio_processor import (
+    AudioProcessor,
+    CHUNK_SIZE,
+    NUM_BANDS,
+    SAMPLE_RATE,
+)
+
+
+def _create_processor(channels):
+    """Create an audio processor with FFmpeg patched out."""
+    with patch(
+        "custom_components.aurora_sound_to_light.core.audio_processor.shutil.which",
+        return_value="/usr/bin/ffmpeg",
+    ), patch(
+        "custom_components.aurora_sound_to_light.core.audio_processor.FFmpegManager"
+    ):
+        return AudioProcessor(
+            MagicMock(spec=HomeAssistant),
+            {"media_player": "media_player.test", "audio_channels": channels},
+        )
+
+
+def _tone(freq, amplitude=1.0):
+    """Generate one chunk of a sine tone."""
+    t = np.arange(CHUNK_SIZE) / SAMPLE_RATE
+    return amplitude * np.sin(2 * np.pi * freq * t)
+
+
+@pytest.mark.asyncio
+class TestMultichannelAnalysis:
+    """Test cases for batched multichannel analysis."""
+
+    async def test_mono_bands(self):
+        """Test mono input still yields normalized bands."""
+        processor = _create_processor(1)
+        processor._process_audio(_tone(440))
+
+        assert processor._freq_bands.shape == (NUM_BANDS,)
+        assert not np.any(np.isnan(processor._freq_bands))
+        assert np.max(processor._freq_bands) == pytest.approx(1.0)
+        assert processor._balance == 0.0
+
+    async def test_stereo_bands(self):
+        """Test per-channel bands are published for stereo input."""
+        processor = _create_processor(2)
+        frames = np.stack([_tone(100), _tone(5000)])
+        processor._process_audio(frames)
+
+        assert processor._channel_bands.shape == (2, NUM_BANDS)
+        left_peak = np.argmax(processor._channel_bands[0])
+        right_peak = np.argmax(processor._channel_bands[1])
+        assert left_peak < right_peak
+
+    async def test_balance(self):
+        """Test the balance follows the louder channel."""
+        processor = _create_processor(2)
+
+        processor._process_audio(np.stack([_tone(440), _tone(440, 0.1)]))
+        assert processor._balance < -0.5
+
+        processor._process_audio(np.stack([_tone(440, 0.1), _tone(440)]))
+        assert processor._balance > 0.5
+
+        processor._process_audio(np.stack([_tone(440), _tone(440)]))
+        assert processor._balance == pytest.approx(0.0, abs=1e-6)
@@ -0,0 +1,111 @@
+"""Tests for silence and idle detection in the audio processor."""
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.aurora_sound_to_light.core.audio_processor import (
+    AudioProcessor,
+    CHUNK_SIZE,
+    SILENCE_HOLD_TIME,
+)
+from custom_components.aurora_sound_to_light.core.light_controller import (
+    LightController,
+)
+
+
+@pytest.fixture
+def hass():
+    """Home Assistant fixture."""
+    return MagicMock(spec=HomeAssistant)
+
+
+@pytest.fixture
+def audio_processor(hass):
+    """Audio processor with FFmpeg patched out."""
+    with patch(
+        "custom_components.aurora_sound_to_light.core.audio_processor.shutil.which",
+        return_value="/usr/bin/ffmpeg",
+    ), patch(
+        "custom_components.aurora_sound_to_light.core.audio_processor.FFmpegManager"
+    ):
+        return AudioProcessor(hass, {"media_player": "media_player.test"})
+
+
+def _loop_time(value):
+    """Patch the event loop clock used for the silence hold time."""
+    loop = MagicMock()
+    loop.time.return_value = value
+    return patch("asyncio.get_event_loop", return_value=loop)
+
+
+@pytest.mark.asyncio
+class TestIdleDetection:
+    """Test cases for the idle state machine."""
+
+    async def test_starts_idle(self, audio_processor):
+        """Test the processor is idle until it hears a signal."""
+        assert audio_processor.is_idle
+
+    async def test_signal_wakes_up(self, audio_processor):
+        """Test a loud chunk switches to active immediately."""
+        changes = []
+        audio_processor.async_add_idle_listener(changes.append)
+
+        loud = np.full(CHUNK_SIZE, 0.5, dtype=np.float32)
+        assert not audio_processor._update_idle_state(loud)
+        assert not audio_processor.is_idle
+        assert changes == [False]
+
+    async def test_silence_hold_time(self, audio_processor):
+        """Test silence only goes idle after the hold time."""
+        loud = np.full(CHUNK_SIZE, 0.5, dtype=np.float32)
+        silence = np.zeros(CHUNK_SIZE, dtype=np.float32)
+        audio_processor._update_idle_state(loud)
+
+        with _loop_time(10.0):
+            assert not audio_processor._update_idle_state(silence)
+        with _loop_time(10.0 + SILENCE_HOLD_TIME / 2):
+            assert not audio_processor._update_idle_state(silence)
+        with _loop_time(10.0 + SILENCE_HOLD_TIME):
+            assert audio_processor._update_idle_state(silence)
+
+        assert audio_processor._energy == 0.0
+        assert not np.any(audio_processor._freq_bands)
+
+    async def test_first_decision_notifies(self, hass, audio_processor):
+        """Test dispatch stays active until the processor first decides."""
+        controller = LightController(hass)
+        audio_processor.async_add_idle_listener(controller.set_idle)
+        assert not controller.is_idle
+
+        audio_processor._set_idle(True)
+        assert controller.is_idle
+
+        changes = []
+        audio_processor.async_add_idle_listener(changes.append)
+        audio_processor._set_idle(True)
+        assert changes == []
+
+    async def test_remove_listener(self, audio_processor):
+        """Test removed listeners are no longer notified."""
+        changes = []
+        remove = audio_processor.async_add_idle_listener(changes.append)
+        remove()
+
+        audio_processor._set_idle(False)
+        assert changes == []
+
+    async def test_light_dispatch_gate(self, hass, audio_processor):
+        """Test the light controller follows the idle state."""
+        controller = LightController(hass)
+        audio_processor.async_add_idle_listener(controller.set_idle)
+
+        audio_processor._set_idle(False)
+        assert not controller.is_idle
+        await controller.async_wait_active()
+
+        audio_processor._set_idle(True)
+        assert controller.is_idle
@@ -0,0 +1,132 @@
+"""Tests for the beat clock and the beat-synchronized effects."""
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.aurora_sound_to_light.const import (
+    EFFECT_FREQUENCY_SWEEP,
+    EFFECT_RAINBOW_FLOW,
+    EFFECT_STROBE_SYNC,
+)
+from custom_components.aurora_sound_to_light.core.beat_clock import BeatClock
+from custom_components.aurora_sound_to_light.core.feature_bus import (
+    AudioFeatures,
+)
+from custom_components.aurora_sound_to_light.effects import (
+    EffectEngine,
+    FrequencySweepEffect,
+    RainbowFlowEffect,
+    StrobeSyncEffect,
+)
+
+LIGHTS = [f"light.{i}" for i in range(4)]
+QUIET = AudioFeatures.from_levels(tempo=120.0)
+BEAT = AudioFeatures.from_levels(beat=True, tempo=120.0)
+
+
+@pytest.fixture
+def hass():
+    """Home Assistant fixture."""
+    return MagicMock(spec=HomeAssistant)
+
+
+class TestBeatClock:
+    """Test cases for BeatClock."""
+
+    def test_free_running(self):
+        """Test the phase advances at the tempo between beats."""
+        clock = BeatClock()
+        clock.update(QUIET, 0.0)
+        assert clock.update(QUIET, 0.25) == pytest.approx(0.5)
+        clock.update(QUIET, 1.25)
+        assert clock.beats == 2
+        assert clock.phase == pytest.approx(0.5)
+
+    def test_locks_to_beats(self):
+        """Test a detected beat snaps the phase without double counting."""
+        clock = BeatClock()
+        clock.update(QUIET, 0.0)
+        clock.update(QUIET, 0.4)  # phase 0.8, beat arrives early
+        clock.update(BEAT, 0.45)
+        assert (clock.beats, clock.phase) == (1, 0.0)
+
+        clock.update(QUIET, 0.96)  # wrapped just before the late beat
+        clock.update(BEAT, 0.98)
+        assert (clock.beats, clock.phase) == (2, 0.0)
+
+    def test_same_time_is_idempotent(self):
+        """Test updating twice for one frame advances once."""
+        clock = BeatClock()
+        clock.update(QUIET, 0.0)
+        clock.update(QUIET, 0.1)
+        assert clock.update(QUIET, 0.1) == pytest.approx(0.2)
+
+
+class TestBeatEffects:
+    """Test cases for the catalogue effects."""
+
+    def test_registered(self, hass):
+        """Test the advertised effects are all registered."""
+        effects = EffectEngine(hass).get_available_effects()
+        for name in [
+            EFFECT_FREQUENCY_SWEEP,
+            EFFECT_STROBE_SYNC,
+            EFFECT_RAINBOW_FLOW,
+            "strobe",
+            "multi_color",
+        ]:
+            assert name in effects
+
+    def test_frequency_sweep(self, hass):
+        """Test each light shows the level of its band."""
+        effect = FrequencySweepEffect(
+            hass, LIGHTS, {"min_brightness": 0.0, "sweep_width": 0.01}
+        )
+        features = AudioFeatures.from_levels([1.0, 0.0, 0.0, 0.0])
+        frame = effect.render(features, 0.1)
+        assert frame.shape == (4, 4)
+        assert frame[0, 3] == pytest.approx(255)
+        assert frame[1:, 3].max() < 1
+
+    def test_frequency_sweep_moves_with_beats(self, hass):
+        """Test the sweep highlight crosses the lights once per sweep."""
+        effect = FrequencySweepEffect(
+            hass, LIGHTS, {"min_brightness": 0.0, "beats_per_sweep": 4}
+        )
+        silent = AudioFeatures.from_levels([0.0] * 4, tempo=120.0)
+        brightest = []
+        for step in range(4):
+            frame = effect.render(silent, step * 0.5)
+            brightest.append(int(np.argmax(frame[:, 3])))
+        assert brightest == [0, 1, 2, 3]
+
+    @pytest.mark.parametrize("pattern,expected", [
+        ("all", [[1, 1, 1, 1], [1, 1, 1, 1]]),
+        ("alternate", [[1, 0, 1, 0], [0, 1, 0, 1]]),
+        ("chase", [[1, 0, 0, 0], [0, 1, 0, 0]]),
+    ])
+    def test_strobe_sync_patterns(self, hass, pattern, expected):
+        """Test flashes start on the beat grid and follow the pattern."""
+        effect = StrobeSyncEffect(hass, LIGHTS, {"pattern": pattern})
+        lit = []
+        for t in (0.0, 0.5):
+            lit.append((effect.render(BEAT, t)[:, 3] > 0).astype(int).tolist())
+        assert lit == expected
+
+    def test_strobe_sync_fades(self, hass):
+        """Test a flash fades out over the duty cycle."""
+        effect = StrobeSyncEffect(hass, LIGHTS, {"duty_cycle": 0.5})
+        assert effect.render(BEAT, 0.0)[0, 3] == 255
+        assert effect.render(QUIET, 0.125)[0, 3] == pytest.approx(127.5)
+        assert effect.render(QUIET, 0.3)[0, 3] == 0
+
+    def test_rainbow_flow_shifts_per_beat(self, hass):
+        """Test the hues move by the configured shift per beat."""
+        effect = RainbowFlowEffect(hass, LIGHTS, {"shift_per_beat": 0.25})
+        first = effect.render(QUIET, 0.0)
+        # One beat later every light shows its right neighbour's color
+        later = effect.render(QUIET, 0.5)
+        np.testing.assert_allclose(later[:-1, :3], first[1:, :3], atol=2)
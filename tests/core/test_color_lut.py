@@ -0,0 +1,101 @@
+"""Tests for the color lookup tables."""
+import colorsys
+
+import numpy as np
+import pytest
+
+from custom_components.aurora_sound_to_light.core.color_lut import (
+    CURVE_CIE,
+    CURVE_LINEAR,
+    ColorLUT,
+    Palette,
+    get_color_lut,
+    get_palette,
+    hsv_to_rgb,
+)
+
+
+class TestHsv:
+    """Test cases for the vectorized HSV conversion."""
+
+    def test_matches_colorsys(self):
+        """Test the conversion against the standard library."""
+        rng = np.random.default_rng(0)
+        hsv = rng.uniform(0, 1, (50, 3))
+        expected = [
+            [255 * c for c in colorsys.hsv_to_rgb(*row)] for row in hsv
+        ]
+        np.testing.assert_allclose(
+            hsv_to_rgb(hsv[:, 0], hsv[:, 1], hsv[:, 2]),
+            expected,
+            atol=1e-3
+        )
+
+
+class TestColorLUT:
+    """Test cases for ColorLUT."""
+
+    def test_hue_lookup(self):
+        """Test hue lookups wrap and hit the primaries."""
+        lut = ColorLUT()
+        np.testing.assert_allclose(
+            lut.hue(np.array([0.0, 1 / 3, 2 / 3, 1.0])),
+            [[255, 0, 0], [0, 255, 0], [0, 0, 255], [255, 0, 0]],
+            atol=1
+        )
+
+    def test_hue_resolution(self):
+        """Test table lookups stay close to the exact conversion."""
+        lut = ColorLUT(hue_size=1024)
+        hues = np.linspace(0, 1, 500, endpoint=False)
+        error = np.abs(lut.hue(hues) - hsv_to_rgb(hues, 1.0, 1.0))
+        assert error.max() <= 255 * 6 / 1024 + 1e-3
+
+    def test_curves(self):
+        """Test brightness curves keep their end points."""
+        lut = ColorLUT(curve_size=256)
+        levels = np.array([0.0, 0.5, 1.0])
+        np.testing.assert_allclose(
+            lut.brightness(levels, CURVE_LINEAR), [0, 127.5, 255], atol=0.6
+        )
+        cie = lut.brightness(levels, CURVE_CIE)
+        assert cie[0] == 0 and cie[2] == pytest.approx(255)
+        assert cie[1] < 127.5
+        assert lut.apply_gamma(np.array([255.0]))[0] == pytest.approx(255)
+
+    def test_configurable_size(self):
+        """Test smaller tables use less memory."""
+        assert ColorLUT(64, 64).nbytes < ColorLUT().nbytes
+        with pytest.raises(ValueError):
+            ColorLUT(hue_size=4)
+
+    def test_shared_instances(self):
+        """Test lookup tables are shared between callers."""
+        assert get_color_lut() is get_color_lut()
+
+
+class TestPalette:
+    """Test cases for Palette."""
+
+    def test_cyclic_gradient(self):
+        """Test a cyclic palette blends back into its first color."""
+        palette = Palette([[255, 0, 0], [0, 0, 255]], size=256)
+        np.testing.assert_allclose(
+            palette.sample(np.array([0.0, 0.25, 0.5, 1.0])),
+            [[255, 0, 0], [127.5, 0, 127.5], [0, 0, 255], [255, 0, 0]],
+            atol=1
+        )
+
+    def test_linear_gradient(self):
+        """Test a non-cyclic palette clamps at its ends."""
+        palette = Palette([[0, 0, 0], [255, 255, 255]], cyclic=False)
+        np.testing.assert_allclose(
+            palette.sample(np.array([-1.0, 2.0])),
+            [[0, 0, 0], [255, 255, 255]]
+        )
+
+    def test_builtin(self):
+        """Test built-in palettes by name."""
+        assert len(get_palette("fire", 64)) == 64
+        with pytest.raises(ValueError):
+            get_palette("unknown")
@@ -0,0 +1,158 @@
+"""Tests for the layer compositor."""
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.aurora_sound_to_light.core.compositor import (
+    BLEND_ADD,
+    BLEND_MAX,
+    BLEND_MULTIPLY,
+    BLEND_OVER,
+    BLEND_SCREEN,
+    Compositor,
+    Layer,
+)
+from custom_components.aurora_sound_to_light.core.feature_bus import FeatureBus
+from custom_components.aurora_sound_to_light.core.frame_output import (
+    new_frame,
+)
+from custom_components.aurora_sound_to_light.core.render_loop import (
+    RenderScheduler,
+)
+
+
+def _solid(value, num_lights=2):
+    """Create a frame with every channel set to a value."""
+    frame = new_frame(num_lights)
+    frame[:] = value
+    return frame
+
+
+def _sequential(base, layers):
+    """Reference implementation blending one layer at a time."""
+    result = base.astype(np.float64)
+    for layer in layers:
+        src = layer.frame.astype(np.float64)
+        weight = layer.weights(len(src)).astype(np.float64)
+        if layer.mode == BLEND_OVER:
+            blended = src
+        elif layer.mode == BLEND_ADD:
+            blended = result + src
+        elif layer.mode == BLEND_MULTIPLY:
+            blended = result * src / 255
+        elif layer.mode == BLEND_SCREEN:
+            blended = 255 - (255 - result) * (255 - src) / 255
+        else:
+            result = np.maximum(result, weight * src)
+            continue
+        result = result + weight * (blended - result)
+    return np.clip(result, 0, 255)
+
+
+class TestCompositor:
+    """Test cases for Compositor."""
+
+    @pytest.mark.parametrize("mode,expected", [
+        (BLEND_OVER, 200),
+        (BLEND_ADD, 255),
+        (BLEND_MULTIPLY, 100 * 200 / 255),
+        (BLEND_SCREEN, 255 - 155 * 55 / 255),
+        (BLEND_MAX, 200),
+    ])
+    def test_modes(self, mode, expected):
+        """Test each blend mode on two solid layers."""
+        result = Compositor(2).composite([
+            Layer(_solid(100)),
+            Layer(_solid(200), mode),
+        ])
+        np.testing.assert_allclose(result, expected, rtol=1e-5)
+
+    def test_opacity_and_mask(self):
+        """Test layer weights come from opacity and the light mask."""
+        result = Compositor(2).composite([
+            Layer(_solid(100)),
+            Layer(_solid(200), opacity=0.5, mask=np.array([1.0, 0.0])),
+        ])
+        np.testing.assert_allclose(result[:, 0], [150, 100])
+
+    def test_matches_sequential_blending(self):
+        """Test vectorized runs equal blending one layer at a time."""
+        rng = np.random.default_rng(1)
+        modes = [
+            BLEND_OVER, BLEND_SCREEN, BLEND_MULTIPLY, BLEND_MAX,
+            BLEND_MAX, BLEND_ADD, BLEND_OVER, BLEND_SCREEN,
+        ]
+        layers = [
+            Layer(
+                rng.uniform(0, 255, (8, 4)).astype(np.float32),
+                mode,
+                float(rng.uniform(0.2, 1.0)),
+                rng.uniform(0, 1, 8).astype(np.float32),
+            )
+            for mode in modes
+        ]
+        # Keep intermediate values in range so end clipping matches
+        layers[5].opacity = 0.05
+        base = rng.uniform(0, 255, (8, 4)).astype(np.float32)
+
+        np.testing.assert_allclose(
+            Compositor(8).composite(layers, base),
+            _sequential(base, layers),
+            rtol=1e-4,
+            atol=1e-3
+        )
+
+    def test_invalid_mode(self):
+        """Test unknown blend modes are rejected."""
+        with pytest.raises(ValueError):
+            Layer(_solid(0), "overlay")
+
+    def test_wrong_shape(self):
+        """Test layers must match the compositor's lights."""
+        with pytest.raises(ValueError):
+            Compositor(3).composite([Layer(_solid(0))])
+
+
+class SolidEffect:
+    """Minimal renderable effect."""
+
+    def __init__(self, lights, value):
+        """Initialize the effect."""
+        self.lights = lights
+        self.value = value
+        self.is_running = True
+
+    def render(self, features, t):
+        """Render a solid frame."""
+        return _solid(self.value, len(self.lights))
+
+
+class TestSchedulerLayers:
+    """Test cases for layered effects in the render scheduler."""
+
+    def test_group_masked_layer(self):
+        """Test a layer restricted to a light group."""
+        hass = MagicMock(spec=HomeAssistant)
+        scheduler = RenderScheduler(hass, FeatureBus(hass))
+        lights = ["light.1", "light.2", "light.3"]
+        scheduler.set_group("left", ["light.1"])
+        scheduler.add_effect("base", SolidEffect(lights, 100))
+        scheduler.add_effect(
+            "accent",
+            SolidEffect(lights, 200),
+            blend=BLEND_ADD,
+            group="left"
+        )
+
+        frame = scheduler.render(0.0)
+        np.testing.assert_allclose(frame[:, 0], [255, 100, 100])
+
+    def test_invalid_blend(self):
+        """Test scheduling with an unknown blend mode."""
+        hass = MagicMock(spec=HomeAssistant)
+        scheduler = RenderScheduler(hass, FeatureBus(hass))
+        with pytest.raises(ValueError):
+            scheduler.add_effect("a", SolidEffect(["light.1"], 0), blend="x")
@@ -1,6 +1,6 @@
 """Test module for Aurora Sound to Light effect engine."""
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from typing import List, Optional
 import asyncio
 
@@ -51,6 +51,11 @@ def hass():
         return None
     
     mock_hass.services.call = MagicMock(side_effect=async_call)
+
+    async def run_in_executor(func, *args):
+        return func(*args)
+
+    mock_hass.async_add_executor_job = AsyncMock(side_effect=run_in_executor)
     return mock_hass
 
 
@@ -0,0 +1,168 @@
+"""Tests for the lazily loaded effect registry."""
+from importlib.metadata import EntryPoint
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.aurora_sound_to_light.effects import (
+    BaseEffect,
+    EffectEngine,
+    get_effect_engine,
+)
+from custom_components.aurora_sound_to_light.effects import registry
+from custom_components.aurora_sound_to_light.effects.bass_pulse import (
+    BassPulseEffect,
+)
+from custom_components.aurora_sound_to_light.effects.registry import (
+    EFFECT_MANIFEST,
+    ENTRY_POINT_GROUP,
+    EffectRegistry,
+)
+
+BASS_PULSE = (
+    "custom_components.aurora_sound_to_light.effects.bass_pulse:BassPulseEffect"
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_discovery():
+    """Rescan entry points in every test."""
+    registry.discover_entry_points.cache_clear()
+    yield
+    registry.discover_entry_points.cache_clear()
+
+
+@pytest.fixture
+def hass():
+    """Home Assistant fixture."""
+    mock_hass = MagicMock(spec=HomeAssistant)
+
+    async def run_in_executor(func, *args):
+        return func(*args)
+
+    mock_hass.async_add_executor_job = AsyncMock(side_effect=run_in_executor)
+    return mock_hass
+
+
+def test_manifest_lists_effects_without_importing():
+    """Effect types are known before any effect module is imported."""
+    with patch.object(
+        registry.importlib, "import_module",
+        wraps=registry.importlib.import_module
+    ) as import_module:
+        effects = EffectRegistry(discover=False)
+        assert set(effects) == set(EFFECT_MANIFEST)
+        assert "sparks" in effects
+        assert "unknown" not in effects
+        assert not any(effects.is_loaded(name) for name in effects)
+        import_module.assert_not_called()
+
+
+def test_effect_module_imported_on_first_lookup():
+    """The class is imported once, on first lookup."""
+    effects = EffectRegistry(discover=False)
+    with patch.object(
+        registry.importlib, "import_module",
+        wraps=registry.importlib.import_module
+    ) as import_module:
+        assert effects["bass_pulse"] is BassPulseEffect
+        assert effects["bass_pulse"] is BassPulseEffect
+    import_module.assert_called_once()
+    assert effects.is_loaded("bass_pulse")
+    assert not effects.is_loaded("color_wave")
+
+
+def test_every_builtin_effect_loads():
+    """All manifest targets resolve to effect classes."""
+    effects = EffectRegistry(discover=False)
+    for name in effects:
+        assert issubclass(effects[name], BaseEffect)
+
+
+def test_invalid_target_raises():
+    """Targets that are not effect classes are rejected on load."""
+    effects = EffectRegistry(
+        {"bad": ".const:DOMAIN", "missing": ".effects.nothing:Effect"},
+        discover=False
+    )
+    assert "bad" in effects
+    with pytest.raises(TypeError):
+        effects["bad"]
+    with pytest.raises(ImportError):
+        effects["missing"]
+
+
+def test_entry_points_discovered():
+    """Installed packages can provide effects through entry points."""
+    entry_point = EntryPoint("external_pulse", BASS_PULSE, ENTRY_POINT_GROUP)
+    shadowing = EntryPoint("strobe", BASS_PULSE, ENTRY_POINT_GROUP)
+    with patch.object(
+        registry, "entry_points", return_value=[entry_point, shadowing]
+    ) as entry_points:
+        effects = EffectRegistry()
+        EffectRegistry()
+    entry_points.assert_called_once_with(group=ENTRY_POINT_GROUP)
+
+    assert "external_pulse" in effects
+    assert effects["external_pulse"] is BassPulseEffect
+    # Built-in effects are not replaced by entry points
+    assert effects["strobe"] is not BassPulseEffect
+
+
+def test_register_class_and_target():
+    """Classes and targets can be registered like dictionary items."""
+    effects = EffectRegistry({}, discover=False)
+    effects["direct"] = BassPulseEffect
+    effects["deferred"] = BASS_PULSE
+    assert effects.is_loaded("direct")
+    assert not effects.is_loaded("deferred")
+    assert effects["deferred"] is BassPulseEffect
+
+    del effects["direct"]
+    assert list(effects) == ["deferred"]
+
+
+@pytest.fixture
+def shared():
+    """Replace the shared registry with a fresh one."""
+    effects = EffectRegistry(discover=False)
+    with patch.object(registry, "_REGISTRY", effects):
+        yield effects
+
+
+@pytest.mark.asyncio
+class TestEngineRegistry:
+    """Test the effect engine's use of the registry."""
+
+    async def test_create_loads_only_requested_effect(self, hass, shared):
+        """Creating one effect imports it in the executor, not the others."""
+        engine = EffectEngine(hass)
+        effect = await engine.create_effect("bass_pulse", ["light.a"])
+
+        assert isinstance(effect, BassPulseEffect)
+        hass.async_add_executor_job.assert_awaited_once()
+        assert shared.is_loaded("bass_pulse")
+        assert not shared.is_loaded("sparks")
+        assert "sparks" in engine.get_available_effects()
+
+        await engine.create_effect("bass_pulse", ["light.b"])
+        hass.async_add_executor_job.assert_awaited_once()
+
+    async def test_engines_share_registry(self, hass, shared):
+        """Effects registered at runtime are seen by every engine."""
+        first = await get_effect_engine(hass)
+        shared["external_pulse"] = BassPulseEffect
+        second = await get_effect_engine(hass)
+
+        assert first._effects is second._effects is shared
+        assert "external_pulse" in second.get_available_effects()
+        effect = await second.create_effect("external_pulse", ["light.a"])
+        assert isinstance(effect, BassPulseEffect)
+
+    async def test_unknown_effect(self, hass, shared):
+        """Unknown effect types raise ValueError."""
+        engine = EffectEngine(hass)
+        with pytest.raises(ValueError):
+            await engine.create_effect("unknown", ["light.a"])
@@ -0,0 +1,112 @@
+"""Tests for compiled effect expressions."""
+import numpy as np
+import pytest
+
+from custom_components.aurora_sound_to_light.core.expression import (
+    EffectProgram,
+    Expression,
+    compile_program,
+    feature_variables,
+)
+from custom_components.aurora_sound_to_light.core.feature_bus import (
+    AudioFeatures,
+)
+
+
+class TestExpression:
+    """Test cases for Expression."""
+
+    def test_arithmetic(self):
+        """Test arithmetic and functions evaluate with numpy."""
+        expression = Expression(
+            "fract(t * speed + position)",
+            ["t", "speed", "position"]
+        )
+        result = expression({
+            "t": 1.0,
+            "speed": 0.5,
+            "position": np.array([0.0, 0.25, 0.75], dtype=np.float32),
+        })
+        np.testing.assert_allclose(result, [0.5, 0.75, 0.25])
+
+    def test_conditionals(self):
+        """Test comparisons, boolean and conditional expressions."""
+        expression = Expression("1 if x > 0.5 and beat else 0", ["x", "beat"])
+        result = expression({"x": np.array([0.2, 0.8]), "beat": 1.0})
+        np.testing.assert_array_equal(result, [0.0, 1.0])
+
+    def test_constant_folding(self):
+        """Test constant subtrees are folded at compile time."""
+        expression = Expression("x * (2 * pi)", ["x"])
+        assert expression.variables == {"x"}
+        assert expression({"x": 1.0}) == pytest.approx(2 * np.pi)
+
+    @pytest.mark.parametrize("source", [
+        "__import__('os')",
+        "x.real",
+        "open",
+        "[1, 2]",
+        "'text'",
+        "sin(1, 2)",
+        "lambda: 1",
+        "y + 1",
+        "1 +",
+    ])
+    def test_rejected(self, source):
+        """Test anything outside the whitelist is rejected."""
+        with pytest.raises(ValueError):
+            Expression(source, ["x"])
+
+
+class TestEffectProgram:
+    """Test cases for EffectProgram."""
+
+    def test_hsv_frame(self):
+        """Test outputs are evaluated across all lights."""
+        program = EffectProgram(
+            {"hue": "position", "brightness": "bass"},
+            []
+        )
+        frame = program.evaluate({"bass": 0.5}, 4)
+        assert frame.shape == (4, 4)
+        assert frame.dtype == np.float32
+        np.testing.assert_allclose(frame[0, :3], [255, 0, 0])
+        np.testing.assert_allclose(frame[:, 3], 127.5)
+
+    def test_rgb_frame_is_clipped(self):
+        """Test RGB outputs are scaled and clipped."""
+        program = EffectProgram(
+            {"red": "2", "green": "index", "blue": "1 / 0"},
+            []
+        )
+        frame = program.evaluate({}, 2)
+        np.testing.assert_allclose(frame[:, 0], 255)
+        np.testing.assert_allclose(frame[:, 1], [0, 255])
+        np.testing.assert_allclose(frame[:, 2], 255)
+
+    def test_invalid_outputs(self):
+        """Test unknown or mixed outputs are rejected."""
+        with pytest.raises(ValueError):
+            EffectProgram({"alpha": "1"})
+        with pytest.raises(ValueError):
+            EffectProgram({"hue": "0", "red": "1"})
+
+    def test_cached_by_config(self):
+        """Test equal configs share one compiled program."""
+        first = compile_program({"hue": "t * speed"}, ["speed"])
+        second = compile_program(dict({"hue": "t * speed"}), ["speed"])
+        assert first is second
+        assert compile_program({"hue": "t"}, ["speed"]) is not first
+
+    def test_feature_variables(self):
+        """Test audio features become scalar variables."""
+        features = AudioFeatures.from_levels(
+            [1.0, 1.0, 0.5, 0.5, 0.0, 0.0],
+            beat=True
+        )
+        variables = feature_variables(features, 2.0)
+        assert variables["t"] == 2.0
+        assert variables["bass"] == 1.0
+        assert variables["mid"] == 0.5
+        assert variables["high"] == 0.0
+        assert variables["beat"] == 1.0
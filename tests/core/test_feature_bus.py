@@ -0,0 +1,110 @@
+"""Tests for the in-process audio feature bus."""
+import asyncio
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.aurora_sound_to_light.core.feature_bus import (
+    AudioFeatures,
+    FeatureBus,
+    StructureEvent,
+)
+
+
+@pytest.fixture
+def hass():
+    """Home Assistant fixture."""
+    return MagicMock(spec=HomeAssistant)
+
+
+def _features(energy):
+    """Create an audio feature frame."""
+    return AudioFeatures(
+        frequencies=np.zeros(32),
+        waveform=np.zeros(32),
+        energy=energy,
+        beat=False,
+        tempo=120.0,
+        loudness_momentary=-20.0,
+        loudness_short_term=-20.0,
+        novelty=0.0,
+        timestamp=0.0,
+    )
+
+
+@pytest.mark.asyncio
+class TestFeatureBus:
+    """Test cases for FeatureBus."""
+
+    async def test_typed_delivery(self, hass):
+        """Test subscribers only receive their feature type."""
+        hass.loop = asyncio.get_running_loop()
+        bus = FeatureBus(hass)
+        features, events = [], []
+        bus.subscribe(AudioFeatures, features.append)
+        bus.subscribe(StructureEvent, events.append)
+
+        bus.publish(_features(0.5))
+        assert len(features) == 1
+        assert events == []
+
+        bus.publish(StructureEvent("drop", 0.1, -8.0, 0.0))
+        assert events[0].event_type == "drop"
+
+    async def test_latest(self, hass):
+        """Test the latest value is kept per type."""
+        hass.loop = asyncio.get_running_loop()
+        bus = FeatureBus(hass)
+        assert bus.latest(AudioFeatures) is None
+        bus.publish(_features(0.1))
+        bus.publish(_features(0.2))
+        assert bus.latest(AudioFeatures).energy == 0.2
+
+    async def test_rate_limit_latest_value(self, hass):
+        """Test a rate-limited subscriber gets the newest value, not a backlog."""
+        hass.loop = asyncio.get_running_loop()
+        bus = FeatureBus(hass)
+        received = []
+        bus.subscribe(AudioFeatures, received.append, max_rate=20)
+
+        for energy in (0.1, 0.2, 0.3, 0.4):
+            bus.publish(_features(energy))
+        assert [f.energy for f in received] == [0.1]
+
+        await asyncio.sleep(0.1)
+        assert [f.energy for f in received] == [0.1, 0.4]
+
+    async def test_unsubscribe(self, hass):
+        """Test unsubscribing cancels pending deliveries."""
+        hass.loop = asyncio.get_running_loop()
+        bus = FeatureBus(hass)
+        received = []
+        unsubscribe = bus.subscribe(AudioFeatures, received.append, max_rate=20)
+
+        bus.publish(_features(0.1))
+        bus.publish(_features(0.2))
+        unsubscribe()
+        await asyncio.sleep(0.1)
+
+        assert len(received) == 1
+        assert bus.subscriber_count(AudioFeatures) == 0
+
+    async def test_listener_errors_are_isolated(self, hass):
+        """Test a failing subscriber does not affect the others."""
+        hass.loop = asyncio.get_running_loop()
+        bus = FeatureBus(hass)
+        received = []
+        bus.subscribe(AudioFeatures, MagicMock(side_effect=RuntimeError))
+        bus.subscribe(AudioFeatures, received.append)
+
+        bus.publish(_features(0.5))
+        assert len(received) == 1
+
+    async def test_summary(self):
+        """Test the summary only contains scalar values."""
+        summary = _features(0.5).summary()
+        assert summary["energy"] == 0.5
+        assert "frequencies" not in summary
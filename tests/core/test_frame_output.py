@@ -0,0 +1,183 @@
+"""Tests for the frame output stage."""
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.aurora_sound_to_light.core.feature_bus import (
+    AudioFeatures,
+)
+from custom_components.aurora_sound_to_light.core.frame_output import (
+    METRIC_LAB,
+    METRIC_RGB,
+    FrameOutput,
+    color_distance,
+    new_frame,
+)
+from custom_components.aurora_sound_to_light.effects import (
+    BassPulseEffect,
+    ColorWaveEffect,
+)
+
+
+@pytest.fixture
+def hass():
+    """Home Assistant fixture."""
+    mock_hass = MagicMock(spec=HomeAssistant)
+    mock_hass.services = MagicMock()
+    mock_hass.services.async_call = AsyncMock()
+    return mock_hass
+
+
+LIGHTS = ["light.a", "light.b", "light.c"]
+
+
+class TestFrameOutput:
+    """Test cases for FrameOutput."""
+
+    def test_identical_lights_share_a_call(self, hass):
+        """Test lights with the same color are grouped into one call."""
+        frame = new_frame(3)
+        frame[:] = [255, 0, 0, 128]
+        commands = FrameOutput(hass, LIGHTS).commands(frame)
+
+        assert commands == [("turn_on", {
+            "entity_id": LIGHTS,
+            "brightness": 128,
+            "rgb_color": [255, 0, 0],
+        })]
+
+    def test_off_and_transition(self, hass):
+        """Test zero brightness turns lights off."""
+        frame = new_frame(3)
+        frame[0] = [0, 255, 0, 255]
+        frame[1] = [0, 0, 255, 0]
+        commands = dict(
+            FrameOutput(hass, LIGHTS, transition=0.5).commands(frame)
+        )
+
+        assert commands["turn_off"] == {"entity_id": ["light.b", "light.c"]}
+        assert commands["turn_on"]["entity_id"] == "light.a"
+        assert commands["turn_on"]["transition"] == 0.5
+
+    def test_wrong_shape(self, hass):
+        """Test frames must match the number of lights."""
+        with pytest.raises(ValueError):
+            FrameOutput(hass, LIGHTS).commands(new_frame(2))
+
+    @pytest.mark.asyncio
+    async def test_async_send(self, hass):
+        """Test frames are sent as light service calls."""
+        frame = new_frame(3)
+        frame[:] = 255
+        await FrameOutput(hass, LIGHTS).async_send(frame)
+        hass.services.async_call.assert_awaited_once()
+
+
+class TestFrameDiffing:
+    """Test cases for deadband frame diffing."""
+
+    @pytest.mark.parametrize("metric,deadband", [
+        (METRIC_LAB, 2.0),
+        (METRIC_RGB, 10.0),
+    ])
+    def test_only_changed_lights(self, hass, metric, deadband):
+        """Test unchanged and barely changed lights are not re-sent."""
+        output = FrameOutput(hass, LIGHTS, deadband=deadband, metric=metric)
+        frame = new_frame(3)
+        frame[:] = [200, 100, 50, 255]
+        assert len(output.commands(frame)) == 1
+        assert output.commands(frame) == []
+
+        frame[0, 0] = 201  # imperceptible
+        frame[1] = [0, 0, 255, 255]
+        commands = output.commands(frame)
+        assert commands == [("turn_on", {
+            "entity_id": "light.b",
+            "brightness": 255,
+            "rgb_color": [0, 0, 255],
+        })]
+
+    def test_small_changes_accumulate(self, hass):
+        """Test slow drifts are sent once they exceed the deadband."""
+        output = FrameOutput(hass, LIGHTS[:1], deadband=2.0)
+        frame = new_frame(1)
+        frame[:] = [100, 100, 100, 255]
+        output.commands(frame)
+
+        sent = 0
+        for red in range(101, 121):
+            frame[0, 0] = red
+            sent += len(output.commands(frame))
+        assert 0 < sent < 20
+
+    def test_switch_off_is_always_sent(self, hass):
+        """Test turning a dark light off is never suppressed."""
+        output = FrameOutput(hass, LIGHTS[:1], deadband=50.0)
+        frame = new_frame(1)
+        frame[:] = [1, 1, 1, 1]
+        output.commands(frame)
+        frame[:] = 0
+        assert output.commands(frame)[0][0] == "turn_off"
+
+    def test_reset(self, hass):
+        """Test reset forces a full update."""
+        output = FrameOutput(hass, LIGHTS, deadband=2.0)
+        frame = new_frame(3)
+        frame[:] = 255
+        output.commands(frame)
+        output.reset()
+        assert len(output.commands(frame)) == 1
+
+    def test_distance_metrics(self):
+        """Test both metrics grow with the color difference."""
+        black = np.array([[0, 0, 0, 255]], dtype=np.float32)
+        grey = np.array([[128, 128, 128, 255]], dtype=np.float32)
+        white = np.array([[255, 255, 255, 255]], dtype=np.float32)
+        for metric in (METRIC_LAB, METRIC_RGB):
+            assert (
+                color_distance(black, grey, metric) <
+                color_distance(black, white, metric)
+            )
+        np.testing.assert_allclose(
+            color_distance(black, white, METRIC_LAB), 100, atol=0.1
+        )
+
+    def test_invalid_metric(self, hass):
+        """Test unknown metrics are rejected."""
+        with pytest.raises(ValueError):
+            FrameOutput(hass, LIGHTS, metric="hsv")
+
+
+class TestRender:
+    """Test cases for vectorized effect rendering."""
+
+    def test_color_wave_render(self, hass):
+        """Test the color wave spreads hues across all lights."""
+        effect = ColorWaveEffect(hass, LIGHTS)
+        frame = effect.render(AudioFeatures.from_levels(), 0.0)
+
+        assert frame.shape == (3, 4)
+        assert frame.dtype == np.float32
+        np.testing.assert_allclose(frame[0], [255, 0, 0, 255], atol=1e-3)
+        assert len({tuple(row) for row in frame}) == 3
+
+    def test_bass_pulse_render(self, hass):
+        """Test bass energy drives the brightness of every light."""
+        effect = BassPulseEffect(hass, LIGHTS)
+        levels = np.zeros(32)
+        levels[:4] = 0.5
+        frame = effect.render(AudioFeatures.from_levels(levels), 0.0)
+
+        np.testing.assert_allclose(frame[:, 3], 127.5)
+        np.testing.assert_allclose(frame[:, :3], [[255, 0, 0]] * 3)
+
+    @pytest.mark.asyncio
+    async def test_update_sends_one_call(self, hass):
+        """Test update() displays a uniform frame with a single call."""
+        effect = BassPulseEffect(hass, LIGHTS)
+        await effect.start()
+        await effect.update([0.5] * 32, False, 120)
+        hass.services.async_call.assert_awaited_once()
@@ -0,0 +1,147 @@
+"""Tests for live parameter updates of running effects."""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.aurora_sound_to_light.core.effect_engine import (
+    EffectEngine,
+)
+from custom_components.aurora_sound_to_light.core.feature_bus import FeatureBus
+from custom_components.aurora_sound_to_light.core.render_loop import (
+    RenderScheduler,
+)
+from custom_components.aurora_sound_to_light.effects_impl import (
+    ColorWaveEffect,
+    StrobeEffect,
+)
+
+LIGHTS = ["light.1", "light.2"]
+
+
+@pytest.fixture
+def hass():
+    """Home Assistant fixture."""
+    mock_hass = MagicMock(spec=HomeAssistant)
+    mock_hass.services = MagicMock()
+    mock_hass.services.async_call = AsyncMock()
+
+    async def run_in_executor(func, *args):
+        return func(*args)
+
+    mock_hass.async_add_executor_job = AsyncMock(side_effect=run_in_executor)
+    return mock_hass
+
+
+@pytest.fixture
+def scheduler(hass):
+    """Render scheduler fixture."""
+    return RenderScheduler(hass, FeatureBus(hass))
+
+
+class TestParamValidation:
+    """Test cases for effect parameter validation."""
+
+    def test_valid(self, hass):
+        """Test valid parameters are coerced."""
+        effect = StrobeEffect(hass, LIGHTS)
+        params = effect.validate_params({"frequency": "4", "color": [1, 2, 3]})
+        assert params["frequency"] == 4.0
+
+    @pytest.mark.parametrize("params", [
+        {"frequency": 0},
+        {"duty_cycle": 2},
+        {"color": [300, 0, 0]},
+        {"brightness": "bright"},
+    ])
+    def test_invalid(self, hass, params):
+        """Test invalid parameters raise ValueError."""
+        with pytest.raises(ValueError):
+            StrobeEffect(hass, LIGHTS).validate_params(params)
+
+    def test_apply_keeps_phase(self, hass):
+        """Test applying parameters keeps the effect's phase."""
+        effect = ColorWaveEffect(hass, LIGHTS, {"speed": 1.0})
+        effect._phase = 1.25
+        effect.apply_params(effect.validate_params({"speed": 3.0}))
+        assert effect._speed == 3.0
+        assert effect._phase == 1.25
+
+
+@pytest.mark.asyncio
+class TestEngineHotUpdate:
+    """Test cases for EffectEngine.update_effect on running effects."""
+
+    async def _start(self, hass, scheduler):
+        """Start a color wave through the engine."""
+        engine = EffectEngine(hass)
+        engine.attach_scheduler(scheduler)
+        await engine.register_effect(
+            "wave",
+            {"type": "color_wave", "params": {"speed": 1.0}}
+        )
+        await engine.start_effect("wave", LIGHTS)
+        return engine, engine._instances["wave"]
+
+    async def test_update_without_restart(self, hass, scheduler):
+        """Test parameters are applied at the next tick, keeping state."""
+        engine, effect = await self._start(hass, scheduler)
+        scheduler.render(0.0)
+        scheduler.render(1.0)
+        phase = effect._phase
+
+        assert await engine.update_effect("wave", {"params": {"speed": 2.0}})
+        assert await engine.update_effect("wave", {"params": {"speed": 3.0}})
+        assert effect._speed == 1.0  # not before the next tick
+
+        scheduler.render(1.0)
+        assert engine._instances["wave"] is effect
+        assert effect._speed == 3.0
+        assert effect._phase == phase
+
+    async def test_partial_update_is_stored_merged(self, hass, scheduler):
+        """Test stored configurations keep parameters not updated."""
+        engine = EffectEngine(hass)
+        engine.attach_scheduler(scheduler)
+        await engine.register_effect(
+            "wave",
+            {"type": "color_wave", "params": {"speed": 1.0, "lut_size": 512}}
+        )
+        await engine.register_effect(
+            "idle",
+            {"type": "color_wave", "params": {"speed": 1.0, "lut_size": 512}}
+        )
+        await engine.start_effect("wave", LIGHTS)
+
+        for effect_id in ("wave", "idle"):
+            assert await engine.update_effect(
+                effect_id, {"params": {"speed": 3.0}}
+            )
+            stored = engine.get_available_effects()[effect_id]["params"]
+            assert stored == {"speed": 3.0, "lut_size": 512}
+        assert engine.get_active_effects()["wave"]["params"] == {
+            "speed": 3.0,
+            "lut_size": 512,
+        }
+
+    async def test_invalid_update_is_rejected(self, hass, scheduler):
+        """Test invalid parameters leave the running effect untouched."""
+        engine, effect = await self._start(hass, scheduler)
+
+        assert not await engine.update_effect(
+            "wave", {"params": {"lut_size": 1}}
+        )
+        scheduler.render(0.0)
+        assert effect.params == {"speed": 1.0}
+        assert engine.get_available_effects()["wave"]["params"] == {
+            "speed": 1.0
+        }
+
+    async def test_layer_update(self, hass, scheduler):
+        """Test layer settings change without a restart."""
+        engine, effect = await self._start(hass, scheduler)
+        assert await engine.update_effect("wave", {"opacity": 0.5})
+        assert scheduler._effects["wave"].opacity == 0.5
+        assert engine._instances["wave"] is effect
@@ -0,0 +1,196 @@
+"""Tests for the light layout and field effects."""
+import math
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.aurora_sound_to_light.core import fields
+from custom_components.aurora_sound_to_light.core.feature_bus import (
+    AudioFeatures,
+    FeatureBus,
+)
+from custom_components.aurora_sound_to_light.core.layout import (
+    LightLayout,
+    linear_positions,
+)
+from custom_components.aurora_sound_to_light.core.render_loop import (
+    RenderScheduler,
+)
+from custom_components.aurora_sound_to_light.effects import (
+    ColorWaveEffect,
+    FieldWaveEffect,
+    RadialPulseEffect,
+    SweepEffect,
+)
+
+LIGHTS = ["light.left", "light.center", "light.right"]
+
+
+@pytest.fixture
+def hass():
+    """Home Assistant fixture."""
+    return MagicMock(spec=HomeAssistant)
+
+
+@pytest.fixture
+def layout(hass):
+    """Layout with three lights on a line and one above."""
+    with patch(
+        "custom_components.aurora_sound_to_light.core.layout.storage.Store"
+    ):
+        layout = LightLayout(hass)
+    layout.set_positions({
+        "light.left": [0.0, 0.0],
+        "light.center": [1.0, 0.0],
+        "light.right": [2.0, 0.0, 0.0],
+        "light.ceiling": [1.0, 1.0, 2.0],
+    })
+    return layout
+
+
+class TestLightLayout:
+    """Test cases for LightLayout."""
+
+    def test_positions(self, layout):
+        """Test positions are gathered into a float32 array."""
+        positions = layout.positions(["light.right", "light.ceiling"])
+        assert positions.dtype == np.float32
+        assert positions.flags.c_contiguous
+        np.testing.assert_array_equal(positions, [[2, 0, 0], [1, 1, 2]])
+        assert layout.positions(["light.right", "light.ceiling"]) is positions
+
+    def test_unknown_lights_fall_back(self, layout):
+        """Test lights without a position sit along the x axis."""
+        positions = layout.positions(["light.unknown", "light.ceiling"])
+        np.testing.assert_array_equal(positions, [[0, 0, 0], [1, 1, 2]])
+
+    def test_update_invalidates(self, layout):
+        """Test changing positions invalidates cached lookups."""
+        before = layout.positions(LIGHTS)
+        layout.set_positions({"light.left": [5, 5, 5]})
+        np.testing.assert_array_equal(layout.positions(LIGHTS)[0], [5, 5, 5])
+        assert before[0, 0] == 0
+
+        layout.remove_light("light.left")
+        np.testing.assert_array_equal(layout.positions(LIGHTS)[0], [0, 0, 0])
+
+    def test_groups(self, layout):
+        """Test groups sit at their centroid unless positioned."""
+        layout.set_group("floor", LIGHTS)
+        np.testing.assert_allclose(layout.group_position("floor"), [1, 0, 0])
+        layout.set_group("floor", LIGHTS, [0, 3])
+        np.testing.assert_allclose(layout.group_position("floor"), [0, 3, 0])
+        with pytest.raises(KeyError):
+            layout.group_position("missing")
+
+    @pytest.mark.parametrize("position", [[1], [1, 2, 3, 4], [0, math.nan]])
+    def test_invalid_position(self, layout, position):
+        """Test invalid positions are rejected."""
+        with pytest.raises(ValueError):
+            layout.set_positions({"light.bad": position})
+
+    @pytest.mark.asyncio
+    async def test_save_and_load(self, hass, layout):
+        """Test the layout round-trips through storage."""
+        layout.set_group("floor", LIGHTS, [1, 2])
+        layout._store.async_save = AsyncMock()
+        await layout.async_save()
+        saved = layout._store.async_save.call_args[0][0]
+
+        with patch(
+            "custom_components.aurora_sound_to_light.core.layout.storage.Store"
+        ):
+            restored = LightLayout(hass)
+        restored._store.async_load = AsyncMock(return_value=saved)
+        await restored.async_load()
+        np.testing.assert_array_equal(
+            restored.positions(LIGHTS),
+            layout.positions(LIGHTS)
+        )
+        np.testing.assert_allclose(restored.group_position("floor"), [1, 2, 0])
+
+
+class TestFields:
+    """Test cases for the field functions."""
+
+    def test_wave(self):
+        """Test a plane wave peaks at its phase."""
+        positions = linear_positions(4)
+        values = fields.wave(positions, [1, 0, 0], 1.0, 0.25)
+        np.testing.assert_allclose(values, [0.5, 1.0, 0.5, 0.0], atol=1e-6)
+
+    def test_rings(self):
+        """Test each light takes its closest ring."""
+        positions = np.array([[1, 0, 0], [3, 0, 0]], dtype=np.float32)
+        values = fields.rings(positions, [0, 0], np.array([1.0, 3.0]), 0.1)
+        np.testing.assert_allclose(values, [1.0, 1.0])
+        assert not fields.rings(positions, [0, 0], np.zeros(0), 0.1).any()
+
+    def test_sweep(self):
+        """Test the beam falls off with the angle."""
+        positions = np.array(
+            [[1, 0, 0], [0, 1, 0], [-1, 0, 0]],
+            dtype=np.float32
+        )
+        values = fields.sweep(positions, [0, 0], 0.0, math.pi)
+        np.testing.assert_allclose(values, [1.0, 0.5, 0.0], atol=1e-6)
+
+
+class TestFieldEffects:
+    """Test cases for effects sampling fields at light positions."""
+
+    def test_scheduler_attaches_layout(self, hass, layout):
+        """Test scheduled effects use the scheduler's layout."""
+        scheduler = RenderScheduler(hass, FeatureBus(hass), layout=layout)
+        effect = SweepEffect(hass, LIGHTS)
+        scheduler.add_effect("sweep", effect)
+        assert effect.layout is layout
+        np.testing.assert_array_equal(
+            effect.positions,
+            layout.positions(LIGHTS)
+        )
+
+    def test_color_wave_unchanged_without_layout(self, hass):
+        """Test index-based effects keep their spread without a layout."""
+        effect = ColorWaveEffect(hass, LIGHTS)
+        np.testing.assert_allclose(effect.positions[:, 0], [0, 1 / 3, 2 / 3])
+
+    def test_field_wave(self, hass, layout):
+        """Test the wave colors lights by their position."""
+        effect = FieldWaveEffect(hass, LIGHTS, {"wavelength": 2.0})
+        effect.layout = layout
+        frame = effect.render(AudioFeatures.from_levels(), 0.0)
+        assert frame.shape == (3, 4)
+        np.testing.assert_allclose(frame[0, :3], frame[2, :3])
+        assert not np.allclose(frame[0, :3], frame[1, :3])
+
+    def test_radial_pulse(self, hass, layout):
+        """Test a beat sends a ring outwards from the center."""
+        effect = RadialPulseEffect(
+            hass, LIGHTS, {"center": [0, 0], "speed": 1.0, "width": 0.1}
+        )
+        effect.layout = layout
+        features = AudioFeatures.from_levels()
+        effect.render(AudioFeatures.from_levels(beat=True), 10.0)
+
+        frame = effect.render(features, 11.0)
+        assert np.argmax(frame[:, 3]) == 1
+        frame = effect.render(features, 12.0)
+        assert np.argmax(frame[:, 3]) == 2
+        effect.render(features, 100.0)
+        assert not len(effect._ages)
+
+    def test_sweep_rotates(self, hass, layout):
+        """Test the beam turns with time."""
+        effect = SweepEffect(
+            hass, LIGHTS, {"center": [1, 1], "speed": 0.25, "width": 30}
+        )
+        effect.layout = layout
+        features = AudioFeatures.from_levels()
+        effect.render(features, 0.0)
+        # Three quarters of a turn point the beam along -y
+        frame = effect.render(features, 3.0)
+        assert np.argmax(frame[:, 3]) == 1
@@ -0,0 +1,83 @@
+"""Tests for the K-weighted loudness meter."""
+import numpy as np
+import pytest
+
+from custom_components.aurora_sound_to_light.core.loudness import (
+    LOUDNESS_FLOOR,
+    LoudnessMeter,
+    k_weighting,
+)
+
+SAMPLE_RATE = 44100
+CHUNK_SIZE = 2048
+
+
+def _feed(meter, amplitude, freq=997, frames=80):
+    """Feed a sine tone through the meter."""
+    window = np.hanning(CHUNK_SIZE)
+    for i in range(frames):
+        t = (np.arange(CHUNK_SIZE) + i * CHUNK_SIZE) / SAMPLE_RATE
+        signal = amplitude * np.sin(2 * np.pi * freq * t)
+        meter.process(np.abs(np.fft.rfft(signal * window)))
+
+
+class TestKWeighting:
+    """Test cases for the K-weighting response."""
+
+    def test_response_shape(self):
+        """Test low frequencies are cut and highs are boosted."""
+        gains = 10 * np.log10(k_weighting(np.array([20, 1000, 10000]), 48000))
+        assert gains[0] < -10
+        assert abs(gains[1]) < 1
+        assert gains[2] == pytest.approx(4.0, abs=0.1)
+
+
+class TestLoudnessMeter:
+    """Test cases for LoudnessMeter."""
+
+    def test_silence(self):
+        """Test silence reads as the loudness floor."""
+        meter = LoudnessMeter(SAMPLE_RATE, CHUNK_SIZE)
+        meter.process(np.zeros(meter.num_bins))
+        assert meter.momentary == LOUDNESS_FLOOR
+        assert meter.short_term == LOUDNESS_FLOOR
+
+    def test_full_scale_sine(self):
+        """Test a full scale 1 kHz sine reads close to -3 LUFS."""
+        meter = LoudnessMeter(SAMPLE_RATE, CHUNK_SIZE)
+        _feed(meter, 1.0)
+        assert meter.momentary == pytest.approx(-3.0, abs=0.5)
+        assert meter.short_term == pytest.approx(-3.0, abs=0.5)
+
+    def test_level_is_absolute(self):
+        """Test a 20 dB quieter signal reads 20 LU lower."""
+        loud = LoudnessMeter(SAMPLE_RATE, CHUNK_SIZE)
+        quiet = LoudnessMeter(SAMPLE_RATE, CHUNK_SIZE)
+        _feed(loud, 1.0)
+        _feed(quiet, 0.1)
+        assert loud.short_term - quiet.short_term == pytest.approx(20.0, abs=0.1)
+
+    def test_momentary_reacts_faster(self):
+        """Test momentary loudness follows a level change before short-term."""
+        meter = LoudnessMeter(SAMPLE_RATE, CHUNK_SIZE)
+        _feed(meter, 0.01)
+        _feed(meter, 1.0, frames=10)
+        assert meter.momentary > meter.short_term
+
+    def test_stereo_sums_channels(self):
+        """Test two identical channels read 3 LU louder than one."""
+        mono = LoudnessMeter(SAMPLE_RATE, CHUNK_SIZE)
+        stereo = LoudnessMeter(SAMPLE_RATE, CHUNK_SIZE)
+        spectrum = np.abs(np.fft.rfft(np.hanning(CHUNK_SIZE) * np.sin(
+            2 * np.pi * 997 * np.arange(CHUNK_SIZE) / SAMPLE_RATE
+        )))
+        mono.process(spectrum)
+        stereo.process(np.stack([spectrum, spectrum]))
+        assert stereo.momentary - mono.momentary == pytest.approx(3.01, abs=0.05)
+
+    def test_reset(self):
+        """Test reset returns to the floor."""
+        meter = LoudnessMeter(SAMPLE_RATE, CHUNK_SIZE)
+        _feed(meter, 1.0, frames=5)
+        meter.reset()
+        assert meter.short_term == LOUDNESS_FLOOR
@@ -0,0 +1,152 @@
+"""Tests for the particle system and particle effects."""
+import time
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.aurora_sound_to_light.core import particles
+from custom_components.aurora_sound_to_light.core.feature_bus import (
+    AudioFeatures,
+)
+from custom_components.aurora_sound_to_light.core.frame_output import (
+    new_frame,
+)
+from custom_components.aurora_sound_to_light.core.particles import (
+    ParticleSystem,
+)
+from custom_components.aurora_sound_to_light.effects import (
+    CometsEffect,
+    SparksEffect,
+)
+
+LIGHTS = [f"light.{i}" for i in range(8)]
+
+
+@pytest.fixture
+def hass():
+    """Home Assistant fixture."""
+    return MagicMock(spec=HomeAssistant)
+
+
+class TestParticleSystem:
+    """Test cases for ParticleSystem."""
+
+    def test_spawn_broadcasts(self):
+        """Test a block of particles is written at once."""
+        system = ParticleSystem(capacity=10)
+        assert system.spawn([0, 0, 0], np.ones((4, 3)), [255, 0, 0], 1.0) == 4
+        assert len(system) == 4
+        np.testing.assert_array_equal(system.color[:4], [[255, 0, 0]] * 4)
+        assert system.spawn([0, 0, 0], 0.0, [0, 0, 0], np.ones(20)) == 6
+        assert system.spawn([0, 0, 0], 0.0, [0, 0, 0], 1.0) == 0
+
+    def test_step_and_cull(self):
+        """Test particles move and expired ones are compacted away."""
+        system = ParticleSystem(drag=0.0)
+        system.spawn(
+            [0, 0, 0],
+            [[1, 0, 0], [0, 1, 0], [0, 0, 1]],
+            [[1, 0, 0], [0, 1, 0], [0, 0, 1]],
+            [1.0, 0.2, 2.0]
+        )
+        system.step(0.5)
+        assert len(system) == 2
+        np.testing.assert_allclose(
+            system.position[:2],
+            [[0.5, 0, 0], [0, 0, 0.5]]
+        )
+        np.testing.assert_allclose(system.color[:2], [[1, 0, 0], [0, 0, 1]])
+        np.testing.assert_allclose(system.intensity(), [0.5, 0.75])
+
+    def test_rasterize(self):
+        """Test particles light nearby targets only."""
+        system = ParticleSystem()
+        system.spawn([[0, 0, 0], [1, 0, 0]], 0.0, [255, 0, 0], 1.0)
+        targets = np.array(
+            [[0, 0, 0], [0.25, 0, 0], [3, 0, 0]],
+            dtype=np.float32
+        )
+        frame = new_frame(3)
+        system.rasterize(targets, 0.5, frame)
+        np.testing.assert_allclose(frame[0], [255, 0, 0, 255])
+        np.testing.assert_allclose(frame[1], [255, 0, 0, 127.5])
+        np.testing.assert_allclose(frame[2], [0, 0, 0, 0])
+
+    def test_grid_matches_dense(self, monkeypatch):
+        """Test the grid splat gives the same light as the dense one."""
+        rng = np.random.default_rng(1)
+        system = ParticleSystem()
+        system.spawn(rng.random((500, 3)), 0.0, rng.random((500, 3)) * 255, 1)
+        targets = rng.random((400, 3)).astype(np.float32)
+
+        dense, grid = new_frame(400), new_frame(400)
+        system.rasterize(targets, 0.1, dense)
+        monkeypatch.setattr(particles, "DENSE_SPLAT_LIMIT", 0)
+        system.rasterize(targets, 0.1, grid)
+        np.testing.assert_allclose(grid, dense, atol=0.05)
+
+    def test_thousands_of_particles(self):
+        """Test thousands of particles stay cheap per frame."""
+        rng = np.random.default_rng(2)
+        system = ParticleSystem()
+        system.spawn(rng.random((4000, 3)), rng.normal(size=(4000, 3)),
+                     [255, 128, 0], 10.0)
+        targets = rng.random((30, 3)).astype(np.float32)
+        frame = new_frame(30)
+
+        start = time.perf_counter()
+        for _ in range(20):
+            system.step(0.001)
+            system.rasterize(targets, 0.2, frame)
+        assert (time.perf_counter() - start) / 20 < 0.005
+
+
+class TestParticleEffects:
+    """Test cases for the particle effects."""
+
+    def test_sparks_on_kick(self, hass):
+        """Test a beat emits sparks that fade out."""
+        effect = SparksEffect(hass, LIGHTS, {"origin": [0.5, 0], "count": 20})
+        quiet = AudioFeatures.from_levels([0.0] * 6)
+        kick = AudioFeatures.from_levels([1.0, 1.0, 0, 0, 0, 0], beat=True)
+
+        assert not effect.render(quiet, 0.0)[:, 3].any()
+        frame = effect.render(kick, 0.1)
+        assert len(effect.particles) == 30
+        assert frame[4, 3] > 0
+        effect.render(quiet, 5.0)
+        assert len(effect.particles) == 0
+
+    def test_comets_on_snare(self, hass):
+        """Test a rise in the highs launches a comet with a tail."""
+        effect = CometsEffect(hass, LIGHTS, {"origin": [0.5, 0]})
+        effect._rng = np.random.default_rng(0)  # jitter may miss the lights
+        effect.render(AudioFeatures.from_levels([0.0] * 6), 0.0)
+        effect.render(AudioFeatures.from_levels([0, 0, 0, 0, 1, 1]), 0.1)
+        assert len(effect.heads) == 1
+
+        for step in range(2, 6):
+            frame = effect.render(
+                AudioFeatures.from_levels([0, 0, 0, 0, 1, 1]),
+                step * 0.1
+            )
+        assert len(effect.heads) == 1
+        assert len(effect.particles) >= 4
+        assert frame[:, 3].any()
+
+    def test_pixels(self, hass):
+        """Test particles also render onto pixel positions."""
+        effect = SparksEffect(hass, LIGHTS)
+        positions = np.zeros((1000, 3), dtype=np.float32)
+        positions[:, 0] = np.linspace(0, 1, 1000)
+        positions[:, 1] = 0.5
+        frame = effect.render_pixels(
+            AudioFeatures.from_levels([1.0] * 6, beat=True),
+            0.0,
+            positions
+        )
+        assert frame.shape == (1000, 4)
+        assert frame[:, 3].any()
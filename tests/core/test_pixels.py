@@ -0,0 +1,194 @@
+"""Tests for addressable pixel strips."""
+import socket
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.aurora_sound_to_light.core import pixels
+from custom_components.aurora_sound_to_light.core.feature_bus import FeatureBus
+from custom_components.aurora_sound_to_light.core.frame_output import (
+    new_frame,
+)
+from custom_components.aurora_sound_to_light.core.pixels import (
+    DNRGB_MAX_PIXELS,
+    PROTOCOL_DNRGB,
+    PixelBuffer,
+    PixelOutput,
+    PixelStrip,
+    encode_dnrgb,
+)
+from custom_components.aurora_sound_to_light.core.render_loop import (
+    RenderScheduler,
+)
+from custom_components.aurora_sound_to_light.effects import (
+    ColorWaveEffect,
+    SweepEffect,
+)
+
+STRIPS = [
+    PixelStrip("desk", "10.0.0.2", 300),
+    PixelStrip("shelf", "10.0.0.3", 600, start=(0, 2), end=(0, 4)),
+]
+
+
+@pytest.fixture
+def hass():
+    """Home Assistant fixture."""
+    return MagicMock(spec=HomeAssistant)
+
+
+class TestPixelBuffer:
+    """Test cases for PixelBuffer."""
+
+    def test_segments_are_views(self):
+        """Test strips are slices of one contiguous array."""
+        buffer = PixelBuffer(STRIPS)
+        assert len(buffer) == 900
+        assert buffer.data.dtype == np.uint8
+        buffer.segment("shelf")[:] = 7
+        assert (buffer.data[300:] == 7).all()
+        assert not buffer.data[:300].any()
+
+    def test_positions(self):
+        """Test pixels are spread between the strip's ends."""
+        buffer = PixelBuffer(STRIPS)
+        np.testing.assert_allclose(buffer.positions[0], [0, 0, 0])
+        np.testing.assert_allclose(buffer.positions[299], [1, 0, 0])
+        np.testing.assert_allclose(buffer.positions[300], [0, 2, 0])
+        np.testing.assert_allclose(buffer.positions[-1], [0, 4, 0])
+
+    def test_load_frame(self):
+        """Test brightness scales the colors into uint8 pixels."""
+        buffer = PixelBuffer([PixelStrip("a", "host", 2)])
+        frame = new_frame(2)
+        frame[0] = [255, 100, 0, 127.5]
+        frame[1] = [300, 0, 0, 255]
+        buffer.load_frame(frame)
+        np.testing.assert_array_equal(buffer.data, [[127, 50, 0], [255, 0, 0]])
+
+    def test_invalid(self):
+        """Test invalid strips are rejected."""
+        with pytest.raises(ValueError):
+            PixelStrip("a", "host", 0)
+        with pytest.raises(ValueError):
+            PixelBuffer([PixelStrip("a", "h", 1), PixelStrip("a", "h", 1)])
+
+
+def test_encode_dnrgb():
+    """Test long strips are split into indexed packets."""
+    data = np.arange(600 * 3, dtype=np.uint32).astype(np.uint8).reshape(-1, 3)
+    packets = encode_dnrgb(data, timeout=5)
+    assert len(packets) == 2
+    assert packets[0][:4] == bytes([PROTOCOL_DNRGB, 5, 0, 0])
+    assert len(packets[0]) == 4 + DNRGB_MAX_PIXELS * 3
+    assert packets[1][:4] == bytes([PROTOCOL_DNRGB, 5, 1, 233])
+    assert packets[1][4:] == data[DNRGB_MAX_PIXELS:].tobytes()
+
+
+def _mock_loop(hass, resolved=None):
+    """Give hass a loop that resolves hosts and opens a mock socket."""
+    resolved = resolved or {}
+
+    async def getaddrinfo(host, port, **kwargs):
+        if host not in resolved:
+            raise socket.gaierror(host)
+        return [(
+            socket.AF_INET, socket.SOCK_DGRAM, 17, "", (resolved[host], port)
+        )]
+
+    hass.loop = MagicMock()
+    hass.loop.getaddrinfo = AsyncMock(side_effect=getaddrinfo)
+    hass.loop.create_datagram_endpoint = AsyncMock(
+        return_value=(MagicMock(), None)
+    )
+
+
+@pytest.mark.asyncio
+class TestPixelOutput:
+    """Test cases for PixelOutput."""
+
+    async def test_skips_unchanged_strips(self, hass):
+        """Test only changed strips are re-sent until the keepalive."""
+        buffer = PixelBuffer(STRIPS)
+        output = PixelOutput(hass, buffer)
+        _mock_loop(hass, {"10.0.0.2": "10.0.0.2", "10.0.0.3": "10.0.0.3"})
+        await output.async_start()
+
+        output.send()
+        assert output._transport.sendto.call_count == 3
+        calls = output._transport.sendto.call_args_list
+        hosts = {call[0][1][0] for call in calls}
+        assert hosts == {"10.0.0.2", "10.0.0.3"}
+
+        output._transport.reset_mock()
+        buffer.segment("desk")[0] = 255
+        output.send()
+        output._transport.sendto.assert_called_once()
+
+        output._transport.reset_mock()
+        with patch.object(
+            pixels.time,
+            "monotonic",
+            return_value=time.monotonic() + 5
+        ):
+            output.send()
+        assert output._transport.sendto.call_count == 3
+
+    async def test_hosts_resolved_once(self, hass):
+        """Test hostnames are resolved on start, not for every packet."""
+        buffer = PixelBuffer([
+            PixelStrip("desk", "wled-desk.local", 10),
+            PixelStrip("gone", "wled-gone.local", 10),
+        ])
+        output = PixelOutput(hass, buffer)
+        _mock_loop(hass, {"wled-desk.local": "10.0.0.7"})
+        await output.async_start()
+
+        for value in (1, 2):
+            buffer.segment("desk")[0] = value
+            output.send()
+        assert hass.loop.getaddrinfo.await_count == 2
+        calls = output._transport.sendto.call_args_list
+        assert [call[0][1] for call in calls] == [
+            ("10.0.0.7", pixels.WLED_UDP_PORT)
+        ] * 2
+
+
+@pytest.mark.asyncio
+class TestSchedulerPixels:
+    """Test cases for rendering pixel strips in the render loop."""
+
+    async def test_render_pixels(self, hass):
+        """Test field effects are sampled at every pixel."""
+        scheduler = RenderScheduler(hass, FeatureBus(hass))
+        with patch.object(PixelOutput, "async_start", AsyncMock()):
+            await scheduler.async_set_strips(
+                [PixelStrip(f"strip{i}", "host", 300) for i in range(100)]
+            )
+        scheduler.add_effect(
+            "sweep",
+            SweepEffect(hass, ["light.1"], {"center": [0.5, 50]})
+        )
+        scheduler.add_effect("wave", ColorWaveEffect(hass, ["light.1"]))
+        await scheduler._effects["sweep"].effect.start()
+        await scheduler._effects["wave"].effect.start()
+
+        scheduler.render(1.0)
+        start = time.perf_counter()
+        data = scheduler.render_pixels(1.0)
+        elapsed = time.perf_counter() - start
+
+        assert data.shape == (30000, 3)
+        assert data.any()
+        assert elapsed < 0.1
+
+    async def test_no_strips(self, hass):
+        """Test nothing is rendered without strips."""
+        scheduler = RenderScheduler(hass, FeatureBus(hass))
+        assert scheduler.render_pixels(0.0) is None
+        await scheduler.async_set_strips([])
+        assert scheduler.pixels is None
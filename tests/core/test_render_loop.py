@@ -0,0 +1,194 @@
+"""Tests for the central render loop."""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.aurora_sound_to_light.core.effect_engine import (
+    EffectEngine,
+)
+from custom_components.aurora_sound_to_light.core.feature_bus import (
+    AudioFeatures,
+    FeatureBus,
+)
+from custom_components.aurora_sound_to_light.core.frame_output import (
+    new_frame,
+)
+from custom_components.aurora_sound_to_light.core.render_loop import (
+    RenderScheduler,
+)
+from custom_components.aurora_sound_to_light.effects_impl import StrobeEffect
+
+
+class SolidEffect:
+    """Minimal renderable effect."""
+
+    def __init__(self, lights, value):
+        """Initialize the effect."""
+        self.lights = lights
+        self.value = value
+        self.is_running = True
+        self.calls = []
+
+    def render(self, features, t):
+        """Render a solid frame."""
+        self.calls.append(t)
+        frame = new_frame(len(self.lights))
+        frame[:] = self.value
+        return frame
+
+
+@pytest.fixture
+def hass():
+    """Home Assistant fixture."""
+    mock_hass = MagicMock(spec=HomeAssistant)
+    mock_hass.services = MagicMock()
+    mock_hass.services.async_call = AsyncMock()
+    mock_hass.async_create_task = MagicMock(
+        side_effect=lambda coro: asyncio.get_running_loop().create_task(coro)
+    )
+
+    async def run_in_executor(func, *args):
+        return func(*args)
+
+    mock_hass.async_add_executor_job = AsyncMock(side_effect=run_in_executor)
+    return mock_hass
+
+
+@pytest.fixture
+def scheduler(hass):
+    """Render scheduler fixture."""
+    return RenderScheduler(hass, FeatureBus(hass))
+
+
+class TestRenderScheduler:
+    """Test cases for RenderScheduler."""
+
+    def test_combined_frame(self, scheduler):
+        """Test effect frames are placed into one frame over all lights."""
+        scheduler.add_effect("a", SolidEffect(["light.1", "light.2"], 10))
+        scheduler.add_effect("b", SolidEffect(["light.2", "light.3"], 20))
+
+        frame = scheduler.render(1.0)
+        assert scheduler.lights == ["light.1", "light.2", "light.3"]
+        np.testing.assert_array_equal(frame[:, 0], [10, 20, 20])
+
+    def test_real_time(self, scheduler):
+        """Test effects receive the tick time."""
+        effect = SolidEffect(["light.1"], 1)
+        scheduler.add_effect("a", effect)
+        scheduler.render(1.0)
+        scheduler.render(1.5)
+        assert effect.calls == [1.0, 1.5]
+
+    def test_over_budget_skips_frames(self, scheduler):
+        """Test an effect over its budget reuses its last frame."""
+        effect = SolidEffect(["light.1"], 1)
+        scheduler.add_effect("slow", effect, budget=0.01)
+
+        clock = iter([0.0, 0.035])
+        with patch(
+            "custom_components.aurora_sound_to_light.core.render_loop."
+            "time.perf_counter",
+            side_effect=lambda: next(clock)
+        ):
+            scheduler.render(0.0)
+        for tick in range(3):
+            frame = scheduler.render(0.1 * (tick + 1))
+
+        assert effect.calls == [0.0]
+        assert frame[0, 0] == 1
+        stats = scheduler.get_stats()["effects"]["slow"]
+        assert stats["overruns"] == 1
+        assert stats["skipped"] == 3
+
+    def test_render_error_keeps_last_frame(self, scheduler):
+        """Test a failing effect does not break the combined frame."""
+        effect = SolidEffect(["light.1"], 5)
+        scheduler.add_effect("a", effect)
+        scheduler.render(0.0)
+        effect.render = MagicMock(side_effect=RuntimeError)
+        assert scheduler.render(0.1)[0, 0] == 5
+
+    def test_stopped_effects_are_skipped(self, scheduler):
+        """Test effects that are not running are not rendered."""
+        effect = SolidEffect(["light.1"], 5)
+        effect.is_running = False
+        scheduler.add_effect("a", effect)
+        assert scheduler.render(0.0)[0, 0] == 0
+
+    def test_strobe_uses_real_time(self, hass):
+        """Test the strobe follows elapsed time instead of update counts."""
+        effect = StrobeEffect(hass, ["light.1"], {
+            "frequency": 2.0, "duty_cycle": 0.5,
+        })
+        features = AudioFeatures.from_levels()
+        assert effect.render(features, 10.1)[0, 3] > 0
+        assert effect.render(features, 10.3)[0, 3] == 0
+
+    def test_beat_reaches_one_frame(self, hass):
+        """Test a published beat is passed on with one frame only."""
+        feature_bus = FeatureBus(hass)
+        scheduler = RenderScheduler(hass, feature_bus)
+        effect = SolidEffect(["light.1"], 255)
+        beats = []
+        effect.render = lambda features, t: (
+            beats.append(features.beat) or new_frame(1)
+        )
+        scheduler.add_effect("a", effect)
+
+        feature_bus.publish(AudioFeatures.from_levels(beat=True))
+        for t in (0.0, 0.0, 1 / 30, 2 / 30):
+            scheduler.render(t)
+        feature_bus.publish(AudioFeatures.from_levels(beat=True))
+        scheduler.render(3 / 30)
+
+        assert beats == [True, True, False, False, True]
+
+    @pytest.mark.asyncio
+    async def test_loop_sends_frames(self, hass, scheduler):
+        """Test the loop renders and sends frames until stopped."""
+        scheduler.add_effect("a", SolidEffect(["light.1"], 255))
+        await scheduler.start()
+        await asyncio.sleep(0.1)
+        await scheduler.stop()
+
+        # The unchanged frame is only sent once
+        assert scheduler.frames_rendered >= 2
+        hass.services.async_call.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+class TestEngineScheduling:
+    """Test cases for scheduling effects from the effect engine."""
+
+    async def test_start_and_stop_effect(self, hass, scheduler):
+        """Test started effects are rendered and stopped ones removed."""
+        engine = EffectEngine(hass)
+        engine.attach_scheduler(scheduler)
+        await engine.register_effect("pulse", {"type": "bass_pulse"})
+
+        await engine.start_effect("pulse", ["light.1", "light.2"])
+        assert scheduler.lights == ["light.1", "light.2"]
+        assert scheduler.render(0.0).shape == (2, 4)
+
+        await engine.stop_effect("pulse")
+        assert scheduler.lights == []
+
+    async def test_restart_stops_previous_instance(self, hass, scheduler):
+        """Test starting a running effect again stops the old instance."""
+        engine = EffectEngine(hass)
+        engine.attach_scheduler(scheduler)
+        await engine.register_effect("pulse", {"type": "bass_pulse"})
+
+        await engine.start_effect("pulse", ["light.1"])
+        first = engine._instances["pulse"]
+        await engine.start_effect("pulse", ["light.1", "light.2"])
+
+        assert not first.is_running
+        assert engine._instances["pulse"] is not first
+        assert engine._instances["pulse"].is_running
+        assert scheduler.lights == ["light.1", "light.2"]
@@ -0,0 +1,204 @@
+"""Tests for out-of-process user effects."""
+import asyncio
+import time
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.aurora_sound_to_light.core.effect_engine import (
+    EffectEngine,
+)
+from custom_components.aurora_sound_to_light.core.feature_bus import (
+    AudioFeatures,
+    FeatureBus,
+)
+from custom_components.aurora_sound_to_light.core.render_loop import (
+    RenderScheduler,
+)
+from custom_components.aurora_sound_to_light.core.sandbox import (
+    SandboxedEffect,
+    check_effect_code,
+)
+
+LIGHTS = ["light.1", "light.2"]
+
+BLUE_CODE = """
+def render(features, t, params, frame):
+    frame[:, 2] = 255
+    frame[:, 3] = 255
+"""
+
+GRADIENT_CODE = """
+def render(features, t, params, frame):
+    frame[:, 0] = params.get("red", 0)
+    frame[:, 3] = 255 * features["bass"]
+"""
+
+SLOW_CODE = """
+def render(features, t, params, frame):
+    while True:
+        pass
+"""
+
+SAVING_CODE = """
+def render(features, t, params, frame):
+    np.save("/tmp/aurora_effect", frame)
+"""
+
+FAILING_CODE = """
+def render(features, t, params, frame):
+    return open("/etc/passwd")
+"""
+
+
+@pytest.fixture
+def hass():
+    """Home Assistant fixture running executor jobs in threads."""
+    mock_hass = MagicMock(spec=HomeAssistant)
+    mock_hass.async_add_executor_job = (
+        lambda target, *args: asyncio.get_running_loop().run_in_executor(
+            None, target, *args
+        )
+    )
+    return mock_hass
+
+
+async def _render_until(effect, predicate, timeout=20.0):
+    """Render ticks until the predicate holds for the returned frame."""
+    features = AudioFeatures.from_levels([1.0, 1.0, 1.0])
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        frame = effect.render(features, time.monotonic())
+        if predicate(frame):
+            return frame
+        await asyncio.sleep(0.01)
+    raise AssertionError("Condition not reached")
+
+
+def test_check_effect_code():
+    """Test code must parse and define render."""
+    check_effect_code(GRADIENT_CODE)
+    with pytest.raises(ValueError):
+        check_effect_code("def render(:")
+    with pytest.raises(ValueError):
+        check_effect_code("x = 1")
+
+
+@pytest.mark.parametrize("body", [
+    "().__class__.__base__.__subclasses__()",
+    "__import__('os')",
+    "frame.tofile('/tmp/out')",
+    "features.f_globals",
+    "np._core",
+])
+def test_check_effect_code_rejects_internals(body):
+    """Test code reaching the interpreter's internals is rejected."""
+    with pytest.raises(ValueError):
+        check_effect_code(
+            f"def render(features, t, params, frame):\n    {body}\n"
+        )
+
+
+@pytest.mark.asyncio
+class TestSandboxedEffect:
+    """Test cases for SandboxedEffect."""
+
+    async def test_renders_in_worker(self, hass):
+        """Test frames rendered by the worker come back via shared memory."""
+        effect = SandboxedEffect(hass, LIGHTS, {"red": 200}, GRADIENT_CODE)
+        await effect.start()
+        try:
+            frame = await _render_until(effect, lambda f: f[0, 3] > 0)
+            np.testing.assert_allclose(frame[:, 0], 200)
+            np.testing.assert_allclose(frame[:, 3], 255)
+        finally:
+            await effect.stop()
+        assert effect._worker is None
+
+    async def test_render_never_blocks(self, hass):
+        """Test a looping worker does not stall render and is disabled."""
+        effect = SandboxedEffect(
+            hass, LIGHTS, code=SLOW_CODE,
+            budget=0.01, max_overruns=2, max_restarts=1
+        )
+        await effect.start()
+        features = AudioFeatures.from_levels()
+        try:
+            deadline = time.monotonic() + 30
+            while not effect.disabled and time.monotonic() < deadline:
+                start = time.perf_counter()
+                frame = effect.render(features, time.monotonic())
+                assert time.perf_counter() - start < 0.05
+                await asyncio.sleep(0.01)
+            assert effect.disabled
+            assert effect.restarts == 1
+            assert effect.overruns >= 4
+            assert not frame.any()
+        finally:
+            await effect.stop()
+
+    async def test_errors_restart(self, hass):
+        """Test exceptions in user code restart the worker."""
+        effect = SandboxedEffect(
+            hass, LIGHTS, code=FAILING_CODE, max_restarts=0
+        )
+        await effect.start()
+        try:
+            await _render_until(effect, lambda f: effect.disabled)
+        finally:
+            await effect.stop()
+
+    async def test_numpy_file_access_unavailable(self, hass):
+        """Test user code only gets numpy functions without file access."""
+        effect = SandboxedEffect(
+            hass, LIGHTS, code=SAVING_CODE, max_restarts=0
+        )
+        await effect.start()
+        try:
+            await _render_until(effect, lambda f: effect.disabled)
+        finally:
+            await effect.stop()
+
+
+@pytest.mark.asyncio
+async def test_engine_create_effect(hass):
+    """Test the engine registers custom code as a sandboxed effect."""
+    engine = EffectEngine(hass)
+    effect_id = await engine.create_effect("My Effect", GRADIENT_CODE, {})
+    assert effect_id == "my_effect"
+    assert engine.get_available_effects()[effect_id]["code"] == GRADIENT_CODE
+
+    instance = await engine._create_instance(
+        effect_id,
+        engine.get_available_effects()[effect_id],
+        LIGHTS
+    )
+    assert isinstance(instance, SandboxedEffect)
+
+    with pytest.raises(ValueError):
+        await engine.create_effect("Bad", "x = 1", {})
+
+
+@pytest.mark.asyncio
+async def test_engine_update_code_restarts_worker(hass):
+    """Test new code for a running custom effect replaces its worker."""
+    engine = EffectEngine(hass)
+    engine.attach_scheduler(RenderScheduler(hass, FeatureBus(hass)))
+    effect_id = await engine.create_effect("My Effect", GRADIENT_CODE, {})
+    assert await engine.start_effect(effect_id, LIGHTS)
+    old = engine._instances[effect_id]
+    try:
+        await _render_until(old, lambda f: f[0, 3] > 0)
+
+        assert await engine.update_effect(effect_id, {"code": BLUE_CODE})
+        new = engine._instances[effect_id]
+        assert new is not old
+        assert old._worker is None
+        frame = await _render_until(new, lambda f: f[0, 2] > 0)
+        np.testing.assert_allclose(frame[:, 2], 255)
+        assert engine._active_effects[effect_id]["code"] == BLUE_CODE
+    finally:
+        await engine.cleanup()
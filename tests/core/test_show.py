@@ -0,0 +1,197 @@
+"""Tests for show recording and replay."""
+import asyncio
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+import pytest
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.aurora_sound_to_light.core.frame_output import (
+    new_frame,
+)
+from custom_components.aurora_sound_to_light.core.show import (
+    KEYFRAME_INTERVAL,
+    Show,
+    ShowCursor,
+    ShowManager,
+    ShowPlayer,
+    ShowRecorder,
+    media_position,
+)
+
+LIGHTS = ["light.a", "light.b", "light.c"]
+
+
+def solid(value, count=3):
+    """Return a frame with every channel of every light at a value."""
+    frame = new_frame(count)
+    frame[:] = value
+    return frame
+
+
+@pytest.fixture
+def hass(tmp_path):
+    """Home Assistant fixture."""
+    mock_hass = MagicMock(spec=HomeAssistant)
+    mock_hass.services = MagicMock()
+    mock_hass.services.async_call = AsyncMock()
+    mock_hass.config = MagicMock()
+    mock_hass.config.path = MagicMock(
+        side_effect=lambda *parts: str(tmp_path.joinpath(*parts))
+    )
+    mock_hass.async_create_task = MagicMock(
+        side_effect=lambda coro: asyncio.get_running_loop().create_task(coro)
+    )
+
+    async def run_in_executor(func, *args):
+        return func(*args)
+
+    mock_hass.async_add_executor_job = AsyncMock(side_effect=run_in_executor)
+    return mock_hass
+
+
+def record_ramp(frames=100, interval=0.1):
+    """Record a show where light.a ramps and the others stay put."""
+    recorder = ShowRecorder(metadata={"frame_rate": 10})
+    for step in range(frames):
+        frame = solid(50)
+        frame[0] = step
+        recorder.record(step * interval, frame, LIGHTS)
+    return recorder
+
+
+class TestShowRecording:
+    """Test cases for recording and encoding shows."""
+
+    def test_only_changes_are_stored(self):
+        """Test unchanged lights cost nothing between keyframes."""
+        show = record_ramp().to_show()
+        assert len(show) == 100
+        assert show.counts[0] == 3
+        assert show.counts[1] == 1
+        # 10 s at 0.1 s steps with a keyframe every 5 s
+        assert len(show.keyframes) == int(10 / KEYFRAME_INTERVAL)
+
+    def test_round_trip(self, tmp_path):
+        """Test a saved show loads back identically."""
+        show = record_ramp().to_show()
+        path = str(tmp_path / "shows" / "ramp.show")
+        show.save(path)
+        loaded = Show.load(path)
+        assert loaded.lights == LIGHTS
+        assert loaded.metadata == {"frame_rate": 10}
+        np.testing.assert_allclose(loaded.times, show.times)
+        assert loaded.body == show.body
+        assert len(show.to_bytes()) < len(show.body)
+
+    def test_rejects_other_files(self):
+        """Test loading garbage fails cleanly."""
+        with pytest.raises(ValueError):
+            Show.from_bytes(b"NOTSHOW" + bytes(16))
+
+    def test_new_lights_and_stalled_time(self):
+        """Test lights may join mid-show and time must move forward."""
+        recorder = ShowRecorder(position=iter([1.0, 1.0, 2.0]).__next__)
+        recorder.record(0.0, solid(10, 1), ["light.a"])
+        recorder.record(0.1, solid(20, 1), ["light.a"])
+        recorder.record(0.2, solid(30, 2), ["light.b", "light.a"])
+        show = recorder.to_show()
+        assert show.lights == ["light.a", "light.b"]
+        assert show.times.tolist() == [1.0, 2.0]
+        assert ShowCursor(show).seek(2.0).tolist() == [[30] * 4, [30] * 4]
+
+
+class TestShowPlayback:
+    """Test cases for replaying shows."""
+
+    def test_cursor_forward_and_seek(self):
+        """Test the cursor matches the recording in any seek order."""
+        show = record_ramp().to_show()
+        cursor = ShowCursor(show)
+        for position in [0.0, 0.35, 2.0, 9.9, 7.25, 1.0, 5.0, -1.0, 4.95]:
+            frame = cursor.seek(position)
+            if position < 0:
+                assert not frame.any()
+                continue
+            step = min(int(position * 10 + 1e-6), 99)
+            assert frame[0].tolist() == [step] * 4
+            assert frame[1:].tolist() == [[50] * 4] * 2
+
+    def test_media_position(self, hass):
+        """Test the live track position is extrapolated while playing."""
+        state = MagicMock()
+        state.state = "playing"
+        state.attributes = {
+            "media_position": 30,
+            "media_position_updated_at": dt_util.utcnow() - timedelta(
+                seconds=2
+            ),
+        }
+        hass.states = MagicMock()
+        hass.states.get = MagicMock(return_value=state)
+        assert media_position(hass, "media_player.x") == pytest.approx(
+            32, abs=0.5
+        )
+        state.state = "paused"
+        assert media_position(hass, "media_player.x") == 30
+        state.state = "idle"
+        assert media_position(hass, "media_player.x") is None
+
+    @pytest.mark.asyncio
+    async def test_player_follows_position(self, hass):
+        """Test playback dispatches the frame at the source position."""
+        hass.loop = asyncio.get_running_loop()
+        show = record_ramp().to_show()
+        position = MagicMock(return_value=4.2)
+        player = ShowPlayer(hass, show, position, deadband=None)
+        await player.start()
+        await asyncio.sleep(0.05)
+        await player.stop()
+
+        calls = hass.services.async_call.call_args_list
+        assert calls
+        values = {
+            tuple(np.atleast_1d(call.args[2]["entity_id"])):
+            call.args[2]["brightness"]
+            for call in calls
+        }
+        assert values[("light.a",)] == 42
+        assert values[("light.b", "light.c")] == 50
+
+
+class TestShowManager:
+    """Test cases for the show manager."""
+
+    @pytest.mark.asyncio
+    async def test_record_and_play(self, hass):
+        """Test a recorded show is saved and replaces the renderer."""
+        hass.loop = asyncio.get_running_loop()
+        scheduler = MagicMock()
+        scheduler.frame_rate = 30.0
+        scheduler.recorder = None
+        scheduler.start = AsyncMock()
+        scheduler.stop = AsyncMock()
+        manager = ShowManager(hass, scheduler)
+
+        manager.start_recording("party")
+        for step in range(5):
+            scheduler.recorder.record(step / 30, solid(step + 1), LIGHTS)
+        path = await manager.async_stop_recording()
+        assert scheduler.recorder is None
+        assert Show.load(path).lights == LIGHTS
+
+        await manager.async_play("party")
+        scheduler.stop.assert_awaited_once()
+        assert manager.player.is_playing
+        await manager.async_stop_playback()
+        scheduler.start.assert_awaited_once()
+
+    def test_rejects_paths(self, hass):
+        """Test show names cannot escape the shows directory."""
+        manager = ShowManager(hass, MagicMock())
+        for name in ["../secrets", "a/b", ".hidden", ""]:
+            with pytest.raises(ValueError):
+                manager.path(name)
@@ -0,0 +1,323 @@
+"""Tests for offline show compilation."""
+import asyncio
+import io
+import math
+import os
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.aurora_sound_to_light.core.audio_processor import (
+    CHUNK_SIZE,
+    SAMPLE_RATE,
+    AudioProcessor,
+)
+from custom_components.aurora_sound_to_light.core.effect_engine import (
+    EffectEngine,
+)
+from custom_components.aurora_sound_to_light.core.feature_bus import (
+    FeatureBus,
+)
+from custom_components.aurora_sound_to_light.core.frame_output import (
+    new_frame,
+)
+from custom_components.aurora_sound_to_light.core.render_loop import (
+    RenderScheduler,
+)
+from custom_components.aurora_sound_to_light.core.show import (
+    COMPILED_PREFIX,
+    ShowManager,
+    ShowRecorder,
+    compiled_show_name,
+)
+from custom_components.aurora_sound_to_light.core.show_compiler import (
+    ShowCompiler,
+)
+
+HOP = CHUNK_SIZE / SAMPLE_RATE
+
+
+class BeatEffect:
+    """Effect that lights up on beats and logs what it was shown."""
+
+    def __init__(self):
+        """Initialize the effect."""
+        self.lights = ["light.a"]
+        self.is_running = True
+        self.seen = []
+
+    def render(self, features, t):
+        """Render full brightness on a beat."""
+        self.seen.append((t, features.timestamp, features.beat))
+        frame = new_frame(1)
+        frame[:, :3] = 255
+        frame[:, 3] = 255 if features.beat else 10
+        return frame
+
+
+def _create_processor():
+    """Create an audio processor with FFmpeg patched out."""
+    with patch(
+        "custom_components.aurora_sound_to_light.core.audio_processor.shutil.which",
+        return_value="/usr/bin/ffmpeg",
+    ), patch(
+        "custom_components.aurora_sound_to_light.core.audio_processor.FFmpegManager"
+    ):
+        return AudioProcessor(MagicMock(spec=HomeAssistant), {})
+
+
+def _kicks(chunks, every=8):
+    """Return chunks of quiet noise with a loud bass kick every few."""
+    rng = np.random.default_rng(1)
+    t = np.arange(CHUNK_SIZE) / SAMPLE_RATE
+    for index in range(chunks):
+        chunk = 0.01 * rng.standard_normal(CHUNK_SIZE)
+        if index % every == 0:
+            chunk = chunk + np.sin(2 * np.pi * 60 * t)
+        yield chunk.astype(np.float32)
+
+
+def _compile(frame_rate, chunks=64):
+    """Compile a kick pattern with a beat effect."""
+    hass = MagicMock(spec=HomeAssistant)
+    bus = FeatureBus(hass)
+    scheduler = RenderScheduler(hass, bus, frame_rate=frame_rate)
+    effect = BeatEffect()
+    scheduler.add_effect("beat", effect, budget=math.inf)
+    compiler = ShowCompiler(_create_processor(), scheduler, bus)
+    return compiler.compile(_kicks(chunks)), effect
+
+
+class TestShowCompiler:
+    """Test cases for ShowCompiler."""
+
+    def test_frames_on_show_clock(self):
+        """Test frames cover the track at the render frame rate."""
+        show, effect = _compile(30.0)
+        expected = math.ceil(64 * HOP * 30)
+        assert len(effect.seen) == expected
+        np.testing.assert_allclose(
+            show.times,
+            np.round(np.arange(expected) / 30, 3)
+        )
+        # Features are stamped with the frame's position in the track
+        assert all(t == stamp for t, stamp, _ in effect.seen)
+        assert show.metadata["frame_rate"] == 30.0
+
+    @pytest.mark.parametrize("frame_rate", [10.0, 60.0])
+    def test_each_beat_rendered_once(self, frame_rate):
+        """Test beats survive slow frame rates and are not repeated."""
+        show, effect = _compile(frame_rate)
+        times = [t for t, _, _ in effect.seen]
+        beat_frames = [t for t, _, beat in effect.seen if beat]
+        processor = _create_processor()
+        beats = [
+            index * HOP
+            for index, chunk in enumerate(_kicks(64))
+            if processor.analyze(chunk, index * HOP).beat
+        ]
+        assert beats
+        # Each beat shows on the first frame at or after its chunk
+        expected = sorted({
+            min(t for t in times if t >= beat) for beat in beats
+        })
+        assert beat_frames == expected
+
+
+def _ffmpeg(output, returncode):
+    """Return a fake FFmpeg process writing the output."""
+    process = MagicMock()
+    process.stdout = io.BytesIO(output)
+    process.wait = MagicMock(return_value=returncode)
+    return process
+
+
+class TestDecode:
+    """Test cases for decoding tracks with FFmpeg."""
+
+    @pytest.mark.parametrize("output,returncode", [
+        (np.zeros(CHUNK_SIZE * 3, dtype=np.float32).tobytes(), 1),
+        (b"", 0),
+    ])
+    def test_failed_decode_raises(self, output, returncode):
+        """Test a failed or empty decode is an error, not a short track."""
+        hass = MagicMock(spec=HomeAssistant)
+        bus = FeatureBus(hass)
+        compiler = ShowCompiler(
+            _create_processor(), RenderScheduler(hass, bus), bus
+        )
+        with patch(
+            "custom_components.aurora_sound_to_light.core.show_compiler."
+            "subprocess.Popen",
+            return_value=_ffmpeg(output, returncode)
+        ), pytest.raises(ValueError):
+            compiler.compile_url("spotify:track:1")
+
+
+@pytest.mark.asyncio
+class TestOfflineLineup:
+    """Test cases for compiling the active effects."""
+
+    async def test_populate_skips_live_only_effects(self, hass):
+        """Test the lineup is copied without code or self-timed effects."""
+        engine = EffectEngine(hass)
+        engine._active_effects = {
+            "wave": {"type": "color_wave", "target_lights": ["light.a"]},
+            "custom": {"code": "pass", "target_lights": ["light.a"]},
+            "flash": {"type": "precise_strobe", "target_lights": ["light.a"]},
+        }
+        scheduler = RenderScheduler(hass, FeatureBus(hass))
+        assert await engine.async_populate(scheduler, budget=math.inf) == 1
+        assert scheduler.get_stats()["effects"]["wave"]["budget"] == math.inf
+
+
+@pytest.fixture
+def hass(tmp_path):
+    """Home Assistant fixture."""
+    mock_hass = MagicMock(spec=HomeAssistant)
+    mock_hass.services = MagicMock()
+    mock_hass.services.async_call = AsyncMock()
+    mock_hass.config = MagicMock()
+    mock_hass.config.path = MagicMock(
+        side_effect=lambda *parts: str(tmp_path.joinpath(*parts))
+    )
+    mock_hass.async_create_task = MagicMock(
+        side_effect=lambda coro: asyncio.get_running_loop().create_task(coro)
+    )
+
+    async def run_in_executor(func, *args):
+        return func(*args)
+
+    mock_hass.async_add_executor_job = AsyncMock(side_effect=run_in_executor)
+    return mock_hass
+
+
+@pytest.mark.asyncio
+class TestCompiledPlayback:
+    """Test cases for playing compiled shows with their track."""
+
+    async def test_failed_compile_is_not_saved(self, hass):
+        """Test a track that fails to compile gets no show."""
+        manager = ShowManager(hass, MagicMock())
+        with patch(
+            "custom_components.aurora_sound_to_light.core.show_compiler."
+            "async_compile_track",
+            AsyncMock(side_effect=ValueError("No audio decoded"))
+        ):
+            assert await manager.async_compile(
+                MagicMock(), {}, "spotify:track:1"
+            ) is None
+
+        name = compiled_show_name("spotify:track:1")
+        assert name not in manager._compiled
+        assert not os.path.exists(manager.path(name))
+
+    async def test_follow_plays_compiled_track(self, hass):
+        """Test a compiled show plays with its track and stops after it."""
+        hass.loop = asyncio.get_running_loop()
+        hass.states = MagicMock()
+        hass.states.get = MagicMock(return_value=None)
+        scheduler = MagicMock()
+        scheduler.start = AsyncMock()
+        scheduler.stop = AsyncMock()
+        manager = ShowManager(hass, scheduler)
+
+        name = compiled_show_name("spotify:track:1")
+        assert name.startswith(COMPILED_PREFIX)
+        recorder = ShowRecorder()
+        recorder.record(0.0, new_frame(1), ["light.a"])
+        recorder.to_show().save(manager.path(name))
+        await manager.async_load()
+
+        with patch(
+            "custom_components.aurora_sound_to_light.core.show."
+            "async_track_state_change_event"
+        ) as track:
+            manager.follow("media_player.room")
+        state_changed = track.call_args.args[2]
+
+        def event(state, content_id):
+            new_state = MagicMock()
+            new_state.state = state
+            new_state.attributes = {"media_content_id": content_id}
+            return MagicMock(data={"new_state": new_state})
+
+        state_changed(event("playing", "spotify:track:1"))
+        await asyncio.sleep(0.01)
+        assert manager.playing == name
+        scheduler.stop.assert_awaited_once()
+
+        state_changed(event("playing", "spotify:track:2"))
+        await asyncio.sleep(0.01)
+        assert manager.playing is None
+        scheduler.start.assert_awaited_once()
+
+    async def test_follow_burst_starts_one_player(self, hass):
+        """Test a burst of state events leaves a single player running."""
+        hass.loop = asyncio.get_running_loop()
+        hass.states = MagicMock()
+        hass.states.get = MagicMock(return_value=None)
+
+        async def run_in_executor(func, *args):
+            await asyncio.sleep(0)
+            return func(*args)
+
+        hass.async_add_executor_job = AsyncMock(side_effect=run_in_executor)
+        scheduler = MagicMock()
+        scheduler.start = AsyncMock()
+        scheduler.stop = AsyncMock()
+        manager = ShowManager(hass, scheduler)
+
+        names = [
+            compiled_show_name(f"spotify:track:{track}") for track in (1, 2)
+        ]
+        for name in names:
+            recorder = ShowRecorder()
+            recorder.record(0.0, new_frame(1), ["light.a"])
+            recorder.to_show().save(manager.path(name))
+        await manager.async_load()
+
+        with patch(
+            "custom_components.aurora_sound_to_light.core.show."
+            "async_track_state_change_event"
+        ) as track:
+            manager.follow("media_player.room")
+        state_changed = track.call_args.args[2]
+
+        def event(content_id):
+            new_state = MagicMock()
+            new_state.state = "playing"
+            new_state.attributes = {"media_content_id": content_id}
+            return MagicMock(data={"new_state": new_state})
+
+        with patch(
+            "custom_components.aurora_sound_to_light.core.show."
+            "ShowPlayer"
+        ) as player:
+            player.return_value.start = AsyncMock()
+            player.return_value.stop = AsyncMock()
+            for content_id in ["spotify:track:1"] * 3 + ["spotify:track:2"]:
+                state_changed(event(content_id))
+            await asyncio.sleep(0.05)
+
+            assert manager.playing == names[1]
+            player.assert_called_once()
+            scheduler.stop.assert_awaited_once()
+
+            await asyncio.gather(
+                manager.async_play(names[0]),
+                manager.async_play(names[1]),
+            )
+            assert manager.playing == names[1]
+            assert player.call_count == 2
+            assert player.return_value.stop.await_count == 1
+
+            state_changed(event("spotify:track:3"))
+            state_changed(event("spotify:track:3"))
+            await asyncio.sleep(0.05)
+            assert manager.playing is None
+            assert manager.player is None
+            assert player.return_value.stop.await_count == 2
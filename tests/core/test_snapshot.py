@@ -0,0 +1,199 @@
+"""Tests for effect state snapshots."""
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.aurora_sound_to_light.core.beat_clock import BeatClock
+from custom_components.aurora_sound_to_light.core.effect_engine import (
+    EffectEngine,
+)
+from custom_components.aurora_sound_to_light.core.feature_bus import (
+    AudioFeatures,
+    FeatureBus,
+)
+from custom_components.aurora_sound_to_light.core.render_loop import (
+    RenderScheduler,
+)
+from custom_components.aurora_sound_to_light.core.snapshot import (
+    decode_value,
+    encode_value,
+)
+from custom_components.aurora_sound_to_light.effects import (
+    RadialPulseEffect,
+    StrobeSyncEffect,
+)
+from custom_components.aurora_sound_to_light.effects_impl import (
+    MultiColorEffect,
+)
+
+LIGHTS = ["light.a", "light.b", "light.c"]
+BEAT = AudioFeatures.from_levels(beat=True, tempo=128.0)
+QUIET = AudioFeatures.from_levels(tempo=128.0)
+
+
+@pytest.fixture
+def hass():
+    """Home Assistant fixture."""
+    mock_hass = MagicMock(spec=HomeAssistant)
+
+    async def run_in_executor(func, *args):
+        return func(*args)
+
+    mock_hass.async_add_executor_job = AsyncMock(side_effect=run_in_executor)
+    return mock_hass
+
+
+@pytest.fixture
+def scheduler(hass):
+    """Render scheduler fixture."""
+    return RenderScheduler(hass, FeatureBus(hass))
+
+
+class TestSnapshotEncoding:
+    """Test cases for encoding effect state."""
+
+    def test_round_trip(self):
+        """Test arrays and nested values restore exactly through JSON."""
+        state = {
+            "ages": np.array([0.1, 0.25, 3.5], dtype=np.float32),
+            "grid": np.arange(6, dtype=np.int16).reshape(2, 3),
+            "phase": np.float64(0.75),
+            "colors": {"light.a": (255, 0, 0)},
+        }
+        restored = decode_value(json.loads(json.dumps(encode_value(state))))
+        assert restored["ages"].dtype == np.float32
+        np.testing.assert_array_equal(restored["ages"], state["ages"])
+        np.testing.assert_array_equal(restored["grid"], state["grid"])
+        assert restored["phase"] == 0.75
+        assert restored["colors"] == {"light.a": [255, 0, 0]}
+
+    def test_beat_clock(self):
+        """Test a restored beat clock continues from its position."""
+        clock = BeatClock()
+        clock.update(QUIET, 0.0)
+        clock.update(BEAT, 0.3)
+        clock.update(QUIET, 0.5)
+
+        restored = BeatClock()
+        restored.restore_state(encode_value(clock))
+        assert restored.tempo == 128.0
+        assert restored.position == pytest.approx(clock.position)
+        # The first update after a restore does not jump ahead
+        restored.update(QUIET, 1000.0)
+        assert restored.position == pytest.approx(clock.position)
+
+
+class TestEffectState:
+    """Test cases for effect snapshots."""
+
+    def test_field_state(self, hass):
+        """Test ring ages survive a snapshot."""
+        effect = RadialPulseEffect(hass, LIGHTS)
+        effect.render(BEAT, 0.0)
+        effect.render(BEAT, 0.5)
+
+        restored = RadialPulseEffect(hass, LIGHTS)
+        restored.restore_state(json.loads(json.dumps(effect.snapshot_state())))
+        np.testing.assert_array_equal(restored._ages, effect._ages)
+
+    def test_nested_state(self, hass):
+        """Test state objects are restored in place."""
+        effect = StrobeSyncEffect(hass, LIGHTS)
+        effect.render(BEAT, 0.0)
+        effect.render(QUIET, 0.2)
+
+        restored = StrobeSyncEffect(hass, LIGHTS)
+        clock = restored._clock
+        restored.restore_state(effect.snapshot_state())
+        assert restored._clock is clock
+        assert clock.position == pytest.approx(effect._clock.position)
+
+    def test_multi_color_ignores_old_lights(self, hass):
+        """Test colors of lights no longer assigned are dropped."""
+        effect = MultiColorEffect(hass, LIGHTS[:2], {"pattern": "random"})
+        effect.restore_state({"_current_colors": {
+            "light.a": [1, 2, 3],
+            "light.gone": [4, 5, 6],
+        }})
+        assert effect._current_colors["light.a"] == [1, 2, 3]
+        assert set(effect._current_colors) == set(LIGHTS[:2])
+
+
+@pytest.mark.asyncio
+class TestEngineSnapshot:
+    """Test cases for saving and restoring the effect engine."""
+
+    async def _engine(self, hass, scheduler):
+        """Return an engine running a field wave on two lights."""
+        engine = EffectEngine(hass)
+        engine.attach_scheduler(scheduler)
+        await engine.register_effect("wave", {
+            "type": "field_wave",
+            "params": {"speed": 0.3},
+            "blend": "add",
+        })
+        await engine.register_effect("spare", {"type": "color_wave"})
+        await engine.start_effect("wave", LIGHTS[:2])
+        return engine
+
+    async def test_restore_resumes_effects(self, hass, scheduler):
+        """Test a restored engine resumes the show where it stopped."""
+        engine = await self._engine(hass, scheduler)
+        scheduler.render(0.0)
+        scheduler.render(1.0)
+        snapshot = json.loads(json.dumps(engine.snapshot()))
+
+        new_scheduler = RenderScheduler(hass, FeatureBus(hass))
+        restored = EffectEngine(hass)
+        restored.attach_scheduler(new_scheduler)
+        assert await restored.async_restore(snapshot) == 1
+
+        assert set(restored.get_available_effects()) == {"wave", "spare"}
+        assert restored.get_active_effects()["wave"]["target_lights"] == (
+            LIGHTS[:2]
+        )
+        effect = restored._instances["wave"]
+        assert effect._phase == pytest.approx(0.3)
+        assert new_scheduler.lights == LIGHTS[:2]
+        assert new_scheduler._effects["wave"].blend == "add"
+
+    async def test_invalid_snapshot(self, hass):
+        """Test malformed snapshots are rejected."""
+        engine = EffectEngine(hass)
+        for snapshot in [{"invalid": "state"}, [], {"version": 99}]:
+            with pytest.raises(ValueError):
+                await engine.async_restore(snapshot)
+
+    async def test_store(self, hass, scheduler):
+        """Test the snapshot goes through the store."""
+        engine = await self._engine(hass, scheduler)
+        engine._store = MagicMock()
+        engine._store.async_save = AsyncMock()
+        await engine.async_save_state()
+        saved = engine._store.async_save.call_args.args[0]
+        assert "wave" in saved["active"]
+
+        restored = EffectEngine(hass)
+        restored._store = MagicMock()
+        restored._store.async_load = AsyncMock(return_value=saved)
+        await restored.async_load_state()
+        assert "wave" in restored.get_active_effects()
+
+    async def test_changes_schedule_save(self, hass, scheduler):
+        """Test changes are saved with a delay, but unloading is not."""
+        engine = await self._engine(hass, scheduler)
+        engine._store = MagicMock()
+        await engine.stop_effect("wave")
+        await engine.start_effect("wave", LIGHTS)
+        await engine.update_effect("wave", {"params": {"speed": 2.0}})
+        assert engine._store.async_delay_save.call_count == 3
+        data_func = engine._store.async_delay_save.call_args.args[0]
+        assert "wave" in data_func()["active"]
+
+        engine._store.reset_mock()
+        await engine.cleanup()
+        engine._store.async_delay_save.assert_not_called()
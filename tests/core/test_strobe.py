@@ -0,0 +1,156 @@
+"""Tests for the precisely timed strobe."""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.aurora_sound_to_light.core.feature_bus import (
+    AudioFeatures,
+    FeatureBus,
+)
+from custom_components.aurora_sound_to_light.core.render_loop import (
+    RenderScheduler,
+)
+from custom_components.aurora_sound_to_light.core.strobe import (
+    MAX_LEAD,
+    StrobeTimer,
+)
+from custom_components.aurora_sound_to_light.effects_impl import (
+    PreciseStrobeEffect,
+)
+
+LIGHTS = ["light.a", "light.b", "light.c"]
+
+
+@pytest.fixture
+def hass():
+    """Home Assistant fixture."""
+    mock_hass = MagicMock(spec=HomeAssistant)
+    mock_hass.services = MagicMock()
+    mock_hass.services.async_call = AsyncMock()
+    mock_hass.async_create_task = MagicMock(
+        side_effect=lambda coro: asyncio.get_running_loop().create_task(coro)
+    )
+    return mock_hass
+
+
+class TestStrobeTimer:
+    """Test cases for StrobeTimer."""
+
+    def test_edges_on_absolute_grid(self, hass):
+        """Test flashes are placed on the grid, not relative to now."""
+        timer = StrobeTimer(hass, LIGHTS, frequency=4.0)
+        timer.anchor = 10.0
+        assert timer.next_on(10.1) == pytest.approx(10.25)
+        assert timer.next_on(11.0) == pytest.approx(11.0)
+
+    def test_beat_sync(self, hass):
+        """Test beats set the period and anchor of the flashes."""
+        timer = StrobeTimer(hass, LIGHTS)
+        timer.sync_beat(5.0, 120.0)
+        assert timer.period == pytest.approx(0.5)
+        assert timer.next_on(5.2) == pytest.approx(5.5)
+
+    def test_no_double_flash_after_reanchor(self, hass):
+        """Test a beat just after a flash does not flash again at once."""
+        timer = StrobeTimer(hass, LIGHTS, frequency=2.0)
+        timer.anchor = 0.0
+        timer._last_on = 1.0
+        timer.sync_beat(1.05, 120.0)
+        assert timer.next_on(1.06) == pytest.approx(1.55)
+
+    @pytest.mark.asyncio
+    async def test_one_call_per_edge(self, hass):
+        """Test every edge switches the whole group in one call."""
+        hass.loop = asyncio.get_running_loop()
+        timer = StrobeTimer(hass, LIGHTS, frequency=20.0, duty_cycle=0.5)
+        await timer.start()
+        await asyncio.sleep(0.22)
+        await timer.stop()
+
+        calls = hass.services.async_call.call_args_list
+        services = [call.args[1] for call in calls]
+        assert services[:4] == ["turn_on", "turn_off", "turn_on", "turn_off"]
+        assert services[-1] == "turn_off"
+        for call in calls:
+            assert call.args[2]["entity_id"] == LIGHTS
+
+        stats = timer.get_stats()
+        assert stats["edges"] == len(calls) - 1
+        assert stats["max_error"] < 0.05
+
+    @pytest.mark.asyncio
+    async def test_slow_dispatch_does_not_drift(self, hass):
+        """Test slow service calls do not push later flashes back."""
+        hass.loop = loop = asyncio.get_running_loop()
+        on_times = []
+
+        async def slow_call(domain, service, data):
+            if service == "turn_on":
+                on_times.append(loop.time())
+            await asyncio.sleep(0.01)
+
+        hass.services.async_call = AsyncMock(side_effect=slow_call)
+        timer = StrobeTimer(hass, LIGHTS, frequency=10.0, duty_cycle=0.3)
+        timer.anchor = loop.time() + 0.05
+        await timer.start()
+        await asyncio.sleep(0.6)
+        await timer.stop()
+
+        assert len(on_times) >= 5
+        for flash, sent in enumerate(on_times):
+            deadline = timer.anchor + flash * timer.period
+            assert abs(sent - deadline) < 0.03
+
+    @pytest.mark.asyncio
+    async def test_lead_compensates_late_edges(self, hass):
+        """Test late edges make the timer wake up earlier."""
+        hass.loop = loop = asyncio.get_running_loop()
+        timer = StrobeTimer(hass, LIGHTS)
+        await timer._switch(timer._on_frame, loop.time() - 0.01)
+        assert 0 < timer.lead <= MAX_LEAD
+        await timer._switch(timer._off_frame, loop.time() - 1.0)
+        assert timer.lead == MAX_LEAD
+
+
+class TestPreciseStrobeEffect:
+    """Test cases for PreciseStrobeEffect."""
+
+    def test_beats_anchor_timer(self, hass):
+        """Test each new beat re-anchors the flashes once."""
+        effect = PreciseStrobeEffect(hass, LIGHTS, {"beat_sync": True})
+        beat = AudioFeatures.from_levels(beat=True, tempo=100.0, timestamp=3.0)
+        effect.sync(beat, 3.0)
+        assert effect.timer.anchor == 3.0
+        assert effect.timer.period == pytest.approx(0.6)
+
+        effect.timer.anchor = None
+        effect.sync(beat, 3.1)
+        assert effect.timer.anchor is None
+
+    def test_params_update_timer(self, hass):
+        """Test live parameter updates reach the timer."""
+        effect = PreciseStrobeEffect(hass, LIGHTS)
+        effect.apply_params(effect.validate_params(
+            {"frequency": 5, "duty_cycle": 0.2, "color": [255, 0, 0]}
+        ))
+        assert effect.timer.period == pytest.approx(0.2)
+        assert effect.timer.duty_cycle == 0.2
+        assert effect.timer._on_frame[0].tolist() == [255, 0, 0, 255]
+
+    @pytest.mark.asyncio
+    async def test_scheduler_leaves_lights_to_timer(self, hass):
+        """Test the scheduler syncs the effect instead of rendering it."""
+        hass.loop = asyncio.get_running_loop()
+        scheduler = RenderScheduler(hass, FeatureBus(hass))
+        effect = PreciseStrobeEffect(hass, LIGHTS)
+        effect.sync = MagicMock()
+        effect._running = True
+        scheduler.add_effect("strobe", effect)
+
+        assert scheduler.lights == []
+        assert scheduler.render(1.0).shape == (0, 4)
+        effect.sync.assert_called_once()
+        assert "timing" in scheduler.get_stats()["effects"]["strobe"]
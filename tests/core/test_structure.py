@@ -0,0 +1,115 @@
+"""Tests for the musical structure analyzer."""
+import numpy as np
+
+from custom_components.aurora_sound_to_light.core.structure import (
+    EVENT_BUILD_UP,
+    EVENT_DROP,
+    EVENT_SECTION_CHANGE,
+    HISTORY_LENGTH,
+    StructureAnalyzer,
+)
+
+SAMPLE_RATE = 44100
+CHUNK_SIZE = 2048
+NUM_BANDS = 32
+
+
+class _Signal:
+    """Generate spectra and bands for synthetic test signals."""
+
+    def __init__(self):
+        self._rng = np.random.default_rng(0)
+        edges = np.logspace(np.log10(20), np.log10(20000), NUM_BANDS + 1)
+        self._edges = np.floor(edges * CHUNK_SIZE / SAMPLE_RATE).astype(int)
+
+    def spectrum(self, freqs, amplitude=1.0):
+        t = np.arange(CHUNK_SIZE) / SAMPLE_RATE
+        signal = amplitude * sum(np.sin(2 * np.pi * f * t) for f in freqs)
+        signal = signal + 0.05 * self._rng.standard_normal(CHUNK_SIZE)
+        return np.abs(np.fft.rfft(signal * np.hanning(CHUNK_SIZE)))
+
+    def bands(self, spectrum):
+        return np.array([
+            spectrum[self._edges[i]:max(self._edges[i + 1], self._edges[i] + 1)].mean()
+            for i in range(NUM_BANDS)
+        ])
+
+
+def _run(analyzer, frames):
+    """Feed (spectrum, bands, loudness) frames and collect events by index."""
+    events = []
+    for index, (spectrum, bands, loudness) in enumerate(frames):
+        for event in analyzer.process(bands, spectrum, loudness):
+            events.append((index, event))
+    return events
+
+
+class TestStructureAnalyzer:
+    """Test cases for StructureAnalyzer."""
+
+    def test_history_is_compact(self):
+        """Test the feature history is a float32 circular matrix."""
+        analyzer = StructureAnalyzer(SAMPLE_RATE, CHUNK_SIZE, NUM_BANDS)
+        assert analyzer._history.dtype == np.float32
+        assert analyzer._history.shape[0] == HISTORY_LENGTH
+
+    def test_steady_signal_has_no_events(self):
+        """Test a steady signal raises no structure events."""
+        signal = _Signal()
+        analyzer = StructureAnalyzer(SAMPLE_RATE, CHUNK_SIZE, NUM_BANDS)
+        frames = []
+        for _ in range(400):
+            spectrum = signal.spectrum([60, 440, 660])
+            frames.append((spectrum, signal.bands(spectrum), -10.0))
+        assert _run(analyzer, frames) == []
+
+    def test_section_change(self):
+        """Test a change of harmony is detected as a new section."""
+        signal = _Signal()
+        analyzer = StructureAnalyzer(SAMPLE_RATE, CHUNK_SIZE, NUM_BANDS)
+        frames = []
+        for index in range(400):
+            freqs = [60, 440, 660] if index < 200 else [80, 523, 784, 3000]
+            spectrum = signal.spectrum(freqs)
+            frames.append((spectrum, signal.bands(spectrum), -10.0))
+
+        events = _run(analyzer, frames)
+        assert [event for _, event in events] == [EVENT_SECTION_CHANGE]
+        assert 200 <= events[0][0] <= 280
+
+    def test_build_up_and_drop(self):
+        """Test a rising, thinning build-up followed by a bass drop."""
+        signal = _Signal()
+        analyzer = StructureAnalyzer(SAMPLE_RATE, CHUNK_SIZE, NUM_BANDS)
+        frames = []
+        for index in range(600):
+            if index < 150:
+                spectrum = signal.spectrum([60, 440])
+                loudness = -12.0
+            elif index < 450:
+                rise = (index - 150) / 300
+                spectrum = (
+                    signal.spectrum([60], 1 - 0.9 * rise) +
+                    signal.spectrum([2000, 4000], rise)
+                )
+                loudness = -30.0 + 20.0 * rise
+            else:
+                spectrum = signal.spectrum([50, 60], 3.0) + signal.spectrum([2000])
+                loudness = -8.0
+            frames.append((spectrum, signal.bands(spectrum), loudness))
+
+        events = [event for _, event in _run(analyzer, frames)]
+        assert EVENT_BUILD_UP in events
+        assert EVENT_DROP in events
+        assert events.index(EVENT_BUILD_UP) < events.index(EVENT_DROP)
+
+    def test_reset(self):
+        """Test reset clears the novelty state."""
+        signal = _Signal()
+        analyzer = StructureAnalyzer(SAMPLE_RATE, CHUNK_SIZE, NUM_BANDS)
+        for index in range(200):
+            spectrum = signal.spectrum([60] if index < 100 else [3000])
+            analyzer.process(signal.bands(spectrum), spectrum, -10.0)
+        analyzer.reset()
+        assert analyzer.novelty == 0.0
+        assert not np.any(analyzer._history)
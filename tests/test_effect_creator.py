@@ -0,0 +1,145 @@
+"""Tests for declarative effects created by the effect creator."""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.aurora_sound_to_light.core.effect_engine import (
+    EffectEngine,
+)
+from custom_components.aurora_sound_to_light.core.feature_bus import (
+    AudioFeatures,
+    FeatureBus,
+)
+from custom_components.aurora_sound_to_light.core.render_loop import (
+    RenderScheduler,
+)
+from custom_components.aurora_sound_to_light.effect_creator import (
+    EffectCreator,
+)
+from custom_components.aurora_sound_to_light.effects import registry
+from custom_components.aurora_sound_to_light.effects.registry import (
+    EffectRegistry,
+)
+
+CONFIG = {
+    "parameters": {
+        "speed": {
+            "type": "number",
+            "name": "Speed",
+            "min": 0.0,
+            "max": 10.0,
+            "step": 0.1,
+            "default": 1.0,
+        },
+        "mirror": {
+            "type": "boolean",
+            "name": "Mirror",
+            "default": False,
+        },
+    },
+    "expressions": {
+        "hue": "fract(t * speed + (1 - position if mirror else position))",
+        "brightness": "mix(0.2, 1, bass)",
+    },
+}
+
+
+@pytest.fixture
+def creator():
+    """Effect creator fixture."""
+    hass = MagicMock(spec=HomeAssistant)
+    with patch(
+        "custom_components.aurora_sound_to_light.effect_creator.storage.Store"
+    ):
+        return EffectCreator(hass)
+
+
+class TestDeclarativeEffect:
+    """Test cases for effects compiled from stored configs."""
+
+    def test_render(self, creator):
+        """Test a created effect renders frames for all lights."""
+        effect_class = creator._create_effect_class("Wave", CONFIG)
+        effect = effect_class(creator.hass, ["light.1", "light.2"])
+        features = AudioFeatures.from_levels([1.0, 1.0, 1.0])
+
+        frame = effect.render(features, 0.0)
+        assert frame.shape == (2, 4)
+        np.testing.assert_allclose(frame[:, 3], 255)
+        np.testing.assert_allclose(frame[0, :3], [255, 0, 0])
+
+    def test_params(self, creator):
+        """Test parameters are validated and applied live."""
+        effect_class = creator._create_effect_class("Wave", CONFIG)
+        effect = effect_class(creator.hass, ["light.1", "light.2"])
+        features = AudioFeatures.from_levels()
+
+        effect.apply_params(effect.validate_params({"mirror": True}))
+        frame = effect.render(features, 0.0)
+        np.testing.assert_allclose(frame[:, 3], 0.2 * 255)
+        np.testing.assert_allclose(frame[1, :3], [0, 255, 255])
+
+        with pytest.raises(ValueError):
+            effect.validate_params({"speed": 20})
+
+    def test_program_shared(self, creator):
+        """Test reloading a config reuses the compiled program."""
+        first = creator._create_effect_class("Wave", CONFIG)
+        second = creator._create_effect_class("Wave", dict(CONFIG))
+        assert first.program is second.program
+
+    def test_invalid_expression(self, creator):
+        """Test invalid expressions fail when the effect is created."""
+        with pytest.raises(ValueError):
+            creator._create_effect(
+                "Bad",
+                {"expressions": {"hue": "__import__('os')"}}
+            )
+
+
+@pytest.mark.asyncio
+class TestCreatorRegistration:
+    """Test cases for making created effects available to the engines."""
+
+    async def test_loaded_effects_can_be_started(self, creator):
+        """Test stored effects are registered and start like built-ins."""
+        creator._store.async_load = AsyncMock(return_value={"effects": [
+            {"name": "Wave", "config": CONFIG},
+            {"name": "Strobe", "config": CONFIG},
+        ]})
+        effects = EffectRegistry(discover=False)
+        with patch.object(registry, "_REGISTRY", effects):
+            await creator.async_load()
+            assert creator.get_effects() == {"wave": "Wave"}
+            assert effects["wave"].program is not None
+            # Built-in effects are not replaced
+            assert effects["strobe"].__name__ == "StrobeEffect"
+
+            engine = EffectEngine(creator.hass)
+            engine.attach_scheduler(
+                RenderScheduler(creator.hass, FeatureBus(creator.hass))
+            )
+            await engine.register_effect("wave", {"type": "wave"})
+            assert await engine.start_effect("wave", ["light.1"])
+            assert isinstance(engine._instances["wave"], effects["wave"])
+
+    async def test_parameter_configs_from_storage(self, creator):
+        """Test parameter configs validate as they come back from JSON."""
+        creator._validate_param_config("color", {
+            "type": "color", "name": "Color", "default": [255, 0, 0],
+        })
+        creator._validate_param_config("select", {
+            "type": "select", "name": "Mode", "options": ["a", "b"],
+            "default": "a",
+        })
+        creator._validate_param_config("number", {
+            "type": "number", "name": "Speed", "min": 0, "max": 10,
+            "step": 1, "default": 1,
+        })
+        with pytest.raises(ValueError):
+            creator._validate_param_config("color", {
+                "type": "color", "name": "Color", "default": [255, 0],
+            })
@@ -0,0 +1,105 @@
+"""Tests for setting up the integration from a config entry."""
+import asyncio
+import os
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.aurora_sound_to_light import (
+    async_setup_entry,
+    async_unload_entry,
+)
+from custom_components.aurora_sound_to_light.const import DOMAIN
+
+INTEGRATION = "custom_components.aurora_sound_to_light"
+LIGHTS = ["light.1", "light.2"]
+
+
+@pytest.fixture
+def hass(tmp_path):
+    """Home Assistant fixture."""
+    mock_hass = MagicMock(spec=HomeAssistant)
+    mock_hass.data = {}
+    mock_hass.bus = MagicMock()
+    mock_hass.config = MagicMock()
+    mock_hass.config.path = lambda *parts: os.path.join(tmp_path, *parts)
+    mock_hass.services = MagicMock()
+    mock_hass.services.async_call = AsyncMock()
+    mock_hass.config_entries = MagicMock()
+    mock_hass.config_entries.async_forward_entry_setups = AsyncMock()
+    mock_hass.config_entries.async_unload_platforms = AsyncMock(
+        return_value=True
+    )
+    mock_hass.async_create_task = MagicMock(
+        side_effect=lambda coro: asyncio.get_running_loop().create_task(coro)
+    )
+
+    async def run_in_executor(func, *args):
+        return func(*args)
+
+    mock_hass.async_add_executor_job = AsyncMock(side_effect=run_in_executor)
+    return mock_hass
+
+
+@pytest.fixture
+def setup_patches():
+    """Patch out FFmpeg, storage and the service registrations."""
+    store = MagicMock()
+    store.return_value.async_load = AsyncMock(return_value=None)
+    store.return_value.async_save = AsyncMock()
+    optimizer = MagicMock()
+    optimizer.return_value.start_optimization_loop = AsyncMock()
+    cache = MagicMock()
+    cache.return_value.async_setup = AsyncMock()
+    cache.return_value.async_stop = AsyncMock()
+    with patch(
+        f"{INTEGRATION}.core.audio_processor.shutil.which",
+        return_value="/usr/bin/ffmpeg",
+    ), patch(
+        f"{INTEGRATION}.core.audio_processor.FFmpegManager"
+    ), patch(
+        "homeassistant.helpers.storage.Store", store
+    ), patch(
+        f"{INTEGRATION}.AuroraCache", cache
+    ), patch(
+        f"{INTEGRATION}.PerformanceOptimizer", optimizer
+    ), patch(
+        f"{INTEGRATION}.async_register_services", AsyncMock()
+    ), patch(
+        f"{INTEGRATION}.async_register_websocket_commands"
+    ):
+        yield
+
+
+@pytest.mark.asyncio
+class TestSetupEntry:
+    """Test cases for async_setup_entry."""
+
+    async def test_started_effect_reaches_lights(self, hass, setup_patches):
+        """Test an effect started after setup is sent to the lights."""
+        hass.loop = asyncio.get_running_loop()
+        entry = MagicMock(entry_id="test", data={"lights": LIGHTS})
+
+        assert await async_setup_entry(hass, entry)
+        data = hass.data[DOMAIN]["test"]
+        assert data["audio_processor"]._running
+        assert not data["light_controller"].is_idle
+
+        engine = data["effect_engine"]
+        await engine.register_effect("wave", {"type": "color_wave"})
+        assert await engine.start_effect("wave", LIGHTS)
+
+        for _ in range(50):
+            services = [
+                call.args[:2]
+                for call in hass.services.async_call.call_args_list
+            ]
+            if ("light", "turn_on") in services:
+                break
+            await asyncio.sleep(0.02)
+        assert ("light", "turn_on") in services
+
+        assert await async_unload_entry(hass, entry)
+        assert not data["audio_processor"]._running
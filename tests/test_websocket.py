@@ -0,0 +1,198 @@
+"""Tests for the Aurora websocket API."""
+import asyncio
+import base64
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.aurora_sound_to_light.const import DOMAIN
+from custom_components.aurora_sound_to_light.core.feature_bus import (
+    AudioFeatures,
+    FeatureBus,
+)
+from custom_components.aurora_sound_to_light.websocket import (
+    EVENT_STATE_UPDATE,
+    FORMAT_FLOAT16,
+    DeltaEncoder,
+    SpectrumEncoder,
+    websocket_audio_levels,
+    websocket_subscribe_spectrum,
+    websocket_subscribe_state,
+)
+
+
+def _features(frequencies):
+    """Create an audio feature frame."""
+    return AudioFeatures(
+        frequencies=np.asarray(frequencies, dtype=np.float64),
+        waveform=np.zeros(8),
+        energy=0.5,
+        beat=True,
+        tempo=120.0,
+        loudness_momentary=-20.0,
+        loudness_short_term=-20.0,
+        novelty=0.0,
+        timestamp=1.0,
+    )
+
+
+@pytest.fixture
+def connection():
+    """Mock websocket connection."""
+    mock_connection = MagicMock()
+    mock_connection.subscriptions = {}
+    return mock_connection
+
+
+class TestSpectrumEncoder:
+    """Test cases for SpectrumEncoder."""
+
+    def test_decimation(self):
+        """Test bands are averaged down to the requested count."""
+        encoder = SpectrumEncoder(bands=4)
+        levels = encoder.decimate(np.arange(8, dtype=np.float64))
+        np.testing.assert_allclose(levels, [0.5, 2.5, 4.5, 6.5])
+
+    def test_no_decimation(self):
+        """Test all bands are kept without a band count."""
+        encoder = SpectrumEncoder()
+        assert len(encoder.decimate(np.ones(32))) == 32
+
+    def test_uint8(self):
+        """Test uint8 quantization round trip."""
+        payload = SpectrumEncoder(bands=2).encode(_features([0, 0, 1, 2]))
+        data = np.frombuffer(base64.b64decode(payload["data"]), np.uint8)
+        assert payload["bands"] == 2
+        np.testing.assert_array_equal(data, [0, 255])
+
+    def test_float16(self):
+        """Test float16 encoding round trip."""
+        encoder = SpectrumEncoder(fmt=FORMAT_FLOAT16)
+        payload = encoder.encode(_features([0.25, 0.5]))
+        data = np.frombuffer(base64.b64decode(payload["data"]), "<f2")
+        np.testing.assert_allclose(data, [0.25, 0.5])
+
+    def test_invalid_format(self):
+        """Test unknown formats are rejected."""
+        with pytest.raises(ValueError):
+            SpectrumEncoder(fmt="int4")
+
+
+@pytest.mark.asyncio
+class TestSpectrumSubscription:
+    """Test cases for the spectrum websocket subscriptions."""
+
+    async def test_subscribe_spectrum(self, connection):
+        """Test frames are pushed to the subscriber and can be cancelled."""
+        hass = MagicMock(spec=HomeAssistant)
+        hass.loop = asyncio.get_running_loop()
+        feature_bus = FeatureBus(hass)
+        hass.data = {DOMAIN: {"entry": {"feature_bus": feature_bus}}}
+
+        websocket_subscribe_spectrum(hass, connection, {
+            "id": 5, "fps": 30.0, "format": "uint8", "bands": 2,
+        })
+        connection.send_result.assert_called_once_with(5)
+
+        feature_bus.publish(_features([1, 1, 0, 0]))
+        msg_id, payload = connection.send_event.call_args[0]
+        assert msg_id == 5
+        assert payload["bands"] == 2
+
+        connection.subscriptions[5]()
+        assert feature_bus.subscriber_count(AudioFeatures) == 0
+
+    async def test_audio_levels(self, connection):
+        """Test the JSON level stream."""
+        hass = MagicMock(spec=HomeAssistant)
+        hass.loop = asyncio.get_running_loop()
+        feature_bus = FeatureBus(hass)
+        hass.data = {DOMAIN: {"entry": {"feature_bus": feature_bus}}}
+
+        websocket_audio_levels(hass, connection, {
+            "id": 1, "fps": 20.0,
+        })
+        feature_bus.publish(_features([0.1234, 0.5]))
+        payload = connection.send_event.call_args[0][1]
+        assert payload == {"levels": [0.123, 0.5]}
+
+    async def test_not_set_up(self, connection):
+        """Test subscribing without a configured entry."""
+        hass = MagicMock(spec=HomeAssistant)
+        hass.data = {}
+
+        websocket_audio_levels(hass, connection, {
+            "id": 1, "fps": 20.0,
+        })
+        connection.send_error.assert_called_once()
+
+
+class TestDeltaEncoder:
+    """Test cases for DeltaEncoder."""
+
+    def test_snapshot_then_changes(self):
+        """Test a full snapshot is followed by changed fields only."""
+        encoder = DeltaEncoder()
+        first = encoder.encode({"energy": 0.5, "idle": False})
+        assert first == {"full": True, "data": {"energy": 0.5, "idle": False}}
+
+        second = encoder.encode({"energy": 0.7, "idle": False})
+        assert second == {"full": False, "data": {"energy": 0.7}}
+
+    def test_unchanged(self):
+        """Test nothing is sent when rounded values did not change."""
+        encoder = DeltaEncoder()
+        encoder.encode({"energy": 0.5})
+        assert encoder.encode({"energy": 0.50001}) is None
+
+    def test_removed(self):
+        """Test removed fields are reported."""
+        encoder = DeltaEncoder()
+        encoder.encode({"energy": 0.5, "tempo": 120.0})
+        update = encoder.encode({"energy": 0.5})
+        assert update == {"full": False, "data": {}, "removed": ["tempo"]}
+
+
+@pytest.mark.asyncio
+class TestStateSubscription:
+    """Test cases for the delta-encoded state subscription."""
+
+    async def test_subscribe_state(self, connection):
+        """Test a snapshot is sent immediately and deltas on each window."""
+        hass = MagicMock(spec=HomeAssistant)
+        hass.loop = asyncio.get_running_loop()
+        audio_processor = MagicMock()
+        audio_processor.is_idle = True
+        effect_engine = MagicMock()
+        effect_engine.get_active_effects.return_value = {}
+        hass.data = {DOMAIN: {"entry": {
+            "audio_processor": audio_processor,
+            "effect_engine": effect_engine,
+        }}}
+
+        with patch(
+            "custom_components.aurora_sound_to_light.websocket."
+            "async_track_time_interval"
+        ) as track:
+            websocket_subscribe_state(hass, connection, {
+                "id": 3, "window": 0.25,
+            })
+        tick = track.call_args[0][1]
+
+        payload = connection.send_event.call_args[0][1]
+        assert payload["type"] == EVENT_STATE_UPDATE
+        assert payload["full"] is True
+        assert payload["data"] == {"idle": True, "active_effects": []}
+
+        connection.send_event.reset_mock()
+        tick(None)
+        connection.send_event.assert_not_called()
+
+        audio_processor.is_idle = False
+        tick(None)
+        payload = connection.send_event.call_args[0][1]
+        assert payload["data"] == {"idle": False}
+        assert connection.subscriptions[3] is track.return_value
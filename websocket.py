@@ -0,0 +1,378 @@
+"""WebSocket API for Aurora Sound to Light."""
+import base64
+import logging
+from datetime import timedelta
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import DOMAIN
+from .core.feature_bus import AudioFeatures, FeatureBus
+
+_LOGGER = logging.getLogger(__name__)
+
+# Spectrum stream settings
+FORMAT_UINT8 = "uint8"
+FORMAT_FLOAT16 = "float16"
+SPECTRUM_FORMATS = [FORMAT_UINT8, FORMAT_FLOAT16]
+DEFAULT_STREAM_FPS = 30.0
+DEFAULT_LEVELS_FPS = 20.0
+MAX_STREAM_FPS = 60.0
+MAX_STREAM_BANDS = 256
+
+# Delta subscription settings
+EVENT_METRICS_UPDATE = f"{DOMAIN}/metrics_update"
+EVENT_STATE_UPDATE = f"{DOMAIN}/state_update"
+DEFAULT_METRICS_WINDOW = 1.0  # seconds
+DEFAULT_STATE_WINDOW = 0.25  # seconds
+MIN_DELTA_WINDOW = 0.05
+MAX_DELTA_WINDOW = 60.0
+DELTA_PRECISION = 3  # decimals kept for float fields
+
+
+def _get_entry_data(
+    hass: HomeAssistant,
+    entry_id: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """Return the runtime data of a config entry, or of the first one."""
+    entries = hass.data.get(DOMAIN, {})
+    if entry_id is None:
+        entry_id = next(iter(entries), None)
+    data = entries.get(entry_id)
+    if not isinstance(data, dict):
+        return None
+    return data
+
+
+def _get_feature_bus(
+    hass: HomeAssistant,
+    entry_id: Optional[str] = None
+) -> Optional[FeatureBus]:
+    """Return the feature bus of a config entry, or of the first one."""
+    data = _get_entry_data(hass, entry_id)
+    if data is None:
+        return None
+    return data.get("feature_bus")
+
+
+class SpectrumEncoder:
+    """Decimate and quantize spectrum frames for one subscriber.
+
+    Bands are averaged down to the requested count with a single
+    ``np.add.reduceat`` call; the group edges are cached per input size
+    so profile changes only cost one rebuild.
+    """
+
+    def __init__(
+        self,
+        bands: Optional[int] = None,
+        fmt: str = FORMAT_UINT8
+    ) -> None:
+        """Initialize the encoder."""
+        if fmt not in SPECTRUM_FORMATS:
+            raise ValueError(f"Unsupported spectrum format: {fmt}")
+        self.bands = bands
+        self.format = fmt
+        self._edges: Optional[np.ndarray] = None
+        self._sizes: Optional[np.ndarray] = None
+        self._input_size = 0
+
+    def _update_edges(self, size: int) -> None:
+        """Rebuild the decimation groups for a new input band count."""
+        count = min(self.bands or size, size)
+        self._edges = np.linspace(0, size, count + 1).astype(int)[:-1]
+        self._sizes = np.diff(np.append(self._edges, size)).astype(np.float32)
+        self._input_size = size
+
+    def decimate(self, frequencies: np.ndarray) -> np.ndarray:
+        """Return the band levels at the requested resolution as float32."""
+        levels = np.asarray(frequencies, dtype=np.float32)
+        if len(levels) == 0:
+            return levels
+        if len(levels) != self._input_size:
+            self._update_edges(len(levels))
+        if len(self._edges) == len(levels):
+            return levels
+        return np.add.reduceat(levels, self._edges) / self._sizes
+
+    def quantize(self, levels: np.ndarray) -> bytes:
+        """Pack band levels into the subscriber's wire format."""
+        if self.format == FORMAT_UINT8:
+            return np.rint(
+                np.clip(levels, 0.0, 1.0) * 255
+            ).astype(np.uint8).tobytes()
+        return levels.astype("<f2").tobytes()
+
+    def encode(self, features: AudioFeatures) -> Dict[str, Any]:
+        """Encode one feature frame as a compact event payload."""
+        levels = self.decimate(features.frequencies)
+        return {
+            "format": self.format,
+            "bands": len(levels),
+            "data": base64.b64encode(self.quantize(levels)).decode("ascii"),
+            "energy": round(float(features.energy), 3),
+            "beat": bool(features.beat),
+            "timestamp": features.timestamp,
+        }
+
+
+def _subscribe_features(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: Dict[str, Any],
+    max_rate: float,
+    encode: Callable[[AudioFeatures], Dict[str, Any]],
+) -> None:
+    """Forward rate-limited audio features to a websocket connection."""
+    feature_bus = _get_feature_bus(hass, msg.get("entry_id"))
+    if feature_bus is None:
+        connection.send_error(
+            msg["id"],
+            websocket_api.ERR_NOT_FOUND,
+            "Aurora Sound to Light is not set up"
+        )
+        return
+
+    @callback
+    def forward(features: AudioFeatures) -> None:
+        connection.send_event(msg["id"], encode(features))
+
+    connection.subscriptions[msg["id"]] = feature_bus.subscribe(
+        AudioFeatures,
+        forward,
+        max_rate=max_rate
+    )
+    connection.send_result(msg["id"])
+
+
+_STREAM_SCHEMA: Dict[Any, Any] = {
+    vol.Optional("entry_id"): str,
+    vol.Optional("bands"): vol.All(
+        vol.Coerce(int),
+        vol.Range(min=1, max=MAX_STREAM_BANDS)
+    ),
+}
+
+
+@callback
+@websocket_api.websocket_command({
+    vol.Required("type"): f"{DOMAIN}/subscribe_spectrum",
+    vol.Optional("fps", default=DEFAULT_STREAM_FPS): vol.All(
+        vol.Coerce(float),
+        vol.Range(min=1, max=MAX_STREAM_FPS)
+    ),
+    vol.Optional("format", default=FORMAT_UINT8): vol.In(SPECTRUM_FORMATS),
+    **_STREAM_SCHEMA,
+})
+def websocket_subscribe_spectrum(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: Dict[str, Any],
+) -> None:
+    """Stream quantized, base64 encoded spectrum frames."""
+    encoder = SpectrumEncoder(msg.get("bands"), msg["format"])
+    _subscribe_features(hass, connection, msg, msg["fps"], encoder.encode)
+
+
+@callback
+@websocket_api.websocket_command({
+    vol.Required("type"): f"{DOMAIN}/audio_levels",
+    vol.Optional("fps", default=DEFAULT_LEVELS_FPS): vol.All(
+        vol.Coerce(float),
+        vol.Range(min=1, max=MAX_STREAM_FPS)
+    ),
+    **_STREAM_SCHEMA,
+})
+def websocket_audio_levels(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: Dict[str, Any],
+) -> None:
+    """Stream band levels as a JSON list for simple consumers."""
+    encoder = SpectrumEncoder(msg.get("bands"))
+
+    def encode(features: AudioFeatures) -> Dict[str, Any]:
+        levels = encoder.decimate(features.frequencies)
+        return {"levels": np.round(levels.astype(float), 3).tolist()}
+
+    _subscribe_features(hass, connection, msg, msg["fps"], encode)
+
+
+def _round_value(value: Any) -> Any:
+    """Round floats so measurement noise does not count as a change."""
+    if isinstance(value, (float, np.floating)):
+        return round(float(value), DELTA_PRECISION)
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class DeltaEncoder:
+    """Diff flat state dicts against what one subscriber last received.
+
+    The first call returns the full snapshot; later calls return only the
+    fields whose value changed plus the keys that disappeared, or None
+    when nothing changed.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the encoder."""
+        self._sent: Optional[Dict[str, Any]] = None
+
+    def encode(self, state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the message for a new state, or None if unchanged."""
+        state = {key: _round_value(value) for key, value in state.items()}
+        if self._sent is None:
+            self._sent = state
+            return {"full": True, "data": state}
+
+        changed = {
+            key: value for key, value in state.items()
+            if key not in self._sent or self._sent[key] != value
+        }
+        removed = [key for key in self._sent if key not in state]
+        if not changed and not removed:
+            return None
+
+        self._sent = state
+        message: Dict[str, Any] = {"full": False, "data": changed}
+        if removed:
+            message["removed"] = removed
+        return message
+
+
+def _metrics_snapshot(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Collect the performance metrics of a config entry."""
+    snapshot: Dict[str, Any] = {}
+    optimizer = data.get("optimizer")
+    if optimizer is not None:
+        snapshot.update(optimizer.get_optimization_stats())
+
+    audio_processor = data.get("audio_processor")
+    if audio_processor is not None:
+        profile = audio_processor.profile
+        snapshot["analysis_frame_rate"] = profile.frame_rate
+        snapshot["analysis_bands"] = profile.num_bands
+        snapshot["analysis_chunk_size"] = profile.chunk_size
+    return snapshot
+
+
+def _state_snapshot(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Collect the live audio and effect state of a config entry."""
+    snapshot: Dict[str, Any] = {}
+    audio_processor = data.get("audio_processor")
+    if audio_processor is not None:
+        snapshot["idle"] = audio_processor.is_idle
+
+    feature_bus = data.get("feature_bus")
+    features = feature_bus.latest(AudioFeatures) if feature_bus else None
+    if features is not None:
+        snapshot.update(features.summary())
+
+    effect_engine = data.get("effect_engine")
+    if effect_engine is not None:
+        snapshot["active_effects"] = sorted(
+            effect_engine.get_active_effects()
+        )
+    return snapshot
+
+
+def _subscribe_delta(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: Dict[str, Any],
+    event_type: str,
+    snapshot: Callable[[Dict[str, Any]], Dict[str, Any]],
+) -> None:
+    """Send a snapshot, then coalesced deltas once per window.
+
+    State is sampled once per window and diffed against what this
+    connection last received, so intermediate states inside a window are
+    dropped and a slow client never has more than one pending update
+    per window.
+    """
+    data = _get_entry_data(hass, msg.get("entry_id"))
+    if data is None:
+        connection.send_error(
+            msg["id"],
+            websocket_api.ERR_NOT_FOUND,
+            "Aurora Sound to Light is not set up"
+        )
+        return
+
+    encoder = DeltaEncoder()
+
+    @callback
+    def send_update(_now: Any = None) -> None:
+        try:
+            update = encoder.encode(snapshot(data))
+        except Exception as err:
+            _LOGGER.error("Error collecting %s: %s", event_type, err)
+            return
+        if update is not None:
+            connection.send_event(msg["id"], {"type": event_type, **update})
+
+    connection.subscriptions[msg["id"]] = async_track_time_interval(
+        hass,
+        send_update,
+        timedelta(seconds=msg["window"])
+    )
+    connection.send_result(msg["id"])
+    send_update()
+
+
+def _window_schema(default: float) -> Dict[Any, Any]:
+    """Return the schema for a delta subscription's coalescing window."""
+    return {
+        vol.Optional("entry_id"): str,
+        vol.Optional("window", default=default): vol.All(
+            vol.Coerce(float),
+            vol.Range(min=MIN_DELTA_WINDOW, max=MAX_DELTA_WINDOW)
+        ),
+    }
+
+
+@callback
+@websocket_api.websocket_command({
+    vol.Required("type"): f"{DOMAIN}/subscribe_metrics",
+    **_window_schema(DEFAULT_METRICS_WINDOW),
+})
+def websocket_subscribe_metrics(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: Dict[str, Any],
+) -> None:
+    """Subscribe to delta-encoded performance metrics."""
+    _subscribe_delta(
+        hass, connection, msg, EVENT_METRICS_UPDATE, _metrics_snapshot
+    )
+
+
+@callback
+@websocket_api.websocket_command({
+    vol.Required("type"): f"{DOMAIN}/subscribe_state",
+    **_window_schema(DEFAULT_STATE_WINDOW),
+})
+def websocket_subscribe_state(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: Dict[str, Any],
+) -> None:
+    """Subscribe to delta-encoded audio and effect state."""
+    _subscribe_delta(
+        hass, connection, msg, EVENT_STATE_UPDATE, _state_snapshot
+    )
+
+
+@callback
+def async_register_websocket_commands(hass: HomeAssistant) -> None:
+    """Register the Aurora websocket commands."""
+    websocket_api.async_register_command(hass, websocket_subscribe_spectrum)
+    websocket_api.async_register_command(hass, websocket_audio_levels)
+    websocket_api.async_register_command(hass, websocket_subscribe_metrics)
+    websocket_api.async_register_command(hass, websocket_subscribe_state)